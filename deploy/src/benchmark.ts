@@ -0,0 +1,422 @@
+import {
+  initConseil,
+  loadContract,
+  deployContract,
+  sendOperation,
+  getOperationReceipt,
+} from './utils'
+import { initOracleLib, Utils } from '@tacoinfra/harbinger-lib'
+import { TezosNodeReader } from 'conseiljs'
+import { execSync } from 'child_process'
+import fs = require('fs')
+
+/* eslint-disable  @typescript-eslint/no-unsafe-member-access */
+/* eslint-disable  @typescript-eslint/no-unsafe-assignment */
+
+// Builds the full Kolibri universe on a sandbox node, drives each user flow through it and records what every flow
+// costs on chain.
+//
+// Usage:
+//   npx ts-node src/benchmark.ts [report.json]             Run the benchmark and write a report.
+//   npx ts-node src/benchmark.ts compare base.json head.json  Compare two reports.
+//
+// Contracts are loaded from the compiled artifacts, so run `npm run build-smart-contracts` and
+// `smart_contracts/test-helpers/compile.sh` first.
+
+//-------------------------------------------------------------------
+// BENCHMARK PARAMETERS
+//-------------------------------------------------------------------
+
+// Tezos sandbox node address.
+const NODE_ADDRESS =
+  process.env.BENCHMARK_NODE_ADDRESS ?? 'http://localhost:20000'
+
+// Funded key on the sandbox which deploys the contracts and drives every flow. Defaults to Flextesa's `alice`.
+const BENCHMARK_PRIVATE_KEY =
+  process.env.BENCHMARK_PRIVATE_KEY ??
+  'edsk3QoqBuvdamxouPhin7swCvkQNgq4jP5KZPbwWNnwdZpSpJiEbq'
+
+// Compiled Minter to benchmark, relative to `smart_contracts/`. Set to `.minter-variants/minter-lambda.tz` or
+// `.minter-variants/minter-inline.tz` from `compile.sh --minter-variants` to compare the Minter's math variants.
+const MINTER_CONTRACT = process.env.BENCHMARK_MINTER_CONTRACT ?? 'minter.tz'
+
+// Log level to use for Conseil.
+const CONSEIL_LOG_LEVEL = 'error' // Valid options: 'error' | 'debug'
+
+// Default output file for the report.
+const DEFAULT_REPORT_FILE = 'benchmark-report.json'
+
+// Initial XTZ-USD price reported by the fake Harbinger. Specified in 6 digits.
+const INITIAL_PRICE = 2000000 // $2.00
+
+// XTZ-USD price which makes the benchmark oven undercollateralized, used for the liquidate flow.
+const LIQUIDATION_PRICE = 500000 // $0.50
+
+// The maximum delay for data from Harbinger, in seconds. Large, so that the fake Harbinger's price stays fresh for the
+// whole run.
+const MAX_DATA_DELAY_SECS = 24 * 60 * 60 // 1 day
+
+const PRECISION = BigInt('1000000000000000000')
+const COLLATERALIZATION_RATIO = '200000000000000000000' // 200%
+const DEBT_CEILING = '1000000000000000000000' // $1000
+const LIQUIDATION_FEE = BigInt('80000000000000000') // 8%
+const DEV_FUND_SPLIT = BigInt('100000000000000000') // 10%
+
+// Amounts used by the flows.
+const DEPOSIT_MUTEZ = 10000000 // 10 XTZ
+const BORROW_TOKENS = BigInt(5) * PRECISION
+const REPAY_TOKENS = BigInt(1) * PRECISION
+const WITHDRAW_MUTEZ = 1000000 // 1 XTZ
+
+// Tokens borrowed from a second oven so that the liquidator can cover the debt and liquidation fee.
+const LIQUIDATOR_BORROW_TOKENS = BigInt(2) * PRECISION
+
+// Numbers of sources the median oracle is benchmarked with, and the tokens borrowed through it for each. The last is
+// also the median oracle's `maxSources`.
+const MEDIAN_ORACLE_SOURCES = [1, 3, 5]
+const MEDIAN_BORROW_TOKENS = BigInt(1) * PRECISION
+
+//-------------------------------------------------------------------
+// REPORT
+//-------------------------------------------------------------------
+
+// On-chain costs of a single flow, summed over every operation in it, including internal operations.
+interface FlowCost {
+  consumedGas: number
+  storageSizeDiff: number
+  paidStorageSizeDiff: number
+  internalOperations: number
+}
+
+interface BenchmarkReport {
+  commit: string
+  nodeAddress: string
+  minterContract: string
+  timestamp: string
+  flows: Record<string, FlowCost>
+}
+
+const METRICS: Array<keyof FlowCost> = [
+  'consumedGas',
+  'storageSizeDiff',
+  'paidStorageSizeDiff',
+  'internalOperations',
+]
+
+//-------------------------------------------------------------------
+// PROGRAM
+//-------------------------------------------------------------------
+
+// Last known storage size of every contract touched by the benchmark, used to compute storage diffs.
+const storageSizes: Record<string, number> = {}
+
+// Fold a set of operation results into a flow's cost and update known storage sizes.
+function accumulateCost(cost: FlowCost, contents: any[]): void {
+  for (const content of contents) {
+    const results = [
+      {
+        destination: content.destination,
+        result: content.metadata.operation_result,
+      },
+      ...(content.metadata.internal_operation_results ?? []).map(
+        (internal: any) => ({
+          destination: internal.destination,
+          result: internal.result,
+        }),
+      ),
+    ]
+    cost.internalOperations += results.length - 1
+
+    for (const { destination, result } of results) {
+      if (result.status !== 'applied') {
+        throw new Error(`Operation not applied: ${JSON.stringify(result)}`)
+      }
+
+      // Protocols before Hangzhou report gas, later protocols report milligas.
+      cost.consumedGas +=
+        result.consumed_milligas !== undefined
+          ? parseInt(result.consumed_milligas) / 1000
+          : parseInt(result.consumed_gas ?? '0')
+      cost.paidStorageSizeDiff += parseInt(result.paid_storage_size_diff ?? '0')
+
+      if (result.storage_size !== undefined) {
+        const address: string =
+          result.originated_contracts?.[0] ?? (destination as string)
+        const storageSize = parseInt(result.storage_size)
+        cost.storageSizeDiff += storageSize - (storageSizes[address] ?? 0)
+        storageSizes[address] = storageSize
+      }
+    }
+  }
+}
+
+// Fetch the receipt of an operation and fold it into a flow's cost. Returns the receipt's contents.
+async function measure(cost: FlowCost, operationHash: string): Promise<any[]> {
+  const contents = await getOperationReceipt(operationHash, NODE_ADDRESS)
+  accumulateCost(cost, contents)
+  return contents
+}
+
+function emptyCost(): FlowCost {
+  return {
+    consumedGas: 0,
+    storageSizeDiff: 0,
+    paidStorageSizeDiff: 0,
+    internalOperations: 0,
+  }
+}
+
+async function runBenchmark(reportFile: string): Promise<void> {
+  console.log('------------------------------------------------------')
+  console.log('> Benchmarking Kolibri Contracts')
+  console.log(`Tezos Node: ${NODE_ADDRESS}`)
+  console.log(`Minter: ${MINTER_CONTRACT}`)
+  console.log('------------------------------------------------------')
+
+  initConseil(CONSEIL_LOG_LEVEL)
+  initOracleLib(CONSEIL_LOG_LEVEL)
+
+  const keystore = await Utils.keyStoreFromPrivateKey(BENCHMARK_PRIVATE_KEY)
+  const pkh = keystore.publicKeyHash
+  let counter = await TezosNodeReader.getCounterForAccount(NODE_ADDRESS, pkh)
+
+  // Deploy a contract and record its initial storage size.
+  const setupCost = emptyCost()
+  const deploy = async (file: string, storage: string): Promise<string> => {
+    counter++
+    const result = await deployContract(
+      loadContract(`${__dirname}/../../smart_contracts/${file}`),
+      storage,
+      keystore,
+      counter,
+      NODE_ADDRESS,
+    )
+    await measure(setupCost, result.operationHash)
+    return result.contractAddress
+  }
+
+  // Invoke a contract. Returns the operation hash.
+  const invoke = async (
+    contractAddress: string,
+    entrypoint: string,
+    parameter: string,
+    amountMutez = 0,
+  ): Promise<string> => {
+    counter++
+    return sendOperation(
+      contractAddress,
+      entrypoint,
+      parameter,
+      keystore,
+      counter,
+      NODE_ADDRESS,
+      amountMutez,
+    )
+  }
+
+  console.log('>> [1/3] Deploying Contracts...')
+  const nowSec = Math.floor(new Date().getTime() / 1000)
+  const harbinger = await deploy(
+    'test-helpers/fake-harbinger.tz',
+    `(Pair "XTZ-USD" (Pair "${nowSec}" ${INITIAL_PRICE}))`,
+  )
+  const minter = await deploy(
+    MINTER_CONTRACT,
+    `(Pair (Pair (Pair ${COLLATERALIZATION_RATIO} (Pair "${pkh}" "${pkh}")) (Pair 1000000000000000000 (Pair "${nowSec}" ${LIQUIDATION_FEE.toString()}))) (Pair (Pair {} (Pair (Some 100000000) "${pkh}")) (Pair (Pair ${DEV_FUND_SPLIT.toString()} 0) (Pair "${pkh}" "${pkh}"))))`,
+  )
+  const ovenProxy = await deploy(
+    'oven-proxy.tz',
+    `(Pair (Pair (Pair None "${pkh}") (Pair None (Pair "${pkh}" "${pkh}"))) (Pair (Pair "${pkh}" "${pkh}") (Pair False (Pair 0 None))))`,
+  )
+  const ovenFactory = await deploy(
+    'oven-factory.tz',
+    `(Pair (Pair "${pkh}" (Pair None None)) (Pair (Pair "${pkh}" "${pkh}") (Pair "${pkh}" 0)))`,
+  )
+  const token = await deploy(
+    'token.tz',
+    `(Pair (Pair (Pair "${pkh}" {}) (Pair ${DEBT_CEILING} "${pkh}")) (Pair (Pair {} False) (Pair {} 0)))`,
+  )
+  const ovenRegistry = await deploy(
+    'oven-registry.tz',
+    `(Pair "${pkh}"(Pair "${pkh}" {}))`,
+  )
+  const devFund = await deploy(
+    'dev-fund.tz',
+    `(Pair "${pkh}"(Pair "${pkh}" "${pkh}"))`,
+  )
+  const stabilityFund = await deploy(
+    'stability-fund.tz',
+    `(Pair(Pair "${pkh}" "${pkh}")(Pair "${pkh}" "${pkh}"))`,
+  )
+  const oracle = await deploy(
+    'oracle.tz',
+    `(Pair(Pair(Pair None 0)(Pair "${pkh}"(Pair "${harbinger}" 0)))(Pair(Pair 0(Pair ${MAX_DATA_DELAY_SECS} 10))(Pair 0(Pair {} 0))))`,
+  )
+
+  console.log('>> [2/3] Wiring Contracts...')
+  const wiring: Array<[string, string, string]> = [
+    [ovenProxy, 'setMinterContract', `"${minter}"`],
+    [ovenProxy, 'setOvenRegistryContract', `"${ovenRegistry}"`],
+    [ovenProxy, 'setOracleContract', `"${oracle}"`],
+    [
+      minter,
+      'updateContracts',
+      `(Pair "${pkh}"(Pair "${token}"(Pair "${ovenProxy}"(Pair "${stabilityFund}" "${devFund}"))))`,
+    ],
+    [token, 'setAdministrator', `"${minter}"`],
+    [ovenFactory, 'setOvenRegistryContract', `"${ovenRegistry}"`],
+    [ovenFactory, 'setMinterContract', `"${minter}"`],
+    [ovenFactory, 'setOvenProxyContract', `"${ovenProxy}"`],
+    [ovenRegistry, 'setOvenFactoryContract', `"${ovenFactory}"`],
+    [stabilityFund, 'setOvenRegistryContract', `"${ovenRegistry}"`],
+  ]
+  for (const [contractAddress, entrypoint, parameter] of wiring) {
+    await measure(setupCost, await invoke(contractAddress, entrypoint, parameter))
+  }
+
+  console.log('>> [3/3] Running Flows...')
+  const flows: Record<string, FlowCost> = {}
+
+  // Run a flow made of one operation and record its cost. Returns the receipt's contents.
+  const flow = async (
+    name: string,
+    operation: Promise<string>,
+  ): Promise<any[]> => {
+    const cost = emptyCost()
+    const contents = await measure(cost, await operation)
+    flows[name] = cost
+    console.log(`${name}: ${JSON.stringify(cost)}`)
+    return contents
+  }
+
+  // Find the address of the oven originated by a `makeOven` call.
+  const originatedOven = (contents: any[]): string => {
+    for (const content of contents) {
+      for (const internal of content.metadata.internal_operation_results ??
+        []) {
+        if (internal.kind === 'origination') {
+          return internal.result.originated_contracts[0] as string
+        }
+      }
+    }
+    throw new Error('makeOven did not originate an oven')
+  }
+
+  const oven = originatedOven(
+    await flow('makeOven', invoke(ovenFactory, 'makeOven', 'Unit')),
+  )
+  await flow('deposit', invoke(oven, 'default', 'Unit', DEPOSIT_MUTEZ))
+  await flow('borrow', invoke(oven, 'borrow', BORROW_TOKENS.toString()))
+  await flow('repay', invoke(oven, 'repay', REPAY_TOKENS.toString()))
+  await flow('withdraw', invoke(oven, 'withdraw', `${WITHDRAW_MUTEZ}`))
+
+  // Setup for liquidation: borrow enough extra tokens from a second oven to cover the debt and liquidation fee, then
+  // drop the price so the first oven is undercollateralized.
+  const liquidatorOven = originatedOven(
+    await getOperationReceipt(
+      await invoke(ovenFactory, 'makeOven', 'Unit'),
+      NODE_ADDRESS,
+    ),
+  )
+  await invoke(liquidatorOven, 'default', 'Unit', DEPOSIT_MUTEZ)
+  await invoke(liquidatorOven, 'borrow', LIQUIDATOR_BORROW_TOKENS.toString())
+  await invoke(harbinger, 'setNewPrice', `${LIQUIDATION_PRICE}`)
+
+  await flow('liquidate', invoke(oven, 'liquidate', 'Unit'))
+
+  // Sweep the dev fund's share of the liquidation fee out of the dev fund.
+  const liquidationFee =
+    ((BORROW_TOKENS - REPAY_TOKENS) * LIQUIDATION_FEE) / PRECISION
+  const devFundTokens = (liquidationFee * DEV_FUND_SPLIT) / PRECISION
+  await flow(
+    'sweep',
+    invoke(devFund, 'sendTokens', `(Pair ${devFundTokens.toString()} "${pkh}")`),
+  )
+
+  // Switch the oven proxy to a median oracle and borrow through it with a growing number of fake Harbinger sources,
+  // which shows the cost of each source read with the `getPrice` view.
+  const medianOracle = await deploy(
+    'median-oracle.tz',
+    `(Pair (Pair "${pkh}" ${MAX_DATA_DELAY_SECS}) (Pair ${MEDIAN_ORACLE_SOURCES[MEDIAN_ORACLE_SOURCES.length - 1]} (Pair 1 {})))`,
+  )
+  await invoke(ovenProxy, 'setOracleContract', `"${medianOracle}"`)
+  let medianSources = 0
+  for (const sourceCount of MEDIAN_ORACLE_SOURCES) {
+    for (; medianSources < sourceCount; medianSources++) {
+      const sourceTime = Math.floor(new Date().getTime() / 1000)
+      const source = await deploy(
+        'test-helpers/fake-harbinger.tz',
+        `(Pair "XTZ-USD" (Pair "${sourceTime}" ${INITIAL_PRICE}))`,
+      )
+      await invoke(medianOracle, 'addSource', `"${source}"`)
+    }
+    await flow(
+      `borrowMedian${sourceCount}`,
+      invoke(liquidatorOven, 'borrow', MEDIAN_BORROW_TOKENS.toString()),
+    )
+  }
+
+  const report: BenchmarkReport = {
+    commit: currentCommit(),
+    nodeAddress: NODE_ADDRESS,
+    minterContract: MINTER_CONTRACT,
+    timestamp: new Date().toISOString(),
+    flows,
+  }
+  fs.writeFileSync(reportFile, `${JSON.stringify(report, null, 2)}\n`)
+
+  console.log('------------------------------------------------------')
+  console.log(`> Setup cost: ${JSON.stringify(setupCost)}`)
+  console.log(`> Report written to ${reportFile}`)
+  console.log('------------------------------------------------------')
+}
+
+// Print the change in every metric of every flow between two reports.
+function compareReports(baseFile: string, headFile: string): void {
+  const base = JSON.parse(fs.readFileSync(baseFile).toString()) as BenchmarkReport
+  const head = JSON.parse(fs.readFileSync(headFile).toString()) as BenchmarkReport
+
+  console.log(`Base: ${base.commit} (${base.minterContract})`)
+  console.log(`Head: ${head.commit} (${head.minterContract})`)
+  console.log('')
+  console.log(
+    `${'Flow'.padEnd(16)}${'Metric'.padEnd(22)}${'Base'.padStart(14)}${'Head'.padStart(14)}${'Delta'.padStart(14)}${'%'.padStart(10)}`,
+  )
+
+  const flowNames = new Set([
+    ...Object.keys(base.flows),
+    ...Object.keys(head.flows),
+  ])
+  for (const flowName of flowNames) {
+    for (const metric of METRICS) {
+      const baseValue = base.flows[flowName]?.[metric] ?? 0
+      const headValue = head.flows[flowName]?.[metric] ?? 0
+      const delta = headValue - baseValue
+      const percent =
+        baseValue === 0 ? '-' : `${((delta / baseValue) * 100).toFixed(2)}`
+      console.log(
+        `${flowName.padEnd(16)}${metric.padEnd(22)}${`${baseValue}`.padStart(14)}${`${headValue}`.padStart(14)}${`${delta}`.padStart(14)}${percent.padStart(10)}`,
+      )
+    }
+  }
+}
+
+// The commit the benchmark ran against, so reports can be compared across commits.
+function currentCommit(): string {
+  try {
+    return execSync('git rev-parse --short HEAD').toString().trim()
+  } catch (e) {
+    return 'unknown'
+  }
+}
+
+async function main(): Promise<void> {
+  const args = process.argv.slice(2)
+  if (args[0] === 'compare') {
+    compareReports(args[1], args[2])
+    return
+  }
+  await runBenchmark(args[0] ?? DEFAULT_REPORT_FILE)
+}
+
+void main()
@@ -144,7 +144,8 @@ async function main() {
   console.log('>>> [1/9] Deploying Minter Contract...')
   // Constants:
   // Interest Index: 1000000000000000000 (1)
-  const minterContractStorage = `(Pair (Pair (Pair ${COLLATERALIZATION_RATIO} (Pair "${keystore.publicKeyHash}" "${keystore.publicKeyHash}")) (Pair 1000000000000000000 (Pair "${timestampSec}" ${LIQUIDATION_FEE}))) (Pair (Pair (${INITIAL_OVEN_MAX_MUTEZ}) (Pair "${keystore.publicKeyHash}" ${DEV_FUND_SPLIT})) (Pair ${STABILITY_FEE} (Pair "${keystore.publicKeyHash}" "${keystore.publicKeyHash}"))))`
+  // Metadata: {} (set with `updateContractMetadata` once the TZIP-16 document is hosted)
+  const minterContractStorage = `(Pair (Pair (Pair ${COLLATERALIZATION_RATIO} (Pair "${keystore.publicKeyHash}" "${keystore.publicKeyHash}")) (Pair 1000000000000000000 (Pair "${timestampSec}" ${LIQUIDATION_FEE}))) (Pair (Pair {} (Pair (${INITIAL_OVEN_MAX_MUTEZ}) "${keystore.publicKeyHash}")) (Pair (Pair ${DEV_FUND_SPLIT} ${STABILITY_FEE}) (Pair "${keystore.publicKeyHash}" "${keystore.publicKeyHash}"))))`
   counter++
   const minterContractDeployResult = await deployContract(
     minterContractSource,
@@ -248,8 +249,14 @@ async function main() {
   console.log('>>> [8/9] Deploying Oracle Contract...')
   // Constants:
   // clientCallback: None
+  // cumulativePrice: 0
+  // lastObservationTime: 0 (epoch)
+  // lastPrice: 0
+  // observationBufferSize: 10
+  // observationIndex: 0
+  // observations: {}
   // state: 0 (IDLE)
-  const oracleStorage = `(Pair(Pair None "${keystore.publicKeyHash}")(Pair "${HARBINGER_NORMALIZER}"(Pair ${MAX_DATA_DELAY_SECS} 0)))`
+  const oracleStorage = `(Pair(Pair(Pair None 0)(Pair "${keystore.publicKeyHash}"(Pair "${HARBINGER_NORMALIZER}" 0)))(Pair(Pair 0(Pair ${MAX_DATA_DELAY_SECS} 10))(Pair 0(Pair {} 0))))`
   counter++
   const oracleDeployResult = await deployContract(
     oracleSource,
@@ -46,6 +46,7 @@ export async function sendOperation(
   keystore: KeyStore,
   counter: number,
   nodeAddress: string,
+  amountMutez = 0,
 ): Promise<string> {
   try {
     console.log(`Using counter: ${counter}`)
@@ -62,7 +63,7 @@ export async function sendOperation(
       keystore.publicKeyHash,
       counter,
       contractAddress,
-      0,
+      amountMutez,
       0,
       Constants.storageLimit,
       Constants.gasLimit,
@@ -103,6 +104,7 @@ export async function sendOperation(
       keystore,
       counter,
       nodeAddress,
+      amountMutez,
     )
   }
 }
@@ -183,3 +185,38 @@ export async function deployContract(
     )
   }
 }
+
+// How many blocks back from head to search for an operation.
+const OPERATION_SEARCH_DEPTH = 10
+
+// Fetch the receipt for an included manager operation by searching the most recent blocks.
+// Returns the operation's `contents`, including metadata and internal operation results.
+export async function getOperationReceipt(
+  operationHash: string,
+  nodeAddress: string,
+): Promise<any[]> {
+  for (let depth = 0; depth < OPERATION_SEARCH_DEPTH; depth++) {
+    const blockHash = (await (
+      await fetch(`${nodeAddress}/chains/main/blocks/head~${depth}/hash`)
+    ).json()) as string
+    const operationHashes = (await (
+      await fetch(
+        `${nodeAddress}/chains/main/blocks/${blockHash}/operation_hashes/3`,
+      )
+    ).json()) as string[]
+
+    const index = operationHashes.indexOf(operationHash)
+    if (index !== -1) {
+      const operation = await (
+        await fetch(
+          `${nodeAddress}/chains/main/blocks/${blockHash}/operations/3/${index}`,
+        )
+      ).json()
+      return operation.contents
+    }
+  }
+
+  throw new Error(
+    `Operation ${operationHash} not found in the last ${OPERATION_SEARCH_DEPTH} blocks`,
+  )
+}
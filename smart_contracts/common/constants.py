@@ -13,4 +13,7 @@ MUTEZ_TO_KOLIBRI_CONVERSION = 1000000000000
 ASSET_CODE = "XTZ-USD"
 
 # The type of data returned in Harbinger's callback.
-HARBINGER_DATA_TYPE = sp.TPair(sp.TString, sp.TPair(sp.TTimestamp, sp.TNat))
\ No newline at end of file
+HARBINGER_DATA_TYPE = sp.TPair(sp.TString, sp.TPair(sp.TTimestamp, sp.TNat))
+
+# The type of data returned by Harbinger's `getPrice` view.
+HARBINGER_VIEW_DATA_TYPE = sp.TPair(sp.TTimestamp, sp.TNat)
@@ -77,4 +77,16 @@ TOKEN_INSUFFICIENT_BALANCE = 23
 TOKEN_UNSAFE_ALLOWANCE_CHANGE = 23
 
 # The operation was not performed by the token administrator.
-TOKEN_NOT_ADMINISTRATOR = 24
\ No newline at end of file
+TOKEN_NOT_ADMINISTRATOR = 24
+
+# The maximum number of price sources would be exceeded if the operation were completed.
+TOO_MANY_SOURCES = 25
+
+# The sender of an operation was required to be the price updater.
+NOT_UPDATER = 26
+
+# Partial liquidations are disabled because the collateralization percentage does not exceed 100% plus the liquidation fee.
+PARTIAL_LIQUIDATION_DISABLED = 27
+
+# The retained price observations do not reach back to the start of the requested TWAP window.
+TWAP_WINDOW_NOT_COVERED = 28
@@ -0,0 +1,107 @@
+import smartpy as sp
+
+################################################################
+# Event tags and payload types emitted by Kolibri contracts.
+#
+# Every change to an oven or to token balances emits an event
+# carrying the values before and after the change, so that the
+# full state can be rebuilt from event logs alone.
+################################################################
+
+################################################################
+# Minter Events
+################################################################
+
+BORROW_EVENT_TAG = "borrow"
+REPAY_EVENT_TAG = "repay"
+DEPOSIT_EVENT_TAG = "deposit"
+WITHDRAW_EVENT_TAG = "withdraw"
+LIQUIDATE_EVENT_TAG = "liquidate"
+PARTIAL_LIQUIDATE_EVENT_TAG = "partialLiquidate"
+
+# The state of an oven, as stored in the Oven contract.
+# Elements:
+#   - borrowedTokens: The number of borrowed tokens.
+#   - stabilityFeeTokens: The number of tokens accrued in stability fees.
+#   - interestIndex: The interest index for the oven.
+#   - isLiquidated: Whether the oven is liquidated.
+OVEN_STATE_TYPE = sp.TRecord(
+    borrowedTokens = sp.TNat,
+    stabilityFeeTokens = sp.TNat,
+    interestIndex = sp.TInt,
+    isLiquidated = sp.TBool,
+)
+
+# An operation on an oven.
+# Elements:
+#   - oven: The address of the oven.
+#   - owner: The owner of the oven.
+#   - balance: The collateral held by the oven after the operation. The balance before the operation is
+#              the balance in the previous event for the oven, since every change of collateral emits an event.
+#   - before: The state of the oven before the operation, with stability fees as last stored by the oven.
+#   - after: The state of the oven after the operation.
+OVEN_EVENT_TYPE = sp.TRecord(
+    oven = sp.TAddress,
+    owner = sp.TAddress,
+    balance = sp.TMutez,
+    before = OVEN_STATE_TYPE,
+    after = OVEN_STATE_TYPE,
+)
+
+################################################################
+# Oven Factory Events
+################################################################
+
+OVEN_CREATED_EVENT_TAG = "ovenCreated"
+
+# A new oven.
+# Elements:
+#   - oven: The address of the oven.
+#   - owner: The owner of the oven.
+#   - interestIndex: The initial interest index for the oven.
+#   - delegate: The initial delegate of the oven.
+OVEN_CREATED_EVENT_TYPE = sp.TRecord(
+    oven = sp.TAddress,
+    owner = sp.TAddress,
+    interestIndex = sp.TInt,
+    delegate = sp.TOption(sp.TKeyHash),
+)
+
+################################################################
+# Token Events
+################################################################
+
+MINT_EVENT_TAG = "mint"
+BURN_EVENT_TAG = "burn"
+TRANSFER_EVENT_TAG = "transfer"
+
+# Tokens minted to or burned from an address.
+# Elements:
+#   - address: The address whose balance changed.
+#   - value: The number of tokens minted or burned.
+#   - balanceBefore / balanceAfter: The balance of the address.
+#   - totalSupplyBefore / totalSupplyAfter: The total supply of the token.
+SUPPLY_EVENT_TYPE = sp.TRecord(
+    address = sp.TAddress,
+    value = sp.TNat,
+    balanceBefore = sp.TNat,
+    balanceAfter = sp.TNat,
+    totalSupplyBefore = sp.TNat,
+    totalSupplyAfter = sp.TNat,
+)
+
+# Tokens transferred between addresses.
+# Elements:
+#   - from_ / to_: The sending and receiving addresses.
+#   - value: The number of tokens transferred.
+#   - fromBalanceBefore / fromBalanceAfter: The balance of the sender.
+#   - toBalanceBefore / toBalanceAfter: The balance of the receiver.
+TRANSFER_EVENT_TYPE = sp.TRecord(
+    from_ = sp.TAddress,
+    to_ = sp.TAddress,
+    value = sp.TNat,
+    fromBalanceBefore = sp.TNat,
+    fromBalanceAfter = sp.TNat,
+    toBalanceBefore = sp.TNat,
+    toBalanceAfter = sp.TNat,
+)
@@ -8,6 +8,7 @@ REPAY_ENTRY_POINT_NAME = "repay"
 DEPOSIT_ENTRY_POINT_NAME = "deposit"
 WITHDRAW_ENTRY_POINT_NAME = "withdraw"
 LIQUIDATE_ENTRY_POINT_NAME = "liquidate"
+PARTIAL_LIQUIDATE_ENTRY_POINT_NAME = "partialLiquidate"
 
 ################################################################
 # Common Parameter types for the Oven -> Oven Proxy -> Minter Abstraction
@@ -86,7 +87,7 @@ WITHDRAW_PARAMETER_TYPE_ORACLE = sp.TPair(sp.TNat, sp.TPair(sp.TAddress, sp.TPai
 #   - Int: The interest index for the oven.
 DEPOSIT_PARAMETER_TYPE = sp.TPair(sp.TAddress, sp.TPair(sp.TAddress, sp.TPair(sp.TNat, sp.TPair(sp.TNat, sp.TPair(sp.TBool, sp.TPair(sp.TInt, sp.TInt))))))
 
-# Liquidate parameter type.
+# Liquidate parameter type. Also used for partial liquidations.
 # Elements:
 #   - Address: The address of the oven
 #   - Address: The address of the owner
@@ -98,7 +99,7 @@ DEPOSIT_PARAMETER_TYPE = sp.TPair(sp.TAddress, sp.TPair(sp.TAddress, sp.TPair(sp
 #   - Address: The address performing the liquidation
 LIQUIDATE_PARAMETER_TYPE        =                   sp.TPair(sp.TAddress, sp.TPair(sp.TAddress, sp.TPair(sp.TNat, sp.TPair(sp.TNat, sp.TPair(sp.TBool, sp.TPair(sp.TInt, sp.TPair(sp.TInt, sp.TAddress)))))))
 
-# Liquidate parameter type with oracle data attached.
+# Liquidate parameter type with oracle data attached. Also used for partial liquidations.
 # Elements:
 #   - Nat: XTZ-USD value as reported by Oracle.
 #   - Address: The address of the oven
@@ -129,3 +130,19 @@ UPDATE_STATE_ENTRY_POINT_NAME = "updateState"
 #   - Int: The interest index for the oven.
 #   - Bool: The new value for is liquidated.
 UPDATE_STATE_PARAMETER_TYPE = sp.TPair(sp.TAddress, sp.TPair(sp.TNat, sp.TPair(sp.TInt, sp.TPair(sp.TInt, sp.TBool))))
+
+################################################################
+# Common Entry Point Names for the Oven Proxy -> Oven Abstraction
+################################################################
+
+SET_DELEGATE_FROM_PROXY_ENTRY_POINT_NAME = "setDelegateFromProxy"
+
+################################################################
+# Common Parameter types for the Oven Proxy -> Oven Abstraction
+################################################################
+
+# Set an Oven's delegate on behalf of its owner.
+# Elements:
+#   - Address: The address which requested the change. Must be the owner of the oven.
+#   - Option<KeyHash>: The new delegate.
+SET_DELEGATE_FROM_PROXY_PARAMETER_TYPE = sp.TPair(sp.TAddress, sp.TOption(sp.TKeyHash))
@@ -13,59 +13,61 @@ SMART_PY_CLI=~/smartpy-cli/SmartPy.sh
 OUT_DIR=./.smartpy_out
 
 # Parallel sorted arrays.
-CONTRACTS_ARRAY=(oven-factory         dev-fund token                stability-fund            minter                  oven-proxy            oracle              oven             oven-registry  sandbox-oracle)
-INVOCATION_ARRAY=("OvenFactoryContract()" "DevFundContract()" "FA12()"  "StabilityFundContract()" "MinterContract()"   "OvenProxyContract()" "OracleContract()"  "OvenContract()" "OvenRegistryContract()" "SandboxOracleContract()")
+CONTRACTS_ARRAY=(oven-factory         dev-fund token                stability-fund            minter                  oven-proxy            oracle              oven             oven-registry  sandbox-oracle           median-oracle          push-oracle)
+INVOCATION_ARRAY=("OvenFactoryContract()" "DevFundContract()" "FA12()"  "StabilityFundContract()" "MinterContract()"   "OvenProxyContract()" "OracleContract()"  "OvenContract()" "OvenRegistryContract()" "SandboxOracleContract()" "MedianOracleContract()" "PushOracleContract()")
 
 # Ensure we have a SmartPy binary.
 if [ ! -f "$SMART_PY_CLI" ]; then
     echo "Fatal: Please install SmartPy CLI at $SMART_PY_CLI" && exit
 fi
 
-# Compile a contract.
-# Args <contract name, ex: minter> <invocation, ex: MinterContract()> <out dir>
-function processContract {
-    CONTRACT_NAME=$1
-    INVOCATION=$2
-    OUT_DIR=$3
-    CONTRACT_IN="${CONTRACT_NAME}.py"
-    CONTRACT_OUT="${CONTRACT_NAME}.tz"
-    CONTRACT_COMPILED="${CONTRACT_NAME}_compiled.tz"
-
-    echo ">> Processing ${CONTRACT_NAME}"
-
-    # Ensure file exists.
-    if [ ! -f "$CONTRACT_IN" ]; then
-        echo "Fatal: $CONTRACT_IN not found. Running from wrong dir?" && exit
-    fi
-
-    # Test
-    echo ">>> [1 / 3] Testing ${CONTRACT_NAME} "
-    $SMART_PY_CLI test $CONTRACT_IN $OUT_DIR
-    echo ">>> Done"
-
-    echo ">>> [2 / 3] Compiling ${CONTRACT_NAME}"
-    $SMART_PY_CLI compile $CONTRACT_IN $INVOCATION $OUT_DIR
-    echo ">>> Done."
-
-    echo ">>> [3 / 3] Copying Artifacts"
-    cp $OUT_DIR/$CONTRACT_COMPILED $CONTRACT_OUT
-    echo ">>> Written to ${CONTRACT_OUT}"
+# Compile the Minter with its math helpers as global lambdas and as inlined code, and print the size of each variant.
+# The variants are kept in $MINTER_VARIANTS_DIR so their gas can be compared with the sandbox benchmark, see README.md.
+# Usage: ./compile.sh --minter-variants
+MINTER_VARIANTS_DIR=./.minter-variants
+MINTER_VARIANTS_ARRAY=(lambda "MinterContract(inlineMath = False)" inline "MinterContract(inlineMath = True)")
+function compareMinterVariants {
+    mkdir -p $MINTER_VARIANTS_DIR
+    for ((i = 0; i < ${#MINTER_VARIANTS_ARRAY[@]}; i += 2)); do
+        VARIANT=${MINTER_VARIANTS_ARRAY[$i]}
+        VARIANT_OUT_DIR=$OUT_DIR/minter-$VARIANT
+        # The CLI compiles registered compilation targets, so compile a copy of the Minter which registers the variant.
+        mkdir -p $VARIANT_OUT_DIR
+        cp minter.py $VARIANT_OUT_DIR/minter.py
+        echo "sp.add_compilation_target(\"minter-$VARIANT\", ${MINTER_VARIANTS_ARRAY[$((i + 1))]})" >> $VARIANT_OUT_DIR/minter.py
+        $SMART_PY_CLI compile $VARIANT_OUT_DIR/minter.py $VARIANT_OUT_DIR/compile > /dev/null
+        cp $VARIANT_OUT_DIR/compile/minter-$VARIANT/step_000_cont_0_contract.tz $MINTER_VARIANTS_DIR/minter-$VARIANT.tz
+    done
+    python3 tools/contract_size.py $MINTER_VARIANTS_DIR/minter-lambda.tz $MINTER_VARIANTS_DIR/minter-inline.tz
+    rm -rf $OUT_DIR
 }
 
-echo "> [1 / 3] Unit Testing and Compiling Contracts."
+if [ "$1" == "--minter-variants" ]; then
+    compareMinterVariants
+    exit
+fi
+
+# Test and compile every contract, and run the end to end tests. Targets whose sources and imports are unchanged since
+# the last successful build are skipped, and the rest are built in parallel. Pass --force to rebuild everything.
+echo "> [1 / 3] Unit Testing and Compiling Contracts, Running End to End Tests."
+TARGETS=()
 for i in ${!CONTRACTS_ARRAY[@]}; do
-    echo ">> [$((i + 1)) / ${#CONTRACTS_ARRAY[@]}] Processing ${CONTRACTS_ARRAY[$i]}"
-    processContract ${CONTRACTS_ARRAY[$i]} ${INVOCATION_ARRAY[$i]} $OUT_DIR
-    echo ">> Done."
-    echo ""
+    TARGETS+=("${CONTRACTS_ARRAY[$i]}=${INVOCATION_ARRAY[$i]}")
 done
-echo "> Compilation Complete."
+TARGETS+=("end-to-end-tests=")
+BUILD_FLAGS=()
+if [ "$1" == "--force" ]; then
+    BUILD_FLAGS+=(--force)
+fi
+python3 tools/build.py --cli $SMART_PY_CLI "${BUILD_FLAGS[@]}" "${TARGETS[@]}"
+echo "> Build Complete."
 echo ""
 
-# End to End Testing
-echo "> [2 / 3] Running End to End Tests"
-$SMART_PY_CLI test end-to-end-tests.py $OUT_DIR
-echo "> Testing Complete"
+# Size Checks
+# If growth is intended, refresh the budget with: python3 tools/contract_size.py --budget size-budget.json --update-budget *.tz
+echo "> [2 / 3] Checking Contract Sizes"
+python3 tools/contract_size.py --budget size-budget.json "${CONTRACTS_ARRAY[@]/%/.tz}"
+echo "> Sizes within budget"
 echo ""
 
 # Remove other artifacts to reduce noise.
@@ -59,6 +59,15 @@ class DevFundContract(sp.Contract):
         sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
         sp.send(sp.snd(param), sp.fst(param))
 
+    # Governance is timelocked and can always transfer funds.
+    @sp.entry_point
+    def sendMany(self, param):
+        sp.set_type(param, sp.TList(sp.TPair(sp.TMutez, sp.TAddress)))
+
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+        sp.for payout in param:
+            sp.send(sp.snd(payout), sp.fst(payout))
+
     # Governance is timelocked and can always transfer funds.
     @sp.entry_point
     def sendTokens(self, param):
@@ -77,12 +86,27 @@ class DevFundContract(sp.Contract):
             from_ = sp.self_address,
             value = amount
         )
-        contractHandle = sp.contract(
-            sp.TRecord(from_ = sp.TAddress, to_ = sp.TAddress, value = sp.TNat).layout(("from_ as from", ("to_ as to", "value"))),
-            self.data.tokenContractAddress,
-            "transfer"
-        ).open_some()
-        sp.transfer(tokenContractParam, sp.mutez(0), contractHandle)
+        sp.transfer(tokenContractParam, sp.mutez(0), self.getTokenTransferHandle())
+
+    # Governance is timelocked and can always transfer funds.
+    #
+    # FA1.2 has no batch transfer, so each payout is a separate token transfer.
+    @sp.entry_point
+    def sendTokensMany(self, param):
+        sp.set_type(param, sp.TList(sp.TPair(sp.TNat, sp.TAddress)))
+
+        # Verify sender is governor.
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+
+        # Look up the token contract once for all payouts.
+        contractHandle = sp.local("contractHandle", self.getTokenTransferHandle())
+        sp.for payout in param:
+            tokenContractParam = sp.record(
+                to_ = sp.snd(payout),
+                from_ = sp.self_address,
+                value = sp.fst(payout)
+            )
+            sp.transfer(tokenContractParam, sp.mutez(0), contractHandle.value)
 
     # Update the governor contract.
     @sp.entry_point
@@ -100,6 +124,18 @@ class DevFundContract(sp.Contract):
         sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
         self.data.administratorContractAddress = newAdministratorContractAddress
 
+    ################################################################
+    # Helpers
+    ################################################################
+
+    # Returns a handle to the token contract's transfer entry point.
+    def getTokenTransferHandle(self):
+        return sp.contract(
+            sp.TRecord(from_ = sp.TAddress, to_ = sp.TAddress, value = sp.TNat).layout(("from_ as from", ("to_ as to", "value"))),
+            self.data.tokenContractAddress,
+            "transfer"
+        ).open_some()
+
 # Only run tests if this file is main.
 if __name__ == "__main__":
 
@@ -231,6 +267,61 @@ if __name__ == "__main__":
             valid = False
         )    
     ################################################################
+    # sendMany
+    ################################################################
+
+    @sp.add_test(name="sendMany - succeeds when called by governor")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a DevFund contract with some balance
+        balance = sp.mutez(10)
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        fund = DevFundContract(
+            governorContractAddress = governorContractAddress
+        )
+        fund.set_initial_balance(balance)
+        scenario += fund
+
+        # AND dummy contracts to receive funds
+        dummyContract1 = DummyContract.DummyContract()
+        dummyContract2 = DummyContract.DummyContract()
+        scenario += dummyContract1
+        scenario += dummyContract2
+
+        # WHEN sendMany is called
+        param = [ (sp.mutez(3), dummyContract1.address), (sp.mutez(7), dummyContract2.address) ]
+        scenario += fund.sendMany(param).run(
+            sender = governorContractAddress,
+        )
+
+        # THEN the funds are sent.
+        scenario.verify(fund.balance == sp.mutez(0))
+        scenario.verify(dummyContract1.balance == sp.mutez(3))
+        scenario.verify(dummyContract2.balance == sp.mutez(7))
+
+    @sp.add_test(name="sendMany - fails when not called by governor")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a DevFund contract
+        balance = sp.mutez(10)
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        fund = DevFundContract(
+            governorContractAddress = governorContractAddress
+        )
+        fund.set_initial_balance(balance)
+        scenario += fund
+
+        # WHEN sendMany is called by someone who isn't the governor THEN the call fails
+        notGovernor = Addresses.NULL_ADDRESS
+        param = [ (balance, notGovernor) ]
+        scenario += fund.sendMany(param).run(
+            sender = notGovernor,
+            valid = False
+        )
+
+    ################################################################
     # sendTokens
     ################################################################
 
@@ -310,6 +401,89 @@ if __name__ == "__main__":
             valid = False
         )
 
+    ################################################################
+    # sendTokensMany
+    ################################################################
+
+    @sp.add_test(name="sendTokensMany - succeeds when called by governor")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Token contract.
+        governorAddress = Addresses.GOVERNOR_ADDRESS
+        token = Token.FA12(
+            admin = governorAddress
+        )
+        scenario += token
+
+        # AND a DevFund contract
+        fund = DevFundContract(
+            governorContractAddress = governorAddress,
+            tokenContractAddress = token.address
+        )
+        scenario += fund
+
+        # And dummy contracts to send to.
+        dummyContract1 = DummyContract.DummyContract()
+        dummyContract2 = DummyContract.DummyContract()
+        scenario += dummyContract1
+        scenario += dummyContract2
+
+        # AND the fund has $1000 of tokens.
+        fundTokens = 1000 * Constants.PRECISION 
+        mintForFundParam = sp.record(address = fund.address, value = fundTokens)
+        scenario += token.mint(mintForFundParam).run(
+            sender = governorAddress
+        )
+
+        # WHEN sendTokensMany is called
+        amount1 = sp.nat(200)
+        amount2 = sp.nat(300)
+        param = [ (amount1, dummyContract1.address), (amount2, dummyContract2.address) ]
+        scenario += fund.sendTokensMany(param).run(
+            sender = governorAddress,
+        )
+
+        # THEN the fund is debited tokens
+        scenario.verify(token.data.balances[fund.address].balance == sp.as_nat(fundTokens - (amount1 + amount2)))
+
+        # AND the receivers were credited the tokens.
+        scenario.verify(token.data.balances[dummyContract1.address].balance == amount1)
+        scenario.verify(token.data.balances[dummyContract2.address].balance == amount2)
+
+    @sp.add_test(name="sendTokensMany - fails when not called by governor")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Token contract.
+        governorAddress = Addresses.GOVERNOR_ADDRESS
+        token = Token.FA12(
+            admin = governorAddress
+        )
+        scenario += token
+
+        # AND a DevFund contract
+        fund = DevFundContract(
+            governorContractAddress = governorAddress,
+            tokenContractAddress = token.address
+        )
+        scenario += fund
+
+        # AND the fund has $1000 of tokens.
+        fundTokens = 1000 * Constants.PRECISION 
+        mintForFundParam = sp.record(address = fund.address, value = fundTokens)
+        scenario += token.mint(mintForFundParam).run(
+            sender = governorAddress
+        )
+
+        # WHEN sendTokensMany is called by someone who isn't the governor THEN the call fails.
+        notGovernor = Addresses.NULL_ADDRESS
+        param = [ (sp.nat(200), Addresses.ROTATED_ADDRESS) ]
+        scenario += fund.sendTokensMany(param).run(
+            sender = notGovernor,
+            valid = False
+        )
+
     ################################################################
     # setGovernorContract
     ################################################################
@@ -1,18 +1,8 @@
 import smartpy as sp
 
-Addresses = sp.import_script_from_url("file:test-helpers/addresses.py")
 Constants = sp.import_script_from_url("file:common/constants.py")
-DevFund = sp.import_script_from_url("file:dev-fund.py")
 Dummy = sp.import_script_from_url("file:test-helpers/dummy-contract.py")
-FakeHarbinger = sp.import_script_from_url("file:test-helpers/fake-harbinger.py")
-Minter = sp.import_script_from_url("file:minter.py")
-Oracle = sp.import_script_from_url("file:oracle.py")
-Oven = sp.import_script_from_url("file:oven.py")
-OvenFactory = sp.import_script_from_url("file:oven-factory.py")
-OvenProxy = sp.import_script_from_url("file:oven-proxy.py")
-OvenRegistry = sp.import_script_from_url("file:oven-registry.py")
-StabilityFund = sp.import_script_from_url("file:stability-fund.py")
-Token= sp.import_script_from_url("file:token.py")
+Universe = sp.import_script_from_url("file:test-helpers/universe.py")
 
 @sp.add_test(name="End to End Tests - Alice can deposit and withdraw from oven")
 def test():
@@ -21,59 +11,24 @@ def test():
   # GIVEN the beginning of time itself
   currentTime = sp.timestamp(0)
 
-  # AND a fake harbinger contract.
-  fakeHarbinger = FakeHarbinger.FakeHarbingerContract(
-    harbingerValue = sp.nat(2 * 1000000), # $2
-    harbingerUpdateTime = currentTime
-  )
-  scenario += fakeHarbinger
-
   # AND a universe of Stablecoin contracts
   stabilityDevFundSplit = sp.nat(100000000000000000) # 10%
   liquidationFeePercent = sp.nat(100000000000000000) # 10%
-  developerFund = DevFund.DevFundContract()
-  stabilityFund = StabilityFund.StabilityFundContract()
-  minter = Minter.MinterContract(
+  universe = Universe.Universe(
+    scenario,
+    harbingerUpdateTime = currentTime,
     collateralizationPercentage = sp.nat(200000000000000000000), # 200%
     lastInterestIndexUpdateTime = currentTime,
     stabilityDevFundSplit = stabilityDevFundSplit,
     liquidationFeePercent = liquidationFeePercent
   )
-  oracle = Oracle.OracleContract(harbingerContractAddress = fakeHarbinger.address)
-  ovenFactory = OvenFactory.OvenFactoryContract()
-  ovenProxy = OvenProxy.OvenProxyContract()
-  ovenRegistry = OvenRegistry.OvenRegistryContract()
-  token = Token.FA12()
-
-  scenario += developerFund
-  scenario += stabilityFund
-  scenario += minter
-  scenario += oracle
-  scenario += ovenFactory
-  scenario += ovenProxy
-  scenario += ovenRegistry
-  scenario += token
 
   # AND a user, Alice.
   alice = Dummy.DummyContract()
   scenario += alice
 
-  # AND the contracts are wired together
-  scenario += stabilityFund.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += minter.updateContracts((Addresses.GOVERNOR_ADDRESS, (token.address, (ovenProxy.address, (stabilityFund.address, developerFund.address))))).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenProxyContract(ovenProxy.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOracleContract(oracle.address).run(sender= Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenRegistry.setOvenFactoryContract(ovenFactory.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += token.setAdministrator(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-
   # AND alice has an oven.
-  aliceOven = Oven.OvenContract(owner = alice.address, ovenProxyContractAddress = ovenProxy.address)
-  scenario += ovenRegistry.addOven((aliceOven.address, alice.address)).run(sender = ovenFactory.address)
-  scenario += aliceOven
+  aliceOven = universe.makeOven(alice.address)
 
   # VERIFY alice can deposit into the oven.
   currentTime = currentTime.add_seconds(1)
@@ -94,59 +49,25 @@ def test():
   # GIVEN the beginning of time itself
   currentTime = sp.timestamp(0)
 
-  # AND a fake harbinger contract.
-  fakeHarbinger = FakeHarbinger.FakeHarbingerContract(
-    harbingerValue = sp.nat(2 * 1000000), # $2
-    harbingerUpdateTime = currentTime
-  )
-  scenario += fakeHarbinger
-
   # AND a universe of Stablecoin contracts
   stabilityDevFundSplit = sp.nat(100000000000000000) # 10%
   liquidationFeePercent = sp.nat(100000000000000000) # 10%
-  developerFund = DevFund.DevFundContract()
-  stabilityFund = StabilityFund.StabilityFundContract()
-  minter = Minter.MinterContract(
+  universe = Universe.Universe(
+    scenario,
+    harbingerUpdateTime = currentTime,
     collateralizationPercentage = sp.nat(200000000000000000000), # 200%
     lastInterestIndexUpdateTime = currentTime,
     stabilityDevFundSplit = stabilityDevFundSplit,
     liquidationFeePercent = liquidationFeePercent
   )
-  oracle = Oracle.OracleContract(harbingerContractAddress = fakeHarbinger.address)
-  ovenFactory = OvenFactory.OvenFactoryContract()
-  ovenProxy = OvenProxy.OvenProxyContract()
-  ovenRegistry = OvenRegistry.OvenRegistryContract()
-  token = Token.FA12()
-
-  scenario += developerFund
-  scenario += stabilityFund
-  scenario += minter
-  scenario += oracle
-  scenario += ovenFactory
-  scenario += ovenProxy
-  scenario += ovenRegistry
-  scenario += token
+  token = universe.token
 
   # AND a user, Alice.
   alice = Dummy.DummyContract()
   scenario += alice
 
-  # AND the contracts are wired together
-  scenario += stabilityFund.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += minter.updateContracts((Addresses.GOVERNOR_ADDRESS, (token.address, (ovenProxy.address, (stabilityFund.address, developerFund.address))))).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenProxyContract(ovenProxy.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOracleContract(oracle.address).run(sender= Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenRegistry.setOvenFactoryContract(ovenFactory.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += token.setAdministrator(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-
   # AND alice has an oven.
-  aliceOven = Oven.OvenContract(owner = alice.address, ovenProxyContractAddress = ovenProxy.address)
-  scenario += ovenRegistry.addOven((aliceOven.address, alice.address)).run(sender = ovenFactory.address)
-  scenario += aliceOven
+  aliceOven = universe.makeOven(alice.address)
 
   # VERIFY alice can deposit into the oven and then mint tokens
   currentTime = currentTime.add_seconds(1)
@@ -176,59 +97,25 @@ def test():
   # GIVEN the beginning of time itself
   currentTime = sp.timestamp(0)
 
-  # AND a fake harbinger contract.
-  fakeHarbinger = FakeHarbinger.FakeHarbingerContract(
-    harbingerValue = sp.nat(2 * 1000000), # $2
-    harbingerUpdateTime = currentTime
-  )
-  scenario += fakeHarbinger
-
   # AND a universe of Stablecoin contracts
   stabilityDevFundSplit = sp.nat(100000000000000000) # 10%
   liquidationFeePercent = sp.nat(100000000000000000) # 10%
-  developerFund = DevFund.DevFundContract()
-  stabilityFund = StabilityFund.StabilityFundContract()
-  minter = Minter.MinterContract(
+  universe = Universe.Universe(
+    scenario,
+    harbingerUpdateTime = currentTime,
     collateralizationPercentage = sp.nat(200000000000000000000), # 200%
     lastInterestIndexUpdateTime = currentTime,
     stabilityDevFundSplit = stabilityDevFundSplit,
     liquidationFeePercent = liquidationFeePercent
   )
-  oracle = Oracle.OracleContract(harbingerContractAddress = fakeHarbinger.address)
-  ovenFactory = OvenFactory.OvenFactoryContract()
-  ovenProxy = OvenProxy.OvenProxyContract()
-  ovenRegistry = OvenRegistry.OvenRegistryContract()
-  token = Token.FA12()
-
-  scenario += developerFund
-  scenario += stabilityFund
-  scenario += minter
-  scenario += oracle
-  scenario += ovenFactory
-  scenario += ovenProxy
-  scenario += ovenRegistry
-  scenario += token
+  token = universe.token
 
   # AND a user, Alice.
   alice = Dummy.DummyContract()
   scenario += alice
 
-  # AND the contracts are wired together
-  scenario += stabilityFund.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += minter.updateContracts((Addresses.GOVERNOR_ADDRESS, (token.address, (ovenProxy.address, (stabilityFund.address, developerFund.address))))).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenProxyContract(ovenProxy.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOracleContract(oracle.address).run(sender= Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenRegistry.setOvenFactoryContract(ovenFactory.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += token.setAdministrator(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-
   # AND alice has an oven.
-  aliceOven = Oven.OvenContract(owner = alice.address, ovenProxyContractAddress = ovenProxy.address)
-  scenario += ovenRegistry.addOven((aliceOven.address, alice.address)).run(sender = ovenFactory.address)
-  scenario += aliceOven
+  aliceOven = universe.makeOven(alice.address)
 
   # VERIFY alice can withdraw partial amounts of collateral after repaying
   # Alice deposits $20 of XTZ and mints $10 of kUSD
@@ -278,59 +165,29 @@ def test():
   # GIVEN the beginning of time itself
   currentTime = sp.timestamp(0)
 
-  # AND a fake harbinger contract.
-  fakeHarbinger = FakeHarbinger.FakeHarbingerContract(
-    harbingerValue = sp.nat(2 * 1000000), # $2
-    harbingerUpdateTime = currentTime
-  )
-  scenario += fakeHarbinger
-
   # AND a universe of Stablecoin contracts
   stabilityDevFundSplit = sp.nat(100000000000000000) # 10%
   liquidationFeePercent = sp.nat(100000000000000000) # 10%
-  developerFund = DevFund.DevFundContract()
-  stabilityFund = StabilityFund.StabilityFundContract()
-  minter = Minter.MinterContract(
+  universe = Universe.Universe(
+    scenario,
+    harbingerUpdateTime = currentTime,
     collateralizationPercentage = sp.nat(200000000000000000000), # 200%
     lastInterestIndexUpdateTime = currentTime,
     stabilityDevFundSplit = stabilityDevFundSplit,
     liquidationFeePercent = liquidationFeePercent
   )
-  oracle = Oracle.OracleContract(harbingerContractAddress = fakeHarbinger.address)
-  ovenFactory = OvenFactory.OvenFactoryContract()
-  ovenProxy = OvenProxy.OvenProxyContract()
-  ovenRegistry = OvenRegistry.OvenRegistryContract()
-  token = Token.FA12()
-
-  scenario += developerFund
-  scenario += stabilityFund
-  scenario += minter
-  scenario += oracle
-  scenario += ovenFactory
-  scenario += ovenProxy
-  scenario += ovenRegistry
-  scenario += token
+  fakeHarbinger = universe.fakeHarbinger
+  developerFund = universe.developerFund
+  stabilityFund = universe.stabilityFund
+  minter = universe.minter
+  token = universe.token
 
   # AND a user, Alice.
   alice = Dummy.DummyContract()
   scenario += alice
 
-  # AND the contracts are wired together
-  scenario += stabilityFund.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += minter.updateContracts((Addresses.GOVERNOR_ADDRESS, (token.address, (ovenProxy.address, (stabilityFund.address, developerFund.address))))).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenProxyContract(ovenProxy.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOracleContract(oracle.address).run(sender= Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenRegistry.setOvenFactoryContract(ovenFactory.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += token.setAdministrator(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-
   # AND alice has an oven.
-  aliceOven = Oven.OvenContract(owner = alice.address, ovenProxyContractAddress = ovenProxy.address)
-  scenario += ovenRegistry.addOven((aliceOven.address, alice.address)).run(sender = ovenFactory.address)
-  scenario += aliceOven
+  aliceOven = universe.makeOven(alice.address)
 
   # VERIFY Bob can liquidate an oven. 
   # Alice deposits $20 of XTZ and mints $10 of kUSD
@@ -386,65 +243,34 @@ def test():
   # GIVEN the beginning of time itself
   currentTime = sp.timestamp(0)
 
-  # AND a fake harbinger contract.
-  fakeHarbinger = FakeHarbinger.FakeHarbingerContract(
-    harbingerValue = sp.nat(2 * 1000000), # $2
-    harbingerUpdateTime = currentTime
-  )
-  scenario += fakeHarbinger
+  # AND an administrator for the stability and developer funds.
+  administrator = Dummy.DummyContract()
+  scenario += administrator
 
   # AND a universe of Stablecoin contracts
   stabilityDevFundSplit = sp.nat(100000000000000000) # 10%
   liquidationFeePercent = sp.nat(100000000000000000) # 10%
-  administrator = Dummy.DummyContract()
-  developerFund = DevFund.DevFundContract(
-    administratorContractAddress = administrator.address
-  )
-  stabilityFund = StabilityFund.StabilityFundContract(
-    administratorContractAddress = administrator.address
-  )
-  minter = Minter.MinterContract(
+  universe = Universe.Universe(
+    scenario,
+    harbingerUpdateTime = currentTime,
+    fundAdministratorAddress = administrator.address,
     collateralizationPercentage = sp.nat(200000000000000000000), # 200%
     lastInterestIndexUpdateTime = currentTime,
     stabilityDevFundSplit = stabilityDevFundSplit,
     liquidationFeePercent = liquidationFeePercent
   )
-  oracle = Oracle.OracleContract(harbingerContractAddress = fakeHarbinger.address)
-  ovenFactory = OvenFactory.OvenFactoryContract()
-  ovenProxy = OvenProxy.OvenProxyContract()
-  ovenRegistry = OvenRegistry.OvenRegistryContract()
-  token = Token.FA12()
-
-  scenario += administrator
-  scenario += developerFund
-  scenario += stabilityFund
-  scenario += minter
-  scenario += oracle
-  scenario += ovenFactory
-  scenario += ovenProxy
-  scenario += ovenRegistry
-  scenario += token
+  fakeHarbinger = universe.fakeHarbinger
+  developerFund = universe.developerFund
+  stabilityFund = universe.stabilityFund
+  minter = universe.minter
+  token = universe.token
 
   # AND a user, Alice.
   alice = Dummy.DummyContract()
   scenario += alice
 
-  # AND the contracts are wired together
-  scenario += stabilityFund.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += minter.updateContracts((Addresses.GOVERNOR_ADDRESS, (token.address, (ovenProxy.address, (stabilityFund.address, developerFund.address))))).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenProxyContract(ovenProxy.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOracleContract(oracle.address).run(sender= Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenRegistry.setOvenFactoryContract(ovenFactory.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += token.setAdministrator(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-
   # AND alice has an oven.
-  aliceOven = Oven.OvenContract(owner = alice.address, ovenProxyContractAddress = ovenProxy.address)
-  scenario += ovenRegistry.addOven((aliceOven.address, alice.address)).run(sender = ovenFactory.address)
-  scenario += aliceOven
+  aliceOven = universe.makeOven(alice.address)
 
   # VERIFY the StabilityFund can liquidate an oven. 
   # Alice deposits $20 of XTZ and mints $10 of kUSD
@@ -499,67 +325,32 @@ def test():
   # GIVEN the beginning of time itself
   currentTime = sp.timestamp(0)
 
-  # AND a fake harbinger contract.
-  fakeHarbinger = FakeHarbinger.FakeHarbingerContract(
-    harbingerValue = sp.nat(2 * 1000000), # $2
-    harbingerUpdateTime = currentTime
-  )
-  scenario += fakeHarbinger
-
   # AND a universe of Stablecoin contracts, which exist at compound period  1
   lastInterestIndexUpdateTime = sp.timestamp(Constants.SECONDS_PER_COMPOUND)
   stabilityFee = sp.nat(100000000000000000) # 10%
   initialInterestIndex = 1100000000000000000 # 1.10
-  developerFund = DevFund.DevFundContract()
-  stabilityFund = StabilityFund.StabilityFundContract()
-  minter = Minter.MinterContract(
+  universe = Universe.Universe(
+    scenario,
+    harbingerUpdateTime = currentTime,
     stabilityFee = stabilityFee,
-    lastInterestIndexUpdateTime = lastInterestIndexUpdateTime, 
+    lastInterestIndexUpdateTime = lastInterestIndexUpdateTime,
     interestIndex = initialInterestIndex
   )
-  oracle = Oracle.OracleContract(harbingerContractAddress = fakeHarbinger.address)
-  ovenFactory = OvenFactory.OvenFactoryContract()
-  ovenProxy = OvenProxy.OvenProxyContract()
-  ovenRegistry = OvenRegistry.OvenRegistryContract()
-  token = Token.FA12()
-
-  scenario += developerFund
-  scenario += stabilityFund
-  scenario += minter
-  scenario += oracle
-  scenario += ovenFactory
-  scenario += ovenProxy
-  scenario += ovenRegistry
-  scenario += token
+  minter = universe.minter
 
   # AND a user, Alice.
   alice = Dummy.DummyContract()
   scenario += alice
 
-  # AND the contracts are wired together
-  scenario += stabilityFund.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += minter.updateContracts((Addresses.GOVERNOR_ADDRESS, (token.address, (ovenProxy.address, (stabilityFund.address, developerFund.address))))).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenProxyContract(ovenProxy.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOracleContract(oracle.address).run(sender= Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenRegistry.setOvenFactoryContract(ovenFactory.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += token.setAdministrator(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-
   # AND alice has an oven with an interest index the same as the minter.
   aliceBorrowedTokens = 10 * Constants.PRECISION
   aliceStabilityFeeTokens = sp.int(0)
-  aliceOven = Oven.OvenContract(
-    owner = alice.address, 
+  aliceOven = universe.makeOven(
+    alice.address,
     borrowedTokens = aliceBorrowedTokens,
     stabilityFeeTokens = aliceStabilityFeeTokens,
-    ovenProxyContractAddress = ovenProxy.address,
     interestIndex = sp.to_int(initialInterestIndex)
   )
-  scenario += ovenRegistry.addOven((aliceOven.address, alice.address)).run(sender = ovenFactory.address)
-  scenario += aliceOven
 
   # WHEN alice deposits 1 XTZ at compound period = 2
   currentTime = sp.timestamp(Constants.SECONDS_PER_COMPOUND * 2)
@@ -608,67 +399,32 @@ def test():
   # GIVEN the beginning of time itself
   currentTime = sp.timestamp(0)
 
-  # AND a fake harbinger contract.
-  fakeHarbinger = FakeHarbinger.FakeHarbingerContract(
-    harbingerValue = sp.nat(2 * 1000000), # $2
-    harbingerUpdateTime = currentTime
-  )
-  scenario += fakeHarbinger
-
   # AND a universe of Stablecoin contracts, which exist at compound period  1
   lastInterestIndexUpdateTime = sp.timestamp(Constants.SECONDS_PER_COMPOUND)
   stabilityFee = sp.nat(100000000000000000) # 10%
   initialInterestIndex = 1100000000000000000 # 1.10
-  developerFund = DevFund.DevFundContract()
-  stabilityFund = StabilityFund.StabilityFundContract()
-  minter = Minter.MinterContract(
+  universe = Universe.Universe(
+    scenario,
+    harbingerUpdateTime = currentTime,
     stabilityFee = stabilityFee,
-    lastInterestIndexUpdateTime = lastInterestIndexUpdateTime, 
+    lastInterestIndexUpdateTime = lastInterestIndexUpdateTime,
     interestIndex = initialInterestIndex
   )
-  oracle = Oracle.OracleContract(harbingerContractAddress = fakeHarbinger.address)
-  ovenFactory = OvenFactory.OvenFactoryContract()
-  ovenProxy = OvenProxy.OvenProxyContract()
-  ovenRegistry = OvenRegistry.OvenRegistryContract()
-  token = Token.FA12()
-
-  scenario += developerFund
-  scenario += stabilityFund
-  scenario += minter
-  scenario += oracle
-  scenario += ovenFactory
-  scenario += ovenProxy
-  scenario += ovenRegistry
-  scenario += token
+  minter = universe.minter
 
   # AND a user, Alice.
   alice = Dummy.DummyContract()
   scenario += alice
 
-  # AND the contracts are wired together
-  scenario += stabilityFund.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += minter.updateContracts((Addresses.GOVERNOR_ADDRESS, (token.address, (ovenProxy.address, (stabilityFund.address, developerFund.address))))).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenProxyContract(ovenProxy.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOracleContract(oracle.address).run(sender= Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenRegistry.setOvenFactoryContract(ovenFactory.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += token.setAdministrator(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-
   # AND alice has an oven with interest index = 1
   aliceBorrowedTokens = 10 * Constants.PRECISION
   aliceStabilityFeeTokens = sp.int(0)
-  aliceOven = Oven.OvenContract(
-    owner = alice.address, 
+  aliceOven = universe.makeOven(
+    alice.address,
     borrowedTokens = aliceBorrowedTokens,
     stabilityFeeTokens = aliceStabilityFeeTokens,
-    ovenProxyContractAddress = ovenProxy.address,
     interestIndex = sp.to_int(Constants.PRECISION)
   )
-  scenario += ovenRegistry.addOven((aliceOven.address, alice.address)).run(sender = ovenFactory.address)
-  scenario += aliceOven
 
   # WHEN alice deposits 1 XTZ at compound period = 2
   currentTime = sp.timestamp(Constants.SECONDS_PER_COMPOUND * 2)
@@ -702,67 +458,32 @@ def test():
   # GIVEN the beginning of time itself
   currentTime = sp.timestamp(0)
 
-  # AND a fake harbinger contract.
-  fakeHarbinger = FakeHarbinger.FakeHarbingerContract(
-    harbingerValue = sp.nat(2 * 1000000), # $2
-    harbingerUpdateTime = currentTime
-  )
-  scenario += fakeHarbinger
-
   # AND a universe of Stablecoin contracts
   lastInterestIndexUpdateTime = sp.timestamp(Constants.SECONDS_PER_COMPOUND)
   stabilityFee = sp.nat(100000000000000000) # 10%
   initialInterestIndex = 1100000000000000000 # 1.10
-  developerFund = DevFund.DevFundContract()
-  stabilityFund = StabilityFund.StabilityFundContract()
-  minter = Minter.MinterContract(
+  universe = Universe.Universe(
+    scenario,
+    harbingerUpdateTime = currentTime,
     stabilityFee = stabilityFee,
-    lastInterestIndexUpdateTime = lastInterestIndexUpdateTime, 
+    lastInterestIndexUpdateTime = lastInterestIndexUpdateTime,
     interestIndex = initialInterestIndex
   )
-  oracle = Oracle.OracleContract(harbingerContractAddress = fakeHarbinger.address)
-  ovenFactory = OvenFactory.OvenFactoryContract()
-  ovenProxy = OvenProxy.OvenProxyContract()
-  ovenRegistry = OvenRegistry.OvenRegistryContract()
-  token = Token.FA12()
-
-  scenario += developerFund
-  scenario += stabilityFund
-  scenario += minter
-  scenario += oracle
-  scenario += ovenFactory
-  scenario += ovenProxy
-  scenario += ovenRegistry
-  scenario += token
+  minter = universe.minter
 
   # AND a user, Alice.
   alice = Dummy.DummyContract()
   scenario += alice
 
-  # AND the contracts are wired together
-  scenario += stabilityFund.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += minter.updateContracts((Addresses.GOVERNOR_ADDRESS, (token.address, (ovenProxy.address, (stabilityFund.address, developerFund.address))))).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setOvenProxyContract(ovenProxy.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenFactory.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setMinterContract(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOvenRegistryContract(ovenRegistry.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenProxy.setOracleContract(oracle.address).run(sender= Addresses.GOVERNOR_ADDRESS)
-  scenario += ovenRegistry.setOvenFactoryContract(ovenFactory.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-  scenario += token.setAdministrator(minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
-
   # AND alice has an oven with interest index = 1
   aliceBorrowedTokens = 10 * Constants.PRECISION
   aliceStabilityFeeTokens = sp.int(0)
-  aliceOven = Oven.OvenContract(
-    owner = alice.address, 
+  aliceOven = universe.makeOven(
+    alice.address,
     borrowedTokens = aliceBorrowedTokens,
     stabilityFeeTokens = aliceStabilityFeeTokens,
-    ovenProxyContractAddress = ovenProxy.address,
     interestIndex = sp.to_int(initialInterestIndex)
   )
-  scenario += ovenRegistry.addOven((aliceOven.address, alice.address)).run(sender = ovenFactory.address)
-  scenario += aliceOven
 
   # WHEN alice deposits 1 XTZ at compound period = 3
   currentTime = sp.timestamp(Constants.SECONDS_PER_COMPOUND * 3)
@@ -0,0 +1,666 @@
+import smartpy as sp
+
+Addresses = sp.import_script_from_url("file:test-helpers/addresses.py")
+Constants = sp.import_script_from_url("file:common/constants.py")
+Errors = sp.import_script_from_url("file:common/errors.py")
+
+################################################################
+# Contract
+################################################################
+
+# Contains an Oracle for an XTZ-USD price which is the median of several Harbinger normalizers.
+#
+# Normalizers are read synchronously with their `getPrice` on-chain view, so a price request
+# costs a single callback to the client regardless of the number of sources. Gas grows
+# linearly with the number of sources, which is bounded by `maxSources`.
+#
+# See: https://github.com/tacoinfra/harbinger
+class MedianOracleContract(sp.Contract):
+    # Initialize a new MedianOracleContract contract.
+    #
+    # Parameters:
+    #   sources The addresses of Harbinger normalizers to read prices from.
+    #   minSources The minimum number of sources with recent data required to produce a price.
+    #   maxSources The maximum number of sources which may be configured.
+    def __init__(
+        self,
+        sources = [ Addresses.HARBINGER_ADDRESS ],
+        minSources = sp.nat(1),
+        maxSources = sp.nat(5),
+        maxDataDelaySec = sp.nat(60 * 30),
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS,
+    ):
+        self.exception_optimization_level = "DefaultUnit"
+
+        self.init(
+            sources = sp.set(l = sources, t = sp.TAddress),
+            minSources = minSources,
+            maxSources = maxSources,
+            maxDataDelaySec = maxDataDelaySec,
+            governorContractAddress = governorContractAddress
+        )
+
+    ################################################################
+    # Public Interface
+    ################################################################
+
+    # Disallow direct transfers.
+    @sp.entry_point
+    def default(self, param):
+        sp.set_type(param, sp.TUnit)
+        sp.failwith(Errors.CANNOT_RECEIVE_FUNDS)
+
+    # Retrieve the price of the XTZ-USD pair.
+    #
+    # Parameters:
+    #   callback: A callback to call with the result. Parameter to callback is a single nat.
+    @sp.entry_point
+    def getXtzUsdRate(self, callback):
+        sp.set_type(callback, sp.TContract(sp.TNat))
+
+        # Verify the call did not contain a balance.
+        sp.verify(sp.amount == sp.mutez(0), message = Errors.AMOUNT_NOT_ALLOWED)
+
+        # Call client callback
+        sp.transfer(self.computeMedianPrice(), sp.mutez(0), callback)
+
+    ################################################################
+    # Helpers
+    ################################################################
+
+    # Compute the median price reported by all sources with recent data, in 10^-18 precision.
+    def computeMedianPrice(self):
+        # Collect a count of each recent price. Map keys are iterated in ascending order, which
+        # avoids sorting the prices.
+        prices = sp.local("prices", sp.map(l = {}, tkey = sp.TNat, tvalue = sp.TNat))
+        numPrices = sp.local("numPrices", sp.nat(0))
+        sp.for source in self.data.sources.elements():
+            viewResult = sp.view("getPrice", source, Constants.ASSET_CODE, t = Constants.HARBINGER_VIEW_DATA_TYPE)
+
+            # Ignore sources without a `getPrice` view of the expected type. A view which fails
+            # fails the whole call, so a source which reverts must be removed by the governor.
+            sp.if viewResult.is_some():
+                updateTime, price = sp.match_pair(viewResult.open_some())
+
+                # Ignore sources with stale data, or with data from the future, which has no age.
+                sp.if updateTime <= sp.now:
+                    dataAge = sp.as_nat(sp.now - updateTime)
+                    sp.if dataAge < self.data.maxDataDelaySec:
+                        prices.value[price] = prices.value.get(price, sp.nat(0)) + 1
+                        numPrices.value += 1
+
+        # Assert enough sources had recent data.
+        sp.verify(numPrices.value >= self.data.minSources, message = Errors.STALE_DATA)
+        sp.verify(numPrices.value > 0, message = Errors.STALE_DATA)
+
+        # Find the middle element(s). These are the same element when there is an odd number of prices.
+        lowerIndex = sp.as_nat(numPrices.value - 1) // 2
+        upperIndex = numPrices.value // 2
+        lowerPrice = sp.local("lowerPrice", sp.nat(0))
+        upperPrice = sp.local("upperPrice", sp.nat(0))
+        seen = sp.local("seen", sp.nat(0))
+        sp.for item in prices.value.items():
+            nextSeen = seen.value + item.value
+            sp.if (seen.value <= lowerIndex) & (lowerIndex < nextSeen):
+                lowerPrice.value = item.key
+            sp.if (seen.value <= upperIndex) & (upperIndex < nextSeen):
+                upperPrice.value = item.key
+            seen.value = nextSeen
+
+        return ((lowerPrice.value + upperPrice.value) // 2) * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+
+    ################################################################
+    # Governance
+    ################################################################
+
+    # Update the governor contract.
+    @sp.entry_point
+    def setGovernorContract(self, newGovernorContractAddress):
+        sp.set_type(newGovernorContractAddress, sp.TAddress)
+
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+        self.data.governorContractAddress = newGovernorContractAddress
+
+    # Update the max data delay.
+    @sp.entry_point
+    def setMaxDataDelaySec(self, newMaxDataDelaySec):
+        sp.set_type(newMaxDataDelaySec, sp.TNat)
+
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+        self.data.maxDataDelaySec = newMaxDataDelaySec
+
+    # Update the minimum number of sources with recent data.
+    @sp.entry_point
+    def setMinSources(self, newMinSources):
+        sp.set_type(newMinSources, sp.TNat)
+
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+        self.data.minSources = newMinSources
+
+    # Add a price source.
+    @sp.entry_point
+    def addSource(self, newSource):
+        sp.set_type(newSource, sp.TAddress)
+
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+        sp.verify(sp.len(self.data.sources) < self.data.maxSources, message = Errors.TOO_MANY_SOURCES)
+        self.data.sources.add(newSource)
+
+    # Remove a price source.
+    @sp.entry_point
+    def removeSource(self, source):
+        sp.set_type(source, sp.TAddress)
+
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+        self.data.sources.remove(source)
+
+# Only run tests if this file is main.
+if __name__ == "__main__":
+
+    ################################################################
+    ################################################################
+    # Tests
+    ################################################################
+    ################################################################
+
+    DummyContract = sp.import_script_from_url("file:test-helpers/dummy-contract.py")
+    FakeHarbinger = sp.import_script_from_url("file:test-helpers/fake-harbinger.py")
+
+    ################################################################
+    # getXtzUsdRate
+    ################################################################
+
+    @sp.add_test(name="getXtzUsdRate - fails when called with an amount")
+    def test():
+        # GIVEN a MedianOracle contract.
+        scenario = sp.test_scenario()
+
+        oracle = MedianOracleContract()
+        scenario += oracle
+
+        # AND a DummyContract to receive the retrieved value.
+        dummyContract = DummyContract.DummyContract()
+        scenario += dummyContract
+
+        # WHEN a price is requested with an amount THEN the invocation fails.
+        callback = sp.contract(sp.TNat, dummyContract.address, entry_point = "natCallback").open_some()
+        scenario += oracle.getXtzUsdRate(callback).run(
+            amount = sp.mutez(1),
+            valid = False
+        )
+
+    @sp.add_test(name="getXtzUsdRate - retrieves median of an odd number of sources")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN three fake Harbinger contracts with different values.
+        now = sp.timestamp(1000)
+        harbinger1 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2310000, # $2.31
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        harbinger2 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2500000, # $2.50
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        harbinger3 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2400000, # $2.40
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger1
+        scenario += harbinger2
+        scenario += harbinger3
+
+        # AND a MedianOracle contract.
+        oracle = MedianOracleContract(
+            sources = [ harbinger1.address, harbinger2.address, harbinger3.address ]
+        )
+        scenario += oracle
+
+        # AND a DummyContract to receive the retrieved value.
+        dummyContract = DummyContract.DummyContract()
+        scenario += dummyContract
+
+        # WHEN a price is requested
+        callback = sp.contract(sp.TNat, dummyContract.address, entry_point = "natCallback").open_some()
+        scenario += oracle.getXtzUsdRate(callback).run(
+            now = now
+        )
+
+        # THEN the dummy contract received the median, correctly converted to 10^-18 precision
+        expectedValue = 2400000 * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+        scenario.verify(dummyContract.data.natValue == expectedValue)
+
+    @sp.add_test(name="getXtzUsdRate - retrieves median of an even number of sources")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN four fake Harbinger contracts, two of which report the same value.
+        now = sp.timestamp(1000)
+        harbinger1 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2000000, # $2.00
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        harbinger2 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2300000, # $2.30
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        harbinger3 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2300000, # $2.30
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        harbinger4 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2500000, # $2.50
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger1
+        scenario += harbinger2
+        scenario += harbinger3
+        scenario += harbinger4
+
+        # AND a MedianOracle contract.
+        oracle = MedianOracleContract(
+            sources = [ harbinger1.address, harbinger2.address, harbinger3.address, harbinger4.address ]
+        )
+        scenario += oracle
+
+        # AND a DummyContract to receive the retrieved value.
+        dummyContract = DummyContract.DummyContract()
+        scenario += dummyContract
+
+        # WHEN a price is requested
+        callback = sp.contract(sp.TNat, dummyContract.address, entry_point = "natCallback").open_some()
+        scenario += oracle.getXtzUsdRate(callback).run(
+            now = now
+        )
+
+        # THEN the dummy contract received the mean of the two middle values.
+        expectedValue = 2300000 * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+        scenario.verify(dummyContract.data.natValue == expectedValue)
+
+    @sp.add_test(name="getXtzUsdRate - ignores sources with stale data")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a fake Harbinger contract with recent data
+        maxDataDelaySec = 30
+        nowSecs = 1000
+        now = sp.timestamp(nowSecs)
+        harbinger1 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2310000, # $2.31
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger1
+
+        # AND a fake Harbinger contract with stale data
+        harbinger2 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 9000000, # $9.00
+            harbingerUpdateTime = sp.timestamp(nowSecs - maxDataDelaySec - 1),
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger2
+
+        # AND a MedianOracle contract.
+        oracle = MedianOracleContract(
+            sources = [ harbinger1.address, harbinger2.address ],
+            maxDataDelaySec = maxDataDelaySec
+        )
+        scenario += oracle
+
+        # AND a DummyContract to receive the retrieved value.
+        dummyContract = DummyContract.DummyContract()
+        scenario += dummyContract
+
+        # WHEN a price is requested
+        callback = sp.contract(sp.TNat, dummyContract.address, entry_point = "natCallback").open_some()
+        scenario += oracle.getXtzUsdRate(callback).run(
+            now = now
+        )
+
+        # THEN the dummy contract received only the recent value.
+        expectedValue = 2310000 * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+        scenario.verify(dummyContract.data.natValue == expectedValue)
+
+    @sp.add_test(name="getXtzUsdRate - ignores sources with data from the future")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a fake Harbinger contract with recent data
+        nowSecs = 1000
+        now = sp.timestamp(nowSecs)
+        harbinger1 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2310000, # $2.31
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger1
+
+        # AND a fake Harbinger contract with data from the future
+        harbinger2 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 9000000, # $9.00
+            harbingerUpdateTime = sp.timestamp(nowSecs + 1),
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger2
+
+        # AND a MedianOracle contract.
+        oracle = MedianOracleContract(
+            sources = [ harbinger1.address, harbinger2.address ]
+        )
+        scenario += oracle
+
+        # AND a DummyContract to receive the retrieved value.
+        dummyContract = DummyContract.DummyContract()
+        scenario += dummyContract
+
+        # WHEN a price is requested
+        callback = sp.contract(sp.TNat, dummyContract.address, entry_point = "natCallback").open_some()
+        scenario += oracle.getXtzUsdRate(callback).run(
+            now = now
+        )
+
+        # THEN the call succeeds with only the recent value.
+        expectedValue = 2310000 * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+        scenario.verify(dummyContract.data.natValue == expectedValue)
+
+    @sp.add_test(name="getXtzUsdRate - fails when too few sources have recent data")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a fake Harbinger contract with recent data
+        maxDataDelaySec = 30
+        nowSecs = 1000
+        now = sp.timestamp(nowSecs)
+        harbinger1 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2310000, # $2.31
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger1
+
+        # AND a fake Harbinger contract with stale data
+        harbinger2 = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2310000, # $2.31
+            harbingerUpdateTime = sp.timestamp(nowSecs - maxDataDelaySec - 1),
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger2
+
+        # AND a MedianOracle contract which requires two sources.
+        oracle = MedianOracleContract(
+            sources = [ harbinger1.address, harbinger2.address ],
+            minSources = 2,
+            maxDataDelaySec = maxDataDelaySec
+        )
+        scenario += oracle
+
+        # AND a DummyContract to receive the retrieved value.
+        dummyContract = DummyContract.DummyContract()
+        scenario += dummyContract
+
+        # WHEN a price is requested THEN the call fails.
+        callback = sp.contract(sp.TNat, dummyContract.address, entry_point = "natCallback").open_some()
+        scenario += oracle.getXtzUsdRate(callback).run(
+            now = now,
+            valid = False
+        )
+
+    ################################################################
+    # default
+    ################################################################
+
+    @sp.add_test(name="default - fails with calls to the default entrypoint")
+    def test():
+        # GIVEN a MedianOracle contract
+        scenario = sp.test_scenario()
+
+        oracle = MedianOracleContract()
+        scenario += oracle
+
+        # WHEN the default entry point is called THEN the request fails
+        scenario += oracle.default(sp.unit).run(
+            amount = sp.mutez(1),
+            valid = False
+        )
+
+    ################################################################
+    # addSource
+    ################################################################
+
+    @sp.add_test(name="addSource - succeeds when called by governor")
+    def test():
+        # GIVEN a MedianOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = MedianOracleContract(
+            sources = [ Addresses.HARBINGER_ADDRESS ],
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN addSource is called with a new source
+        newSource = Addresses.ROTATED_ADDRESS
+        scenario += oracle.addSource(newSource).run(
+            sender = governorContractAddress,
+        )
+
+        # THEN the source is added.
+        scenario.verify(oracle.data.sources.contains(newSource))
+        scenario.verify(oracle.data.sources.contains(Addresses.HARBINGER_ADDRESS))
+
+    @sp.add_test(name="addSource - fails when max sources would be exceeded")
+    def test():
+        # GIVEN a MedianOracle contract with the maximum number of sources
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = MedianOracleContract(
+            sources = [ Addresses.HARBINGER_ADDRESS ],
+            maxSources = 1,
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN addSource is called THEN the call fails
+        newSource = Addresses.ROTATED_ADDRESS
+        scenario += oracle.addSource(newSource).run(
+            sender = governorContractAddress,
+            valid = False
+        )
+
+    @sp.add_test(name="addSource - fails when not called by governor")
+    def test():
+        # GIVEN a MedianOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = MedianOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN addSource is called by someone who isn't the governor THEN the call fails
+        newSource = Addresses.ROTATED_ADDRESS
+        scenario += oracle.addSource(newSource).run(
+            sender = Addresses.NULL_ADDRESS,
+            valid = False
+        )
+
+    ################################################################
+    # removeSource
+    ################################################################
+
+    @sp.add_test(name="removeSource - succeeds when called by governor")
+    def test():
+        # GIVEN a MedianOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = MedianOracleContract(
+            sources = [ Addresses.HARBINGER_ADDRESS, Addresses.ROTATED_ADDRESS ],
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN removeSource is called
+        scenario += oracle.removeSource(Addresses.ROTATED_ADDRESS).run(
+            sender = governorContractAddress,
+        )
+
+        # THEN the source is removed.
+        scenario.verify(~oracle.data.sources.contains(Addresses.ROTATED_ADDRESS))
+        scenario.verify(oracle.data.sources.contains(Addresses.HARBINGER_ADDRESS))
+
+    @sp.add_test(name="removeSource - fails when not called by governor")
+    def test():
+        # GIVEN a MedianOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = MedianOracleContract(
+            sources = [ Addresses.HARBINGER_ADDRESS ],
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN removeSource is called by someone who isn't the governor THEN the call fails
+        scenario += oracle.removeSource(Addresses.HARBINGER_ADDRESS).run(
+            sender = Addresses.NULL_ADDRESS,
+            valid = False
+        )
+
+    ################################################################
+    # setMinSources
+    ################################################################
+
+    @sp.add_test(name="setMinSources - succeeds when called by governor")
+    def test():
+        # GIVEN a MedianOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = MedianOracleContract(
+            governorContractAddress = governorContractAddress,
+            minSources = 1,
+        )
+        scenario += oracle
+
+        # WHEN setMinSources is called
+        newMinSources = 3
+        scenario += oracle.setMinSources(newMinSources).run(
+            sender = governorContractAddress,
+        )
+
+        # THEN the value is updated.
+        scenario.verify(oracle.data.minSources == newMinSources)
+
+    @sp.add_test(name="setMinSources - fails when not called by governor")
+    def test():
+        # GIVEN a MedianOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = MedianOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN setMinSources is called by someone who isn't the governor THEN the call fails
+        scenario += oracle.setMinSources(3).run(
+            sender = Addresses.NULL_ADDRESS,
+            valid = False
+        )
+
+    ################################################################
+    # setMaxDataDelaySec
+    ################################################################
+
+    @sp.add_test(name="setMaxDataDelaySec - succeeds when called by governor")
+    def test():
+        # GIVEN a MedianOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = MedianOracleContract(
+            governorContractAddress = governorContractAddress,
+            maxDataDelaySec = 30,
+        )
+        scenario += oracle
+
+        # WHEN the setMaxDataDelaySec is called with a new value
+        newMaxDataDelaySec = 60
+        scenario += oracle.setMaxDataDelaySec(newMaxDataDelaySec).run(
+            sender = governorContractAddress,
+        )
+
+        # THEN the value is updated.
+        scenario.verify(oracle.data.maxDataDelaySec == newMaxDataDelaySec)
+
+    @sp.add_test(name="setMaxDataDelaySec - fails when not called by governor")
+    def test():
+        # GIVEN a MedianOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = MedianOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN the setMaxDataDelaySec is called by someone who isn't the governor THEN the call fails
+        newMaxDataDelaySec = 60
+        scenario += oracle.setMaxDataDelaySec(newMaxDataDelaySec).run(
+            sender = Addresses.NULL_ADDRESS,
+            valid = False
+        )
+
+    ################################################################
+    # setGovernorContract
+    ################################################################
+
+    @sp.add_test(name="setGovernorContract - succeeds when called by governor")
+    def test():
+        # GIVEN a MedianOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = MedianOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN the setGovernorContract is called with a new contract
+        rotatedAddress = Addresses.ROTATED_ADDRESS
+        scenario += oracle.setGovernorContract(rotatedAddress).run(
+            sender = governorContractAddress,
+        )
+
+        # THEN the contract is updated.
+        scenario.verify(oracle.data.governorContractAddress == rotatedAddress)
+
+    @sp.add_test(name="setGovernorContract - fails when not called by governor")
+    def test():
+        # GIVEN a MedianOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = MedianOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN the setGovernorContract is called by someone who isn't the governor THEN the call fails
+        rotatedAddress = Addresses.ROTATED_ADDRESS
+        scenario += oracle.setGovernorContract(rotatedAddress).run(
+            sender = Addresses.NULL_ADDRESS,
+            valid = False
+        )
@@ -3,8 +3,56 @@ import smartpy as sp
 Addresses = sp.import_script_from_url("file:test-helpers/addresses.py")
 Constants = sp.import_script_from_url("file:common/constants.py")
 Errors = sp.import_script_from_url("file:common/errors.py")
+Events = sp.import_script_from_url("file:common/events.py")
 OvenApi = sp.import_script_from_url("file:common/oven-api.py")
 
+################################################################
+# Math
+#
+# Pure helpers shared by the Minter's entry points. `MinterContract`
+# either wraps them in global lambdas, which are stored once and
+# `EXEC`ed at every call site, or inlines them into each call site.
+################################################################
+
+# Calculate newly accrued stability fees with the given input.
+def calculateNewAccruedInterest(params):
+    sp.set_type(params, sp.TPair(sp.TInt, sp.TPair(sp.TNat, sp.TPair(sp.TNat, sp.TNat))))
+
+    ovenInterestIndex =  sp.as_nat(sp.fst(params))
+    borrowedTokens =     sp.fst(sp.snd(params))
+    stabilityFeeTokens = sp.fst(sp.snd(sp.snd(params)))
+    minterInterestIndex = sp.snd(sp.snd(sp.snd(params)))
+
+    ratio = sp.fst(sp.ediv((minterInterestIndex * Constants.PRECISION), ovenInterestIndex).open_some())        
+    totalPrinciple = borrowedTokens + stabilityFeeTokens
+    newTotalTokens = sp.fst(sp.ediv((ratio * totalPrinciple), Constants.PRECISION).open_some())
+    newTokensAccruedAsFee = sp.as_nat(newTotalTokens - totalPrinciple)
+    sp.result(newTokensAccruedAsFee)
+
+# Compound interest via a linear approximation.
+def compoundWithLinearApproximation(params):
+    sp.set_type(params, sp.TPair(sp.TNat, sp.TPair(sp.TNat, sp.TNat)))
+
+    initialValue = sp.fst(params)
+    stabilityFee = sp.fst(sp.snd(params))
+    numPeriods = sp.snd(sp.snd(params))
+
+    sp.result((initialValue * (Constants.PRECISION + (numPeriods * stabilityFee))) // Constants.PRECISION)
+
+# Compute the collateralization percentage from the given inputs
+# Output is in the form of 200_000_000 (= 200%)
+def computeCollateralizationPercentage(params):
+    sp.set_type(params, sp.TPair(sp.TNat, sp.TPair(sp.TNat, sp.TNat)))
+
+    ovenBalance = sp.fst(params)
+    xtzPrice = sp.fst(sp.snd(params))
+    borrowedTokens = sp.snd(sp.snd(params))
+
+    # Compute collateral value.
+    collateralValue = ovenBalance * xtzPrice // Constants.PRECISION
+    ratio = (collateralValue * Constants.PRECISION) // (borrowedTokens)
+    sp.result(ratio * 100)
+
 ################################################################
 # Contract
 ################################################################
@@ -23,11 +71,38 @@ class MinterContract(sp.Contract):
         interestIndex = 1000000000000000000,
         stabilityDevFundSplit = sp.nat(100000000000000000), # 10%
         liquidationFeePercent = sp.nat(80000000000000000),  # 8%
-        ovenMax = sp.some(sp.tez(100))
+        ovenMax = sp.some(sp.tez(100)),
+        metadata = sp.big_map(l = {}, tkey = sp.TString, tvalue = sp.TBytes),
+        inlineMath = False
     ):
         self.exception_optimization_level = "DefaultUnit"
         self.add_flag("no_comment")
 
+        # Math helpers are compiled either as global lambdas, which keep the contract small but are pushed and
+        # `EXEC`ed by every entry point, or inlined into each call site, which trades contract size for gas.
+        # See `compile.sh --minter-variants` to compare the two.
+        if inlineMath:
+            self.calculateNewAccruedInterest = sp.inline_result(calculateNewAccruedInterest)
+            self.compoundWithLinearApproximation = sp.inline_result(compoundWithLinearApproximation)
+            self.computeCollateralizationPercentage = sp.inline_result(computeCollateralizationPercentage)
+        else:
+            self.calculateNewAccruedInterest = sp.global_lambda(calculateNewAccruedInterest)
+            self.compoundWithLinearApproximation = sp.global_lambda(compoundWithLinearApproximation)
+            self.computeCollateralizationPercentage = sp.global_lambda(computeCollateralizationPercentage)
+
+        # TZIP-16 metadata. The JSON document emitted by the compiler should be hosted and its
+        # location stored under the "" key with `updateContractMetadata`.
+        self.init_metadata("minter_metadata", {
+            "name": "Kolibri Minter",
+            "description": "Off-chain views for evaluating the health of Kolibri Ovens",
+            "interfaces": ["TZIP-016"],
+            "views": [
+                self.getOvenDebt,
+                self.getOvenCollateralizationPercentage,
+                self.getOvenLiquidationPrice
+            ],
+        })
+
         self.init(
             governorContractAddress = governorContractAddress,
             tokenContractAddress = tokenContractAddress,
@@ -38,6 +113,7 @@ class MinterContract(sp.Contract):
             liquidationFeePercent = liquidationFeePercent,
             stabilityDevFundSplit = stabilityDevFundSplit,
             ovenMax = ovenMax,
+            metadata = metadata,
  
             # Interest Calculations
             interestIndex = interestIndex,
@@ -69,6 +145,89 @@ class MinterContract(sp.Contract):
         self.data.interestIndex = newMinterInterestIndex
         self.data.lastInterestIndexUpdateTime = self.data.lastInterestIndexUpdateTime.add_seconds(sp.to_int(numPeriods * Constants.SECONDS_PER_COMPOUND))
 
+    ################################################################
+    # Views
+    ################################################################
+
+    # Get the interest index compounded to the current time.
+    #
+    # Unlike `getInterestIndex`, this does not require a callback and does not update storage.
+    @sp.onchain_view()
+    def getCurrentInterestIndex(self):
+        sp.result(self.computeCurrentInterestIndex())
+
+    ################################################################
+    # Off-chain Views
+    #
+    # These views evaluate an oven with the same math the Minter uses on chain. Oven
+    # parameters are passed as they appear in the Oven's storage and balance. Interest
+    # is compounded to `sp.now`, so the views are not pure.
+    ################################################################
+
+    # Get the total number of tokens owed by an oven, including newly accrued stability fees.
+    #
+    # Params: (borrowedTokens, (stabilityFeeTokens, interestIndex))
+    @sp.offchain_view()
+    def getOvenDebt(self, params):
+        sp.set_type(params, sp.TPair(sp.TNat, sp.TPair(sp.TInt, sp.TInt)))
+
+        borrowedTokens = sp.fst(params)
+        stabilityFeeTokens = sp.fst(sp.snd(params))
+        interestIndex = sp.snd(sp.snd(params))
+
+        sp.result(self.computeTotalOutstandingTokens(borrowedTokens, stabilityFeeTokens, interestIndex))
+
+    # Get the collateralization percentage of an oven at the given XTZ-USD price.
+    # Returns `None` if the oven has no outstanding tokens.
+    #
+    # Params: (xtzPrice, (ovenBalance, (borrowedTokens, (stabilityFeeTokens, interestIndex))))
+    @sp.offchain_view()
+    def getOvenCollateralizationPercentage(self, params):
+        sp.set_type(params, sp.TPair(sp.TNat, sp.TPair(sp.TMutez, sp.TPair(sp.TNat, sp.TPair(sp.TInt, sp.TInt)))))
+
+        xtzPrice = sp.fst(params)
+        ovenBalanceMutez = sp.fst(sp.snd(params))
+        borrowedTokens = sp.fst(sp.snd(sp.snd(params)))
+        stabilityFeeTokens = sp.fst(sp.snd(sp.snd(sp.snd(params))))
+        interestIndex = sp.snd(sp.snd(sp.snd(sp.snd(params))))
+
+        ovenBalance = sp.fst(sp.ediv(ovenBalanceMutez, sp.mutez(1)).open_some()) * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+        totalOutstandingTokens = self.computeTotalOutstandingTokens(borrowedTokens, stabilityFeeTokens, interestIndex)
+
+        result = sp.local("result", sp.none, sp.TOption(sp.TNat))
+        sp.if totalOutstandingTokens > 0:
+            result.value = sp.some(self.computeCollateralizationPercentage((ovenBalance, (xtzPrice, totalOutstandingTokens))))
+        sp.result(result.value)
+
+    # Get the XTZ-USD price below which an oven can be liquidated.
+    # Returns `None` if the oven can be liquidated at any price.
+    #
+    # Params: (ovenBalance, (borrowedTokens, (stabilityFeeTokens, interestIndex)))
+    @sp.offchain_view()
+    def getOvenLiquidationPrice(self, params):
+        sp.set_type(params, sp.TPair(sp.TMutez, sp.TPair(sp.TNat, sp.TPair(sp.TInt, sp.TInt))))
+
+        ovenBalanceMutez = sp.fst(params)
+        borrowedTokens = sp.fst(sp.snd(params))
+        stabilityFeeTokens = sp.fst(sp.snd(sp.snd(params)))
+        interestIndex = sp.snd(sp.snd(sp.snd(params)))
+
+        ovenBalance = sp.fst(sp.ediv(ovenBalanceMutez, sp.mutez(1)).open_some()) * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+        totalOutstandingTokens = self.computeTotalOutstandingTokens(borrowedTokens, stabilityFeeTokens, interestIndex)
+
+        # Invert `computeCollateralizationPercentage`, rounding up at each step, to find the smallest 
+        # collateral value and then the smallest price which keep the oven collateralized.
+        minimumRatio = (self.data.collateralizationPercentage + 99) // 100
+        minimumCollateralValue = (minimumRatio * totalOutstandingTokens + sp.as_nat(Constants.PRECISION - 1)) // Constants.PRECISION
+
+        result = sp.local("result", sp.none, sp.TOption(sp.TNat))
+        sp.if ovenBalance > 0:
+            result.value = sp.some((minimumCollateralValue * Constants.PRECISION + sp.as_nat(ovenBalance - 1)) // ovenBalance)
+        sp.else:
+            sp.if minimumCollateralValue == 0:
+                result.value = sp.some(sp.nat(0))
+        sp.result(result.value)
+
     ################################################################
     # Oven Interface
     ################################################################
@@ -132,6 +291,11 @@ class MinterContract(sp.Contract):
 
         # Inform oven of new state.
         self.updateOvenState(ovenAddress, newTotalBorrowedTokens, newStabilityFeeTokens, newMinterInterestIndex, isLiquidated, sp.balance)
+        self.emitOvenEvent(
+            Events.BORROW_EVENT_TAG, ovenAddress, ownerAddress, sp.balance,
+            self.ovenState(borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated),
+            self.ovenState(newTotalBorrowedTokens, newStabilityFeeTokens, sp.to_int(newMinterInterestIndex), isLiquidated)
+        )
 
         # Update internal state
         self.data.interestIndex = newMinterInterestIndex
@@ -198,6 +362,11 @@ class MinterContract(sp.Contract):
 
         # Inform oven of new state.
         self.updateOvenState(ovenAddress, remainingBorrowedTokenBalance.value, remainingStabilityFeeTokens.value, newMinterInterestIndex, isLiquidated, sp.balance)
+        self.emitOvenEvent(
+            Events.REPAY_EVENT_TAG, ovenAddress, ownerAddress, sp.balance,
+            self.ovenState(borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated),
+            self.ovenState(remainingBorrowedTokenBalance.value, remainingStabilityFeeTokens.value, sp.to_int(newMinterInterestIndex), isLiquidated)
+        )
 
         # Update internal state
         self.data.interestIndex = newMinterInterestIndex
@@ -248,6 +417,11 @@ class MinterContract(sp.Contract):
 
         # Intentional no-op. Pass value back to oven.
         self.updateOvenState(ovenAddress, borrowedTokens, newStabilityFeeTokens, newMinterInterestIndex, isLiquidated, sp.balance)
+        self.emitOvenEvent(
+            Events.DEPOSIT_EVENT_TAG, ovenAddress, ownerAddress, sp.balance,
+            self.ovenState(borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated),
+            self.ovenState(borrowedTokens, newStabilityFeeTokens, sp.to_int(newMinterInterestIndex), isLiquidated)
+        )
         
         # Update internal state
         self.data.interestIndex = newMinterInterestIndex
@@ -306,6 +480,11 @@ class MinterContract(sp.Contract):
         # Update the oven's state and return the remaining mutez to it.
         remainingMutez = sp.mutez(ovenBalance // Constants.MUTEZ_TO_KOLIBRI_CONVERSION) - mutezToWithdraw
         self.updateOvenState(ovenAddress, borrowedTokens, newStabilityFeeTokens, newMinterInterestIndex, isLiquidated, remainingMutez)
+        self.emitOvenEvent(
+            Events.WITHDRAW_EVENT_TAG, ovenAddress, ownerAddress, remainingMutez,
+            self.ovenState(borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated),
+            self.ovenState(borrowedTokens, newStabilityFeeTokens, sp.to_int(newMinterInterestIndex), isLiquidated)
+        )
         
         # Update internal state
         self.data.interestIndex = newMinterInterestIndex
@@ -373,6 +552,120 @@ class MinterContract(sp.Contract):
 
         # Inform oven it is liquidated, clear owed tokens and return no collateral.
         self.updateOvenState(ovenAddress, sp.nat(0), sp.nat(0), newMinterInterestIndex, True, sp.mutez(0))
+        self.emitOvenEvent(
+            Events.LIQUIDATE_EVENT_TAG, ovenAddress, ownerAddress, sp.mutez(0),
+            self.ovenState(borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated),
+            self.ovenState(sp.nat(0), sp.nat(0), sp.to_int(newMinterInterestIndex), True)
+        )
+
+        # Update internal state
+        self.data.interestIndex = newMinterInterestIndex
+        self.data.lastInterestIndexUpdateTime = self.data.lastInterestIndexUpdateTime.add_seconds(sp.to_int(numPeriods * Constants.SECONDS_PER_COMPOUND))
+
+    # partialLiquidate
+    #
+    # Repay only enough of an undercollateralized oven's debt to bring it back to the required
+    # collateralization. The liquidator burns the repaid tokens and receives collateral worth the
+    # repaid tokens plus the liquidation fee, valued at the oracle price.
+    @sp.entry_point
+    def partialLiquidate(self, param):
+        sp.set_type(param, OvenApi.LIQUIDATE_PARAMETER_TYPE_ORACLE)
+
+        # Verify the sender is a oven.
+        sp.verify(sp.sender == self.data.ovenProxyContractAddress, message = Errors.NOT_OVEN_PROXY)
+
+        # Destructure input params.        
+        oraclePrice,           pair1 = sp.match_pair(param)
+        ovenAddress,           pair2 = sp.match_pair(pair1)
+        ownerAddress,          pair3 = sp.match_pair(pair2)
+        ovenBalance,           pair4 = sp.match_pair(pair3)
+        borrowedTokens,        pair5 = sp.match_pair(pair4)
+        isLiquidated,          pair6 = sp.match_pair(pair5)
+        stabilityFeeTokensInt, pair7 = sp.match_pair(pair6)
+        interestIndex                = sp.fst(pair7)
+        liquidatorAddress            = sp.snd(pair7)
+
+        stabilityFeeTokens = sp.as_nat(stabilityFeeTokensInt)
+
+        sp.set_type(oraclePrice, sp.TNat)
+        sp.set_type(ovenAddress, sp.TAddress)
+        sp.set_type(ownerAddress, sp.TAddress)
+        sp.set_type(ovenBalance, sp.TNat)
+        sp.set_type(borrowedTokens, sp.TNat)
+        sp.set_type(isLiquidated, sp.TBool)
+        sp.set_type(stabilityFeeTokens, sp.TNat)
+        sp.set_type(interestIndex, sp.TInt)
+        sp.set_type(liquidatorAddress, sp.TAddress)
+
+        # Calculate new interest indices for the minter and the oven.
+        timeDeltaSeconds = sp.as_nat(sp.now - self.data.lastInterestIndexUpdateTime)
+        numPeriods = timeDeltaSeconds // Constants.SECONDS_PER_COMPOUND
+        newMinterInterestIndex = self.compoundWithLinearApproximation((self.data.interestIndex, (self.data.stabilityFee, numPeriods)))
+
+        # Disallow additional liquidate operations on liquidated ovens.
+        sp.verify(isLiquidated == False, message = Errors.LIQUIDATED)
+
+        # Calculate newly accrued stability fees and determine total fees.
+        accruedStabilityFeeTokens = self.calculateNewAccruedInterest((interestIndex, (borrowedTokens, (stabilityFeeTokens, (newMinterInterestIndex)))))
+        newStabilityFeeTokens = stabilityFeeTokens + accruedStabilityFeeTokens
+
+        # Verify collateral percentage.
+        totalOutstandingTokens = borrowedTokens + newStabilityFeeTokens
+        collateralizationPercentage = self.computeCollateralizationPercentage((ovenBalance, (oraclePrice, totalOutstandingTokens)))
+        sp.verify(collateralizationPercentage < self.data.collateralizationPercentage, message = Errors.NOT_UNDER_COLLATERALIZED)
+
+        # Determine the shortfall between the collateral value and the value required by the collateralization 
+        # percentage. The required ratio is rounded up, which guarantees the shortfall is positive.
+        collateralValue = ovenBalance * oraclePrice // Constants.PRECISION
+        requiredRatio = (self.data.collateralizationPercentage + 99) // 100
+        requiredCollateralValue = (requiredRatio * totalOutstandingTokens + sp.as_nat(Constants.PRECISION - 1)) // Constants.PRECISION
+        shortfall = sp.as_nat(requiredCollateralValue - collateralValue)
+
+        # Repaying a token reduces the required collateral by `requiredRatio` and seizes `1 + liquidationFeePercent` 
+        # of collateral, so each repaid token closes the shortfall by the difference. Round up so the oven is restored.
+        # Unless the required ratio exceeds `1 + liquidationFeePercent`, repaying never restores the oven and it can 
+        # only be liquidated in full.
+        sp.verify(requiredRatio > Constants.PRECISION + self.data.liquidationFeePercent, message = Errors.PARTIAL_LIQUIDATION_DISABLED)
+        shortfallReductionPerToken = sp.as_nat(requiredRatio - (Constants.PRECISION + self.data.liquidationFeePercent))
+        tokensToRepay = sp.local("tokensToRepay", (shortfall * Constants.PRECISION + sp.as_nat(shortfallReductionPerToken - 1)) // shortfallReductionPerToken)
+        sp.if tokensToRepay.value > totalOutstandingTokens:
+            tokensToRepay.value = totalOutstandingTokens
+
+        # Determine the collateral seized, capped at the oven's balance.
+        ovenBalanceMutez = sp.mutez(ovenBalance // Constants.MUTEZ_TO_KOLIBRI_CONVERSION)
+        seizedValue = (tokensToRepay.value * (Constants.PRECISION + self.data.liquidationFeePercent)) // Constants.PRECISION
+        seizedBalance = (seizedValue * Constants.PRECISION) // oraclePrice
+        seizedMutez = sp.local("seizedMutez", sp.mutez(seizedBalance // Constants.MUTEZ_TO_KOLIBRI_CONVERSION))
+        sp.if seizedMutez.value > ovenBalanceMutez:
+            seizedMutez.value = ovenBalanceMutez
+
+        # Apply the repayment to stability fees first, then to borrowed tokens.
+        stabilityFeeTokensRepaid = sp.local("stabilityFeeTokensRepaid", 0)
+        remainingStabilityFeeTokens = sp.local("remainingStabilityFeeTokens", 0)
+        remainingBorrowedTokenBalance = sp.local("remainingBorrowedTokenBalance", 0)
+        sp.if tokensToRepay.value < newStabilityFeeTokens:
+            stabilityFeeTokensRepaid.value = tokensToRepay.value
+            remainingStabilityFeeTokens.value = sp.as_nat(newStabilityFeeTokens - tokensToRepay.value)
+            remainingBorrowedTokenBalance.value = borrowedTokens
+        sp.else:
+            stabilityFeeTokensRepaid.value = newStabilityFeeTokens
+            remainingStabilityFeeTokens.value = sp.nat(0)
+            remainingBorrowedTokenBalance.value = sp.as_nat(borrowedTokens - sp.as_nat(tokensToRepay.value - newStabilityFeeTokens))
+
+        # Burn tokens from the liquidator and mint repaid stability fees to the funds.
+        self.burnTokens(tokensToRepay.value, liquidatorAddress)
+        self.mintTokensToStabilityAndDevFund(stabilityFeeTokensRepaid.value)
+
+        # Send seized collateral to liquidator.
+        sp.send(liquidatorAddress, seizedMutez.value)
+
+        # Inform oven of its new state and return the remaining collateral.
+        self.updateOvenState(ovenAddress, remainingBorrowedTokenBalance.value, remainingStabilityFeeTokens.value, newMinterInterestIndex, isLiquidated, ovenBalanceMutez - seizedMutez.value)
+        self.emitOvenEvent(
+            Events.PARTIAL_LIQUIDATE_EVENT_TAG, ovenAddress, ownerAddress, ovenBalanceMutez - seizedMutez.value,
+            self.ovenState(borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated),
+            self.ovenState(remainingBorrowedTokenBalance.value, remainingStabilityFeeTokens.value, sp.to_int(newMinterInterestIndex), isLiquidated)
+        )
 
         # Update internal state
         self.data.interestIndex = newMinterInterestIndex
@@ -427,10 +720,37 @@ class MinterContract(sp.Contract):
         self.data.stabilityFundContractAddress = newStabilityFundContractAddress
         self.data.developerFundContractAddress = newDeveloperFundContractAddress
 
+    # Update contract metadata.
+    @sp.entry_point
+    def updateContractMetadata(self, params):
+        sp.set_type(params, sp.TPair(sp.TString, sp.TBytes))
+
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+
+        key = sp.fst(params)
+        value = sp.snd(params)
+        self.data.metadata[key] = value
+
     ################################################################
     # Helpers
     ################################################################
 
+    # Compute the Minter's interest index compounded to the current time, without updating storage.
+    def computeCurrentInterestIndex(self):
+        timeDeltaSeconds = sp.as_nat(sp.now - self.data.lastInterestIndexUpdateTime)
+        numPeriods = timeDeltaSeconds // Constants.SECONDS_PER_COMPOUND
+        return self.compoundWithLinearApproximation((self.data.interestIndex, (self.data.stabilityFee, numPeriods)))
+
+    # Compute the tokens owed by an oven at the current time, including newly accrued stability fees.
+    def computeTotalOutstandingTokens(self, borrowedTokens, stabilityFeeTokensInt, interestIndex):
+        sp.set_type(borrowedTokens, sp.TNat)
+        sp.set_type(stabilityFeeTokensInt, sp.TInt)
+        sp.set_type(interestIndex, sp.TInt)
+
+        stabilityFeeTokens = sp.as_nat(stabilityFeeTokensInt)
+        accruedStabilityFeeTokens = self.calculateNewAccruedInterest((interestIndex, (borrowedTokens, (stabilityFeeTokens, self.computeCurrentInterestIndex()))))
+        return borrowedTokens + stabilityFeeTokens + accruedStabilityFeeTokens
+
     # Mint tokens to a stability fund.
     # 
     # This function does *NOT* burn tokens - the caller must do this. This is an efficiency gain because normally
@@ -470,48 +790,6 @@ class MinterContract(sp.Contract):
         ).open_some()
         sp.transfer(tokenContractParam, sp.mutez(0), contractHandle)
 
-    # Calculate newly accrued stability fees with the given input.
-    @sp.global_lambda
-    def calculateNewAccruedInterest(params):
-        sp.set_type(params, sp.TPair(sp.TInt, sp.TPair(sp.TNat, sp.TPair(sp.TNat, sp.TNat))))
-
-        ovenInterestIndex =  sp.as_nat(sp.fst(params))
-        borrowedTokens =     sp.fst(sp.snd(params))
-        stabilityFeeTokens = sp.fst(sp.snd(sp.snd(params)))
-        minterInterestIndex = sp.snd(sp.snd(sp.snd(params)))
-
-        ratio = sp.fst(sp.ediv((minterInterestIndex * Constants.PRECISION), ovenInterestIndex).open_some())        
-        totalPrinciple = borrowedTokens + stabilityFeeTokens
-        newTotalTokens = sp.fst(sp.ediv((ratio * totalPrinciple), Constants.PRECISION).open_some())
-        newTokensAccruedAsFee = sp.as_nat(newTotalTokens - totalPrinciple)
-        sp.result(newTokensAccruedAsFee)
-
-    # Compound interest via a linear approximation.
-    @sp.global_lambda
-    def compoundWithLinearApproximation(params):
-        sp.set_type(params, sp.TPair(sp.TNat, sp.TPair(sp.TNat, sp.TNat)))
-
-        initialValue = sp.fst(params)
-        stabilityFee = sp.fst(sp.snd(params))
-        numPeriods = sp.snd(sp.snd(params))
-
-        sp.result((initialValue * (Constants.PRECISION + (numPeriods * stabilityFee))) // Constants.PRECISION)
-
-    # Compute the collateralization percentage from the given inputs
-    # Output is in the form of 200_000_000 (= 200%)
-    @sp.global_lambda
-    def computeCollateralizationPercentage(params):
-        sp.set_type(params, sp.TPair(sp.TNat, sp.TPair(sp.TNat, sp.TNat)))
-
-        ovenBalance = sp.fst(params)
-        xtzPrice = sp.fst(sp.snd(params))
-        borrowedTokens = sp.snd(sp.snd(params))
-
-        # Compute collateral value.
-        collateralValue = ovenBalance * xtzPrice // Constants.PRECISION
-        ratio = (collateralValue * Constants.PRECISION) // (borrowedTokens)
-        sp.result(ratio * 100)
-
     def updateOvenState(self, ovenAddress, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated, sendAmount):
         sp.set_type(ovenAddress, sp.TAddress)
         sp.set_type(borrowedTokens, sp.TNat)
@@ -531,6 +809,33 @@ class MinterContract(sp.Contract):
 
         sp.transfer(ovenContractParam, sendAmount, ovenHandle)
 
+    # Build an oven state for an event.
+    def ovenState(self, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated):
+        return sp.set_type_expr(
+            sp.record(
+                borrowedTokens = borrowedTokens,
+                stabilityFeeTokens = stabilityFeeTokens,
+                interestIndex = interestIndex,
+                isLiquidated = isLiquidated
+            ),
+            Events.OVEN_STATE_TYPE
+        )
+
+    # Emit an event describing an oven before and after an operation.
+    def emitOvenEvent(self, tag, ovenAddress, ownerAddress, balance, before, after):
+        event = sp.record(
+            oven = ovenAddress,
+            owner = ownerAddress,
+            balance = balance,
+            before = before,
+            after = after
+        )
+        self.emitEvent(tag, sp.set_type_expr(event, Events.OVEN_EVENT_TYPE))
+
+    # Emit an event. Scenarios override this to record events, see `test-helpers/event-recorder.py`.
+    def emitEvent(self, tag, event):
+        sp.emit(event, tag = tag)
+
 # Only run tests if this file is main.
 if __name__ == "__main__":
 
@@ -543,6 +848,7 @@ if __name__ == "__main__":
     Addresses = sp.import_script_from_url("file:test-helpers/addresses.py")
     DevFund = sp.import_script_from_url("file:dev-fund.py")
     DummyContract = sp.import_script_from_url("file:test-helpers/dummy-contract.py")
+    EventRecorder = sp.import_script_from_url("file:test-helpers/event-recorder.py")
     MockOvenProxy = sp.import_script_from_url("file:test-helpers/mock-oven-proxy.py")
     StabilityFund = sp.import_script_from_url("file:stability-fund.py")
     Token = sp.import_script_from_url("file:token.py")
@@ -555,7 +861,7 @@ if __name__ == "__main__":
     # See: https://smartpy.io/releases/20201220-f9f4ad18bd6ec2293f22b8c8812fefbde46d6b7d/ide?template=test_global_lambda.py
     class Tester(sp.Contract):
         def __init__(self, lambdaFunc):
-            self.lambdaFunc = sp.inline_result(lambdaFunc.f)
+            self.lambdaFunc = sp.inline_result(lambdaFunc)
             self.init(lambdaResult = sp.none)
 
         @sp.entry_point
@@ -566,6 +872,46 @@ if __name__ == "__main__":
         def check(self, params, result):
             sp.verify(self.lambdaFunc(params) == result)
 
+    # A Minter which records the last event it emits.
+    EventRecordingMinterContract = EventRecorder.recordEvents(MinterContract)
+
+    # An oven event. Oven states are given as (borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated).
+    def ovenEvent(ovenAddress, ownerAddress, balance, before, after):
+        def ovenState(state):
+            borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated = state
+            return sp.record(
+                borrowedTokens = borrowedTokens,
+                stabilityFeeTokens = stabilityFeeTokens,
+                interestIndex = interestIndex,
+                isLiquidated = isLiquidated
+            )
+
+        event = sp.record(
+            oven = ovenAddress,
+            owner = ownerAddress,
+            balance = balance,
+            before = ovenState(before),
+            after = ovenState(after)
+        )
+        return sp.set_type_expr(event, Events.OVEN_EVENT_TYPE)
+
+    # A contract which reads the Minter's `getCurrentInterestIndex` view and stores the result for inspection.
+    class InterestIndexViewReader(sp.Contract):
+        def __init__(self, minterContractAddress):
+            self.init(
+                minterContractAddress = minterContractAddress,
+                interestIndex = sp.nat(0)
+            )
+
+        @sp.entry_point
+        def readInterestIndex(self):
+            self.data.interestIndex = sp.view(
+                "getCurrentInterestIndex",
+                self.data.minterContractAddress,
+                sp.unit,
+                t = sp.TNat
+            ).open_some()
+
     ################################################################
     # calculateNewAccruedInterest
     ################################################################
@@ -573,10 +919,8 @@ if __name__ == "__main__":
     @sp.add_test(name="calculateNewAccruedInterest")
     def test():
         scenario = sp.test_scenario()
-        minter = MinterContract()
-        scenario += minter
 
-        tester = Tester(minter.calculateNewAccruedInterest)
+        tester = Tester(calculateNewAccruedInterest)
         scenario += tester
 
         scenario += tester.check(
@@ -612,10 +956,8 @@ if __name__ == "__main__":
     @sp.add_test(name="compoundWithLinearApproximation")
     def test():
         scenario = sp.test_scenario()
-        minter = MinterContract()
-        scenario += minter
 
-        tester = Tester(minter.compoundWithLinearApproximation)
+        tester = Tester(compoundWithLinearApproximation)
         scenario += tester
 
         # Two periods back to back
@@ -771,7 +1113,7 @@ if __name__ == "__main__":
         # AND a Minter contract
         liquidationFeePercent = sp.nat(80000000000000000) # 8%
         stabilityDevFundSplit = sp.nat(100000000000000000) # 10%
-        minter = MinterContract(
+        minter = EventRecordingMinterContract(
             liquidationFeePercent = liquidationFeePercent,
             ovenProxyContractAddress = ovenProxy.address,
             stabilityFundContractAddress = stabilityFund.address,
@@ -841,6 +1183,13 @@ if __name__ == "__main__":
         scenario.verify(ovenProxy.data.updateState_interestIndex == interestIndex)
         scenario.verify(ovenProxy.data.updateState_isLiquidated == True)
 
+        # AND a liquidate event is emitted with the oven's state before and after.
+        EventRecorder.verifyLastEvent(scenario, minter, Events.LIQUIDATE_EVENT_TAG, ovenEvent(
+            ovenAddress, ovenOwnerAddress, sp.mutez(0),
+            (ovenBorrowedTokens, sp.as_nat(stabilityFeeTokens), interestIndex, False),
+            (sp.nat(0), sp.nat(0), interestIndex, True)
+        ))
+
     # TODO(keefertaylor): Enable when SmartPy supports handling `failwith` in other contracts with `valid = False`
     # SEE: https://t.me/SmartPy_io/6538
     # @sp.add_test(name="liquidate - fails when liquidator has too few tokens")
@@ -896,18 +1245,230 @@ if __name__ == "__main__":
     #     stabilityFeeTokens = sp.to_int(Constants.PRECISION)
     #     interestIndex = sp.to_int(Constants.PRECISION)
 
-    #     liquidatorAddress = liquidator.address
+    #     liquidatorAddress = liquidator.address
+
+    #     # THEN the call fails.
+    #     param = (xtzPrice, (ovenAddress, (ovenOwnerAddress, (ovenBalance, (ovenBorrowedTokens, (isLiquidated, (stabilityFeeTokens, (interestIndex, liquidatorAddress))))))))
+    #     scenario += minter.liquidate(param).run(
+    #         sender = ovenProxy.address,
+    #         amount = ovenBalanceMutez,
+    #         now = sp.timestamp_from_utc_now(),
+    #         valid = False
+    #     )
+
+    @sp.add_test(name="liquidate - fails if oven is properly collateralized")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an Minter contract
+        ovenProxyAddress = Addresses.OVEN_PROXY_ADDRESS
+        minter = MinterContract(
+            ovenProxyContractAddress = ovenProxyAddress,
+        )
+        scenario += minter
+
+        # WHEN liquidate is called on an oven that exactly meets the collateralization ratios
+        ovenBalance = 2 * Constants.PRECISION # 2 XTZ
+        ovenBalanceMutez = sp.mutez(2000000) # 2 XTZ
+        xtzPrice = Constants.PRECISION # 1 XTZ / $1
+        ovenBorrowedTokens = 1 * Constants.PRECISION # $1 kUSD
+
+        ovenOwnerAddress =  Addresses.OVEN_OWNER_ADDRESS
+        ovenAddress = Addresses.OVEN_ADDRESS
+        liquidatorAddress = Addresses.LIQUIDATOR_ADDRESS
+
+        stabilityFeeTokens = sp.to_int(0)
+        interestIndex = sp.to_int(Constants.PRECISION)
+
+        isLiquidated = False
+
+        param = (xtzPrice, (ovenAddress, (ovenOwnerAddress, (ovenBalance, (ovenBorrowedTokens, (isLiquidated, (stabilityFeeTokens, (interestIndex, liquidatorAddress))))))))
+
+        # THEN the call fails.
+        scenario += minter.liquidate(param).run(
+            sender = ovenProxyAddress,
+            amount = ovenBalanceMutez,
+            now = sp.timestamp_from_utc_now(),
+            valid = False
+        )
+
+    @sp.add_test(name="liquidate - fails if oven is already liquidated")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an Minter contract
+        ovenProxyAddress = Addresses.OVEN_PROXY_ADDRESS
+        minter = MinterContract(
+            ovenProxyContractAddress = ovenProxyAddress,
+        )
+        scenario += minter
+
+        # WHEN liquidate is called on an undercollateralized oven which is already liquidated
+        ovenBalance = Constants.PRECISION # 1 XTZ
+        ovenBalanceMutez = sp.mutez(1000000) # 1 XTZ
+
+        xtzPrice = Constants.PRECISION # 1 XTZ / $1
+
+        ovenBorrowedTokens = 2 * Constants.PRECISION # $2 kUSD
+
+        ovenOwnerAddress =  Addresses.OVEN_OWNER_ADDRESS
+        ovenAddress = Addresses.OVEN_ADDRESS
+        liquidatorAddress = Addresses.LIQUIDATOR_ADDRESS
+
+        stabilityFeeTokens = sp.to_int(Constants.PRECISION)
+        interestIndex = sp.to_int(Constants.PRECISION)
+
+        isLiquidated = True
+
+        param = (xtzPrice, (ovenAddress, (ovenOwnerAddress, (ovenBalance, (ovenBorrowedTokens, (isLiquidated, (stabilityFeeTokens, (interestIndex, liquidatorAddress))))))))
+
+        # THEN the call fails.
+        scenario += minter.liquidate(param).run(
+            sender = ovenProxyAddress,
+            amount = ovenBalanceMutez,
+            now = sp.timestamp_from_utc_now(),
+            valid = False
+        )
+
+    @sp.add_test(name="liquidate - fails if not called by ovenProxy")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an Minter contract
+        ovenProxyAddress = Addresses.OVEN_PROXY_ADDRESS
+        minter = MinterContract(
+            ovenProxyContractAddress = ovenProxyAddress,
+        )
+        scenario += minter
+
+        # WHEN liquidate is called on an undercollateralized oven by someone other than the oven proxy
+        ovenBalance = Constants.PRECISION # 1 XTZ
+        ovenBalanceMutez = sp.mutez(1000000) # 1 XTZ
+
+        xtzPrice = Constants.PRECISION # 1 XTZ / $1
+
+        ovenBorrowedTokens = 2 * Constants.PRECISION # $2 kUSD
+
+        ovenOwnerAddress =  Addresses.OVEN_OWNER_ADDRESS
+        ovenAddress = Addresses.OVEN_ADDRESS
+        liquidatorAddress = Addresses.LIQUIDATOR_ADDRESS
+
+        stabilityFeeTokens = sp.to_int(Constants.PRECISION)
+        interestIndex = sp.to_int(Constants.PRECISION)
+
+        isLiquidated = False
+
+        param = (xtzPrice, (ovenAddress, (ovenOwnerAddress, (ovenBalance, (ovenBorrowedTokens, (isLiquidated, (stabilityFeeTokens, (interestIndex, liquidatorAddress))))))))
+
+        # THEN the call fails.
+        notOvenProxy = Addresses.NULL_ADDRESS
+        scenario += minter.liquidate(param).run(
+            sender = notOvenProxy,
+            amount = ovenBalanceMutez,
+            now = sp.timestamp_from_utc_now(),
+            valid = False
+        )    
+
+    ###############################################################
+    # Partial Liquidate
+    ###############################################################
+
+    @sp.add_test(name="partialLiquidate - restores collateralization of undercollateralized oven")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an OvenProxy contract
+        ovenProxy = MockOvenProxy.MockOvenProxyContract()
+        scenario += ovenProxy
+        
+        # AND a Token contract.
+        governorAddress = Addresses.GOVERNOR_ADDRESS
+        token = Token.FA12(
+            admin = governorAddress
+        )
+        scenario += token
+
+        # AND dummy contracts to act as the dev and stability funds.
+        stabilityFund = DummyContract.DummyContract()
+        devFund = DummyContract.DummyContract()
+        scenario += stabilityFund
+        scenario += devFund
+
+        # AND a Minter contract
+        liquidationFeePercent = sp.nat(80000000000000000) # 8%
+        minter = EventRecordingMinterContract(
+            liquidationFeePercent = liquidationFeePercent,
+            ovenProxyContractAddress = ovenProxy.address,
+            stabilityFundContractAddress = stabilityFund.address,
+            developerFundContractAddress = devFund.address,
+            tokenContractAddress = token.address
+        )
+        scenario += minter
+
+        # AND the Minter is the Token administrator
+        scenario += token.setAdministrator(minter.address).run(
+            sender = governorAddress
+        )    
+
+        # AND a dummy contract that acts as the liquidator.
+        liquidator = DummyContract.DummyContract()
+        scenario += liquidator
+
+        # AND the liquidator has $1000 of tokens.
+        liquidatorTokens = 1000 * Constants.PRECISION
+        mintForLiquidatorParam = sp.record(address = liquidator.address, value = liquidatorTokens)
+        scenario += token.mint(mintForLiquidatorParam).run(
+            sender = minter.address
+        )
+
+        # WHEN partialLiquidate is called on an oven that is 166% collateralized.
+        ovenBalance = Constants.PRECISION # 1 XTZ
+        ovenBalanceMutez = sp.mutez(1000000) # 1 XTZ
+
+        xtzPrice = Constants.PRECISION # 1 XTZ / $1
+
+        ovenBorrowedTokens = 600000000000000000 # $0.60 kUSD
+
+        ovenOwnerAddress =  Addresses.OVEN_OWNER_ADDRESS
+        ovenAddress = Addresses.OVEN_ADDRESS
+        isLiquidated = False
+
+        stabilityFeeTokens = sp.int(0)
+        interestIndex = sp.to_int(Constants.PRECISION)
+
+        liquidatorAddress = liquidator.address
+
+        param = (xtzPrice, (ovenAddress, (ovenOwnerAddress, (ovenBalance, (ovenBorrowedTokens, (isLiquidated, (stabilityFeeTokens, (interestIndex, liquidatorAddress))))))))
+        scenario += minter.partialLiquidate(param).run(
+            sender = ovenProxy.address,
+            amount = ovenBalanceMutez,
+            now = sp.timestamp_from_utc_now(),
+        )
+
+        # THEN the liquidator is debited just enough tokens to restore a 200% collateralization ratio.
+        # Required repayment is ceil((1.2 - 1) / (2 - 1.08)) = 0.217391304347826087 kUSD
+        tokensRepaid = 217391304347826087
+        scenario.verify(token.data.balances[liquidator.address].balance == sp.as_nat(liquidatorTokens - tokensRepaid))
+
+        # AND the liquidator receives collateral worth the repaid tokens plus the liquidation fee.
+        scenario.verify(liquidator.balance == sp.mutez(234782))
+
+        # AND the oven keeps the remaining collateral and is not marked as liquidated.
+        scenario.verify(ovenProxy.balance == sp.mutez(765218))
+        scenario.verify(ovenProxy.data.updateState_ovenAddress == ovenAddress)
+        scenario.verify(ovenProxy.data.updateState_borrowedTokens == sp.as_nat(ovenBorrowedTokens - tokensRepaid))
+        scenario.verify(ovenProxy.data.updateState_stabilityFeeTokens == 0)
+        scenario.verify(ovenProxy.data.updateState_interestIndex == interestIndex)
+        scenario.verify(ovenProxy.data.updateState_isLiquidated == False)
 
-    #     # THEN the call fails.
-    #     param = (xtzPrice, (ovenAddress, (ovenOwnerAddress, (ovenBalance, (ovenBorrowedTokens, (isLiquidated, (stabilityFeeTokens, (interestIndex, liquidatorAddress))))))))
-    #     scenario += minter.liquidate(param).run(
-    #         sender = ovenProxy.address,
-    #         amount = ovenBalanceMutez,
-    #         now = sp.timestamp_from_utc_now(),
-    #         valid = False
-    #     )
+        # AND a partialLiquidate event is emitted with the oven's state before and after.
+        EventRecorder.verifyLastEvent(scenario, minter, Events.PARTIAL_LIQUIDATE_EVENT_TAG, ovenEvent(
+            ovenAddress, ovenOwnerAddress, sp.mutez(765218),
+            (ovenBorrowedTokens, sp.nat(0), interestIndex, False),
+            (sp.as_nat(ovenBorrowedTokens - tokensRepaid), sp.nat(0), interestIndex, False)
+        ))
 
-    @sp.add_test(name="liquidate - fails if oven is properly collateralized")
+    @sp.add_test(name="partialLiquidate - fails if oven is properly collateralized")
     def test():
         scenario = sp.test_scenario()
 
@@ -918,7 +1479,7 @@ if __name__ == "__main__":
         )
         scenario += minter
 
-        # WHEN liquidate is called on an oven that exactly meets the collateralization ratios
+        # WHEN partialLiquidate is called on an oven that exactly meets the collateralization ratios
         ovenBalance = 2 * Constants.PRECISION # 2 XTZ
         ovenBalanceMutez = sp.mutez(2000000) # 2 XTZ
         xtzPrice = Constants.PRECISION # 1 XTZ / $1
@@ -936,14 +1497,14 @@ if __name__ == "__main__":
         param = (xtzPrice, (ovenAddress, (ovenOwnerAddress, (ovenBalance, (ovenBorrowedTokens, (isLiquidated, (stabilityFeeTokens, (interestIndex, liquidatorAddress))))))))
 
         # THEN the call fails.
-        scenario += minter.liquidate(param).run(
+        scenario += minter.partialLiquidate(param).run(
             sender = ovenProxyAddress,
             amount = ovenBalanceMutez,
             now = sp.timestamp_from_utc_now(),
             valid = False
         )
 
-    @sp.add_test(name="liquidate - fails if oven is already liquidated")
+    @sp.add_test(name="partialLiquidate - fails if oven is already liquidated")
     def test():
         scenario = sp.test_scenario()
 
@@ -954,7 +1515,7 @@ if __name__ == "__main__":
         )
         scenario += minter
 
-        # WHEN liquidate is called on an undercollateralized oven which is already liquidated
+        # WHEN partialLiquidate is called on an undercollateralized oven which is already liquidated
         ovenBalance = Constants.PRECISION # 1 XTZ
         ovenBalanceMutez = sp.mutez(1000000) # 1 XTZ
 
@@ -974,14 +1535,14 @@ if __name__ == "__main__":
         param = (xtzPrice, (ovenAddress, (ovenOwnerAddress, (ovenBalance, (ovenBorrowedTokens, (isLiquidated, (stabilityFeeTokens, (interestIndex, liquidatorAddress))))))))
 
         # THEN the call fails.
-        scenario += minter.liquidate(param).run(
+        scenario += minter.partialLiquidate(param).run(
             sender = ovenProxyAddress,
             amount = ovenBalanceMutez,
             now = sp.timestamp_from_utc_now(),
             valid = False
         )
 
-    @sp.add_test(name="liquidate - fails if not called by ovenProxy")
+    @sp.add_test(name="partialLiquidate - fails if not called by ovenProxy")
     def test():
         scenario = sp.test_scenario()
 
@@ -992,7 +1553,7 @@ if __name__ == "__main__":
         )
         scenario += minter
 
-        # WHEN liquidate is called on an undercollateralized oven by someone other than the oven proxy
+        # WHEN partialLiquidate is called on an undercollateralized oven by someone other than the oven proxy
         ovenBalance = Constants.PRECISION # 1 XTZ
         ovenBalanceMutez = sp.mutez(1000000) # 1 XTZ
 
@@ -1013,12 +1574,52 @@ if __name__ == "__main__":
 
         # THEN the call fails.
         notOvenProxy = Addresses.NULL_ADDRESS
-        scenario += minter.liquidate(param).run(
+        scenario += minter.partialLiquidate(param).run(
             sender = notOvenProxy,
             amount = ovenBalanceMutez,
             now = sp.timestamp_from_utc_now(),
             valid = False
-        )    
+        )
+
+    @sp.add_test(name="partialLiquidate - fails if collateralization percentage does not exceed the liquidation fee")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an Minter contract with a collateralization percentage of 105% and a liquidation fee of 8%
+        ovenProxyAddress = Addresses.OVEN_PROXY_ADDRESS
+        minter = MinterContract(
+            ovenProxyContractAddress = ovenProxyAddress,
+            collateralizationPercentage = sp.nat(105000000000000000000), # 105%
+            liquidationFeePercent = sp.nat(80000000000000000),  # 8%
+        )
+        scenario += minter
+
+        # WHEN partialLiquidate is called on an undercollateralized oven
+        ovenBalance = Constants.PRECISION # 1 XTZ
+        ovenBalanceMutez = sp.mutez(1000000) # 1 XTZ
+
+        xtzPrice = Constants.PRECISION # 1 XTZ / $1
+
+        ovenBorrowedTokens = Constants.PRECISION # $1 kUSD
+
+        ovenOwnerAddress =  Addresses.OVEN_OWNER_ADDRESS
+        ovenAddress = Addresses.OVEN_ADDRESS
+        liquidatorAddress = Addresses.LIQUIDATOR_ADDRESS
+
+        stabilityFeeTokens = sp.to_int(0)
+        interestIndex = sp.to_int(Constants.PRECISION)
+
+        isLiquidated = False
+
+        param = (xtzPrice, (ovenAddress, (ovenOwnerAddress, (ovenBalance, (ovenBorrowedTokens, (isLiquidated, (stabilityFeeTokens, (interestIndex, liquidatorAddress))))))))
+
+        # THEN the call fails because repaying tokens never restores the oven.
+        scenario += minter.partialLiquidate(param).run(
+            sender = ovenProxyAddress,
+            amount = ovenBalanceMutez,
+            now = sp.timestamp_from_utc_now(),
+            valid = False
+        )
 
     ###############################################################
     # Repay
@@ -1102,7 +1703,7 @@ if __name__ == "__main__":
 
         # AND a Minter contract
         stabilityDevFundSplit = sp.nat(250000000000000000) # 25%
-        minter = MinterContract(
+        minter = EventRecordingMinterContract(
             ovenProxyContractAddress = ovenProxy.address,
             governorContractAddress = governorAddress,
             tokenContractAddress = token.address,
@@ -1164,6 +1765,13 @@ if __name__ == "__main__":
         # AND the oven proxy received the balance of the oven.
         scenario.verify(ovenProxy.balance == ovenBalanceMutez)
 
+        # AND a repay event is emitted with the oven's state before and after.
+        EventRecorder.verifyLastEvent(scenario, minter, Events.REPAY_EVENT_TAG, ovenEvent(
+            ovenAddress, ovenOwner, ovenBalanceMutez,
+            (ovenBorrowedTokens, sp.as_nat(stabilityFeeTokens), interestIndex, isLiquidated),
+            (expectedBorrowedTokens, sp.nat(0), interestIndex, isLiquidated)
+        ))
+
     @sp.add_test(name="repay - repays amount less than stability fees")
     def test():
         scenario = sp.test_scenario()
@@ -1483,6 +2091,55 @@ if __name__ == "__main__":
         scenario.verify(minter.data.interestIndex == 1100000000000000000)
         scenario.verify(minter.data.lastInterestIndexUpdateTime == now)
 
+    @sp.add_test(name="borrow - succeeds and accrues stability fees with inlined math")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an OvenProxy contract.
+        ovenProxy = MockOvenProxy.MockOvenProxyContract()
+        scenario += ovenProxy
+
+        # AND a Minter contract compiled with inlined math helpers.
+        minter = MinterContract(
+            ovenProxyContractAddress = ovenProxy.address,
+            stabilityFee = 100000000000000000,
+            lastInterestIndexUpdateTime = sp.timestamp(0),
+            interestIndex = Constants.PRECISION,
+            inlineMath = True
+        )
+        scenario += minter
+
+        # WHEN borrow is called with valid inputs
+        ovenAddress = Addresses.OVEN_ADDRESS
+        ownerAddress = Addresses.OVEN_OWNER_ADDRESS
+        isLiquidated = False
+
+        xtzPrice = Constants.PRECISION # $1 / XTZ
+        ovenBalance = 300 * Constants.PRECISION # 300 XTZ / $300
+        ovenBalanceMutez = sp.mutez(300000000) # 300 XTZ / $300
+
+        borrowedTokens =  100 * Constants.PRECISION # $100 kUSD
+
+        interestIndex = sp.to_int(Constants.PRECISION)
+        stabilityFeeTokens = sp.int(0)
+
+        tokensToBorrow = Constants.PRECISION
+
+        param = (xtzPrice, (ovenAddress, (ownerAddress, (ovenBalance, (borrowedTokens, (isLiquidated, (stabilityFeeTokens, (interestIndex, tokensToBorrow))))))))
+
+        now = sp.timestamp(Constants.SECONDS_PER_COMPOUND)
+        scenario += minter.borrow(param).run(
+            sender = ovenProxy.address,
+            amount = ovenBalanceMutez,
+            now = now,
+        )
+
+        # THEN the results match the global lambda variant.
+        scenario.verify(ovenProxy.data.updateState_stabilityFeeTokens == sp.to_int(10 * Constants.PRECISION))
+        scenario.verify(ovenProxy.data.updateState_interestIndex == sp.to_int(minter.data.interestIndex))
+        scenario.verify(minter.data.interestIndex == 1100000000000000000)
+        scenario.verify(minter.data.lastInterestIndexUpdateTime == now)
+
     @sp.add_test(name="borrow - succeeds and mints tokens")
     def test():
         scenario = sp.test_scenario()
@@ -1499,7 +2156,7 @@ if __name__ == "__main__":
         scenario += token
 
         # AND a Minter contract
-        minter = MinterContract(
+        minter = EventRecordingMinterContract(
             ovenProxyContractAddress = ovenProxy.address,
             tokenContractAddress = token.address
         )
@@ -1546,6 +2203,13 @@ if __name__ == "__main__":
         # AND the remaining balance is passed back to the oven proxy
         scenario.verify(ovenProxy.balance == ovenBalanceMutez)
 
+        # AND a borrow event is emitted with the oven's state before and after.
+        EventRecorder.verifyLastEvent(scenario, minter, Events.BORROW_EVENT_TAG, ovenEvent(
+            ovenAddress, ownerAddress, ovenBalanceMutez,
+            (borrowedTokens, sp.as_nat(stabilityFeeTokens), interestIndex, isLiquidated),
+            (borrowedTokens + tokensToBorrow, sp.nat(0), interestIndex, isLiquidated)
+        ))
+
     @sp.add_test(name="borrow - succeeds and mints tokens when zero tokens are outstanding")
     def test():
         scenario = sp.test_scenario()
@@ -2355,6 +3019,243 @@ if __name__ == "__main__":
             now = sp.timestamp_from_utc_now(),
         )
 
+    ################################################################
+    # getCurrentInterestIndex
+    ################################################################
+
+    @sp.add_test(name="getCurrentInterestIndex - returns compounded interest index")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Minter contract
+        initialTime = sp.timestamp(0)
+        minter = MinterContract(
+            interestIndex = Constants.PRECISION,
+            stabilityFee = 100000000000000000,
+            lastInterestIndexUpdateTime = initialTime
+        )
+        scenario += minter
+
+        # AND a contract which reads the view.
+        reader = InterestIndexViewReader(minter.address)
+        scenario += reader
+
+        # WHEN the view is read after two periods have elapsed
+        now = sp.timestamp(2 * Constants.SECONDS_PER_COMPOUND)
+        scenario += reader.readInterestIndex().run(
+            now = now
+        )
+
+        # THEN the compounded interest index is returned.
+        scenario.verify(reader.data.interestIndex == 1200000000000000000)
+
+    @sp.add_test(name="getCurrentInterestIndex - does not update storage")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Minter contract
+        initialInterestIndex = Constants.PRECISION
+        initialTime = sp.timestamp(0)
+        minter = MinterContract(
+            interestIndex = initialInterestIndex,
+            stabilityFee = 100000000000000000,
+            lastInterestIndexUpdateTime = initialTime
+        )
+        scenario += minter
+
+        # AND a contract which reads the view.
+        reader = InterestIndexViewReader(minter.address)
+        scenario += reader
+
+        # WHEN the view is read after a period has elapsed
+        scenario += reader.readInterestIndex().run(
+            now = sp.timestamp(Constants.SECONDS_PER_COMPOUND)
+        )
+
+        # THEN the minter's interest index and update time are unchanged.
+        scenario.verify(minter.data.interestIndex == initialInterestIndex)
+        scenario.verify(minter.data.lastInterestIndexUpdateTime == initialTime)
+
+    ################################################################
+    # getOvenDebt
+    ################################################################
+
+    @sp.add_test(name="getOvenDebt - includes newly accrued stability fees")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Minter contract which has compounded interest since the oven was last updated.
+        minter = MinterContract(
+            interestIndex = 1100000000000000000,
+            stabilityFee = sp.nat(0),
+            lastInterestIndexUpdateTime = sp.timestamp(0)
+        )
+        scenario += minter
+
+        # WHEN the debt is requested for an oven with $100 borrowed and $10 of stability fees
+        borrowedTokens = 100 * Constants.PRECISION
+        stabilityFeeTokens = sp.to_int(10 * Constants.PRECISION)
+        interestIndex = sp.to_int(Constants.PRECISION)
+
+        # THEN the result includes borrowed tokens, stability fees and newly accrued stability fees.
+        scenario.verify(minter.getOvenDebt((borrowedTokens, (stabilityFeeTokens, interestIndex))) == 121 * Constants.PRECISION)
+
+    ################################################################
+    # getOvenCollateralizationPercentage
+    ################################################################
+
+    @sp.add_test(name="getOvenCollateralizationPercentage - computes collateralization")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Minter contract
+        minter = MinterContract(
+            lastInterestIndexUpdateTime = sp.timestamp(0)
+        )
+        scenario += minter
+
+        # WHEN the collateralization is requested for an oven with 2 XTZ and $1 borrowed at $1 / XTZ
+        xtzPrice = Constants.PRECISION
+        ovenBalance = sp.mutez(2000000)
+        borrowedTokens = 1 * Constants.PRECISION
+        stabilityFeeTokens = sp.int(0)
+        interestIndex = sp.to_int(Constants.PRECISION)
+        param = (xtzPrice, (ovenBalance, (borrowedTokens, (stabilityFeeTokens, interestIndex))))
+
+        # THEN the oven is 200% collateralized.
+        scenario.verify(minter.getOvenCollateralizationPercentage(param).open_some() == 200 * Constants.PRECISION)
+
+    @sp.add_test(name="getOvenCollateralizationPercentage - returns none with no outstanding tokens")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Minter contract
+        minter = MinterContract(
+            lastInterestIndexUpdateTime = sp.timestamp(0)
+        )
+        scenario += minter
+
+        # WHEN the collateralization is requested for an oven with no borrowed tokens
+        xtzPrice = Constants.PRECISION
+        ovenBalance = sp.mutez(2000000)
+        borrowedTokens = sp.nat(0)
+        stabilityFeeTokens = sp.int(0)
+        interestIndex = sp.to_int(Constants.PRECISION)
+        param = (xtzPrice, (ovenBalance, (borrowedTokens, (stabilityFeeTokens, interestIndex))))
+
+        # THEN no value is returned.
+        scenario.verify(minter.getOvenCollateralizationPercentage(param).is_some() == False)
+
+    ################################################################
+    # getOvenLiquidationPrice
+    ################################################################
+
+    @sp.add_test(name="getOvenLiquidationPrice - computes liquidation price")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Minter contract with a 200% collateralization requirement
+        minter = MinterContract(
+            collateralizationPercentage = sp.nat(200000000000000000000), # 200%
+            lastInterestIndexUpdateTime = sp.timestamp(0)
+        )
+        scenario += minter
+
+        # WHEN the liquidation price is requested for an oven with 2 XTZ and $1 borrowed
+        ovenBalance = sp.mutez(2000000)
+        borrowedTokens = 1 * Constants.PRECISION
+        stabilityFeeTokens = sp.int(0)
+        interestIndex = sp.to_int(Constants.PRECISION)
+        param = (ovenBalance, (borrowedTokens, (stabilityFeeTokens, interestIndex)))
+
+        # THEN the oven can be liquidated below $1 / XTZ.
+        scenario.verify(minter.getOvenLiquidationPrice(param).open_some() == Constants.PRECISION)
+
+    @sp.add_test(name="getOvenLiquidationPrice - returns zero with no outstanding tokens")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Minter contract
+        minter = MinterContract(
+            lastInterestIndexUpdateTime = sp.timestamp(0)
+        )
+        scenario += minter
+
+        # WHEN the liquidation price is requested for an oven with no borrowed tokens
+        ovenBalance = sp.mutez(0)
+        borrowedTokens = sp.nat(0)
+        stabilityFeeTokens = sp.int(0)
+        interestIndex = sp.to_int(Constants.PRECISION)
+        param = (ovenBalance, (borrowedTokens, (stabilityFeeTokens, interestIndex)))
+
+        # THEN the oven can never be liquidated.
+        scenario.verify(minter.getOvenLiquidationPrice(param).open_some() == 0)
+
+    @sp.add_test(name="getOvenLiquidationPrice - returns none with no collateral")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Minter contract
+        minter = MinterContract(
+            lastInterestIndexUpdateTime = sp.timestamp(0)
+        )
+        scenario += minter
+
+        # WHEN the liquidation price is requested for an oven with borrowed tokens and no collateral
+        ovenBalance = sp.mutez(0)
+        borrowedTokens = 1 * Constants.PRECISION
+        stabilityFeeTokens = sp.int(0)
+        interestIndex = sp.to_int(Constants.PRECISION)
+        param = (ovenBalance, (borrowedTokens, (stabilityFeeTokens, interestIndex)))
+
+        # THEN the oven can be liquidated at any price.
+        scenario.verify(minter.getOvenLiquidationPrice(param).is_some() == False)
+
+    ################################################################
+    # updateContractMetadata
+    ################################################################
+
+    @sp.add_test(name="updateContractMetadata - succeeds when called by governor")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Minter contract
+        governorAddress = Addresses.GOVERNOR_ADDRESS
+        minter = MinterContract(
+            governorContractAddress = governorAddress
+        )
+        scenario += minter
+
+        # WHEN updateContractMetadata is called with a new locator
+        locatorKey = ""
+        newLocator = sp.bytes('0x1234567890')
+        scenario += minter.updateContractMetadata((locatorKey, newLocator)).run(
+            sender = governorAddress,
+        )
+
+        # THEN the metadata is updated.
+        scenario.verify(minter.data.metadata[locatorKey] == newLocator)
+
+    @sp.add_test(name="updateContractMetadata - fails if not called by governor")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a Minter contract
+        governorAddress = Addresses.GOVERNOR_ADDRESS
+        minter = MinterContract(
+            governorContractAddress = governorAddress
+        )
+        scenario += minter
+
+        # WHEN updateContractMetadata is called by someone other than the governor THEN the call fails.
+        locatorKey = ""
+        newLocator = sp.bytes('0x1234567890')
+        notGovernor = Addresses.NULL_ADDRESS
+        scenario += minter.updateContractMetadata((locatorKey, newLocator)).run(
+            sender = notGovernor,
+            valid = False
+        )
+
     ################################################################
     # updateContracts
     ################################################################
@@ -22,13 +22,24 @@ class OracleContract(sp.Contract):
     #
     # Parameters:
     #   harbingerContractAddress The address of the Harbinger contract. Defaults to the Coinbase Normalizer.
+    #   observationBufferSize The number of price observations retained for computing TWAPs. Must be positive.
     def __init__(
         self, 
         state = IDLE,
         harbingerContractAddress = Addresses.HARBINGER_ADDRESS,
         maxDataDelaySec = sp.nat(60 * 30),
         governorContractAddress = Addresses.GOVERNOR_ADDRESS,
+        cumulativePrice = sp.nat(0),
+        lastPrice = sp.nat(0),
+        lastObservationTime = sp.timestamp(0),
+        observations = sp.map(l = {}, tkey = sp.TNat, tvalue = sp.TPair(sp.TTimestamp, sp.TNat)),
+        observationIndex = sp.nat(0),
+        observationBufferSize = 10,
     ):
+        # Observations are written at `observationIndex % observationBufferSize`.
+        if observationBufferSize <= 0:
+            raise ValueError("observationBufferSize must be positive, got {}".format(observationBufferSize))
+
         self.exception_optimization_level = "DefaultUnit"
 
         self.init(
@@ -36,7 +47,17 @@ class OracleContract(sp.Contract):
             state = state,
             clientCallback = sp.none,
             maxDataDelaySec = maxDataDelaySec,
-            governorContractAddress = governorContractAddress
+            governorContractAddress = governorContractAddress,
+
+            # TWAP accumulator. `cumulativePrice` is the sum of price * seconds up to `lastObservationTime`.
+            cumulativePrice = cumulativePrice,
+            lastPrice = lastPrice,
+            lastObservationTime = lastObservationTime,
+
+            # Ring buffer of (observation time, cumulativePrice) pairs.
+            observations = observations,
+            observationIndex = observationIndex,
+            observationBufferSize = sp.nat(observationBufferSize),
         )
 
     ################################################################
@@ -109,6 +130,16 @@ class OracleContract(sp.Contract):
         ).open_some()
 
         clientCallbackParam = sp.snd(sp.snd(result)) * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+
+        # Accumulate the previous price over the time it was current and record a new observation.
+        updateTime = sp.fst(sp.snd(result))
+        sp.if updateTime > self.data.lastObservationTime:
+            self.data.cumulativePrice += self.data.lastPrice * sp.as_nat(updateTime - self.data.lastObservationTime)
+            self.data.lastPrice = clientCallbackParam
+            self.data.lastObservationTime = updateTime
+
+            self.data.observations[self.data.observationIndex] = (updateTime, self.data.cumulativePrice)
+            self.data.observationIndex = (self.data.observationIndex + 1) % self.data.observationBufferSize
         
         # Call client callback
         sp.transfer(clientCallbackParam, sp.mutez(0), clientCallback)
@@ -117,6 +148,47 @@ class OracleContract(sp.Contract):
         self.data.state = IDLE
         self.data.clientCallback = sp.none
 
+    ################################################################
+    # Views
+    ################################################################
+
+    # Returns the time weighted average XTZ-USD price over the last `windowSec` seconds.
+    #
+    # The window starts at the latest observation at or before `now - windowSec`. Fails with
+    # TWAP_WINDOW_NOT_COVERED if the ring buffer does not reach back that far, rather than averaging over a
+    # shorter window than the caller asked for.
+    @sp.onchain_view()
+    def getTwap(self, windowSec):
+        sp.set_type(windowSec, sp.TNat)
+
+        # Assert a recent price has been observed.
+        sp.verify(self.data.lastObservationTime > sp.timestamp(0), message = Errors.STALE_DATA)
+        dataAge = sp.as_nat(sp.now - self.data.lastObservationTime)
+        sp.verify(dataAge < self.data.maxDataDelaySec, message = Errors.STALE_DATA)
+
+        # Extend the accumulator to the current time.
+        currentCumulativePrice = self.data.cumulativePrice + self.data.lastPrice * dataAge
+
+        # Find the observation the window starts from.
+        windowStartTime = sp.now.add_seconds(0 - sp.to_int(windowSec))
+        startTime = sp.local("startTime", self.data.lastObservationTime)
+        startCumulativePrice = sp.local("startCumulativePrice", self.data.cumulativePrice)
+        foundStart = sp.local("foundStart", False)
+        sp.for observation in self.data.observations.values():
+            observationTime = sp.fst(observation)
+            sp.if observationTime <= windowStartTime:
+                sp.if (~foundStart.value) | (observationTime > startTime.value):
+                    startTime.value = observationTime
+                    startCumulativePrice.value = sp.snd(observation)
+                    foundStart.value = True
+        sp.verify(foundStart.value, message = Errors.TWAP_WINDOW_NOT_COVERED)
+
+        # Average over the elapsed time. If no time has elapsed the spot price is the average.
+        twap = sp.local("twap", self.data.lastPrice)
+        sp.if sp.now > startTime.value:
+            twap.value = sp.as_nat(currentCumulativePrice - startCumulativePrice.value) // sp.as_nat(sp.now - startTime.value)
+        sp.result(twap.value)
+
     ################################################################
     # Governance
     ################################################################
@@ -149,6 +221,24 @@ if __name__ == "__main__":
     DummyContract = sp.import_script_from_url("file:test-helpers/dummy-contract.py")
     FakeHarbinger = sp.import_script_from_url("file:test-helpers/fake-harbinger.py")
 
+    # A contract which reads the TWAP through the on-chain view.
+    class TwapViewReader(sp.Contract):
+        def __init__(self, oracleContractAddress):
+            self.init(
+                oracleContractAddress = oracleContractAddress,
+                twap = sp.nat(0)
+            )
+
+        @sp.entry_point
+        def readTwap(self, windowSec):
+            sp.set_type(windowSec, sp.TNat)
+            self.data.twap = sp.view(
+                "getTwap",
+                self.data.oracleContractAddress,
+                windowSec,
+                t = sp.TNat
+            ).open_some()
+
     ################################################################
     # getXtzUsdRate
     ################################################################
@@ -230,6 +320,54 @@ if __name__ == "__main__":
         scenario.verify(oracle.data.state == IDLE)
         scenario.verify(oracle.data.clientCallback.is_some() == False)
 
+    @sp.add_test(name="getXtzUsdRate - accumulates price into TWAP observations")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a fake Harbinger contract with a new price.
+        updateTime = sp.timestamp(1060)
+        xtzUsdValue = 3000000 # $3.00
+        harbinger = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = xtzUsdValue,
+            harbingerUpdateTime = updateTime,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger
+
+        # AND an Oracle contract which last observed $2.00 sixty seconds earlier.
+        lastPrice = 2 * Constants.PRECISION
+        cumulativePrice = 100 * Constants.PRECISION
+        oracle = OracleContract(
+            harbingerContractAddress = harbinger.address,
+            cumulativePrice = cumulativePrice,
+            lastPrice = lastPrice,
+            lastObservationTime = sp.timestamp(1000),
+            observationIndex = 9,
+            observationBufferSize = 10
+        )
+        scenario += oracle
+
+        # AND a DummyContract to receive the retrieved value.
+        dummyContract = DummyContract.DummyContract()
+        scenario += dummyContract
+
+        # WHEN a price is requested
+        callback = sp.contract(sp.TNat, dummyContract.address, entry_point = "natCallback").open_some()
+        scenario += oracle.getXtzUsdRate(callback).run(
+            now = updateTime
+        )
+
+        # THEN the previous price is accumulated over the sixty seconds it was current.
+        expectedCumulativePrice = cumulativePrice + (lastPrice * 60)
+        scenario.verify(oracle.data.cumulativePrice == expectedCumulativePrice)
+        scenario.verify(oracle.data.lastPrice == xtzUsdValue * Constants.MUTEZ_TO_KOLIBRI_CONVERSION)
+        scenario.verify(oracle.data.lastObservationTime == updateTime)
+
+        # AND an observation is written to the ring buffer, which wraps around.
+        scenario.verify(sp.fst(oracle.data.observations[9]) == updateTime)
+        scenario.verify(sp.snd(oracle.data.observations[9]) == expectedCumulativePrice)
+        scenario.verify(oracle.data.observationIndex == 0)
+
     ################################################################
     # getXtzUsdRate_callback
     ################################################################
@@ -317,6 +455,109 @@ if __name__ == "__main__":
             now = now
         )    
 
+    ################################################################
+    # getTwap
+    ################################################################
+
+    # Two observations: $2.00 from t = 1000 to t = 1060, then $3.00 from t = 1060 onwards.
+    def makeTwapOracle():
+        return OracleContract(
+            cumulativePrice = 120 * Constants.PRECISION,
+            lastPrice = 3 * Constants.PRECISION,
+            lastObservationTime = sp.timestamp(1060),
+            observations = sp.map(
+                l = {
+                    0: (sp.timestamp(1000), sp.nat(0)),
+                    1: (sp.timestamp(1060), 120 * Constants.PRECISION),
+                },
+                tkey = sp.TNat,
+                tvalue = sp.TPair(sp.TTimestamp, sp.TNat)
+            ),
+            observationIndex = 2
+        )
+
+    @sp.add_test(name="getTwap - averages over the window")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an Oracle contract with two observations
+        oracle = makeTwapOracle()
+        scenario += oracle
+
+        # AND a contract which reads the view.
+        reader = TwapViewReader(oracle.address)
+        scenario += reader
+
+        # WHEN the TWAP is read over the last 120 seconds
+        scenario += reader.readTwap(120).run(
+            now = sp.timestamp(1120)
+        )
+
+        # THEN the price is averaged as 60 seconds at $2.00 and 60 seconds at $3.00
+        scenario.verify(reader.data.twap == 2500000000000000000)
+
+    @sp.add_test(name="getTwap - starts window at the latest observation before it")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an Oracle contract with two observations
+        oracle = makeTwapOracle()
+        scenario += oracle
+
+        # AND a contract which reads the view.
+        reader = TwapViewReader(oracle.address)
+        scenario += reader
+
+        # WHEN the TWAP is read over a window which starts after the latest observation
+        scenario += reader.readTwap(30).run(
+            now = sp.timestamp(1120)
+        )
+
+        # THEN the price is the price since the latest observation.
+        scenario.verify(reader.data.twap == 3 * Constants.PRECISION)
+
+    @sp.add_test(name="getTwap - fails when window exceeds buffer")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an Oracle contract with two observations
+        oracle = makeTwapOracle()
+        scenario += oracle
+
+        # AND a contract which reads the view.
+        reader = TwapViewReader(oracle.address)
+        scenario += reader
+
+        # WHEN the TWAP is read over a window which starts before the oldest observation THEN the call fails.
+        scenario += reader.readTwap(1000).run(
+            now = sp.timestamp(1120),
+            valid = False
+        )
+
+        # AND a window which starts exactly at the oldest observation succeeds.
+        scenario += reader.readTwap(120).run(
+            now = sp.timestamp(1120)
+        )
+        scenario.verify(reader.data.twap == 2500000000000000000)
+
+    @sp.add_test(name="getTwap - fails with no observations")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an Oracle contract with no observations
+        oracle = OracleContract()
+        scenario += oracle
+
+        # AND a contract which reads the view.
+        reader = TwapViewReader(oracle.address)
+        scenario += reader
+
+        # WHEN the TWAP is read THEN the call fails.
+        scenario += reader.readTwap(120).run(
+            now = sp.timestamp(1120),
+            valid = False
+        )
+
     ################################################################
     # default
     ################################################################
@@ -2,6 +2,7 @@ import smartpy as sp
 
 Addresses = sp.import_script_from_url("file:test-helpers/addresses.py")
 Errors = sp.import_script_from_url("file:common/errors.py")
+Events = sp.import_script_from_url("file:common/events.py")
 Oven = sp.import_script_from_url("file:oven.py")
 
 ################################################################
@@ -110,6 +111,15 @@ class OvenFactoryContract(sp.Contract):
         ).open_some()
         sp.transfer(registryParam, sp.mutez(0), ovenRegistryHandle)
 
+        # Announce the new oven.
+        ovenCreatedEvent = sp.record(
+            oven = newContract,
+            owner = ovenOwner,
+            interestIndex = sp.to_int(param),
+            delegate = self.data.initialDelegate
+        )
+        self.emitEvent(Events.OVEN_CREATED_EVENT_TAG, sp.set_type_expr(ovenCreatedEvent, Events.OVEN_CREATED_EVENT_TYPE))
+
         # Reset state
         self.data.state = IDLE
         self.data.makeOvenOwner = sp.none
@@ -158,6 +168,14 @@ class OvenFactoryContract(sp.Contract):
         sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
         self.data.initialDelegate = newInitialDelegate
 
+    ################################################################
+    # Helpers
+    ################################################################
+
+    # Emit an event. Scenarios override this to record events, see `test-helpers/event-recorder.py`.
+    def emitEvent(self, tag, event):
+        sp.emit(event, tag = tag)
+
 # Only run tests if this file is main.
 if __name__ == "__main__":
 
@@ -167,9 +185,17 @@ if __name__ == "__main__":
     ################################################################
     ################################################################
 
+    EventRecorder = sp.import_script_from_url("file:test-helpers/event-recorder.py")
     Minter = sp.import_script_from_url("file:minter.py")
     OvenRegistry = sp.import_script_from_url("file:oven-registry.py")
 
+    ################################################################
+    # Helpers
+    ################################################################
+
+    # An OvenFactory which records the last event it emits.
+    EventRecordingOvenFactoryContract = EventRecorder.recordEvents(OvenFactoryContract)
+
     ################################################################
     # makeOven
     ################################################################
@@ -192,7 +218,7 @@ if __name__ == "__main__":
         scenario += minter
 
         # AND an OvenFactory contract
-        ovenFactory = OvenFactoryContract(
+        ovenFactory = EventRecordingOvenFactoryContract(
             minterContractAddress = minter.address,
             ovenRegistryContractAddress = ovenRegistry.address,
             state = IDLE,
@@ -214,6 +240,15 @@ if __name__ == "__main__":
             sender = ovenOwner
         )
 
+        # AND an ovenCreated event is emitted for the oven added to the registry.
+        lastEvent = ovenFactory.data.lastEvent.open_some()
+        scenario.verify(sp.fst(lastEvent) == Events.OVEN_CREATED_EVENT_TAG)
+        ovenCreated = sp.unpack(sp.snd(lastEvent), t = Events.OVEN_CREATED_EVENT_TYPE).open_some()
+        scenario.verify(ovenRegistry.data.ovenMap[ovenCreated.oven] == ovenOwner)
+        scenario.verify(ovenCreated.owner == ovenOwner)
+        scenario.verify(ovenCreated.interestIndex == sp.to_int(minter.data.interestIndex))
+        scenario.verify(ovenCreated.delegate == ovenFactory.data.initialDelegate)
+
     @sp.add_test(name="makeOven - fails in bad state")
     def test():
         scenario = sp.test_scenario()
@@ -12,6 +12,7 @@ IDLE = 0
 BORROW_WAITING_FOR_ORACLE = 1
 WITHDRAW_WAITING_FOR_ORACLE = 2
 LIQUIDATE_WAITING_FOR_ORACLE = 3
+PARTIAL_LIQUIDATE_WAITING_FOR_ORACLE = 4
 
 ################################################################
 # Contract
@@ -58,6 +59,37 @@ class OvenProxyContract(sp.Contract):
         sp.set_type(param, sp.TUnit)
         sp.failwith(Errors.CANNOT_RECEIVE_FUNDS)        
 
+    ################################################################
+    # Owner Interface
+    ################################################################
+
+    # Set the delegate of many ovens in one operation.
+    #
+    # Each oven verifies that the sender of this call is its owner, so callers can only change the
+    # delegate of their own ovens.
+    #
+    # Parameters:
+    #   - List<Address>: The ovens to update.
+    #   - Option<KeyHash>: The new delegate.
+    @sp.entry_point
+    def setDelegates(self, param):
+        sp.set_type(param, sp.TPair(sp.TList(sp.TAddress), sp.TOption(sp.TKeyHash)))
+
+        # Verify the call did not contain a balance.
+        sp.verify(sp.amount == sp.mutez(0), message = Errors.AMOUNT_NOT_ALLOWED)
+
+        # Verify system is not paused.
+        sp.verify(self.data.paused == False, message = Errors.PAUSED)
+
+        newDelegate = sp.snd(param)
+        sp.for ovenAddress in sp.fst(param):
+            ovenHandle = sp.contract(
+                OvenApi.SET_DELEGATE_FROM_PROXY_PARAMETER_TYPE,
+                ovenAddress,
+                OvenApi.SET_DELEGATE_FROM_PROXY_ENTRY_POINT_NAME
+            ).open_some()
+            sp.transfer((sp.sender, newDelegate), sp.mutez(0), ovenHandle)
+
     ################################################################
     # Oven Interface
     ################################################################
@@ -74,11 +106,14 @@ class OvenProxyContract(sp.Contract):
         # Verify in idle state
         sp.verify(self.data.state == IDLE, message = Errors.BAD_STATE)
 
-        # Update state and save params
-        self.data.state = BORROW_WAITING_FOR_ORACLE
-        self.data.borrowParams = sp.some(param)
-
-        self.callOracleWithCallback('borrow_callback')
+        self.forwardWithOraclePrice(
+            param,
+            OvenApi.BORROW_PARAMETER_TYPE_ORACLE,
+            OvenApi.BORROW_ENTRY_POINT_NAME,
+            BORROW_WAITING_FOR_ORACLE,
+            'borrowParams',
+            'borrow_callback'
+        )
 
     @sp.entry_point
     def borrow_callback(self, oracleResult): 
@@ -133,11 +168,14 @@ class OvenProxyContract(sp.Contract):
         # Verify in idle state
         sp.verify(self.data.state == IDLE, message = Errors.BAD_STATE)
 
-        # Update state and save params
-        self.data.state = LIQUIDATE_WAITING_FOR_ORACLE
-        self.data.liquidateParams = sp.some(param)
-
-        self.callOracleWithCallback('liquidate_callback')
+        self.forwardWithOraclePrice(
+            param,
+            OvenApi.LIQUIDATE_PARAMETER_TYPE_ORACLE,
+            OvenApi.LIQUIDATE_ENTRY_POINT_NAME,
+            LIQUIDATE_WAITING_FOR_ORACLE,
+            'liquidateParams',
+            'liquidate_callback'
+        )
 
     @sp.entry_point
     def liquidate_callback(self, oracleResult): 
@@ -162,6 +200,50 @@ class OvenProxyContract(sp.Contract):
         self.data.state = IDLE
         self.data.liquidateParams = sp.none
 
+    @sp.entry_point
+    def partialLiquidate(self, param):
+        sp.set_type(param, OvenApi.LIQUIDATE_PARAMETER_TYPE)
+        self.verifyIsOven(sp.sender)
+
+        # Verify system is not paused.
+        sp.verify(self.data.paused == False, message = Errors.PAUSED)
+
+        # Verify in idle state
+        sp.verify(self.data.state == IDLE, message = Errors.BAD_STATE)
+
+        # Partial liquidations share the liquidate register.
+        self.forwardWithOraclePrice(
+            param,
+            OvenApi.LIQUIDATE_PARAMETER_TYPE_ORACLE,
+            OvenApi.PARTIAL_LIQUIDATE_ENTRY_POINT_NAME,
+            PARTIAL_LIQUIDATE_WAITING_FOR_ORACLE,
+            'liquidateParams',
+            'partialLiquidate_callback'
+        )
+
+    @sp.entry_point
+    def partialLiquidate_callback(self, oracleResult): 
+        sp.set_type(oracleResult, sp.TNat)
+
+        # Verify sender is the oracle
+        sp.verify(sp.sender == self.data.oracleContractAddress, message = Errors.NOT_ORACLE)
+
+        # Verify state
+        sp.verify(self.data.state == PARTIAL_LIQUIDATE_WAITING_FOR_ORACLE, message = Errors.BAD_STATE)
+
+        # Load liquidate params
+        param = (oracleResult, self.data.liquidateParams.open_some())
+        minterContractHandle = sp.contract(
+            OvenApi.LIQUIDATE_PARAMETER_TYPE_ORACLE,
+            self.data.minterContractAddress,
+            OvenApi.PARTIAL_LIQUIDATE_ENTRY_POINT_NAME
+        ).open_some()
+        sp.transfer(param, sp.balance, minterContractHandle)
+
+        # Reset state
+        self.data.state = IDLE
+        self.data.liquidateParams = sp.none
+
     @sp.entry_point
     def withdraw(self, param):
         sp.set_type(param, OvenApi.WITHDRAW_PARAMETER_TYPE)
@@ -173,11 +255,14 @@ class OvenProxyContract(sp.Contract):
         # Verify system is not paused.
         sp.verify(self.data.paused == False, message = Errors.PAUSED)
 
-        # Update state and save params
-        self.data.state = WITHDRAW_WAITING_FOR_ORACLE
-        self.data.withdrawParams = sp.some(param)
-
-        self.callOracleWithCallback('withdraw_callback')
+        self.forwardWithOraclePrice(
+            param,
+            OvenApi.WITHDRAW_PARAMETER_TYPE_ORACLE,
+            OvenApi.WITHDRAW_ENTRY_POINT_NAME,
+            WITHDRAW_WAITING_FOR_ORACLE,
+            'withdrawParams',
+            'withdraw_callback'
+        )
 
     @sp.entry_point
     def withdraw_callback(self, oracleResult): 
@@ -314,6 +399,30 @@ class OvenProxyContract(sp.Contract):
         ).open_some()
         sp.transfer(ovenAddress, sp.mutez(0), contractHandle)
 
+    # Forward an oven call to the Minter with the oracle's price.
+    #
+    # Oracles with a `getLatestXtzUsdRate` view, like `PushOracleContract`, are read in this
+    # operation, and the Minter is called right away. A stale price fails the call. Other
+    # oracles are asked for the price with a callback, and the params wait in `register` in
+    # `state` until it arrives.
+    def forwardWithOraclePrice(self, param, parameterType, entryPointName, state, register, callbackEntryPoint):
+        oraclePrice = sp.local(
+            "oraclePrice",
+            sp.view("getLatestXtzUsdRate", self.data.oracleContractAddress, sp.unit, t = sp.TNat)
+        )
+        sp.if oraclePrice.value.is_some():
+            minterContractHandle = sp.contract(
+                parameterType,
+                self.data.minterContractAddress,
+                entryPointName
+            ).open_some()
+            sp.transfer((oraclePrice.value.open_some(), param), sp.balance, minterContractHandle)
+        sp.else:
+            self.data.state = state
+            setattr(self.data, register, sp.some(param))
+
+            self.callOracleWithCallback(callbackEntryPoint)
+
     def callOracleWithCallback(self, entrypoint):
         # Call oracle
         oracleCallback = sp.self_entry_point(entry_point = entrypoint)
@@ -340,6 +449,91 @@ if __name__ == "__main__":
     Oracle = sp.import_script_from_url("file:oracle.py")
     OvenRegistry = sp.import_script_from_url("file:oven-registry.py")
     FakeHarbinger = sp.import_script_from_url("file:test-helpers/fake-harbinger.py")
+    PushOracle = sp.import_script_from_url("file:push-oracle.py")
+
+    ################################################################
+    # setDelegates
+    ################################################################
+
+    @sp.add_test(name="setDelegates - updates delegate of all ovens")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an OvenProxy
+        ovenProxy = OvenProxyContract()
+        scenario += ovenProxy
+
+        # AND two ovens with the same owner
+        ownerAddress = Addresses.OVEN_OWNER_ADDRESS
+        oven1 = Oven.OvenContract(
+            owner = ownerAddress,
+            ovenProxyContractAddress = ovenProxy.address
+        )
+        oven2 = Oven.OvenContract(
+            owner = ownerAddress,
+            ovenProxyContractAddress = ovenProxy.address
+        )
+        scenario += oven1
+        scenario += oven2
+
+        # WHEN setDelegates is called by the owner
+        delegate = sp.some(sp.key_hash("tz1abmz7jiCV2GH2u81LRrGgAFFgvQgiDiaf"))
+        scenario += ovenProxy.setDelegates(([ oven1.address, oven2.address ], delegate)).run(
+            sender = ownerAddress
+        )
+
+        # THEN the delegate of each oven is updated.
+        scenario.verify(oven1.baker.open_some() == delegate.open_some())
+        scenario.verify(oven2.baker.open_some() == delegate.open_some())
+
+    @sp.add_test(name="setDelegates - fails when called with an amount")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an OvenProxy
+        ovenProxy = OvenProxyContract()
+        scenario += ovenProxy
+
+        # AND an oven
+        ownerAddress = Addresses.OVEN_OWNER_ADDRESS
+        oven = Oven.OvenContract(
+            owner = ownerAddress,
+            ovenProxyContractAddress = ovenProxy.address
+        )
+        scenario += oven
+
+        # WHEN setDelegates is called with an amount THEN the call fails
+        delegate = sp.some(sp.key_hash("tz1abmz7jiCV2GH2u81LRrGgAFFgvQgiDiaf"))
+        scenario += ovenProxy.setDelegates(([ oven.address ], delegate)).run(
+            sender = ownerAddress,
+            amount = sp.mutez(1),
+            valid = False
+        )
+
+    @sp.add_test(name="setDelegates - fails when paused")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an OvenProxy which is paused
+        ovenProxy = OvenProxyContract(
+            paused = True
+        )
+        scenario += ovenProxy
+
+        # AND an oven
+        ownerAddress = Addresses.OVEN_OWNER_ADDRESS
+        oven = Oven.OvenContract(
+            owner = ownerAddress,
+            ovenProxyContractAddress = ovenProxy.address
+        )
+        scenario += oven
+
+        # WHEN setDelegates is called THEN the call fails
+        delegate = sp.some(sp.key_hash("tz1abmz7jiCV2GH2u81LRrGgAFFgvQgiDiaf"))
+        scenario += ovenProxy.setDelegates(([ oven.address ], delegate)).run(
+            sender = ownerAddress,
+            valid = False
+        )
 
     ################################################################
     # withdraw
@@ -584,6 +778,55 @@ if __name__ == "__main__":
         # AND the balance of the minter is the balance sent.
         scenario.verify(minter.balance == sp.mutez(1))
 
+    @sp.add_test(name="withdraw - fails when the push oracle price is stale")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an OvenRegistry contract
+        ovenFactoryAddress = Addresses.OVEN_FACTORY_ADDRESS
+        ovenRegistry = OvenRegistry.OvenRegistryContract(
+            ovenFactoryContractAddress = ovenFactoryAddress
+        )
+        scenario += ovenRegistry
+
+        # AND an oven which is registered
+        ovenAddress = Addresses.OVEN_ADDRESS
+        scenario += ovenRegistry.addOven((ovenAddress, ovenAddress)).run(
+            sender = ovenFactoryAddress
+        )
+
+        # AND a mock minter contract
+        minter = MockMinter.MockMinterContract()
+        scenario += minter
+
+        # AND a push oracle with a price pushed at time 1000
+        price = sp.nat(8 * 1000000000000)
+        pushOracle = PushOracle.PushOracleContract(
+            price = price,
+            lastUpdateTime = sp.timestamp(1000)
+        )
+        scenario += pushOracle
+
+        # AND an OvenProxy which reads the push oracle
+        ovenProxy = OvenProxyContract(
+            ovenRegistryContractAddress = ovenRegistry.address,
+            minterContractAddress = minter.address,
+            oracleContractAddress = pushOracle.address
+        )
+        scenario += ovenProxy
+
+        # WHEN withdraw is called by an oven after the price is older than the oracle's maximum delay
+        ownerAddress = sp.address("tz1YfB2H1NoZVUq4heHqrVX4oVp99yz8gwNq")
+        param = (ovenAddress, (ownerAddress, (sp.nat(1), (sp.nat(2), (False, (sp.int(3), (sp.int(4), sp.mutez(5))))))))
+
+        # THEN the call fails.
+        scenario += ovenProxy.withdraw(param).run(
+            sender = ovenAddress,
+            amount = sp.mutez(1),
+            now = sp.timestamp(1000 + 60 * 30),
+            valid = False
+        )
+
     ################################################################
     # liquidate
     ################################################################
@@ -821,6 +1064,132 @@ if __name__ == "__main__":
         # AND the balance of the minter is the balance sent.
         scenario.verify(minter.balance == sp.mutez(1))
 
+    @sp.add_test(name="liquidate - reads the price from a push oracle view")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an OvenRegistry contract
+        ovenFactoryAddress = Addresses.OVEN_FACTORY_ADDRESS
+        ovenRegistry = OvenRegistry.OvenRegistryContract(
+            ovenFactoryContractAddress = ovenFactoryAddress
+        )
+        scenario += ovenRegistry
+
+        # AND an oven which is registered
+        ovenAddress = Addresses.OVEN_ADDRESS
+        scenario += ovenRegistry.addOven((ovenAddress, ovenAddress)).run(
+            sender = ovenFactoryAddress
+        )
+
+        # AND a mock minter contract
+        minter = MockMinter.MockMinterContract()
+        scenario += minter
+
+        # AND a push oracle with a price pushed at time 1000
+        price = sp.nat(8 * 1000000000000)
+        pushOracle = PushOracle.PushOracleContract(
+            price = price,
+            lastUpdateTime = sp.timestamp(1000)
+        )
+        scenario += pushOracle
+
+        # AND an OvenProxy which reads the push oracle
+        ovenProxy = OvenProxyContract(
+            ovenRegistryContractAddress = ovenRegistry.address,
+            minterContractAddress = minter.address,
+            oracleContractAddress = pushOracle.address
+        )
+        scenario += ovenProxy
+
+        # WHEN liquidate is called by an oven
+        ownerAddress = sp.address("tz1YfB2H1NoZVUq4heHqrVX4oVp99yz8gwNq")
+        liquidatorAddress = Addresses.LIQUIDATOR_ADDRESS
+        param = (ovenAddress, (ownerAddress, (sp.nat(1), (sp.nat(2), (False, (sp.int(3), (sp.int(4), liquidatorAddress)))))))
+        scenario += ovenProxy.liquidate(param).run(
+            sender = ovenAddress,
+            amount = sp.mutez(1),
+            now = sp.timestamp(1060)
+        )
+        # THEN the minter receives the pushed price and the parameters in the same operation
+        scenario.verify(minter.data.liquidate_oracleValue == price)
+        scenario.verify(minter.data.liquidate_liquidatorAddress == liquidatorAddress)
+        scenario.verify(minter.balance == sp.mutez(1))
+
+        # AND the proxy never waited for the oracle.
+        scenario.verify(ovenProxy.data.state == IDLE)
+        scenario.verify(ovenProxy.data.liquidateParams.is_some() == False)
+
+    ################################################################
+    # partialLiquidate
+    ################################################################
+
+    @sp.add_test(name="partialLiquidate - passes partial liquidate params")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an OvenRegistry contract
+        ovenFactoryAddress = Addresses.OVEN_FACTORY_ADDRESS
+        ovenRegistry = OvenRegistry.OvenRegistryContract(
+            ovenFactoryContractAddress = ovenFactoryAddress
+        )
+        scenario += ovenRegistry
+
+        # AND an oven which is registered
+        ovenAddress = Addresses.OVEN_ADDRESS
+        scenario += ovenRegistry.addOven((ovenAddress, ovenAddress)).run(
+            sender = ovenFactoryAddress
+        )
+
+        # AND a mock minter contract
+        minter = MockMinter.MockMinterContract()
+        scenario += minter
+
+        # AND a faked Oracle contract
+        fakeHarbingerValue = sp.nat(8)
+        harbinger = FakeHarbinger.FakeHarbingerContract(fakeHarbingerValue, sp.timestamp_from_utc_now(), "XTZ-USD")
+        scenario += harbinger
+        oracle = Oracle.OracleContract(
+            harbingerContractAddress = harbinger.address
+        )
+        scenario += oracle
+
+        # AND an OvenProxy
+        ovenProxy = OvenProxyContract(
+            ovenRegistryContractAddress = ovenRegistry.address,
+            minterContractAddress = minter.address,
+            oracleContractAddress = oracle.address
+        )
+        scenario += ovenProxy
+
+        # WHEN partialLiquidate is called by an oven
+        ownerAddress = sp.address("tz1YfB2H1NoZVUq4heHqrVX4oVp99yz8gwNq")
+        ovenBalance = sp.nat(1)
+        borrowedTokens = sp.nat(2)
+        isLiquidated = False
+        stabilityFeeTokens = sp.int(3)
+        interestIndex = sp.int(4)
+        liquidatorAddress = Addresses.LIQUIDATOR_ADDRESS
+        param = (ovenAddress, (ownerAddress, (ovenBalance, (borrowedTokens, (isLiquidated, (stabilityFeeTokens, (interestIndex, liquidatorAddress)))))))
+        amount = sp.mutez(1)
+        scenario += ovenProxy.partialLiquidate(param).run(
+            sender = ovenAddress,
+            amount = amount,
+            now = sp.timestamp_from_utc_now()
+        )   
+
+        # THEN the minter contract receives the parameters on its partialLiquidate entry point
+        scenario.verify(minter.data.partialLiquidate_ovenAddress == ovenAddress)
+        scenario.verify(minter.data.partialLiquidate_ownerAddress == ownerAddress)
+        scenario.verify(minter.data.partialLiquidate_ovenBalance == ovenBalance)
+        scenario.verify(minter.data.partialLiquidate_borrowedTokens == borrowedTokens)
+        scenario.verify(minter.data.partialLiquidate_liquidated == isLiquidated)
+        scenario.verify(minter.data.partialLiquidate_stabilityFeeTokens == stabilityFeeTokens)
+        scenario.verify(minter.data.partialLiquidate_ovenInterestIndex == interestIndex)
+        scenario.verify(minter.data.partialLiquidate_liquidatorAddress == liquidatorAddress)
+
+        # AND the balance of the minter is the balance sent.
+        scenario.verify(minter.balance == sp.mutez(1))
+
     ################################################################
     # borrow
     ################################################################
@@ -1058,6 +1427,62 @@ if __name__ == "__main__":
         # AND the balance of the minter is the balance sent.
         scenario.verify(minter.balance == sp.mutez(1))
 
+    @sp.add_test(name="borrow - reads the price from a push oracle view")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN an OvenRegistry contract
+        ovenFactoryAddress = Addresses.OVEN_FACTORY_ADDRESS
+        ovenRegistry = OvenRegistry.OvenRegistryContract(
+            ovenFactoryContractAddress = ovenFactoryAddress
+        )
+        scenario += ovenRegistry
+
+        # AND an oven which is registered
+        ovenAddress = Addresses.OVEN_ADDRESS
+        scenario += ovenRegistry.addOven((ovenAddress, ovenAddress)).run(
+            sender = ovenFactoryAddress
+        )
+
+        # AND a mock minter contract
+        minter = MockMinter.MockMinterContract()
+        scenario += minter
+
+        # AND a push oracle with a price pushed at time 1000
+        price = sp.nat(8 * 1000000000000)
+        pushOracle = PushOracle.PushOracleContract(
+            price = price,
+            lastUpdateTime = sp.timestamp(1000)
+        )
+        scenario += pushOracle
+
+        # AND an OvenProxy which reads the push oracle
+        ovenProxy = OvenProxyContract(
+            ovenRegistryContractAddress = ovenRegistry.address,
+            minterContractAddress = minter.address,
+            oracleContractAddress = pushOracle.address
+        )
+        scenario += ovenProxy
+
+        # WHEN borrow is called by an oven
+        ownerAddress = sp.address("tz1YfB2H1NoZVUq4heHqrVX4oVp99yz8gwNq")
+        tokensToBorrow = sp.nat(5)
+        param = (ovenAddress, (ownerAddress, (sp.nat(1), (sp.nat(2), (False, (sp.int(3), (sp.int(4), tokensToBorrow)))))))
+        scenario += ovenProxy.borrow(param).run(
+            sender = ovenAddress,
+            amount = sp.mutez(1),
+            now = sp.timestamp(1060)
+        )
+        # THEN the minter receives the pushed price and the parameters in the same operation
+        scenario.verify(minter.data.borrow_oracleValue == price)
+        scenario.verify(minter.data.borrow_ovenAddress == ovenAddress)
+        scenario.verify(minter.data.borrow_tokensToBorrow == tokensToBorrow)
+        scenario.verify(minter.balance == sp.mutez(1))
+
+        # AND the proxy never waited for the oracle.
+        scenario.verify(ovenProxy.data.state == IDLE)
+        scenario.verify(ovenProxy.data.borrowParams.is_some() == False)
+
     ################################################################
     # borrow_callback
     ################################################################
@@ -1172,6 +1597,63 @@ if __name__ == "__main__":
             valid = False
         )        
 
+    ################################################################
+    # partialLiquidate_callback
+    ################################################################
+
+    @sp.add_test(name="partialLiquidate_callback - fails in bad state")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a mock minter contract
+        minter = MockMinter.MockMinterContract()
+        scenario += minter
+
+        # AND an Oracle contract
+        oracleAddress = Addresses.ORACLE_ADDRESS
+
+        # AND an OvenProxy in the IDLE state
+        ovenProxy = OvenProxyContract(
+            minterContractAddress = minter.address,
+            oracleContractAddress = oracleAddress,
+            state = IDLE
+        )
+        scenario += ovenProxy
+
+        # WHEN partialLiquidate_callback is called THEN the call fails
+        callbackValue = sp.nat(2)
+        scenario += ovenProxy.partialLiquidate_callback(callbackValue).run(
+            sender = oracleAddress,
+            valid = False
+        )
+
+    @sp.add_test(name="partialLiquidate_callback - fails with bad sender")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a mock minter contract
+        minter = MockMinter.MockMinterContract()
+        scenario += minter
+
+        # AND an Oracle contract
+        oracleAddress = Addresses.ORACLE_ADDRESS
+
+        # AND an OvenProxy in the PARTIAL_LIQUIDATE_WAITING_FOR_ORACLE state
+        ovenProxy = OvenProxyContract(
+            minterContractAddress = minter.address,
+            oracleContractAddress = oracleAddress,
+            state = PARTIAL_LIQUIDATE_WAITING_FOR_ORACLE
+        )
+        scenario += ovenProxy
+
+        # WHEN partialLiquidate_callback is called by someone other than the oracle THEN the call fails
+        callbackValue = sp.nat(2)
+        notOracleAddress = sp.address("tz1YfB2H1NoZVUq4heHqrVX4oVp99yz8gwNq")
+        scenario += ovenProxy.partialLiquidate_callback(callbackValue).run(
+            sender = notOracleAddress,
+            valid = False
+        )
+
     ################################################################
     # withdraw_callback
     ################################################################
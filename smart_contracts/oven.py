@@ -141,6 +141,30 @@ class OvenContract(sp.Contract):
         ).open_some()
         sp.transfer(minterParam, sp.balance, minterHandle)
     
+    # Repay only enough of an undercollateralized oven's debt to restore its collateralization, in
+    # exchange for a proportional amount of collateral plus the liquidation fee.
+    #
+    # Oven code is fixed at origination, so ovens originated before this entry point was added
+    # do not have it and can only be liquidated in full with `liquidate`.
+    @sp.entry_point
+    def partialLiquidate(self, unit):
+        sp.set_type(unit, sp.TUnit)
+
+        # Verify the call did not contain a balance.
+        sp.verify(sp.amount == sp.mutez(0), message = Errors.AMOUNT_NOT_ALLOWED)
+
+        # Convert mutez to 10^-18 scale.
+        normalizedBalance = sp.fst(sp.ediv(sp.balance, sp.mutez(1)).open_some()) * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+
+        # Call minter.
+        minterParam = (sp.to_address(sp.self), (self.data.owner, (normalizedBalance, (self.data.borrowedTokens, ((self.data.isLiquidated, (self.data.stabilityFeeTokens, (self.data.interestIndex, sp.sender))))))))
+        minterHandle = sp.contract(
+            OvenApi.LIQUIDATE_PARAMETER_TYPE,
+            self.data.ovenProxyContractAddress,
+            OvenApi.PARTIAL_LIQUIDATE_ENTRY_POINT_NAME,
+        ).open_some()
+        sp.transfer(minterParam, sp.balance, minterHandle)
+
     @sp.entry_point
     def setDelegate(self, newDelegate):
         sp.set_type(newDelegate, sp.TOption(sp.TKeyHash))
@@ -170,6 +194,21 @@ class OvenContract(sp.Contract):
         self.data.interestIndex      =  sp.fst(sp.snd(sp.snd(sp.snd(param))))
         self.data.isLiquidated       =  sp.snd(sp.snd(sp.snd(sp.snd(param))))
 
+    ################################################################
+    # Oven Proxy Interface
+    ################################################################
+
+    # Set the delegate on behalf of the owner. Used to change the delegate of many ovens in one operation.
+    @sp.entry_point
+    def setDelegateFromProxy(self, param):
+        sp.set_type(param, OvenApi.SET_DELEGATE_FROM_PROXY_PARAMETER_TYPE)
+
+        # Verify input came from the OvenProxy on behalf of the owner.
+        sp.verify(sp.sender == self.data.ovenProxyContractAddress, message = Errors.NOT_OVEN_PROXY)
+        sp.verify(sp.fst(param) == self.data.owner, message = Errors.NOT_OWNER)
+
+        sp.set_delegate(sp.snd(param))
+
 # Only run tests if this file is main.
 if __name__ == "__main__":
 
@@ -554,6 +593,70 @@ if __name__ == "__main__":
         # AND the minter has the balance of the oven.
         scenario.verify(ovenProxyContract.balance == contractBalance)
 
+    ################################################################
+    # Partial Liquidate
+    ################################################################
+
+    @sp.add_test(name="partialLiquidate - fails with an amount")
+    def test():
+        # GIVEN a oven contract.
+        scenario = sp.test_scenario()
+
+        contract = OvenContract()
+        scenario += contract
+
+        # WHEN partialLiquidate is called with an amount THEN the invocation fails.
+        scenario += contract.partialLiquidate(sp.unit).run(
+            amount = sp.mutez(1),
+            valid = False
+        )
+
+    @sp.add_test(name="partialLiquidate - calls oven proxy successfully")
+    def test():
+        # GIVEN a oven contract, a mock oven proxy, and some parameters set in the oven.
+        scenario = sp.test_scenario()
+
+        borrowedTokens = 1
+        stabilityFeeTokens = 2
+        interestIndex = 3
+        isLiquidated = False
+        owner = Addresses.OVEN_OWNER_ADDRESS
+        contractBalance = sp.mutez(4)
+
+        ovenProxyContract = MockOvenProxy.MockOvenProxyContract()
+        scenario += ovenProxyContract
+
+        contract = OvenContract(
+            owner = owner,
+            borrowedTokens = borrowedTokens,
+            stabilityFeeTokens = stabilityFeeTokens,
+            interestIndex = interestIndex,
+            isLiquidated = isLiquidated,
+            ovenProxyContractAddress = ovenProxyContract.address
+        )
+        contract.set_initial_balance(contractBalance)
+        scenario += contract
+
+        # WHEN partialLiquidate is called
+        liquidatorAddress = Addresses.LIQUIDATOR_ADDRESS
+        scenario += contract.partialLiquidate(sp.unit).run(
+            sender = liquidatorAddress,
+        )
+
+        # THEN the parameters were passed to the oven proxy correctly.
+        expectedBalance = sp.fst(sp.ediv(contractBalance, sp.mutez(1)).open_some()) * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+        scenario.verify(ovenProxyContract.data.partialLiquidate_ovenAddress == contract.address)
+        scenario.verify(ovenProxyContract.data.partialLiquidate_ownerAddress == owner)
+        scenario.verify(ovenProxyContract.data.partialLiquidate_ovenBalance == expectedBalance)
+        scenario.verify(ovenProxyContract.data.partialLiquidate_borrowedTokens == borrowedTokens)
+        scenario.verify(ovenProxyContract.data.partialLiquidate_liquidated == isLiquidated)
+        scenario.verify(ovenProxyContract.data.partialLiquidate_stabilityFeeTokens == stabilityFeeTokens)
+        scenario.verify(ovenProxyContract.data.partialLiquidate_ovenInterestIndex == interestIndex)
+        scenario.verify(ovenProxyContract.data.partialLiquidate_liquidatorAddress == liquidatorAddress)
+
+        # AND the oven proxy has the balance of the oven.
+        scenario.verify(ovenProxyContract.balance == contractBalance)
+
     ################################################################
     # Set Delegate
     ################################################################
@@ -597,6 +700,73 @@ if __name__ == "__main__":
         # THEN the delegate is updated.
         scenario.verify(contract.baker.open_some() == delegate.open_some())
 
+    ################################################################
+    # Set Delegate From Proxy
+    ################################################################
+
+    @sp.add_test(name="setDelegateFromProxy - fails when sender is not OvenProxy")
+    def test():
+        # GIVEN a oven contract without a delegate and an owner.
+        scenario = sp.test_scenario()
+        owner = Addresses.OVEN_OWNER_ADDRESS
+        ovenProxyAddress = Addresses.OVEN_PROXY_ADDRESS
+
+        contract = OvenContract(
+            owner = owner,
+            ovenProxyContractAddress = ovenProxyAddress
+        )
+        scenario += contract
+
+        # WHEN setDelegateFromProxy is called by someone other than the OvenProxy THEN the invocation fails.
+        delegate = sp.some(sp.key_hash("tz1abmz7jiCV2GH2u81LRrGgAFFgvQgiDiaf"))
+        scenario += contract.setDelegateFromProxy((owner, delegate)).run(
+            sender = owner,
+            valid = False
+        )
+
+    @sp.add_test(name="setDelegateFromProxy - fails when requested by someone other than the owner")
+    def test():
+        # GIVEN a oven contract without a delegate and an owner.
+        scenario = sp.test_scenario()
+        owner = Addresses.OVEN_OWNER_ADDRESS
+        ovenProxyAddress = Addresses.OVEN_PROXY_ADDRESS
+
+        contract = OvenContract(
+            owner = owner,
+            ovenProxyContractAddress = ovenProxyAddress
+        )
+        scenario += contract
+
+        # WHEN the OvenProxy relays a request from someone other than the owner THEN the invocation fails.
+        notOwner = Addresses.NULL_ADDRESS
+        delegate = sp.some(sp.key_hash("tz1abmz7jiCV2GH2u81LRrGgAFFgvQgiDiaf"))
+        scenario += contract.setDelegateFromProxy((notOwner, delegate)).run(
+            sender = ovenProxyAddress,
+            valid = False
+        )
+
+    @sp.add_test(name="setDelegateFromProxy - updates delegate")
+    def test():
+        # GIVEN a oven contract without a delegate and an owner.
+        scenario = sp.test_scenario()
+        owner = Addresses.OVEN_OWNER_ADDRESS
+        ovenProxyAddress = Addresses.OVEN_PROXY_ADDRESS
+
+        contract = OvenContract(
+            owner = owner,
+            ovenProxyContractAddress = ovenProxyAddress
+        )
+        scenario += contract
+
+        # WHEN the OvenProxy relays a request from the owner
+        delegate = sp.some(sp.key_hash("tz1abmz7jiCV2GH2u81LRrGgAFFgvQgiDiaf"))
+        scenario += contract.setDelegateFromProxy((owner, delegate)).run(
+            sender = ovenProxyAddress,
+        )
+
+        # THEN the delegate is updated.
+        scenario.verify(contract.baker.open_some() == delegate.open_some())
+
     ################################################################
     # Update State
     ################################################################
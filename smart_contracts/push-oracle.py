@@ -0,0 +1,673 @@
+import smartpy as sp
+
+Addresses = sp.import_script_from_url("file:test-helpers/addresses.py")
+Constants = sp.import_script_from_url("file:common/constants.py")
+Errors = sp.import_script_from_url("file:common/errors.py")
+
+################################################################
+# Contract
+################################################################
+
+# Contains an Oracle for an XTZ-USD price which is pushed into storage.
+#
+# The price is written by an authorized updater, or relayed from Harbinger by anyone. Reads
+# never wait on another contract, so there is no state machine and any number of readers may
+# be served in the same block. Readers may use the `getXtzUsdRate` callback or the
+# `getLatestXtzUsdRate` on-chain view.
+#
+# `OvenProxyContract` reads `getLatestXtzUsdRate` when its oracle is a push oracle, so oven
+# calls reach the Minter in one operation without the proxy's oracle state machine.
+#
+# See: https://github.com/tacoinfra/harbinger
+class PushOracleContract(sp.Contract):
+    # Initialize a new PushOracleContract contract.
+    #
+    # Parameters:
+    #   updaterContractAddress The address allowed to push prices directly.
+    #   harbingerContractAddress The address of the Harbinger contract which prices may be relayed from.
+    def __init__(
+        self,
+        price = sp.nat(0),
+        lastUpdateTime = sp.timestamp(0),
+        updaterContractAddress = Addresses.ORACLE_ADDRESS,
+        harbingerContractAddress = Addresses.HARBINGER_ADDRESS,
+        maxDataDelaySec = sp.nat(60 * 30),
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS,
+    ):
+        self.exception_optimization_level = "DefaultUnit"
+
+        self.init(
+            price = price,
+            lastUpdateTime = lastUpdateTime,
+            updaterContractAddress = updaterContractAddress,
+            harbingerContractAddress = harbingerContractAddress,
+            maxDataDelaySec = maxDataDelaySec,
+            governorContractAddress = governorContractAddress
+        )
+
+    ################################################################
+    # Public Interface
+    ################################################################
+
+    # Disallow direct transfers.
+    @sp.entry_point
+    def default(self, param):
+        sp.set_type(param, sp.TUnit)
+        sp.failwith(Errors.CANNOT_RECEIVE_FUNDS)
+
+    # Retrieve the price of the XTZ-USD pair.
+    #
+    # Parameters:
+    #   callback: A callback to call with the result. Parameter to callback is a single nat.
+    @sp.entry_point
+    def getXtzUsdRate(self, callback):
+        sp.set_type(callback, sp.TContract(sp.TNat))
+
+        # Verify the call did not contain a balance.
+        sp.verify(sp.amount == sp.mutez(0), message = Errors.AMOUNT_NOT_ALLOWED)
+
+        # Call client callback
+        sp.transfer(self.readPrice(), sp.mutez(0), callback)
+
+    # Push a new price of the XTZ-USD pair.
+    #
+    # Parameters:
+    #   newPrice: The price, in 10^-18 precision.
+    @sp.entry_point
+    def setPrice(self, newPrice):
+        sp.set_type(newPrice, sp.TNat)
+
+        # Verify the call did not contain a balance.
+        sp.verify(sp.amount == sp.mutez(0), message = Errors.AMOUNT_NOT_ALLOWED)
+
+        sp.verify(sp.sender == self.data.updaterContractAddress, message = Errors.NOT_UPDATER)
+
+        self.data.price = newPrice
+        self.data.lastUpdateTime = sp.now
+
+    # Relay the latest price of the XTZ-USD pair from Harbinger. Anyone may call this.
+    @sp.entry_point
+    def update(self, param):
+        sp.set_type(param, sp.TUnit)
+
+        # Verify the call did not contain a balance.
+        sp.verify(sp.amount == sp.mutez(0), message = Errors.AMOUNT_NOT_ALLOWED)
+
+        harbingerResult = sp.view(
+            "getPrice",
+            self.data.harbingerContractAddress,
+            Constants.ASSET_CODE,
+            t = Constants.HARBINGER_VIEW_DATA_TYPE
+        ).open_some()
+        updateTime, harbingerPrice = sp.match_pair(harbingerResult)
+
+        # Assert data is recent and newer than the stored price.
+        dataAge = sp.as_nat(sp.now - updateTime)
+        sp.verify(dataAge < self.data.maxDataDelaySec, message = Errors.STALE_DATA)
+        sp.verify(updateTime > self.data.lastUpdateTime, message = Errors.STALE_DATA)
+
+        self.data.price = harbingerPrice * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+        self.data.lastUpdateTime = updateTime
+
+    ################################################################
+    # Views
+    ################################################################
+
+    # Returns the stored price of the XTZ-USD pair, in 10^-18 precision. Fails if the price is stale.
+    @sp.onchain_view()
+    def getLatestXtzUsdRate(self):
+        sp.result(self.readPrice())
+
+    ################################################################
+    # Helpers
+    ################################################################
+
+    # Returns the stored price after asserting it is recent.
+    def readPrice(self):
+        dataAge = sp.as_nat(sp.now - self.data.lastUpdateTime)
+        sp.verify(dataAge < self.data.maxDataDelaySec, message = Errors.STALE_DATA)
+
+        return self.data.price
+
+    ################################################################
+    # Governance
+    ################################################################
+
+    # Update the governor contract.
+    @sp.entry_point
+    def setGovernorContract(self, newGovernorContractAddress):
+        sp.set_type(newGovernorContractAddress, sp.TAddress)
+
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+        self.data.governorContractAddress = newGovernorContractAddress
+
+    # Update the updater contract.
+    @sp.entry_point
+    def setUpdaterContract(self, newUpdaterContractAddress):
+        sp.set_type(newUpdaterContractAddress, sp.TAddress)
+
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+        self.data.updaterContractAddress = newUpdaterContractAddress
+
+    # Update the Harbinger contract.
+    @sp.entry_point
+    def setHarbingerContract(self, newHarbingerContractAddress):
+        sp.set_type(newHarbingerContractAddress, sp.TAddress)
+
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+        self.data.harbingerContractAddress = newHarbingerContractAddress
+
+    # Update the max data delay.
+    @sp.entry_point
+    def setMaxDataDelaySec(self, newMaxDataDelaySec):
+        sp.set_type(newMaxDataDelaySec, sp.TNat)
+
+        sp.verify(sp.sender == self.data.governorContractAddress, message = Errors.NOT_GOVERNOR)
+        self.data.maxDataDelaySec = newMaxDataDelaySec
+
+# Only run tests if this file is main.
+if __name__ == "__main__":
+
+    ################################################################
+    ################################################################
+    # Tests
+    ################################################################
+    ################################################################
+
+    DummyContract = sp.import_script_from_url("file:test-helpers/dummy-contract.py")
+    FakeHarbinger = sp.import_script_from_url("file:test-helpers/fake-harbinger.py")
+
+    # A contract which reads the price through the on-chain view.
+    class PriceViewReader(sp.Contract):
+        def __init__(self, oracleContractAddress):
+            self.init(
+                oracleContractAddress = oracleContractAddress,
+                price = sp.nat(0)
+            )
+
+        @sp.entry_point
+        def readPrice(self):
+            self.data.price = sp.view(
+                "getLatestXtzUsdRate",
+                self.data.oracleContractAddress,
+                sp.unit,
+                t = sp.TNat
+            ).open_some()
+
+    ################################################################
+    # getXtzUsdRate
+    ################################################################
+
+    @sp.add_test(name="getXtzUsdRate - fails when called with an amount")
+    def test():
+        # GIVEN a PushOracle contract with a recent price.
+        scenario = sp.test_scenario()
+
+        now = sp.timestamp(1000)
+        oracle = PushOracleContract(
+            price = 2310000000000000000,
+            lastUpdateTime = now
+        )
+        scenario += oracle
+
+        # AND a DummyContract to receive the retrieved value.
+        dummyContract = DummyContract.DummyContract()
+        scenario += dummyContract
+
+        # WHEN a price is requested with an amount THEN the invocation fails.
+        callback = sp.contract(sp.TNat, dummyContract.address, entry_point = "natCallback").open_some()
+        scenario += oracle.getXtzUsdRate(callback).run(
+            amount = sp.mutez(1),
+            now = now,
+            valid = False
+        )
+
+    @sp.add_test(name="getXtzUsdRate - fails when price is stale")
+    def test():
+        # GIVEN a PushOracle contract with a stale price.
+        scenario = sp.test_scenario()
+
+        maxDataDelaySec = 30
+        nowSecs = 1000
+        oracle = PushOracleContract(
+            price = 2310000000000000000,
+            lastUpdateTime = sp.timestamp(nowSecs - maxDataDelaySec - 1),
+            maxDataDelaySec = maxDataDelaySec
+        )
+        scenario += oracle
+
+        # AND a DummyContract to receive the retrieved value.
+        dummyContract = DummyContract.DummyContract()
+        scenario += dummyContract
+
+        # WHEN a price is requested THEN the invocation fails.
+        callback = sp.contract(sp.TNat, dummyContract.address, entry_point = "natCallback").open_some()
+        scenario += oracle.getXtzUsdRate(callback).run(
+            now = sp.timestamp(nowSecs),
+            valid = False
+        )
+
+    @sp.add_test(name="getXtzUsdRate - serves multiple readers in the same block")
+    def test():
+        # GIVEN a PushOracle contract with a recent price.
+        scenario = sp.test_scenario()
+
+        now = sp.timestamp(1000)
+        price = 2310000000000000000 # $2.31
+        oracle = PushOracleContract(
+            price = price,
+            lastUpdateTime = now
+        )
+        scenario += oracle
+
+        # AND two DummyContracts to receive the retrieved value.
+        dummyContract1 = DummyContract.DummyContract()
+        dummyContract2 = DummyContract.DummyContract()
+        scenario += dummyContract1
+        scenario += dummyContract2
+
+        # WHEN a price is requested by both contracts at the same time
+        callback1 = sp.contract(sp.TNat, dummyContract1.address, entry_point = "natCallback").open_some()
+        scenario += oracle.getXtzUsdRate(callback1).run(
+            now = now
+        )
+        callback2 = sp.contract(sp.TNat, dummyContract2.address, entry_point = "natCallback").open_some()
+        scenario += oracle.getXtzUsdRate(callback2).run(
+            now = now
+        )
+
+        # THEN both contracts received the price.
+        scenario.verify(dummyContract1.data.natValue == price)
+        scenario.verify(dummyContract2.data.natValue == price)
+
+    ################################################################
+    # getLatestXtzUsdRate
+    ################################################################
+
+    @sp.add_test(name="getLatestXtzUsdRate - returns price")
+    def test():
+        # GIVEN a PushOracle contract with a recent price.
+        scenario = sp.test_scenario()
+
+        now = sp.timestamp(1000)
+        price = 2310000000000000000 # $2.31
+        oracle = PushOracleContract(
+            price = price,
+            lastUpdateTime = now
+        )
+        scenario += oracle
+
+        # AND a contract which reads the view.
+        reader = PriceViewReader(oracle.address)
+        scenario += reader
+
+        # WHEN the price is read through the view
+        scenario += reader.readPrice().run(
+            now = now
+        )
+
+        # THEN the reader received the price.
+        scenario.verify(reader.data.price == price)
+
+    ################################################################
+    # setPrice
+    ################################################################
+
+    @sp.add_test(name="setPrice - succeeds when called by updater")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        updaterContractAddress = Addresses.ORACLE_ADDRESS
+        oracle = PushOracleContract(
+            updaterContractAddress = updaterContractAddress
+        )
+        scenario += oracle
+
+        # WHEN setPrice is called by the updater
+        newPrice = 2310000000000000000 # $2.31
+        now = sp.timestamp(1000)
+        scenario += oracle.setPrice(newPrice).run(
+            sender = updaterContractAddress,
+            now = now
+        )
+
+        # THEN the price and update time are stored.
+        scenario.verify(oracle.data.price == newPrice)
+        scenario.verify(oracle.data.lastUpdateTime == now)
+
+    @sp.add_test(name="setPrice - fails when not called by updater")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        updaterContractAddress = Addresses.ORACLE_ADDRESS
+        oracle = PushOracleContract(
+            updaterContractAddress = updaterContractAddress
+        )
+        scenario += oracle
+
+        # WHEN setPrice is called by someone other than the updater THEN the call fails.
+        scenario += oracle.setPrice(2310000000000000000).run(
+            sender = Addresses.NULL_ADDRESS,
+            valid = False
+        )
+
+    @sp.add_test(name="setPrice - fails when called with an amount")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        updaterContractAddress = Addresses.ORACLE_ADDRESS
+        oracle = PushOracleContract(
+            updaterContractAddress = updaterContractAddress
+        )
+        scenario += oracle
+
+        # WHEN setPrice is called by the updater with an amount THEN the call fails.
+        scenario += oracle.setPrice(2310000000000000000).run(
+            sender = updaterContractAddress,
+            amount = sp.mutez(1),
+            valid = False
+        )
+
+    ################################################################
+    # update
+    ################################################################
+
+    @sp.add_test(name="update - relays price from Harbinger")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a fake Harbinger contract.
+        now = sp.timestamp(1000)
+        xtzUsdValue = 2310000 # $2.31
+        harbinger = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = xtzUsdValue,
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger
+
+        # AND a PushOracle contract.
+        oracle = PushOracleContract(
+            harbingerContractAddress = harbinger.address
+        )
+        scenario += oracle
+
+        # WHEN update is called by anyone
+        scenario += oracle.update(sp.unit).run(
+            sender = Addresses.NULL_ADDRESS,
+            now = now
+        )
+
+        # THEN the price is stored, correctly converted to 10^-18 precision.
+        scenario.verify(oracle.data.price == xtzUsdValue * Constants.MUTEZ_TO_KOLIBRI_CONVERSION)
+        scenario.verify(oracle.data.lastUpdateTime == now)
+
+    @sp.add_test(name="update - fails when called with an amount")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a fake Harbinger contract.
+        now = sp.timestamp(1000)
+        harbinger = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2310000,
+            harbingerUpdateTime = now,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger
+
+        # AND a PushOracle contract.
+        oracle = PushOracleContract(
+            harbingerContractAddress = harbinger.address
+        )
+        scenario += oracle
+
+        # WHEN update is called with an amount THEN the call fails.
+        scenario += oracle.update(sp.unit).run(
+            sender = Addresses.NULL_ADDRESS,
+            amount = sp.mutez(1),
+            now = now,
+            valid = False
+        )
+
+    @sp.add_test(name="update - fails when Harbinger data is stale")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a fake Harbinger contract with stale data.
+        maxDataDelaySec = 30
+        nowSecs = 1000
+        harbinger = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2310000,
+            harbingerUpdateTime = sp.timestamp(nowSecs - maxDataDelaySec - 1),
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger
+
+        # AND a PushOracle contract.
+        oracle = PushOracleContract(
+            harbingerContractAddress = harbinger.address,
+            maxDataDelaySec = maxDataDelaySec
+        )
+        scenario += oracle
+
+        # WHEN update is called THEN the call fails.
+        scenario += oracle.update(sp.unit).run(
+            now = sp.timestamp(nowSecs),
+            valid = False
+        )
+
+    @sp.add_test(name="update - fails when Harbinger data is older than stored price")
+    def test():
+        scenario = sp.test_scenario()
+
+        # GIVEN a fake Harbinger contract.
+        harbingerUpdateTime = sp.timestamp(990)
+        harbinger = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = 2310000,
+            harbingerUpdateTime = harbingerUpdateTime,
+            harbingerAsset = Constants.ASSET_CODE
+        )
+        scenario += harbinger
+
+        # AND a PushOracle contract with a more recent price.
+        oracle = PushOracleContract(
+            price = 2400000000000000000,
+            lastUpdateTime = sp.timestamp(995),
+            harbingerContractAddress = harbinger.address
+        )
+        scenario += oracle
+
+        # WHEN update is called THEN the call fails.
+        scenario += oracle.update(sp.unit).run(
+            now = sp.timestamp(1000),
+            valid = False
+        )
+
+    ################################################################
+    # default
+    ################################################################
+
+    @sp.add_test(name="default - fails with calls to the default entrypoint")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        oracle = PushOracleContract()
+        scenario += oracle
+
+        # WHEN the default entry point is called THEN the request fails
+        scenario += oracle.default(sp.unit).run(
+            amount = sp.mutez(1),
+            valid = False
+        )
+
+    ################################################################
+    # setUpdaterContract
+    ################################################################
+
+    @sp.add_test(name="setUpdaterContract - succeeds when called by governor")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = PushOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN the setUpdaterContract is called with a new contract
+        rotatedAddress = Addresses.ROTATED_ADDRESS
+        scenario += oracle.setUpdaterContract(rotatedAddress).run(
+            sender = governorContractAddress,
+        )
+
+        # THEN the contract is updated.
+        scenario.verify(oracle.data.updaterContractAddress == rotatedAddress)
+
+    @sp.add_test(name="setUpdaterContract - fails when not called by governor")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = PushOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN the setUpdaterContract is called by someone who isn't the governor THEN the call fails
+        rotatedAddress = Addresses.ROTATED_ADDRESS
+        scenario += oracle.setUpdaterContract(rotatedAddress).run(
+            sender = Addresses.NULL_ADDRESS,
+            valid = False
+        )
+
+    ################################################################
+    # setHarbingerContract
+    ################################################################
+
+    @sp.add_test(name="setHarbingerContract - succeeds when called by governor")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = PushOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN the setHarbingerContract is called with a new contract
+        rotatedAddress = Addresses.ROTATED_ADDRESS
+        scenario += oracle.setHarbingerContract(rotatedAddress).run(
+            sender = governorContractAddress,
+        )
+
+        # THEN the contract is updated.
+        scenario.verify(oracle.data.harbingerContractAddress == rotatedAddress)
+
+    @sp.add_test(name="setHarbingerContract - fails when not called by governor")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = PushOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN the setHarbingerContract is called by someone who isn't the governor THEN the call fails
+        rotatedAddress = Addresses.ROTATED_ADDRESS
+        scenario += oracle.setHarbingerContract(rotatedAddress).run(
+            sender = Addresses.NULL_ADDRESS,
+            valid = False
+        )
+
+    ################################################################
+    # setMaxDataDelaySec
+    ################################################################
+
+    @sp.add_test(name="setMaxDataDelaySec - succeeds when called by governor")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = PushOracleContract(
+            governorContractAddress = governorContractAddress,
+            maxDataDelaySec = 30,
+        )
+        scenario += oracle
+
+        # WHEN the setMaxDataDelaySec is called with a new value
+        newMaxDataDelaySec = 60
+        scenario += oracle.setMaxDataDelaySec(newMaxDataDelaySec).run(
+            sender = governorContractAddress,
+        )
+
+        # THEN the value is updated.
+        scenario.verify(oracle.data.maxDataDelaySec == newMaxDataDelaySec)
+
+    @sp.add_test(name="setMaxDataDelaySec - fails when not called by governor")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = PushOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN the setMaxDataDelaySec is called by someone who isn't the governor THEN the call fails
+        scenario += oracle.setMaxDataDelaySec(60).run(
+            sender = Addresses.NULL_ADDRESS,
+            valid = False
+        )
+
+    ################################################################
+    # setGovernorContract
+    ################################################################
+
+    @sp.add_test(name="setGovernorContract - succeeds when called by governor")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = PushOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN the setGovernorContract is called with a new contract
+        rotatedAddress = Addresses.ROTATED_ADDRESS
+        scenario += oracle.setGovernorContract(rotatedAddress).run(
+            sender = governorContractAddress,
+        )
+
+        # THEN the contract is updated.
+        scenario.verify(oracle.data.governorContractAddress == rotatedAddress)
+
+    @sp.add_test(name="setGovernorContract - fails when not called by governor")
+    def test():
+        # GIVEN a PushOracle contract
+        scenario = sp.test_scenario()
+
+        governorContractAddress = Addresses.GOVERNOR_ADDRESS
+        oracle = PushOracleContract(
+            governorContractAddress = governorContractAddress
+        )
+        scenario += oracle
+
+        # WHEN the setGovernorContract is called by someone who isn't the governor THEN the call fails
+        rotatedAddress = Addresses.ROTATED_ADDRESS
+        scenario += oracle.setGovernorContract(rotatedAddress).run(
+            sender = Addresses.NULL_ADDRESS,
+            valid = False
+        )
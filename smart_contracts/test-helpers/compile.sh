@@ -29,7 +29,8 @@ function processContract {
     OUT_DIR=$3
     CONTRACT_IN="${CONTRACT_NAME}.py"
     CONTRACT_OUT="${CONTRACT_NAME}.tz"
-    CONTRACT_COMPILED="${CONTRACT_NAME}_compiled.tz"
+    CONTRACT_SCRIPT="${OUT_DIR}/${CONTRACT_NAME}/${CONTRACT_IN}"
+    CONTRACT_COMPILED="${OUT_DIR}/${CONTRACT_NAME}/compile/${CONTRACT_NAME}/step_000_cont_0_contract.tz"
 
     echo ">> Processing ${CONTRACT_NAME}"
 
@@ -43,12 +44,16 @@ function processContract {
     $SMART_PY_CLI test $CONTRACT_IN $OUT_DIR
     echo ">>> Done"
 
+    # The CLI compiles registered compilation targets, so compile a copy which registers the invocation.
     echo ">>> [2 / 3] Compiling ${CONTRACT_NAME}"
-    $SMART_PY_CLI compile $CONTRACT_IN $INVOCATION $OUT_DIR
+    mkdir -p $(dirname $CONTRACT_SCRIPT)
+    cp $CONTRACT_IN $CONTRACT_SCRIPT
+    echo "sp.add_compilation_target(\"${CONTRACT_NAME}\", ${INVOCATION})" >> $CONTRACT_SCRIPT
+    $SMART_PY_CLI compile $CONTRACT_SCRIPT $OUT_DIR/$CONTRACT_NAME/compile
     echo ">>> Done."
 
     echo ">>> [3 / 3] Copying Artifacts"
-    cp $OUT_DIR/$CONTRACT_COMPILED $CONTRACT_OUT
+    cp $CONTRACT_COMPILED $CONTRACT_OUT
     echo ">>> Written to ${CONTRACT_OUT}"
     echo ""
 }
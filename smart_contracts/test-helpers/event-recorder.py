@@ -0,0 +1,22 @@
+import smartpy as sp
+
+# Wraps a contract class so that it records the last event it emits in a `lastEvent` storage field.
+#
+# Scenarios cannot read the events a contract emits, so they check `lastEvent` instead. The wrapped
+# contract must route its events through an `emitEvent(tag, event)` method. The event is stored as
+# `(tag, sp.pack(event))`, so contracts which emit several payload types share a single field.
+def recordEvents(contractClass):
+    class EventRecorder(contractClass):
+        def init(self, **storage):
+            contractClass.init(self, lastEvent = sp.none, **storage)
+
+        def emitEvent(self, tag, event):
+            contractClass.emitEvent(self, tag, event)
+            self.data.lastEvent = sp.some((tag, sp.pack(event)))
+
+    return EventRecorder
+
+# Verify the last event recorded by a contract wrapped with `recordEvents` has the given tag and payload.
+def verifyLastEvent(scenario, contract, tag, event):
+    scenario.verify(sp.fst(contract.data.lastEvent.open_some()) == tag)
+    scenario.verify(sp.snd(contract.data.lastEvent.open_some()) == sp.pack(event))
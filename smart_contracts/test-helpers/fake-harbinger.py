@@ -34,4 +34,12 @@ class FakeHarbingerContract(sp.Contract):
         callback = sp.snd(requestPair)
 
         result = (self.data.harbingerAsset, (self.data.harbingerUpdateTime, self.data.harbingerValue))
-        sp.transfer(result, sp.mutez(0), callback) 
\ No newline at end of file
+        sp.transfer(result, sp.mutez(0), callback)
+
+    # getPrice - Returns the static value in the initializer as an on-chain view.
+    @sp.onchain_view()
+    def getPrice(self, assetCode):
+        sp.set_type(assetCode, sp.TString)
+        sp.verify(assetCode == self.data.harbingerAsset)
+
+        sp.result((self.data.harbingerUpdateTime, self.data.harbingerValue))
@@ -61,6 +61,17 @@ class MockMinterContract(sp.Contract):
         liquidate_stabilityFeeTokens = sp.int(0),
         liquidate_ovenInterestIndex = sp.int(0),
         liquidate_liquidatorAddress = Addresses.NULL_ADDRESS,
+
+        # partialLiquidate parameters
+        partialLiquidate_oracleValue = sp.nat(0),
+        partialLiquidate_ovenAddress = Addresses.NULL_ADDRESS,
+        partialLiquidate_ownerAddress = Addresses.NULL_ADDRESS,
+        partialLiquidate_ovenBalance = sp.nat(0),
+        partialLiquidate_borrowedTokens = sp.nat(0),
+        partialLiquidate_liquidated = sp.bool(False),
+        partialLiquidate_stabilityFeeTokens = sp.int(0),
+        partialLiquidate_ovenInterestIndex = sp.int(0),
+        partialLiquidate_liquidatorAddress = Addresses.NULL_ADDRESS,
       )
 
     ################################################################
@@ -133,4 +144,18 @@ class MockMinterContract(sp.Contract):
         self.data.liquidate_stabilityFeeTokens = sp.fst(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param)))))))
         self.data.liquidate_ovenInterestIndex = sp.fst(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param))))))))
         self.data.liquidate_liquidatorAddress = sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param))))))))
-        
\ No newline at end of file
+        
+
+    @sp.entry_point
+    def partialLiquidate(self, param):
+        sp.set_type(param, OvenApi.LIQUIDATE_PARAMETER_TYPE_ORACLE)
+
+        self.data.partialLiquidate_oracleValue        = sp.fst(param)
+        self.data.partialLiquidate_ovenAddress        = sp.fst(sp.snd(param))
+        self.data.partialLiquidate_ownerAddress       = sp.fst(sp.snd(sp.snd(param)))
+        self.data.partialLiquidate_ovenBalance        = sp.fst(sp.snd(sp.snd(sp.snd(param))))
+        self.data.partialLiquidate_borrowedTokens     = sp.fst(sp.snd(sp.snd(sp.snd(sp.snd(param)))))
+        self.data.partialLiquidate_liquidated         = sp.fst(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param))))))
+        self.data.partialLiquidate_stabilityFeeTokens = sp.fst(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param)))))))
+        self.data.partialLiquidate_ovenInterestIndex  = sp.fst(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param))))))))
+        self.data.partialLiquidate_liquidatorAddress  = sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param))))))))
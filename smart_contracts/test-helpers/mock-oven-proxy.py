@@ -59,6 +59,16 @@ class MockOvenProxyContract(sp.Contract):
         liquidate_ovenInterestIndex = sp.int(0),
         liquidate_liquidatorAddress = Addresses.NULL_ADDRESS,
 
+        # partialLiquidate parameters
+        partialLiquidate_ovenAddress = Addresses.NULL_ADDRESS,
+        partialLiquidate_ownerAddress = Addresses.NULL_ADDRESS,
+        partialLiquidate_ovenBalance = sp.nat(0),
+        partialLiquidate_borrowedTokens = sp.nat(0),
+        partialLiquidate_liquidated = sp.bool(False),
+        partialLiquidate_stabilityFeeTokens = sp.int(0),
+        partialLiquidate_ovenInterestIndex = sp.int(0),
+        partialLiquidate_liquidatorAddress = Addresses.NULL_ADDRESS,
+
         # updateState parameters
         updateState_ovenAddress = Addresses.NULL_ADDRESS,
         updateState_borrowedTokens = sp.nat(0),
@@ -135,6 +145,19 @@ class MockOvenProxyContract(sp.Contract):
         self.data.liquidate_ovenInterestIndex = sp.fst(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param)))))))
         self.data.liquidate_liquidatorAddress = sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param)))))))
 
+    @sp.entry_point
+    def partialLiquidate(self, param):
+        sp.set_type(param, OvenApi.LIQUIDATE_PARAMETER_TYPE)
+
+        self.data.partialLiquidate_ovenAddress        = sp.fst(param) 
+        self.data.partialLiquidate_ownerAddress       = sp.fst(sp.snd(param))
+        self.data.partialLiquidate_ovenBalance        = sp.fst(sp.snd(sp.snd(param)))
+        self.data.partialLiquidate_borrowedTokens     = sp.fst(sp.snd(sp.snd(sp.snd(param))))
+        self.data.partialLiquidate_liquidated         = sp.fst(sp.snd(sp.snd(sp.snd(sp.snd(param)))))
+        self.data.partialLiquidate_stabilityFeeTokens = sp.fst(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param))))))
+        self.data.partialLiquidate_ovenInterestIndex  = sp.fst(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param)))))))
+        self.data.partialLiquidate_liquidatorAddress  = sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(sp.snd(param)))))))
+
     @sp.entry_point
     def updateState(self, param):
         sp.set_type(param, OvenApi.UPDATE_STATE_PARAMETER_TYPE)
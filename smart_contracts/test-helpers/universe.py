@@ -0,0 +1,102 @@
+import smartpy as sp
+
+Addresses = sp.import_script_from_url("file:test-helpers/addresses.py")
+DevFund = sp.import_script_from_url("file:dev-fund.py")
+FakeHarbinger = sp.import_script_from_url("file:test-helpers/fake-harbinger.py")
+Minter = sp.import_script_from_url("file:minter.py")
+Oracle = sp.import_script_from_url("file:oracle.py")
+Oven = sp.import_script_from_url("file:oven.py")
+OvenFactory = sp.import_script_from_url("file:oven-factory.py")
+OvenProxy = sp.import_script_from_url("file:oven-proxy.py")
+OvenRegistry = sp.import_script_from_url("file:oven-registry.py")
+StabilityFund = sp.import_script_from_url("file:stability-fund.py")
+Token = sp.import_script_from_url("file:token.py")
+
+# A wired universe of Stablecoin contracts for end to end tests.
+#
+# Each contract is originated with its wiring already in its initial storage, so a scenario starts from the state
+# the universe has after setup rather than replaying every governance call. Only the references which form cycles
+# (Minter <-> OvenProxy, Minter <-> Token and OvenFactory <-> OvenRegistry) are set after origination.
+#
+# Params:
+#   - scenario: The scenario to originate contracts in.
+#   - harbingerValue: The XTZ-USD price reported by the fake Harbinger oracle.
+#   - harbingerUpdateTime: The update time reported by the fake Harbinger oracle.
+#   - fundAdministratorAddress: The administrator of the dev and stability funds.
+#   - minterParams: Additional parameters for the Minter, ex. `stabilityFee`.
+class Universe:
+    def __init__(
+        self,
+        scenario,
+        harbingerValue = sp.nat(2 * 1000000), # $2
+        harbingerUpdateTime = sp.timestamp(0),
+        fundAdministratorAddress = Addresses.FUND_ADMINISTRATOR_ADDRESS,
+        **minterParams
+    ):
+        self.scenario = scenario
+
+        self.fakeHarbinger = FakeHarbinger.FakeHarbingerContract(
+            harbingerValue = harbingerValue,
+            harbingerUpdateTime = harbingerUpdateTime
+        )
+        scenario += self.fakeHarbinger
+
+        self.oracle = Oracle.OracleContract(harbingerContractAddress = self.fakeHarbinger.address)
+        self.token = Token.FA12()
+        self.ovenRegistry = OvenRegistry.OvenRegistryContract()
+        scenario += self.oracle
+        scenario += self.token
+        scenario += self.ovenRegistry
+
+        self.developerFund = DevFund.DevFundContract(
+            administratorContractAddress = fundAdministratorAddress,
+            tokenContractAddress = self.token.address
+        )
+        self.stabilityFund = StabilityFund.StabilityFundContract(
+            administratorContractAddress = fundAdministratorAddress,
+            ovenRegistryContractAddress = self.ovenRegistry.address,
+            tokenContractAddress = self.token.address
+        )
+        self.ovenProxy = OvenProxy.OvenProxyContract(
+            ovenRegistryContractAddress = self.ovenRegistry.address,
+            oracleContractAddress = self.oracle.address
+        )
+        scenario += self.developerFund
+        scenario += self.stabilityFund
+        scenario += self.ovenProxy
+
+        self.minter = Minter.MinterContract(
+            tokenContractAddress = self.token.address,
+            ovenProxyContractAddress = self.ovenProxy.address,
+            stabilityFundContractAddress = self.stabilityFund.address,
+            developerFundContractAddress = self.developerFund.address,
+            **minterParams
+        )
+        scenario += self.minter
+
+        self.ovenFactory = OvenFactory.OvenFactoryContract(
+            ovenRegistryContractAddress = self.ovenRegistry.address,
+            ovenProxyContractAddress = self.ovenProxy.address,
+            minterContractAddress = self.minter.address
+        )
+        scenario += self.ovenFactory
+
+        # Close the cycles.
+        scenario += self.ovenProxy.setMinterContract(self.minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
+        scenario += self.token.setAdministrator(self.minter.address).run(sender = Addresses.GOVERNOR_ADDRESS)
+        scenario += self.ovenRegistry.setOvenFactoryContract(self.ovenFactory.address).run(sender = Addresses.GOVERNOR_ADDRESS)
+
+    # Originate an oven owned by `owner` and register it, as the OvenFactory would.
+    #
+    # Params:
+    #   - owner: The address of the owner.
+    #   - ovenParams: Additional parameters for the Oven, ex. `borrowedTokens`.
+    def makeOven(self, owner, **ovenParams):
+        oven = Oven.OvenContract(
+            owner = owner,
+            ovenProxyContractAddress = self.ovenProxy.address,
+            **ovenParams
+        )
+        self.scenario += self.ovenRegistry.addOven((oven.address, owner)).run(sender = self.ovenFactory.address)
+        self.scenario += oven
+        return oven
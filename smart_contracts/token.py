@@ -12,6 +12,9 @@ Errors = sp.import_script_from_url("file:common/errors.py")
 # CHANGED: Import address helpers
 Addresses = sp.import_script_from_url("file:test-helpers/addresses.py")
 
+# CHANGED: Import event definitions
+Events = sp.import_script_from_url("file:common/events.py")
+
 # CHANGED: Define a constant for the empty string in the metadata bigmap
 METADATA_KEY = ""
 
@@ -71,11 +74,32 @@ class FA12_core(sp.Contract):
                  (self.data.balances[params.from_].approvals[sp.sender] >= params.value))), Errors.TOKEN_NO_TRANSFER_PERMISSION)
         self.addAddressIfNecessary(params.to_)
         sp.verify(self.data.balances[params.from_].balance >= params.value, Errors.TOKEN_INSUFFICIENT_BALANCE)
+
+        # CHANGED: Record balances before the transfer for the event.
+        fromBalanceBefore = sp.local("fromBalanceBefore", self.data.balances[params.from_].balance)
+        toBalanceBefore = sp.local("toBalanceBefore", self.data.balances[params.to_].balance)
+
         self.data.balances[params.from_].balance = sp.as_nat(self.data.balances[params.from_].balance - params.value)
         self.data.balances[params.to_].balance += params.value
         sp.if (params.from_ != sp.sender) & (~self.is_administrator(sp.sender)):
             self.data.balances[params.from_].approvals[sp.sender] = sp.as_nat(self.data.balances[params.from_].approvals[sp.sender] - params.value)
 
+        # CHANGED: Emit a transfer event.
+        transferEvent = sp.record(
+            from_ = params.from_,
+            to_ = params.to_,
+            value = params.value,
+            fromBalanceBefore = fromBalanceBefore.value,
+            fromBalanceAfter = self.data.balances[params.from_].balance,
+            toBalanceBefore = toBalanceBefore.value,
+            toBalanceAfter = self.data.balances[params.to_].balance
+        )
+        self.emitEvent(Events.TRANSFER_EVENT_TAG, sp.set_type_expr(transferEvent, Events.TRANSFER_EVENT_TYPE))
+
+    # CHANGED: Add a helper to emit events. Scenarios override this to record events, see `test-helpers/event-recorder.py`.
+    def emitEvent(self, tag, event):
+        sp.emit(event, tag = tag)
+
     @sp.entry_point
     def approve(self, params):
         sp.set_type(params, sp.TRecord(spender = sp.TAddress, value = sp.TNat).layout(("spender", "value")))
@@ -115,20 +139,48 @@ class FA12_mint_burn(FA12_core):
         sp.set_type(params, sp.TRecord(address = sp.TAddress, value = sp.TNat))
         sp.verify(self.is_administrator(sp.sender), Errors.TOKEN_NOT_ADMINISTRATOR)
         self.addAddressIfNecessary(params.address)
+
+        # CHANGED: Record balances before the mint for the event.
+        balanceBefore = sp.local("balanceBefore", self.data.balances[params.address].balance)
+        totalSupplyBefore = sp.local("totalSupplyBefore", self.data.totalSupply)
+
         self.data.balances[params.address].balance += params.value
         self.data.totalSupply += params.value
 
         # CHANGED: Verify that the debt ceiling is not passed.
         sp.verify(self.data.totalSupply <= self.data.debtCeiling, Errors.DEBT_CEILING)
 
+        # CHANGED: Emit a mint event.
+        self.emitSupplyEvent(Events.MINT_EVENT_TAG, params.address, params.value, balanceBefore.value, totalSupplyBefore.value)
+
     @sp.entry_point
     def burn(self, params):
         sp.set_type(params, sp.TRecord(address = sp.TAddress, value = sp.TNat))
         sp.verify(self.is_administrator(sp.sender), Errors.TOKEN_NOT_ADMINISTRATOR)
         sp.verify(self.data.balances[params.address].balance >= params.value, Errors.TOKEN_INSUFFICIENT_BALANCE)
+
+        # CHANGED: Record balances before the burn for the event.
+        balanceBefore = sp.local("balanceBefore", self.data.balances[params.address].balance)
+        totalSupplyBefore = sp.local("totalSupplyBefore", self.data.totalSupply)
+
         self.data.balances[params.address].balance = sp.as_nat(self.data.balances[params.address].balance - params.value)
         self.data.totalSupply = sp.as_nat(self.data.totalSupply - params.value)
 
+        # CHANGED: Emit a burn event.
+        self.emitSupplyEvent(Events.BURN_EVENT_TAG, params.address, params.value, balanceBefore.value, totalSupplyBefore.value)
+
+    # CHANGED: Add a helper to emit mint and burn events.
+    def emitSupplyEvent(self, tag, address, value, balanceBefore, totalSupplyBefore):
+        supplyEvent = sp.record(
+            address = address,
+            value = value,
+            balanceBefore = balanceBefore,
+            balanceAfter = self.data.balances[address].balance,
+            totalSupplyBefore = totalSupplyBefore,
+            totalSupplyAfter = self.data.totalSupply
+        )
+        self.emitEvent(tag, sp.set_type_expr(supplyEvent, Events.SUPPLY_EVENT_TYPE))
+
 class FA12_administrator(FA12_core):
     def is_administrator(self, sender):
         return sender == self.data.administrator
@@ -347,6 +399,124 @@ if __name__ == "__main__":
             valid = False
         )
 
+    ################################################################
+    # Events
+    ################################################################
+
+    EventRecorder = sp.import_script_from_url("file:test-helpers/event-recorder.py")
+
+    # A Token which records the last event it emits.
+    EventRecordingFA12 = EventRecorder.recordEvents(FA12)
+
+    @sp.add_test(name="mint - emits a mint event")
+    def test():
+        # GIVEN a Token contract with 10 tokens held by a token holder
+        scenario = sp.test_scenario()
+
+        token = EventRecordingFA12(
+            admin = Addresses.GOVERNOR_ADDRESS
+        )
+        scenario += token
+
+        tokenHolder = Dummy.DummyContract()
+        scenario += tokenHolder
+
+        scenario += token.mint(sp.record(address = tokenHolder.address, value = 10)).run(
+            sender = Addresses.GOVERNOR_ADDRESS,
+        )
+
+        # WHEN 5 more tokens are minted to the token holder
+        scenario += token.mint(sp.record(address = tokenHolder.address, value = 5)).run(
+            sender = Addresses.GOVERNOR_ADDRESS,
+        )
+
+        # THEN a mint event is emitted with the balance and total supply before and after.
+        EventRecorder.verifyLastEvent(scenario, token, Events.MINT_EVENT_TAG, sp.set_type_expr(
+            sp.record(
+                address = tokenHolder.address,
+                value = 5,
+                balanceBefore = 10,
+                balanceAfter = 15,
+                totalSupplyBefore = 10,
+                totalSupplyAfter = 15
+            ),
+            Events.SUPPLY_EVENT_TYPE
+        ))
+
+    @sp.add_test(name="burn - emits a burn event")
+    def test():
+        # GIVEN a Token contract with 10 tokens held by a token holder
+        scenario = sp.test_scenario()
+
+        token = EventRecordingFA12(
+            admin = Addresses.GOVERNOR_ADDRESS
+        )
+        scenario += token
+
+        tokenHolder = Dummy.DummyContract()
+        scenario += tokenHolder
+
+        scenario += token.mint(sp.record(address = tokenHolder.address, value = 10)).run(
+            sender = Addresses.GOVERNOR_ADDRESS,
+        )
+
+        # WHEN 4 tokens are burned from the token holder
+        scenario += token.burn(sp.record(address = tokenHolder.address, value = 4)).run(
+            sender = Addresses.GOVERNOR_ADDRESS,
+        )
+
+        # THEN a burn event is emitted with the balance and total supply before and after.
+        EventRecorder.verifyLastEvent(scenario, token, Events.BURN_EVENT_TAG, sp.set_type_expr(
+            sp.record(
+                address = tokenHolder.address,
+                value = 4,
+                balanceBefore = 10,
+                balanceAfter = 6,
+                totalSupplyBefore = 10,
+                totalSupplyAfter = 6
+            ),
+            Events.SUPPLY_EVENT_TYPE
+        ))
+
+    @sp.add_test(name="transfer - emits a transfer event")
+    def test():
+        # GIVEN a Token contract
+        scenario = sp.test_scenario()
+
+        token = EventRecordingFA12(
+            admin = Addresses.GOVERNOR_ADDRESS
+        )
+        scenario += token
+
+        # AND a sender with 10 tokens and a receiver with 3 tokens
+        sender = sp.test_account("Sender")
+        receiver = sp.test_account("Receiver")
+        scenario += token.mint(sp.record(address = sender.address, value = 10)).run(
+            sender = Addresses.GOVERNOR_ADDRESS,
+        )
+        scenario += token.mint(sp.record(address = receiver.address, value = 3)).run(
+            sender = Addresses.GOVERNOR_ADDRESS,
+        )
+
+        # WHEN the sender transfers 4 tokens to the receiver
+        scenario += token.transfer(from_ = sender.address, to_ = receiver.address, value = 4).run(
+            sender = sender
+        )
+
+        # THEN a transfer event is emitted with both balances before and after.
+        EventRecorder.verifyLastEvent(scenario, token, Events.TRANSFER_EVENT_TAG, sp.set_type_expr(
+            sp.record(
+                from_ = sender.address,
+                to_ = receiver.address,
+                value = 4,
+                fromBalanceBefore = 10,
+                fromBalanceAfter = 6,
+                toBalanceBefore = 3,
+                toBalanceAfter = 7
+            ),
+            Events.TRANSFER_EVENT_TYPE
+        ))
+
     ################################################################
     # setDebtCeiling
     ################################################################
@@ -0,0 +1,319 @@
+################################################################
+# Batch oven health evaluation.
+#
+# Evaluates the Minter's `calculateNewAccruedInterest` and
+# `computeCollateralizationPercentage` for every oven at once with
+# numpy. Fixed point values at PRECISION = 10^18 overflow 64 bits,
+# so values are held as columns of 32 bit limbs and every operation
+# is exact: results are bit for bit those of `minter_math.py`,
+# including which ovens fail with `AS_NAT` or `DIVISION_BY_ZERO`.
+#
+# A limb array has shape (limbs, ovens), least significant limb
+# first. A single value has shape (limbs, 1) and broadcasts.
+#
+# Usage:
+#   health = batch_health.evaluateHealth(ovenBalances, borrowedTokens, stabilityFeeTokens, interestIndexes, minterInterestIndex, xtzPrice)
+#   batch_health.fromLimbs(health.collateralizationPercentage)
+################################################################
+
+import collections
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contract_constants import Constants
+from minter_math import AS_NAT_FAILURE, DIVISION_BY_ZERO
+
+PRECISION = Constants.PRECISION
+
+LIMB_BITS = 32
+LIMB_MASK = np.uint64((1 << LIMB_BITS) - 1)
+LIMB_SHIFT = np.uint64(LIMB_BITS)
+LIMB_BASE = float(1 << LIMB_BITS)
+
+# Quotient estimates are scaled down by this much so that float rounding can never overshoot the exact quotient.
+ESTIMATE_MARGIN = 1.0 - 2.0 ** -40
+
+################################################################
+# Limb Arithmetic
+################################################################
+
+# Convert natural numbers to a limb array.
+def toLimbs(values):
+    values = list(values)
+    limbCount = max([1] + [(value.bit_length() + LIMB_BITS - 1) // LIMB_BITS for value in values])
+    data = b"".join(value.to_bytes(4 * limbCount, "little") for value in values)
+    return np.frombuffer(data, dtype = "<u4").reshape(len(values), limbCount).T.astype(np.uint64)
+
+# Convert a limb array to a list of Python ints.
+def fromLimbs(limbs):
+    limbs = np.atleast_2d(limbs)
+    data = np.ascontiguousarray(limbs.T.astype("<u4")).tobytes()
+    width = 4 * limbs.shape[0]
+    return [int.from_bytes(data[start:start + width], "little") for start in range(0, len(data), width)]
+
+# Convert ints which may be negative, an existing limb array, or a (magnitude limbs, negative) pair such as a snapshot
+# column, to a limb array. Returns (limbs, negative) where negative values are replaced by zero and flagged.
+def naturals(values):
+    if isinstance(values, tuple):
+        limbs, negative = values
+        if negative.any():
+            limbs = np.where(negative, np.uint64(0), limbs)
+        return limbs, negative
+    if isinstance(values, np.ndarray):
+        return values, np.zeros(values.shape[1:], dtype = bool)
+    values = list(values)
+    negative = np.array([value < 0 for value in values], dtype = bool)
+    return toLimbs(max(value, 0) for value in values), negative
+
+def scalar(value):
+    return toLimbs([value])
+
+# Drop most significant limbs which are zero for every oven.
+def trim(limbs):
+    end = limbs.shape[0]
+    while end > 1 and not limbs[end - 1].any():
+        end -= 1
+    return limbs[:end]
+
+def pad(limbs, limbCount):
+    if limbs.shape[0] == limbCount:
+        return limbs
+    padded = np.zeros((limbCount,) + limbs.shape[1:], dtype = np.uint64)
+    padded[:limbs.shape[0]] = limbs
+    return padded
+
+def operands(a, b):
+    shape = np.broadcast_shapes(a.shape[1:], b.shape[1:])
+    limbCount = max(a.shape[0], b.shape[0])
+    return pad(a, limbCount), pad(b, limbCount), limbCount, shape
+
+# Propagate carries of limbs which hold more than LIMB_BITS bits.
+def normalize(limbs):
+    carry = np.zeros(limbs.shape[1:], dtype = np.uint64)
+    for index in range(limbs.shape[0]):
+        limb = limbs[index]
+        limb += carry
+        np.right_shift(limb, LIMB_SHIFT, out = carry)
+        limb &= LIMB_MASK
+    return trim(limbs)
+
+def add(a, b):
+    a, b, limbCount, shape = operands(a, b)
+    total = np.zeros((limbCount + 1,) + shape, dtype = np.uint64)
+    np.add(a, b, out = total[:limbCount])
+    return normalize(total)
+
+# Returns (a - b, negative). Where the difference is negative its limbs are meaningless.
+def subtract(a, b):
+    a, b, limbCount, shape = operands(a, b)
+    difference = np.zeros((limbCount,) + shape, dtype = np.uint64)
+    borrow = np.zeros(shape, dtype = np.uint64)
+    for index in range(limbCount):
+        total = a[index] + np.uint64(1 << LIMB_BITS) - b[index] - borrow
+        difference[index] = total & LIMB_MASK
+        borrow = np.uint64(1) - (total >> LIMB_SHIFT)
+    return trim(difference), borrow.astype(bool)
+
+def multiply(a, b):
+    shape = np.broadcast_shapes(a.shape[1:], b.shape[1:])
+    product = np.zeros((a.shape[0] + b.shape[0],) + shape, dtype = np.uint64)
+    partial = np.empty(shape, dtype = np.uint64)
+    for i in range(a.shape[0]):
+        for j in range(b.shape[0]):
+            np.multiply(a[i], b[j], out = partial)
+            product[i + j + 1] += partial >> LIMB_SHIFT
+            partial &= LIMB_MASK
+            product[i + j] += partial
+    return normalize(product)
+
+def lessThan(a, b):
+    a, b, limbCount, shape = operands(a, b)
+    result = np.zeros(shape, dtype = bool)
+    decided = np.zeros(shape, dtype = bool)
+    for index in reversed(range(limbCount)):
+        result |= ~decided & (a[index] < b[index])
+        decided |= a[index] != b[index]
+    return result
+
+def isZero(limbs):
+    return ~limbs.any(axis = 0)
+
+# Zero out the values of ovens where `mask` is set.
+def where(mask, limbs):
+    return limbs * (~mask).astype(np.uint64)
+
+def toFloat(limbs):
+    value = np.zeros(limbs.shape[1:])
+    for index in reversed(range(limbs.shape[0])):
+        value = value * LIMB_BASE + limbs[index]
+    return value
+
+# Convert non negative, integer valued floats to a limb array exactly.
+def fromFloat(values):
+    mantissa, exponent = np.frexp(values)
+    significand = np.ldexp(mantissa, 53).astype(np.uint64)
+    shift = exponent.astype(np.int64) - 53
+
+    limbCount = max(1, (int(exponent.max()) + LIMB_BITS - 1) // LIMB_BITS)
+    limbs = np.zeros((limbCount,) + values.shape, dtype = np.uint64)
+    for index in range(limbCount):
+        # Bits of the significand which land in this limb.
+        offset = LIMB_BITS * index - shift
+        right = significand >> np.clip(offset, 0, 63).astype(np.uint64)
+        left = significand << np.clip(-offset, 0, 63).astype(np.uint64)
+        limb = np.where(offset >= 0, right, left) & LIMB_MASK
+        limbs[index] = np.where((offset < 64) & (offset > -LIMB_BITS), limb, 0)
+    return limbs
+
+# Returns a // divisor for a positive int divisor.
+#
+# Powers of two are shifted out, and an odd part below 2 ** 47 is divided 16 bits at a time with a remainder that
+# fits in 64 bits, which is much cheaper than `floorDivide`.
+def floorDivideScalar(a, divisor):
+    twos = (divisor & -divisor).bit_length() - 1
+    oddPart = divisor >> twos
+    if oddPart >= 1 << 47:
+        return floorDivide(a, scalar(divisor))[0]
+
+    a = shiftRight(a, twos)
+    oddPart = np.uint64(oddPart)
+    quotient = np.zeros(a.shape, dtype = np.uint64)
+    remainder = np.zeros(a.shape[1:], dtype = np.uint64)
+    for index in reversed(range(a.shape[0])):
+        for half in [np.uint64(16), np.uint64(0)]:
+            current = (remainder << np.uint64(16)) | ((a[index] >> half) & np.uint64(0xFFFF))
+            digit = current // oddPart
+            remainder = current - digit * oddPart
+            quotient[index] |= digit << half
+    return trim(quotient)
+
+def shiftRight(limbs, bits):
+    limbShift, bitShift = divmod(bits, LIMB_BITS)
+    limbs = limbs[limbShift:] if limbShift < limbs.shape[0] else np.zeros((1,) + limbs.shape[1:], dtype = np.uint64)
+    if bitShift == 0:
+        return limbs
+    shifted = limbs >> np.uint64(bitShift)
+    shifted[:-1] |= (limbs[1:] << np.uint64(LIMB_BITS - bitShift)) & LIMB_MASK
+    return trim(shifted)
+
+# Returns (a // b, divisionByZero). Where the divisor is zero the quotient is meaningless.
+#
+# Quotients are estimated in floating point and refined against the exact remainder, so each pass gains about 40
+# bits of quotient regardless of the size of the divisor.
+def floorDivide(a, b):
+    shape = np.broadcast_shapes(a.shape[1:], b.shape[1:])
+    divisionByZero = isZero(b)
+    b = b.copy()
+    b[0] |= divisionByZero.astype(np.uint64)
+
+    divisor = toFloat(b)
+    quotient = np.zeros((1,) + shape, dtype = np.uint64)
+    remainder = np.broadcast_to(a, (a.shape[0],) + shape)
+    while True:
+        estimate = np.floor(toFloat(remainder) / divisor * ESTIMATE_MARGIN)
+        if not estimate.any():
+            break
+        estimate = fromFloat(estimate)
+        remainder, _ = subtract(remainder, multiply(estimate, b))
+        quotient = add(quotient, estimate)
+
+    # The estimates never overshoot, so the remainder is short of at most a few divisors.
+    while True:
+        excess = ~lessThan(remainder, b)
+        if not excess.any():
+            break
+        step = excess.astype(np.uint64)[None]
+        remainder, _ = subtract(remainder, multiply(b, step))
+        quotient = add(quotient, step)
+
+    return quotient, divisionByZero
+
+################################################################
+# Minter Math
+################################################################
+
+# The first failure of each oven, or None.
+class Failures:
+    def __init__(self, shape):
+        self.codes = np.full(shape, None, dtype = object)
+
+    def record(self, mask, code):
+        self.codes[np.asarray(mask) & np.equal(self.codes, None)] = code
+
+    @property
+    def failed(self):
+        return ~np.equal(self.codes, None)
+
+Health = collections.namedtuple("Health", ["stabilityFeeTokens", "totalOutstandingTokens", "collateralizationPercentage", "failures"])
+
+# Stability fee tokens of each oven including fees accrued up to `minterInterestIndex`, like `borrow` in `minter.py`.
+def accrueStabilityFees(borrowedTokens, stabilityFeeTokens, interestIndexes, minterInterestIndex, failures):
+    interestIndexes, negativeIndexes = naturals(interestIndexes)
+    failures.record(negativeIndexes, AS_NAT_FAILURE)
+
+    ratio, divisionByZero = floorDivide(multiply(scalar(minterInterestIndex), scalar(PRECISION)), interestIndexes)
+    failures.record(divisionByZero, DIVISION_BY_ZERO)
+
+    totalPrinciple = add(borrowedTokens, stabilityFeeTokens)
+    newTotalTokens = floorDivideScalar(multiply(ratio, totalPrinciple), PRECISION)
+    accrued, negative = subtract(newTotalTokens, totalPrinciple)
+    failures.record(negative, AS_NAT_FAILURE)
+
+    return add(stabilityFeeTokens, where(failures.failed, accrued))
+
+# Collateralization percentage of each oven, like `computeCollateralizationPercentage` in `minter.py`.
+def computeCollateralizationPercentages(ovenBalances, xtzPrice, totalOutstandingTokens, failures):
+    collateralValue = floorDivideScalar(multiply(ovenBalances, scalar(xtzPrice)), PRECISION)
+    ratio, divisionByZero = floorDivide(multiply(collateralValue, scalar(PRECISION)), totalOutstandingTokens)
+    failures.record(divisionByZero, DIVISION_BY_ZERO)
+    return multiply(ratio, scalar(100))
+
+# Evaluate the debt and collateralization of ovens at a Minter interest index and an oracle price.
+#
+# Params:
+#   - ovenBalances: Balances in kolibri precision, ie. mutez * MUTEZ_TO_KOLIBRI_CONVERSION, as ints or a limb array.
+#   - borrowedTokens, stabilityFeeTokens, interestIndexes: Oven storage, as ints or limb arrays.
+#   - minterInterestIndex: The Minter's compounded interest index.
+#   - xtzPrice: The price passed to the Minter, ie. the Harbinger price * MUTEZ_TO_KOLIBRI_CONVERSION.
+#
+# Returns a `Health` of limb arrays, with the first failure of each oven in `failures.codes`. Values of ovens which
+# failed are meaningless.
+def evaluateHealth(ovenBalances, borrowedTokens, stabilityFeeTokens, interestIndexes, minterInterestIndex, xtzPrice):
+    ovenBalances, _ = naturals(ovenBalances)
+    borrowedTokens, _ = naturals(borrowedTokens)
+    stabilityFeeTokens, negativeFees = naturals(stabilityFeeTokens)
+
+    failures = Failures(negativeFees.shape)
+    failures.record(negativeFees, AS_NAT_FAILURE)
+
+    newStabilityFeeTokens = accrueStabilityFees(borrowedTokens, stabilityFeeTokens, interestIndexes, minterInterestIndex, failures)
+    totalOutstandingTokens = add(borrowedTokens, newStabilityFeeTokens)
+    collateralizationPercentage = computeCollateralizationPercentages(ovenBalances, xtzPrice, totalOutstandingTokens, failures)
+    return Health(newStabilityFeeTokens, totalOutstandingTokens, collateralizationPercentage, failures)
+
+# Ovens which `liquidate` would accept: healthy math and a collateralization below `minimumCollateralizationPercentage`.
+def liquidatable(health, minimumCollateralizationPercentage, isLiquidated = None):
+    result = ~health.failures.failed & lessThan(health.collateralizationPercentage, scalar(minimumCollateralizationPercentage))
+    if isLiquidated is not None:
+        result &= ~np.asarray(isLiquidated, dtype = bool)
+    return result
+
+# Ovens which `liquidate` would accept at `xtzPrice`, without computing collateralization percentages.
+#
+# floor(collateralValue * PRECISION / total) * 100 < minimum exactly when
+# collateralValue * PRECISION < ceil(minimum / 100) * total, so no division by a per oven value is needed. This is
+# the check to run on every price tick once `totalOutstandingTokens` is known.
+def liquidatableAtPrice(ovenBalances, totalOutstandingTokens, xtzPrice, minimumCollateralizationPercentage, isLiquidated = None):
+    ovenBalances, _ = naturals(ovenBalances)
+    totalOutstandingTokens, _ = naturals(totalOutstandingTokens)
+
+    collateralValue = floorDivideScalar(multiply(ovenBalances, scalar(xtzPrice)), PRECISION)
+    threshold = scalar(-(-minimumCollateralizationPercentage // 100))
+    result = ~isZero(totalOutstandingTokens) & lessThan(multiply(collateralValue, scalar(PRECISION)), multiply(threshold, totalOutstandingTokens))
+    if isLiquidated is not None:
+        result &= ~np.asarray(isLiquidated, dtype = bool)
+    return result
@@ -0,0 +1,215 @@
+################################################################
+# Incremental, parallel build of SmartPy contracts.
+#
+# Each target is a SmartPy file which is tested and, if it has an
+# invocation, compiled to `<name>.tz`. The CLI only compiles
+# contracts registered with `sp.add_compilation_target`, so a copy
+# of the file registering its invocation under the target's name is
+# compiled instead of the file itself. A target is fingerprinted
+# by hashing its source, the sources of everything it imports with
+# `sp.import_script_from_url("file:...")` (transitively), its
+# invocation, and the SmartPy CLI installation. Targets whose
+# fingerprint matches the cache and whose artifact exists are
+# skipped. The rest are built in parallel.
+#
+# Usage:
+#   python3 tools/build.py --cli ~/smartpy-cli/SmartPy.sh [--jobs N] [--force] NAME=INVOCATION...
+#
+# An empty invocation (`end-to-end-tests=`) only runs the file's tests.
+################################################################
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+IMPORT_REGEX = re.compile(r'sp\.import_script_from_url\(\s*"file:([^"]+)"\s*\)')
+
+# Bump to invalidate every cached fingerprint when the build itself changes.
+BUILD_VERSION = "2"
+
+DEFAULT_CACHE_DIR = ".build-cache"
+DEFAULT_OUT_DIR = ".smartpy_out"
+MANIFEST_FILE = "manifest.json"
+
+# Where the CLI writes the Michelson of a compilation target, relative to the compile output directory.
+COMPILED_CONTRACT = os.path.join("{name}", "step_000_cont_0_contract.tz")
+
+################################################################
+# Fingerprints
+################################################################
+
+# Files imported by a SmartPy file, as normalized paths relative to the source root.
+def directImports(path, root):
+    with open(os.path.join(root, path)) as f:
+        return [os.path.normpath(imported) for imported in IMPORT_REGEX.findall(f.read())]
+
+# All files a SmartPy file depends on, including itself, in sorted order.
+def transitiveImports(path, root):
+    seen = set()
+    pending = [os.path.normpath(path)]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        pending.extend(directImports(current, root))
+    return sorted(seen)
+
+# Fingerprint of a SmartPy CLI: its resolved path and the relative path, size and modification time of every file in
+# its installation directory. Reinstalling or upgrading the CLI rewrites its files, so this identifies the version
+# without reading the installation on every build.
+def cliFingerprint(cli):
+    path = os.path.realpath(shutil.which(cli) or cli)
+    if not os.path.isfile(path):
+        raise ValueError("SmartPy CLI not found at {}".format(cli))
+
+    installDir = os.path.dirname(path)
+    digest = hashlib.sha256(path.encode())
+    for directory, subdirectories, files in os.walk(installDir):
+        subdirectories.sort()
+        for name in sorted(files):
+            filePath = os.path.join(directory, name)
+            stat = os.stat(filePath)
+            digest.update("\0{}\0{}\0{}".format(os.path.relpath(filePath, installDir), stat.st_size, stat.st_mtime_ns).encode())
+    return digest.hexdigest()
+
+def fingerprint(path, invocation, root, cliDigest = ""):
+    digest = hashlib.sha256()
+    digest.update(BUILD_VERSION.encode())
+    digest.update(b"\0" + cliDigest.encode())
+    digest.update(b"\0" + (invocation or "").encode())
+    for dependency in transitiveImports(path, root):
+        with open(os.path.join(root, dependency), "rb") as f:
+            digest.update(b"\0" + dependency.encode() + b"\0" + f.read())
+    return digest.hexdigest()
+
+################################################################
+# Cache
+################################################################
+
+def loadManifest(cacheDir):
+    try:
+        with open(os.path.join(cacheDir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def saveManifest(cacheDir, manifest):
+    os.makedirs(cacheDir, exist_ok = True)
+    with open(os.path.join(cacheDir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent = 2, sort_keys = True)
+        f.write("\n")
+
+class Target:
+    def __init__(self, name, invocation, root, cliDigest = ""):
+        self.name = name
+        self.invocation = invocation or None
+        self.source = name + ".py"
+        self.artifact = name + ".tz" if self.invocation else None
+        self.fingerprint = fingerprint(self.source, self.invocation, root, cliDigest)
+
+    def isFresh(self, manifest, root):
+        if manifest.get(self.name) != self.fingerprint:
+            return False
+        return self.artifact is None or os.path.exists(os.path.join(root, self.artifact))
+
+# Parse a NAME=INVOCATION target. `cliDigest` is the `cliFingerprint` of the CLI it will be built with.
+def parseTarget(spec, root, cliDigest = ""):
+    name, separator, invocation = spec.partition("=")
+    if not separator:
+        raise ValueError("Target must be NAME=INVOCATION, got {!r}".format(spec))
+    if not os.path.exists(os.path.join(root, name + ".py")):
+        raise ValueError("{}.py not found. Running from wrong dir?".format(name))
+    return Target(name, invocation, root, cliDigest)
+
+################################################################
+# Build
+################################################################
+
+# The source of a target with its invocation registered as a compilation target named after it.
+def compilationScript(target, root):
+    with open(os.path.join(root, target.source)) as f:
+        source = f.read()
+    return "{}\nsp.add_compilation_target({}, {})\n".format(source, json.dumps(target.name), target.invocation)
+
+# Test and compile a single target in its own output directory. Returns (target, succeeded, seconds, log).
+def buildTarget(target, cli, outDir, root):
+    start = time.monotonic()
+    targetOutDir = os.path.join(outDir, target.name)
+    commands = [[cli, "test", target.source, os.path.join(targetOutDir, "test")]]
+    if target.invocation is not None:
+        # Imports are resolved from the working directory, so the copy can live in the output directory.
+        script = os.path.join(targetOutDir, target.source)
+        os.makedirs(os.path.join(root, targetOutDir), exist_ok = True)
+        with open(os.path.join(root, script), "w") as f:
+            f.write(compilationScript(target, root))
+        commands.append([cli, "compile", script, os.path.join(targetOutDir, "compile")])
+
+    log = []
+    for command in commands:
+        result = subprocess.run(command, cwd = root, stdout = subprocess.PIPE, stderr = subprocess.STDOUT, text = True)
+        log.append("$ " + " ".join(command) + "\n" + result.stdout)
+        if result.returncode != 0:
+            return target, False, time.monotonic() - start, "".join(log)
+
+    if target.artifact is not None:
+        compiled = os.path.join(root, targetOutDir, "compile", COMPILED_CONTRACT.format(name = target.name))
+        shutil.copyfile(compiled, os.path.join(root, target.artifact))
+
+    return target, True, time.monotonic() - start, "".join(log)
+
+# Build every stale target. Returns True if all targets are up to date afterwards.
+def build(targets, cli, root, jobs = None, force = False, cacheDir = DEFAULT_CACHE_DIR, outDir = DEFAULT_OUT_DIR):
+    cachePath = os.path.join(root, cacheDir)
+    manifest = loadManifest(cachePath)
+
+    stale = [target for target in targets if force or not target.isFresh(manifest, root)]
+    for target in targets:
+        if target not in stale:
+            print(">> {}: up to date".format(target.name))
+
+    succeeded = True
+    with ThreadPoolExecutor(max_workers = jobs or os.cpu_count()) as executor:
+        futures = [executor.submit(buildTarget, target, cli, outDir, root) for target in stale]
+        for future in futures:
+            target, ok, seconds, log = future.result()
+            if ok:
+                print(">> {}: built in {:.1f}s".format(target.name, seconds))
+                # Record progress as soon as a target succeeds, so an interrupted build keeps it.
+                manifest[target.name] = target.fingerprint
+                saveManifest(cachePath, manifest)
+            else:
+                succeeded = False
+                print(">> {}: FAILED after {:.1f}s".format(target.name, seconds))
+                print(log)
+
+    shutil.rmtree(os.path.join(root, outDir), ignore_errors = True)
+    return succeeded
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Incrementally test and compile SmartPy contracts in parallel.")
+    parser.add_argument("targets", nargs = "+", help = "NAME=INVOCATION, with an empty invocation to only run tests")
+    parser.add_argument("--cli", required = True, help = "Path to SmartPy.sh")
+    parser.add_argument("--jobs", type = int, default = None, help = "Number of parallel builds. Defaults to the CPU count")
+    parser.add_argument("--force", action = "store_true", help = "Rebuild every target regardless of the cache")
+    parser.add_argument("--root", default = ".", help = "Directory containing the SmartPy sources")
+    args = parser.parse_args(argv)
+
+    try:
+        cliDigest = cliFingerprint(args.cli)
+        targets = [parseTarget(spec, args.root, cliDigest) for spec in args.targets]
+    except (ValueError, OSError) as e:
+        print("Fatal: {}".format(e), file = sys.stderr)
+        return 1
+
+    return 0 if build(targets, args.cli, args.root, jobs = args.jobs, force = args.force) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
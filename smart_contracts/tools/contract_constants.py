@@ -0,0 +1,48 @@
+################################################################
+# Error codes and constants of the SmartPy contracts, for tools
+# written in plain Python.
+#
+# Values are read from `common/errors.py` and `common/constants.py`
+# rather than copied, so tools cannot drift from the contracts.
+# Only literal values (and `sp.nat(...)` / `sp.int(...)` wrapped
+# literals) are read; SmartPy types are skipped.
+################################################################
+
+import ast
+import os
+import types
+
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LITERAL_WRAPPERS = {"nat", "int", "string"}
+
+def literalValue(node):
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = literalValue(node.operand)
+        return -value if isinstance(value, int) else None
+    isWrapper = (
+        isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and
+        isinstance(node.func.value, ast.Name) and node.func.value.id == "sp" and
+        node.func.attr in LITERAL_WRAPPERS and len(node.args) == 1
+    )
+    return literalValue(node.args[0]) if isWrapper else None
+
+# Read the top level literal assignments of a SmartPy source file.
+def loadLiterals(path):
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+
+    values = {}
+    for statement in tree.body:
+        if not isinstance(statement, ast.Assign) or len(statement.targets) != 1:
+            continue
+        target = statement.targets[0]
+        value = literalValue(statement.value)
+        if isinstance(target, ast.Name) and value is not None:
+            values[target.id] = value
+    return types.SimpleNamespace(**values)
+
+Errors = loadLiterals(os.path.join(SOURCE_ROOT, "common", "errors.py"))
+Constants = loadLiterals(os.path.join(SOURCE_ROOT, "common", "constants.py"))
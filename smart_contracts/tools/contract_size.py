@@ -0,0 +1,182 @@
+################################################################
+# Contract size report and budget guard for compiled `.tz` files.
+#
+# Reports, per contract and per entry point, the number of
+# Michelson instructions and the binary-encoded size in bytes.
+# With a budget file, fails if a contract grew past its budget or
+# has no budget.
+#
+# Usage:
+#   python3 tools/contract_size.py [--budget size-budget.json] [--update-budget] [--json] FILE.tz...
+################################################################
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import michelson
+
+# Code outside of every entry point, such as lambdas and the dispatch on the parameter.
+COMMON_ENTRY_POINT = "(common)"
+
+# Growth allowed over the budget, in percent, if the budget file does not specify one.
+DEFAULT_TOLERANCE_PERCENT = 0
+
+################################################################
+# Measurement
+################################################################
+
+# Build a tree of entry points from a parameter type. Leaves are entry point names, nodes are (left, right) pairs.
+def entryPointTree(parameterType):
+    fieldAnnotations = [annot[1:] for annot in parameterType.annots if annot.startswith("%")]
+    isOr = isinstance(parameterType, michelson.Prim) and parameterType.name == "or"
+    if not isOr or fieldAnnotations:
+        return fieldAnnotations[0] if fieldAnnotations else "default"
+    return (entryPointTree(parameterType.args[0]), entryPointTree(parameterType.args[1]))
+
+def entryPointNames(tree):
+    if isinstance(tree, str):
+        return [tree]
+    return entryPointNames(tree[0]) + entryPointNames(tree[1])
+
+# Find the first IF_LEFT among the instructions of a sequence, without descending into branches.
+def findDispatch(node):
+    if isinstance(node, michelson.Seq):
+        for item in node.items:
+            found = findDispatch(item)
+            if found is not None:
+                return found
+    elif isinstance(node, michelson.Prim) and node.name == "IF_LEFT":
+        return node
+    return None
+
+# Attribute each branch of the parameter dispatch to the entry point it handles.
+def attributeEntryPoints(tree, code, result):
+    if isinstance(tree, str):
+        result[tree] = code
+        return
+
+    dispatch = findDispatch(code)
+    if dispatch is None:
+        # The dispatch was compiled in an unexpected shape. Attribute the code to the entry points together.
+        result[",".join(entryPointNames(tree))] = code
+        return
+
+    attributeEntryPoints(tree[0], dispatch.args[0], result)
+    attributeEntryPoints(tree[1], dispatch.args[1], result)
+
+def measure(node):
+    return {
+        "instructions": michelson.countInstructions(node),
+        "bytes": len(michelson.encode(node)),
+    }
+
+# Measure a compiled contract.
+def measureContract(text):
+    script = michelson.expand(michelson.parseScript(text))
+    code = michelson.getSection(script, "code")
+
+    branches = {}
+    attributeEntryPoints(entryPointTree(michelson.getSection(script, "parameter")), code, branches)
+    entryPoints = { name: measure(branch) for name, branch in branches.items() }
+
+    codeSize = measure(code)
+    entryPoints[COMMON_ENTRY_POINT] = {
+        metric: codeSize[metric] - sum(entryPoint[metric] for entryPoint in entryPoints.values())
+        for metric in codeSize
+    }
+
+    return {
+        "instructions": codeSize["instructions"],
+        "bytes": len(michelson.encode(script)),
+        "entryPoints": entryPoints,
+    }
+
+def contractName(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+################################################################
+# Budget
+################################################################
+
+# Compare measurements to the budget. Returns a list of human readable violations. A contract without a budget is a
+# violation, so new contracts cannot skip the check.
+def checkBudget(report, budget):
+    tolerance = budget.get("tolerancePercent", DEFAULT_TOLERANCE_PERCENT)
+    violations = []
+    for name, contract in report.items():
+        contractBudget = budget.get("contracts", {}).get(name)
+        if contractBudget is None:
+            violations.append("{}: no budget, add one with --update-budget".format(name))
+            continue
+        for metric in ("bytes", "instructions"):
+            limit = contractBudget[metric] * (100 + tolerance) / 100
+            if contract[metric] > limit:
+                violations.append("{}: {} {} exceeds budget {} (+{}%)".format(
+                    name, metric, contract[metric], contractBudget[metric], tolerance
+                ))
+    return violations
+
+def updateBudget(report, budget):
+    contracts = budget.setdefault("contracts", {})
+    for name, contract in report.items():
+        contracts[name] = { "bytes": contract["bytes"], "instructions": contract["instructions"] }
+    return budget
+
+################################################################
+# Output
+################################################################
+
+def formatReport(report, budget):
+    budgets = budget.get("contracts", {}) if budget is not None else {}
+    lines = ["{:<40} {:>14} {:>12} {:>14}".format("Contract / Entry Point", "Instructions", "Bytes", "Budget (bytes)")]
+    for name, contract in sorted(report.items()):
+        contractBudget = budgets.get(name)
+        lines.append("{:<40} {:>14} {:>12} {:>14}".format(
+            name, contract["instructions"], contract["bytes"], contractBudget["bytes"] if contractBudget else "-"
+        ))
+        for entryPoint, size in sorted(contract["entryPoints"].items()):
+            lines.append("  {:<38} {:>14} {:>12}".format(entryPoint, size["instructions"], size["bytes"]))
+    return "\n".join(lines)
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Report the size of compiled Michelson contracts.")
+    parser.add_argument("files", nargs = "+", help = "Compiled .tz files")
+    parser.add_argument("--budget", help = "JSON file with the size budget of each contract")
+    parser.add_argument("--update-budget", action = "store_true", help = "Write current sizes to the budget file")
+    parser.add_argument("--json", action = "store_true", help = "Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for path in args.files:
+        with open(path) as f:
+            report[contractName(path)] = measureContract(f.read())
+
+    budget = None
+    if args.budget is not None and os.path.exists(args.budget):
+        with open(args.budget) as f:
+            budget = json.load(f)
+
+    if args.update_budget:
+        if args.budget is None:
+            parser.error("--update-budget requires --budget")
+        budget = updateBudget(report, budget if budget is not None else { "tolerancePercent": DEFAULT_TOLERANCE_PERCENT })
+        with open(args.budget, "w") as f:
+            json.dump(budget, f, indent = 2, sort_keys = True)
+            f.write("\n")
+
+    print(json.dumps(report, indent = 2, sort_keys = True) if args.json else formatReport(report, budget))
+
+    if budget is not None and not args.update_budget:
+        violations = checkBudget(report, budget)
+        for violation in violations:
+            print("Over budget: {}".format(violation), file = sys.stderr)
+        if violations:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,651 @@
+################################################################
+# Block stream indexer for ovens and kUSD balances.
+#
+# Reads blocks in order from a node RPC or a directory of recorded
+# blocks, decodes the applied operations of the deployed contracts
+# and keeps current state tables in SQLite:
+#   - ovens: every oven originated by the OvenFactory, with its
+#     owner, tez balance and the state last written by
+#     `OvenContract.updateState`.
+#   - balances: kUSD balances from FA1.2 `mint`, `burn` and
+#     `transfer`.
+#   - totals: kUSD total supply.
+#
+# A cold start can backfill final levels with a process pool: each
+# worker fetches a range of blocks and keeps only the operations
+# which involve Kolibri contracts, and the ranges are applied in
+# level order, giving the same tables as indexing one block at a
+# time.
+#
+# Each block is applied in one SQLite transaction together with the
+# checkpoint, so a restart resumes from the last applied level and
+# re-applying a level is a no-op.
+#
+# Every row a block changes is saved to an undo journal first, which
+# is kept for the last `maxReorgDepth` levels. When the source's next
+# block does not build on the last one applied, the indexer finds
+# the fork point, restores the journaled rows of the reverted blocks
+# and applies the new branch, at a cost proportional to the number
+# of reverted blocks.
+#
+# Usage:
+#   python3 tools/indexer.py --database ovens.db --source http://localhost:8732 --oven-factory KT1... --oven-registry KT1... --token KT1... [--start-level N] [--reorg-depth N] [--jobs N --oven-proxy KT1... --minter KT1...] [--follow] [--record DIR]
+#   python3 tools/indexer.py --database ovens.db --source recorded-blocks/ --oven-factory KT1... --oven-registry KT1... --token KT1...
+################################################################
+
+import argparse
+import collections
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import michelson
+from michelson import Bytes, MichelsonError, Prim, Seq, String
+
+# The OvenProxy and Minter are only needed to backfill.
+Contracts = collections.namedtuple("Contracts", ["ovenFactory", "ovenRegistry", "token", "ovenProxy", "minter"], defaults = (None, None))
+Checkpoint = collections.namedtuple("Checkpoint", ["level", "hash"])
+Oven = collections.namedtuple("Oven", [
+    "address",
+    "owner",
+    "originationLevel",
+    "balance",
+    "borrowedTokens",
+    "stabilityFeeTokens",
+    "interestIndex",
+    "isLiquidated",
+    "updateLevel",
+])
+
+class IndexerError(Exception):
+    pass
+
+################################################################
+# Decoding
+################################################################
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Base58check prefixes of implicit accounts by curve tag, and of originated contracts.
+IMPLICIT_PREFIXES = { 0: bytes([6, 161, 159]), 1: bytes([6, 161, 161]), 2: bytes([6, 161, 164]), 3: bytes([6, 161, 166]) }
+ORIGINATED_PREFIX = bytes([2, 90, 121])
+
+def base58Check(prefix, payload):
+    data = prefix + payload
+    data += hashlib.sha256(hashlib.sha256(data).digest()).digest()[:4]
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, digit = divmod(number, 58)
+        encoded = BASE58_ALPHABET[digit] + encoded
+    leadingZeros = len(data) - len(data.lstrip(b"\x00"))
+    return BASE58_ALPHABET[0] * leadingZeros + encoded
+
+# An address node, in either the readable or the optimized (binary) form, as a base58 string without entry point.
+def decodeAddress(node):
+    if isinstance(node, String):
+        return node.value.split("%")[0]
+    if isinstance(node, Bytes) and len(node.value) >= 22:
+        if node.value[0] == 0 and node.value[1] in IMPLICIT_PREFIXES:
+            return base58Check(IMPLICIT_PREFIXES[node.value[1]], node.value[2:22])
+        if node.value[0] == 1:
+            return base58Check(ORIGINATED_PREFIX, node.value[1:21])
+    raise IndexerError("Not an address: {}".format(node))
+
+def decodeInt(node):
+    if isinstance(node, michelson.Int):
+        return node.value
+    raise IndexerError("Not an int: {}".format(node))
+
+def decodeBool(node):
+    if isinstance(node, Prim) and node.name in ("True", "False"):
+        return node.name == "True"
+    raise IndexerError("Not a bool: {}".format(node))
+
+# Split a right comb of pairs into `count` values. Accepts nested, flattened and sequence forms.
+def unpair(node, count):
+    values = []
+    while len(values) < count - 1:
+        if isinstance(node, Prim) and node.name == "Pair":
+            args = node.args
+        elif isinstance(node, Seq):
+            args = node.items
+        else:
+            raise IndexerError("Not a pair: {}".format(node))
+        if len(args) < 2:
+            raise IndexerError("Not a pair: {}".format(node))
+
+        values.append(args[0])
+        node = args[1] if len(args) == 2 else Prim("Pair", args[1:])
+    values.append(node)
+    return values
+
+# (owner, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated) from an oven's storage, see `oven.tz`.
+def decodeOvenStorage(node):
+    left, right = unpair(node, 2)
+    borrowedTokens, interestIndex, isLiquidated = unpair(left, 3)
+    _, owner, stabilityFeeTokens = unpair(right, 3)
+    return (decodeAddress(owner), decodeInt(borrowedTokens), decodeInt(stabilityFeeTokens), decodeInt(interestIndex), decodeBool(isLiquidated))
+
+# (totalSupply, debtCeiling) from the kUSD token's storage, see `token.tz`.
+def decodeTokenStorage(node):
+    left, right = unpair(node, 2)
+    _, limits = unpair(left, 2)
+    debtCeiling, _ = unpair(limits, 2)
+    _, supply = unpair(right, 2)
+    _, totalSupply = unpair(supply, 2)
+    return (decodeInt(totalSupply), decodeInt(debtCeiling))
+
+# Applied transactions and originations of a block in execution order, with internal operations after their parent.
+# Yields (operation, result).
+def appliedOperations(block):
+    for group in block.get("operations", []):
+        for operation in group:
+            for content in operation.get("contents", []):
+                metadata = content.get("metadata", {})
+                result = metadata.get("operation_result")
+                if result is None or result.get("status") != "applied":
+                    continue
+                yield content, result
+
+                for internal in metadata.get("internal_operation_results", []):
+                    if internal.get("result", {}).get("status") == "applied":
+                        yield internal, internal["result"]
+
+################################################################
+# Sources
+################################################################
+
+# Blocks from a node's RPC.
+class NodeSource:
+    def __init__(self, url, chain = "main", timeoutSec = 30):
+        self.url = url.rstrip("/")
+        self.chain = chain
+        self.timeoutSec = timeoutSec
+
+    def get(self, path):
+        with urllib.request.urlopen(self.url + path, timeout = self.timeoutSec) as response:
+            return json.load(response)
+
+    def head(self):
+        return self.get("/chains/{}/blocks/head/header".format(self.chain))["level"]
+
+    def block(self, level):
+        return self.get("/chains/{}/blocks/{}".format(self.chain, level))
+
+    def storage(self, address, level = "head"):
+        return self.get("/chains/{}/blocks/{}/context/contracts/{}/storage".format(self.chain, level, address))
+
+# Blocks recorded as `<level>.json` files in a directory, in the format of the node's `/chains/main/blocks/<level>`.
+class FixtureSource:
+    FILE_REGEX = re.compile(r"^(\d+)\.json$")
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def levels(self):
+        matches = (FixtureSource.FILE_REGEX.match(name) for name in os.listdir(self.directory))
+        return sorted(int(match.group(1)) for match in matches if match)
+
+    def head(self):
+        levels = self.levels()
+        if not levels:
+            raise IndexerError("No blocks in {}".format(self.directory))
+        return levels[-1]
+
+    def block(self, level):
+        path = os.path.join(self.directory, "{}.json".format(level))
+        if not os.path.exists(path):
+            raise IndexerError("Block {} is not recorded in {}".format(level, self.directory))
+        with open(path) as f:
+            return json.load(f)
+
+# Records every block read from another source into a directory that `FixtureSource` can replay.
+class RecordingSource:
+    def __init__(self, source, directory):
+        self.source = source
+        self.directory = directory
+        os.makedirs(directory, exist_ok = True)
+
+    def head(self):
+        return self.source.head()
+
+    def block(self, level):
+        block = self.source.block(level)
+        with open(os.path.join(self.directory, "{}.json".format(level)), "w") as f:
+            json.dump(block, f)
+        return block
+
+# A source for a `--source` argument: a node URL or a directory of recorded blocks.
+def openSource(location):
+    if location.startswith("http://") or location.startswith("https://"):
+        return NodeSource(location)
+    return FixtureSource(location)
+
+################################################################
+# Indexer
+################################################################
+
+# Token amounts and oven state overflow SQLite's 64 bit integers, so they are stored as decimal text.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ovens (
+    address TEXT PRIMARY KEY,
+    owner TEXT,
+    originationLevel INTEGER NOT NULL,
+    balance TEXT NOT NULL,
+    borrowedTokens TEXT NOT NULL,
+    stabilityFeeTokens TEXT NOT NULL,
+    interestIndex TEXT NOT NULL,
+    isLiquidated INTEGER NOT NULL,
+    updateLevel INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS balances (
+    address TEXT PRIMARY KEY,
+    balance TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totals (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    level INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    level INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS journal (
+    level INTEGER NOT NULL,
+    sequence INTEGER NOT NULL,
+    tableName TEXT NOT NULL,
+    key TEXT NOT NULL,
+    row TEXT,
+    PRIMARY KEY (level, sequence)
+);
+"""
+
+# The key column of each state table, for the journal.
+TABLE_KEYS = { "ovens": "address", "balances": "address", "totals": "name" }
+
+# Levels journaled by default. Blocks are final after two levels under Tenderbake, so this is generous.
+DEFAULT_REORG_DEPTH = 60
+
+# Levels fetched by each backfill task.
+DEFAULT_CHUNK_LEVELS = 1000
+
+class Indexer:
+    # Params:
+    #   - path: The SQLite database, created if it does not exist.
+    #   - contracts: Addresses of the deployed contracts.
+    #   - startLevel: The first level to index in an empty database, ie. the level the contracts were originated at.
+    #   - maxReorgDepth: The number of recent levels which can be rolled back.
+    def __init__(self, path, contracts, startLevel = 0, maxReorgDepth = DEFAULT_REORG_DEPTH):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.contracts = contracts
+        self.startLevel = startLevel
+        self.maxReorgDepth = maxReorgDepth
+        self.journaled = None
+
+    def close(self):
+        self.connection.close()
+
+    def checkpoint(self):
+        row = self.connection.execute("SELECT level, hash FROM checkpoint WHERE id = 0").fetchone()
+        return None if row is None else Checkpoint(*row)
+
+    def nextLevel(self):
+        checkpoint = self.checkpoint()
+        return self.startLevel if checkpoint is None else checkpoint.level + 1
+
+    ################################################################
+    # Queries
+    ################################################################
+
+    def oven(self, address):
+        row = self.connection.execute("SELECT * FROM ovens WHERE address = ?", (address,)).fetchone()
+        return None if row is None else ovenFromRow(row)
+
+    # Every oven, or those changed after `sinceLevel`.
+    def ovens(self, sinceLevel = None):
+        query = "SELECT * FROM ovens WHERE updateLevel > ? ORDER BY originationLevel, address"
+        for row in self.connection.execute(query, (-1 if sinceLevel is None else sinceLevel,)):
+            yield ovenFromRow(row)
+
+    # The hash of an applied block, if it is still within the reorg depth.
+    def blockHash(self, level):
+        row = self.connection.execute("SELECT hash FROM blocks WHERE level = ?", (level,)).fetchone()
+        return None if row is None else row[0]
+
+    def balance(self, address):
+        row = self.connection.execute("SELECT balance FROM balances WHERE address = ?", (address,)).fetchone()
+        return 0 if row is None else int(row[0])
+
+    # Every (address, balance), read as it is consumed.
+    def balances(self):
+        for address, balance in self.connection.execute("SELECT address, balance FROM balances ORDER BY address"):
+            yield address, int(balance)
+
+    def totalSupply(self):
+        row = self.connection.execute("SELECT value FROM totals WHERE name = 'totalSupply'").fetchone()
+        return 0 if row is None else int(row[0])
+
+    ################################################################
+    # Ingestion
+    ################################################################
+
+    # Apply every level from the checkpoint up to `toLevel`, or the source's head, first rolling back any blocks the
+    # source no longer has. Returns the number of blocks applied.
+    def sync(self, source, toLevel = None):
+        if toLevel is None:
+            toLevel = source.head()
+
+        # The last block applied may have been replaced by one at the same level.
+        checkpoint = self.checkpoint()
+        if checkpoint is not None and checkpoint.level <= toLevel and source.block(checkpoint.level)["hash"] != checkpoint.hash:
+            self.rollback(self.forkLevel(source))
+
+        applied = 0
+        while self.nextLevel() <= toLevel:
+            block = source.block(self.nextLevel())
+            if not self.extends(block):
+                self.rollback(self.forkLevel(source))
+                continue
+            self.applyBlock(block)
+            applied += 1
+        return applied
+
+    # Whether a block builds on the last block applied.
+    def extends(self, block):
+        checkpoint = self.checkpoint()
+        return checkpoint is None or block["header"]["predecessor"] == checkpoint.hash
+
+    # Apply a block atomically. Returns False if the block was already applied.
+    def applyBlock(self, block):
+        return self.applyBlocks([block]) == 1
+
+    # Apply consecutive blocks in one transaction, skipping those already applied. Rows are only journaled for levels
+    # from `journalFrom`, by default all. Returns the number of blocks applied.
+    def applyBlocks(self, blocks, journalFrom = None):
+        applied = 0
+        with self.connection:
+            for block in blocks:
+                level = block["header"]["level"]
+                checkpoint = self.checkpoint()
+                if checkpoint is not None and level <= checkpoint.level:
+                    continue
+                if level != self.nextLevel():
+                    raise IndexerError("Expected block {} but got {}".format(self.nextLevel(), level))
+                if not self.extends(block):
+                    raise IndexerError("Block {} does not build on {}".format(block["hash"], checkpoint.hash))
+
+                self.level = level
+                self.journaled = set() if journalFrom is None or level >= journalFrom else None
+                for operation, result in appliedOperations(block):
+                    self.applyOperation(operation, result, level)
+                self.journaled = None
+
+                self.connection.execute("INSERT OR REPLACE INTO checkpoint (id, level, hash) VALUES (0, ?, ?)", (level, block["hash"]))
+                self.connection.execute("INSERT OR REPLACE INTO blocks VALUES (?, ?)", (level, block["hash"]))
+                self.connection.execute("DELETE FROM blocks WHERE level < ?", (level - self.maxReorgDepth,))
+                self.connection.execute("DELETE FROM journal WHERE level <= ?", (level - self.maxReorgDepth,))
+                applied += 1
+        return applied
+
+    # Apply every level up to `toLevel` with `jobs` worker processes fetching ranges of `chunkLevels` blocks. Ranges
+    # are applied in level order as they complete, with a bounded number in flight. Forks are detected but not rolled
+    # back, so only backfill final levels and `sync` the rest. Returns the number of blocks applied.
+    def backfill(self, source, toLevel, jobs, chunkLevels = DEFAULT_CHUNK_LEVELS):
+        if self.contracts.ovenProxy is None:
+            raise IndexerError("Backfilling needs the OvenProxy address")
+
+        starts = range(self.nextLevel(), toLevel + 1, chunkLevels)
+        journalFrom = toLevel - self.maxReorgDepth + 1
+        applied = 0
+        pending = collections.deque()
+        with ProcessPoolExecutor(max_workers = jobs) as executor:
+            for start in starts:
+                pending.append(executor.submit(fetchRange, source, self.contracts, start, min(start + chunkLevels - 1, toLevel)))
+                if len(pending) >= 2 * jobs:
+                    applied += self.applyBlocks(pending.popleft().result(), journalFrom)
+            while pending:
+                applied += self.applyBlocks(pending.popleft().result(), journalFrom)
+        return applied
+
+    # The highest level at which the indexed chain and the source agree.
+    def forkLevel(self, source):
+        head = source.head()
+        for level, blockHash in self.connection.execute("SELECT level, hash FROM blocks ORDER BY level DESC").fetchall():
+            if level <= head and source.block(level)["hash"] == blockHash:
+                return level
+        raise IndexerError("The chain forked more than {} levels ago, reindex from scratch".format(self.maxReorgDepth))
+
+    # Undo every block after `level` by restoring the rows they changed, newest first.
+    def rollback(self, level):
+        checkpoint = self.checkpoint()
+        if checkpoint is None or level >= checkpoint.level:
+            return
+        row = self.connection.execute("SELECT hash FROM blocks WHERE level = ?", (level,)).fetchone()
+        if row is None:
+            raise IndexerError("Level {} is no longer journaled".format(level))
+
+        with self.connection:
+            entries = self.connection.execute(
+                "SELECT tableName, key, row FROM journal WHERE level > ? ORDER BY level DESC, sequence DESC", (level,)
+            ).fetchall()
+            for table, key, saved in entries:
+                if saved is None:
+                    self.connection.execute("DELETE FROM {} WHERE {} = ?".format(table, TABLE_KEYS[table]), (key,))
+                else:
+                    values = json.loads(saved)
+                    self.connection.execute("INSERT OR REPLACE INTO {} VALUES ({})".format(table, ", ".join("?" * len(values))), values)
+
+            self.connection.execute("DELETE FROM journal WHERE level > ?", (level,))
+            self.connection.execute("DELETE FROM blocks WHERE level > ?", (level,))
+            self.connection.execute("INSERT OR REPLACE INTO checkpoint (id, level, hash) VALUES (0, ?, ?)", (level, row[0]))
+
+    def applyOperation(self, operation, result, level):
+        kind = operation.get("kind")
+        if kind == "origination":
+            if operation["source"] == self.contracts.ovenFactory:
+                for address in result.get("originated_contracts", []):
+                    self.originateOven(address, operation, level)
+            return
+        if kind != "transaction":
+            return
+
+        source = operation["source"]
+        destination = operation["destination"]
+        amount = int(operation.get("amount", "0"))
+        if amount != 0:
+            self.moveOvenBalance(source, -amount, level)
+            self.moveOvenBalance(destination, amount, level)
+
+        parameters = operation.get("parameters")
+        if parameters is None:
+            return
+        entrypoint = parameters.get("entrypoint", "default")
+        try:
+            value = michelson.fromJson(parameters["value"])
+        except MichelsonError as e:
+            raise IndexerError("Bad parameter in block {}: {}".format(level, e))
+
+        if destination == self.contracts.ovenRegistry and entrypoint == "addOven":
+            ovenAddress, owner = unpair(value, 2)
+            self.registerOven(decodeAddress(ovenAddress), decodeAddress(owner), level)
+        elif destination == self.contracts.token:
+            self.applyTokenCall(entrypoint, value)
+        elif entrypoint == "updateState" and self.oven(destination) is not None:
+            ovenAddress, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated = unpair(value, 5)
+            self.updateOven(destination, level,
+                borrowedTokens = decodeInt(borrowedTokens),
+                stabilityFeeTokens = decodeInt(stabilityFeeTokens),
+                interestIndex = decodeInt(interestIndex),
+                isLiquidated = decodeBool(isLiquidated),
+            )
+
+    def applyTokenCall(self, entrypoint, value):
+        if entrypoint == "transfer":
+            source, destination, tokens = unpair(value, 3)
+            tokens = decodeInt(tokens)
+            self.addBalance(decodeAddress(source), -tokens)
+            self.addBalance(decodeAddress(destination), tokens)
+        elif entrypoint in ("mint", "burn"):
+            address, tokens = unpair(value, 2)
+            tokens = decodeInt(tokens) if entrypoint == "mint" else -decodeInt(tokens)
+            self.addBalance(decodeAddress(address), tokens)
+            self.setTotal("totalSupply", self.totalSupply() + tokens)
+
+    ################################################################
+    # Writes
+    ################################################################
+
+    # Save a row to the undo journal before the block being applied first changes it.
+    def journal(self, table, key):
+        if self.journaled is None or (table, key) in self.journaled:
+            return
+        self.journaled.add((table, key))
+
+        row = self.connection.execute("SELECT * FROM {} WHERE {} = ?".format(table, TABLE_KEYS[table]), (key,)).fetchone()
+        self.connection.execute(
+            "INSERT INTO journal VALUES (?, ?, ?, ?, ?)",
+            (self.level, len(self.journaled), table, key, None if row is None else json.dumps(row))
+        )
+
+    def originateOven(self, address, operation, level):
+        owner, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated = None, 0, 0, 0, False
+        storage = operation.get("script", {}).get("storage")
+        if storage is not None:
+            owner, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated = decodeOvenStorage(michelson.fromJson(storage))
+
+        self.journal("ovens", address)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO ovens VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (address, owner, level, operation.get("balance", "0"), str(borrowedTokens), str(stabilityFeeTokens), str(interestIndex), int(isLiquidated), level)
+        )
+
+    # `addOven` confirms the owner of an oven, and registers ovens whose origination was not seen.
+    def registerOven(self, address, owner, level):
+        self.journal("ovens", address)
+        if self.oven(address) is None:
+            self.connection.execute(
+                "INSERT INTO ovens VALUES (?, ?, ?, '0', '0', '0', '0', 0, ?)",
+                (address, owner, level, level)
+            )
+        else:
+            self.connection.execute("UPDATE ovens SET owner = ?, updateLevel = ? WHERE address = ?", (owner, level, address))
+
+    def updateOven(self, address, level, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated):
+        self.journal("ovens", address)
+        self.connection.execute(
+            "UPDATE ovens SET borrowedTokens = ?, stabilityFeeTokens = ?, interestIndex = ?, isLiquidated = ?, updateLevel = ? WHERE address = ?",
+            (str(borrowedTokens), str(stabilityFeeTokens), str(interestIndex), int(isLiquidated), level, address)
+        )
+
+    def moveOvenBalance(self, address, mutez, level):
+        oven = self.oven(address)
+        if oven is not None:
+            self.journal("ovens", address)
+            self.connection.execute("UPDATE ovens SET balance = ?, updateLevel = ? WHERE address = ?", (str(oven.balance + mutez), level, address))
+
+    def addBalance(self, address, tokens):
+        self.journal("balances", address)
+        self.connection.execute("INSERT OR REPLACE INTO balances VALUES (?, ?)", (address, str(self.balance(address) + tokens)))
+
+    def setTotal(self, name, value):
+        self.journal("totals", name)
+        self.connection.execute("INSERT OR REPLACE INTO totals VALUES (?, ?)", (name, str(value)))
+
+################################################################
+# Parallel Backfill
+################################################################
+
+# Whether an operation, including its internal operations, involves a Kolibri contract. No other operation can change
+# the tables: ovens are originated by the OvenFactory, and only move tez or receive `updateState` via the OvenProxy.
+def touchesContracts(operation, addresses):
+    for content in operation.get("contents", []):
+        internals = content.get("metadata", {}).get("internal_operation_results", [])
+        for item in [content] + internals:
+            if item.get("source") in addresses or item.get("destination") in addresses:
+                return True
+    return False
+
+# Fetch the blocks from `start` to `end`, keeping only operations which involve the contracts. Runs in a worker.
+def fetchRange(source, contracts, start, end):
+    addresses = set(address for address in contracts if address is not None)
+    blocks = []
+    for level in range(start, end + 1):
+        block = source.block(level)
+        operations = [operation for group in block.get("operations", []) for operation in group if touchesContracts(operation, addresses)]
+        blocks.append({
+            "hash": block["hash"],
+            "header": { "level": level, "predecessor": block["header"]["predecessor"] },
+            "operations": [operations],
+        })
+    return blocks
+
+def ovenFromRow(row):
+    address, owner, originationLevel, balance, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated, updateLevel = row
+    return Oven(address, owner, originationLevel, int(balance), int(borrowedTokens), int(stabilityFeeTokens), int(interestIndex), bool(isLiquidated), updateLevel)
+
+################################################################
+# Command Line
+################################################################
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Index ovens and kUSD balances into SQLite.")
+    parser.add_argument("--database", required = True, help = "SQLite database to create or resume")
+    parser.add_argument("--source", required = True, help = "Node RPC URL, or a directory of recorded <level>.json blocks")
+    parser.add_argument("--oven-factory", required = True, help = "Address of the OvenFactory contract")
+    parser.add_argument("--oven-registry", required = True, help = "Address of the OvenRegistry contract")
+    parser.add_argument("--token", required = True, help = "Address of the kUSD token contract")
+    parser.add_argument("--oven-proxy", help = "Address of the OvenProxy contract, needed with --jobs")
+    parser.add_argument("--minter", help = "Address of the Minter contract, needed with --jobs")
+    parser.add_argument("--start-level", type = int, default = 0, help = "First level to index in a new database")
+    parser.add_argument("--to-level", type = int, help = "Stop at this level rather than the head")
+    parser.add_argument("--reorg-depth", type = int, default = DEFAULT_REORG_DEPTH, help = "Number of recent levels which can be rolled back")
+    parser.add_argument("--jobs", type = int, default = 1, help = "Worker processes to backfill final levels with")
+    parser.add_argument("--follow", action = "store_true", help = "Keep indexing new blocks as they arrive")
+    parser.add_argument("--poll", type = float, default = 10.0, help = "Seconds between head checks with --follow")
+    parser.add_argument("--record", help = "Also save every block read to this directory")
+    args = parser.parse_args(argv)
+
+    source = openSource(args.source)
+    if args.record:
+        source = RecordingSource(source, args.record)
+    if args.jobs > 1 and (args.oven_proxy is None or args.minter is None):
+        parser.error("--jobs needs --oven-proxy and --minter")
+    contracts = Contracts(args.oven_factory, args.oven_registry, args.token, args.oven_proxy, args.minter)
+    indexer = Indexer(args.database, contracts, args.start_level, args.reorg_depth)
+
+    try:
+        while True:
+            start = time.time()
+            toLevel = source.head() if args.to_level is None else args.to_level
+            applied = 0
+            if args.jobs > 1:
+                applied += indexer.backfill(source, toLevel - args.reorg_depth, args.jobs)
+            applied += indexer.sync(source, toLevel)
+            if applied:
+                print("Applied {} blocks to level {} in {:.1f}s".format(applied, indexer.checkpoint().level, time.time() - start))
+            if not args.follow:
+                return 0
+            time.sleep(args.poll)
+    except IndexerError as e:
+        print("Error: {}".format(e))
+        return 1
+    finally:
+        indexer.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
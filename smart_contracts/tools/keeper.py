@@ -0,0 +1,260 @@
+################################################################
+# Liquidation keeper.
+#
+# An asyncio service which follows oven state, finds the ovens the
+# Minter would liquidate at the current price with
+# `liquidation_index.py`, and submits liquidations, most
+# undercollateralized first, with a bounded number in flight.
+# Liquidations go through `StabilityFundContract.liquidate`, with the
+# keeper as the fund's administrator, or directly to
+# `OvenContract.liquidate`, with the keeper holding kUSD itself.
+#
+# The keeper talks to the chain through an RPC client with the
+# interface of `LocalRpc`, which runs against the contract simulator
+# so the keeper can be load tested without a network.
+#
+# Usage:
+#   python3 tools/keeper.py --ovens 5000 [--concurrency 16] [--latency 0.01] [--direct]
+################################################################
+
+import argparse
+import asyncio
+import collections
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import minter_math
+import simulator
+from contract_constants import Constants
+from liquidation_index import LiquidationIndex, OvenState
+from minter_math import ContractError
+
+MUTEZ_TO_KOLIBRI_CONVERSION = Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+PRECISION = Constants.PRECISION
+
+# The chain head, with the Minter and Oracle state the keeper needs. Times are in seconds.
+Head = collections.namedtuple("Head", [
+    "level",
+    "now",
+    "harbingerValue",
+    "harbingerUpdateTime",
+    "maxDataDelaySec",
+    "interestIndex",
+    "stabilityFee",
+    "lastInterestIndexUpdateTime",
+    "collateralizationPercentage",
+])
+
+class LiquidationFailed(Exception):
+    def __init__(self, ovenAddress, code):
+        super().__init__("Liquidating {} failed with {}".format(ovenAddress, code))
+        self.ovenAddress = ovenAddress
+        self.code = code
+
+################################################################
+# Local RPC
+################################################################
+
+# An RPC client backed by a simulator `Universe`, with an optional delay on every call.
+#
+# RPC clients provide:
+#   - async getHead() -> Head
+#   - async getOvenUpdates(cursor) -> ({ address: OvenState }, newCursor): ovens changed since `cursor`. The first
+#     call, with cursor 0, returns every oven.
+#   - async liquidate(ovenAddress, viaStabilityFund): raises `LiquidationFailed` if the operation fails.
+class LocalRpc:
+    def __init__(self, universe, keeperAddress = simulator.FUND_ADMINISTRATOR_ADDRESS, latencySec = 0):
+        self.universe = universe
+        self.keeperAddress = keeperAddress
+        self.latencySec = latencySec
+        self.level = 0
+        self.changes = list(universe.ovens)
+        self.submitted = []
+        self.inFlight = 0
+        self.maxInFlight = 0
+
+    async def wait(self):
+        await asyncio.sleep(self.latencySec)
+
+    def ovenState(self, address):
+        oven = self.universe.ovens[address].data
+        balance = self.universe.chain.balance(address)
+        return OvenState(balance, oven.borrowedTokens, oven.stabilityFeeTokens, oven.interestIndex, oven.isLiquidated)
+
+    # Run a simulator action, ex. a price change or a borrow, as if another account had.
+    def runAction(self, action):
+        error = simulator.runAction(self.universe, action)
+        if "oven" in action:
+            self.changes.append(action["oven"])
+        self.level += 1
+        return error
+
+    async def getHead(self):
+        await self.wait()
+        universe = self.universe
+        return Head(
+            level = self.level,
+            now = universe.chain.now,
+            harbingerValue = universe.fakeHarbinger.data.harbingerValue,
+            harbingerUpdateTime = universe.fakeHarbinger.data.harbingerUpdateTime,
+            maxDataDelaySec = universe.oracle.data.maxDataDelaySec,
+            interestIndex = universe.minter.data.interestIndex,
+            stabilityFee = universe.minter.data.stabilityFee,
+            lastInterestIndexUpdateTime = universe.minter.data.lastInterestIndexUpdateTime,
+            collateralizationPercentage = universe.minter.data.collateralizationPercentage,
+        )
+
+    async def getOvenUpdates(self, cursor):
+        await self.wait()
+        addresses = set(self.changes[cursor:])
+        return { address: self.ovenState(address) for address in addresses }, len(self.changes)
+
+    async def liquidate(self, ovenAddress, viaStabilityFund):
+        self.submitted.append(ovenAddress)
+        self.inFlight += 1
+        self.maxInFlight = max(self.maxInFlight, self.inFlight)
+        try:
+            await self.wait()
+            if viaStabilityFund:
+                self.universe.call(self.keeperAddress, "stabilityFund", "liquidate", ovenAddress)
+            else:
+                self.universe.call(self.keeperAddress, ovenAddress, "liquidate")
+        except ContractError as e:
+            raise LiquidationFailed(ovenAddress, e.code)
+        finally:
+            self.inFlight -= 1
+            self.changes.append(ovenAddress)
+            self.level += 1
+
+################################################################
+# Keeper
+################################################################
+
+class Keeper:
+    # Params:
+    #   - rpc: An RPC client, see `LocalRpc`.
+    #   - viaStabilityFund: Liquidate through the Stability Fund rather than directly.
+    #   - concurrency: The most liquidations in flight at once.
+    #   - pollIntervalSec: The time between checks for new ovens and prices.
+    def __init__(self, rpc, viaStabilityFund = True, concurrency = 8, pollIntervalSec = 5):
+        self.rpc = rpc
+        self.viaStabilityFund = viaStabilityFund
+        self.pollIntervalSec = pollIntervalSec
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.index = LiquidationIndex()
+        self.cursor = 0
+        self.inFlight = set()
+        self.tasks = set()
+        self.results = collections.Counter()
+
+    async def sync(self):
+        updates, self.cursor = await self.rpc.getOvenUpdates(self.cursor)
+        for address, oven in updates.items():
+            self.index.update(address, *oven)
+
+    # Ovens the Minter would liquidate at the head, most undercollateralized first.
+    def findLiquidatable(self, head):
+        # The Oracle rejects stale prices, so nothing can be liquidated.
+        dataAge = head.now - head.harbingerUpdateTime
+        if dataAge < 0 or dataAge >= head.maxDataDelaySec:
+            return []
+
+        minterInterestIndex, _ = minter_math.compoundInterestIndex(head.interestIndex, head.stabilityFee, head.lastInterestIndexUpdateTime, head.now)
+        xtzPrice = head.harbingerValue * MUTEZ_TO_KOLIBRI_CONVERSION
+        return self.index.liquidatable(xtzPrice, minterInterestIndex, head.collateralizationPercentage)
+
+    # Sync ovens and start liquidating every liquidatable oven which is not already in flight. Returns the ovens started.
+    async def tick(self):
+        await self.sync()
+        head = await self.rpc.getHead()
+        targets = [address for address in self.findLiquidatable(head) if address not in self.inFlight]
+
+        for address in targets:
+            self.inFlight.add(address)
+            task = asyncio.ensure_future(self.submit(address))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        return targets
+
+    async def submit(self, address):
+        async with self.semaphore:
+            try:
+                await self.rpc.liquidate(address, self.viaStabilityFund)
+                self.results["liquidated"] += 1
+            except LiquidationFailed as e:
+                # Usually another keeper got there first, or the price moved.
+                self.results[e.code] += 1
+            finally:
+                self.inFlight.discard(address)
+
+    # Wait for every liquidation in flight.
+    async def drain(self):
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks))
+
+    async def run(self, stop):
+        while not stop.is_set():
+            await self.tick()
+            try:
+                await asyncio.wait_for(stop.wait(), self.pollIntervalSec)
+            except asyncio.TimeoutError:
+                pass
+        await self.drain()
+
+################################################################
+# Load Test
+################################################################
+
+# Build a universe of `ovenCount` ovens borrowing 50% to 100% of what they can at $2, then crash the price to $1.60.
+def makeLoadTest(ovenCount, latencySec = 0, seed = 0):
+    rng = random.Random(seed)
+    universe = simulator.Universe(lastInterestIndexUpdateTime = 0, harbingerUpdateTime = 0)
+    rpc = LocalRpc(universe, latencySec = latencySec)
+
+    rpc.runAction({ "action": "setDebtCeiling", "tokens": 10 ** 12 * PRECISION })
+    rpc.runAction({ "action": "mint", "to": "stabilityFund", "tokens": 10 ** 11 * PRECISION })
+    rpc.runAction({ "action": "mint", "to": simulator.FUND_ADMINISTRATOR_ADDRESS, "tokens": 10 ** 11 * PRECISION })
+    for i in range(ovenCount):
+        oven = "oven{}".format(i)
+        mutez = rng.randrange(1, 100) * 1000000
+        maximumTokens = mutez * MUTEZ_TO_KOLIBRI_CONVERSION
+
+        rpc.runAction({ "action": "makeOven", "oven": oven, "owner": "owner{}".format(i) })
+        rpc.runAction({ "action": "deposit", "oven": oven, "mutez": mutez, "now": 1 })
+        rpc.runAction({ "action": "borrow", "oven": oven, "tokens": rng.randrange(maximumTokens // 2, maximumTokens), "now": 1 })
+    rpc.runAction({ "action": "setPrice", "price": 1600000, "now": 2 })
+    return rpc
+
+async def loadTest(ovenCount, concurrency, latencySec, viaStabilityFund):
+    rpc = makeLoadTest(ovenCount, latencySec)
+    keeper = Keeper(rpc, viaStabilityFund = viaStabilityFund, concurrency = concurrency)
+
+    start = time.monotonic()
+    targets = await keeper.tick()
+    await keeper.drain()
+    seconds = time.monotonic() - start
+
+    print("{} ovens, {} liquidatable, results {} in {:.2f}s, at most {} in flight".format(
+        ovenCount, len(targets), dict(keeper.results), seconds, rpc.maxInFlight
+    ))
+    remaining = await keeper.tick()
+    print("{} liquidatable after the run".format(len(remaining)))
+    return len(remaining) == 0
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Load test the liquidation keeper against simulated ovens.")
+    parser.add_argument("--ovens", type = int, default = 1000, help = "Number of simulated ovens")
+    parser.add_argument("--concurrency", type = int, default = 8, help = "Liquidations in flight at once")
+    parser.add_argument("--latency", type = float, default = 0.0, help = "Simulated seconds per RPC call")
+    parser.add_argument("--direct", action = "store_true", help = "Liquidate ovens directly rather than via the Stability Fund")
+    args = parser.parse_args(argv)
+
+    ok = asyncio.run(loadTest(args.ovens, args.concurrency, args.latency, not args.direct))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
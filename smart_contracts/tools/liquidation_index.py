@@ -0,0 +1,159 @@
+################################################################
+# Liquidation price index.
+#
+# Finds the ovens which `MinterContract.liquidate` would accept at
+# a price with a range query rather than a scan of every oven.
+#
+# An oven is liquidatable when the oracle price is below its
+# liquidation price, which at Minter interest index `m` is about
+#
+#   m * ceil(collateralizationPercentage / 100) * principal / (interestIndex * balance)
+#
+# where principal is borrowed plus stability fee tokens. Ovens are
+# kept sorted by `principal / (interestIndex * balance)`, an order
+# that neither interest accruing nor a new collateralization
+# percentage changes, so only ovens whose state changes are
+# re-indexed. Rounding in the contract's math is bounded, and the
+# few ovens close enough to the price for it to matter are checked
+# with the exact math in `minter_math.py`.
+################################################################
+
+import bisect
+import collections
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import minter_math
+from contract_constants import Constants
+from minter_math import ContractError
+
+PRECISION = Constants.PRECISION
+MUTEZ_TO_KOLIBRI_CONVERSION = Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+
+# Relative error allowed for float keys and the rounding of the contract's math.
+RELATIVE_MARGIN = 1e-12
+
+OvenState = collections.namedtuple("OvenState", ["ovenBalance", "borrowedTokens", "stabilityFeeTokens", "interestIndex", "isLiquidated"])
+
+# Total outstanding tokens of an oven at a Minter interest index, like `liquidate` in `minter.py`.
+def totalOutstandingTokens(oven, minterInterestIndex):
+    stabilityFeeTokens = minter_math.asNat(oven.stabilityFeeTokens)
+    accrued = minter_math.calculateNewAccruedInterest(oven.interestIndex, oven.borrowedTokens, stabilityFeeTokens, minterInterestIndex)
+    return oven.borrowedTokens + stabilityFeeTokens + accrued
+
+# Whether `liquidate` would succeed for an oven, with the exact math of the Minter.
+def isLiquidatable(oven, xtzPrice, minterInterestIndex, collateralizationPercentage):
+    if oven.isLiquidated:
+        return False
+    try:
+        totalOutstanding = totalOutstandingTokens(oven, minterInterestIndex)
+        ovenBalance = oven.ovenBalance * MUTEZ_TO_KOLIBRI_CONVERSION
+        return minter_math.computeCollateralizationPercentage(ovenBalance, xtzPrice, totalOutstanding) < collateralizationPercentage
+    except ContractError:
+        return False
+
+# The lowest price at which `liquidate` fails for an oven, or None if it succeeds at any price.
+# The oven is liquidatable at every price below it.
+#
+# The collateralization check passes at price p exactly when
+#   floor(balance * p / PRECISION) < ceil(ceil(percentage / 100) * total / PRECISION)
+# which solves to p < ceil(that bound * PRECISION / balance).
+def liquidationPrice(oven, minterInterestIndex, collateralizationPercentage):
+    if oven.isLiquidated:
+        return 0
+    try:
+        totalOutstanding = totalOutstandingTokens(oven, minterInterestIndex)
+    except ContractError:
+        return 0
+    if totalOutstanding == 0:
+        return 0
+    if oven.ovenBalance == 0:
+        return None
+
+    requiredRatio = -(-collateralizationPercentage // 100)
+    maximumCollateralValue = -(-requiredRatio * totalOutstanding // PRECISION)
+    ovenBalance = oven.ovenBalance * MUTEZ_TO_KOLIBRI_CONVERSION
+    return -(-maximumCollateralValue * PRECISION // ovenBalance)
+
+def sortKey(oven):
+    if oven.isLiquidated or oven.stabilityFeeTokens < 0 or oven.interestIndex <= 0:
+        return None
+    principal = oven.borrowedTokens + oven.stabilityFeeTokens
+    if principal == 0:
+        return None
+    if oven.ovenBalance == 0:
+        return float("inf")
+    return principal / (oven.interestIndex * oven.ovenBalance * MUTEZ_TO_KOLIBRI_CONVERSION)
+
+class LiquidationIndex:
+    def __init__(self):
+        self.ovens = {}
+        self.keys = []
+        self.addresses = []
+
+    def __len__(self):
+        return len(self.ovens)
+
+    def __contains__(self, address):
+        return address in self.ovens
+
+    # Add or replace the state of an oven, as last written by `updateState`. Balances are in mutez.
+    def update(self, address, ovenBalance, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated = False):
+        self.remove(address)
+        oven = OvenState(ovenBalance, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated)
+        self.ovens[address] = oven
+
+        key = sortKey(oven)
+        if key is not None:
+            position = bisect.bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.addresses.insert(position, address)
+
+    # Replace the index with the states of many ovens at once, ex. from a snapshot. Ovens are (address, OvenState).
+    def load(self, ovens):
+        self.ovens = dict(ovens)
+        keyed = [(sortKey(oven), address) for address, oven in self.ovens.items()]
+        entries = sorted(entry for entry in keyed if entry[0] is not None)
+        self.keys = [key for key, _ in entries]
+        self.addresses = [address for _, address in entries]
+
+    def remove(self, address):
+        oven = self.ovens.pop(address, None)
+        key = None if oven is None else sortKey(oven)
+        if key is None:
+            return
+
+        start = bisect.bisect_left(self.keys, key)
+        position = self.addresses.index(address, start, bisect.bisect_right(self.keys, key))
+        del self.keys[position]
+        del self.addresses[position]
+
+    def get(self, address):
+        return self.ovens.get(address)
+
+    # Ovens which `liquidate` would accept, most undercollateralized first.
+    #
+    # Params:
+    #   - xtzPrice: The price passed to the Minter, ie. the Harbinger price * MUTEZ_TO_KOLIBRI_CONVERSION.
+    #   - minterInterestIndex: The Minter's interest index compounded to now. It is never below the index ovens
+    #     were last updated at.
+    #   - collateralizationPercentage: The Minter's `collateralizationPercentage`.
+    def liquidatable(self, xtzPrice, minterInterestIndex, collateralizationPercentage):
+        requiredRatio = -(-collateralizationPercentage // 100)
+        scale = minterInterestIndex * requiredRatio
+
+        # Rounding moves a liquidation price by at most `slack` plus a relative margin.
+        slack = (requiredRatio + PRECISION) // MUTEZ_TO_KOLIBRI_CONVERSION + 2
+        upper = (xtzPrice + slack) / scale * (1 + RELATIVE_MARGIN)
+        lower = max(xtzPrice - slack, 0) / scale * (1 - RELATIVE_MARGIN)
+
+        certainStart = bisect.bisect_right(self.keys, upper)
+        candidateStart = bisect.bisect_right(self.keys, lower)
+
+        result = self.addresses[certainStart:][::-1]
+        for address in reversed(self.addresses[candidateStart:certainStart]):
+            if isLiquidatable(self.ovens[address], xtzPrice, minterInterestIndex, collateralizationPercentage):
+                result.append(address)
+        return result
@@ -0,0 +1,329 @@
+################################################################
+# Michelson parsing, macro expansion and binary encoding.
+#
+# Parses the `.tz` files emitted by the SmartPy compiler into
+# Micheline nodes, expands the macros the compiler emits into
+# primitive instructions, and encodes nodes in the binary format
+# used for origination and `PACK`.
+################################################################
+
+import re
+import struct
+from dataclasses import dataclass, field
+from typing import List, Union
+
+################################################################
+# Nodes
+################################################################
+
+@dataclass(frozen = True)
+class Int:
+    value: int
+
+@dataclass(frozen = True)
+class String:
+    value: str
+
+@dataclass(frozen = True)
+class Bytes:
+    value: bytes
+
+@dataclass(frozen = True)
+class Seq:
+    items: List["Node"]
+
+@dataclass(frozen = True)
+class Prim:
+    name: str
+    args: List["Node"] = field(default_factory = list)
+    annots: List[str] = field(default_factory = list)
+
+Node = Union[Int, String, Bytes, Seq, Prim]
+
+class MichelsonError(Exception):
+    pass
+
+################################################################
+# Parsing
+################################################################
+
+TOKEN_REGEX = re.compile(r'''
+    (?P<space>\s+|\#[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<bytes>0x[0-9a-fA-F]*)
+  | (?P<int>-?[0-9]+)
+  | (?P<annot>[@:%][A-Za-z0-9_.%@]*)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<punct>[(){};])
+''', re.VERBOSE | re.DOTALL)
+
+STRING_ESCAPES = { '"': '"', '\\': '\\', 'n': '\n', 't': '\t', 'b': '\b', 'r': '\r' }
+
+def tokenize(text):
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = TOKEN_REGEX.match(text, position)
+        if match is None:
+            raise MichelsonError("Unexpected character {!r} at offset {}".format(text[position], position))
+        position = match.end()
+        if match.lastgroup != "space":
+            tokens.append((match.lastgroup, match.group()))
+    return tokens
+
+class Parser:
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return (None, None)
+
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise MichelsonError("Unexpected end of input")
+        self.position += 1
+        return token
+
+    def expect(self, value):
+        kind, text = self.next()
+        if text != value:
+            raise MichelsonError("Expected {!r}, found {!r}".format(value, text))
+
+    # Parse `expr; expr; ...` until `end`, which is a closing token or None for end of input.
+    def parseSequenceBody(self, end):
+        items = []
+        while self.peek()[1] != end:
+            items.append(self.parseExpression())
+            if self.peek()[1] == ";":
+                self.next()
+            elif self.peek()[1] != end:
+                raise MichelsonError("Expected ';' or {!r}, found {!r}".format(end, self.peek()[1]))
+        return items
+
+    # Parse an expression in a position where a primitive may take arguments.
+    def parseExpression(self):
+        kind, text = self.peek()
+        if kind != "ident":
+            return self.parseArgument()
+
+        self.next()
+        annots = self.parseAnnotations()
+        args = []
+        while self.isArgumentStart(self.peek()):
+            args.append(self.parseArgument())
+        return Prim(text, args, annots)
+
+    # Parse an expression in argument position, where primitives only take arguments inside parentheses.
+    def parseArgument(self):
+        kind, text = self.next()
+        if kind == "ident":
+            return Prim(text, [], self.parseAnnotations())
+        if kind == "int":
+            return Int(int(text))
+        if kind == "string":
+            return String(parseString(text))
+        if kind == "bytes":
+            return Bytes(bytes.fromhex(text[2:]))
+        if text == "(":
+            expression = self.parseExpression()
+            self.expect(")")
+            return expression
+        if text == "{":
+            items = self.parseSequenceBody("}")
+            self.expect("}")
+            return Seq(items)
+        raise MichelsonError("Unexpected token {!r}".format(text))
+
+    def parseAnnotations(self):
+        annots = []
+        while self.peek()[0] == "annot":
+            annots.append(self.next()[1])
+        return annots
+
+    @staticmethod
+    def isArgumentStart(token):
+        kind, text = token
+        return kind in ("ident", "int", "string", "bytes") or text in ("(", "{")
+
+def parseString(text):
+    return re.sub(r'\\(.)', lambda match: STRING_ESCAPES.get(match.group(1), match.group(1)), text[1:-1])
+
+# Parse a single Michelson expression.
+def parseExpression(text):
+    parser = Parser(text)
+    expression = parser.parseExpression()
+    if parser.peek()[0] is not None:
+        raise MichelsonError("Unexpected trailing token {!r}".format(parser.peek()[1]))
+    return expression
+
+# Parse a script, which is a sequence of `parameter`, `storage`, `code` and `view` sections without enclosing braces.
+def parseScript(text):
+    return Seq(Parser(text).parseSequenceBody(None))
+
+# Convert Micheline in the JSON format of the node RPC, ex. operation parameters, into nodes.
+def fromJson(value):
+    if isinstance(value, list):
+        return Seq([fromJson(item) for item in value])
+    if "int" in value:
+        return Int(int(value["int"]))
+    if "string" in value:
+        return String(value["string"])
+    if "bytes" in value:
+        return Bytes(bytes.fromhex(value["bytes"]))
+    if "prim" in value:
+        return Prim(value["prim"], [fromJson(arg) for arg in value.get("args", [])], list(value.get("annots", [])))
+    raise MichelsonError("Not Micheline JSON: {!r}".format(value))
+
+################################################################
+# Macro Expansion
+################################################################
+
+COMPARISONS = ("EQ", "NEQ", "LT", "GT", "LE", "GE")
+
+def fail():
+    return Seq([Prim("UNIT"), Prim("FAILWITH")])
+
+# Expand a single macro, or return None if `prim` is not a macro. Arguments are already expanded.
+def expandMacro(prim):
+    name, args = prim.name, prim.args
+
+    if re.fullmatch(r"C[AD]{2,}R", name):
+        return Seq([Prim("CAR" if letter == "A" else "CDR") for letter in name[1:-1]])
+    if re.fullmatch(r"DI{2,}P", name):
+        return Prim("DIP", [Int(len(name) - 2)] + args)
+    if re.fullmatch(r"DU{2,}P", name):
+        return Prim("DUP", [Int(len(name) - 2)])
+    if name == "IF_SOME":
+        return Prim("IF_NONE", [args[1], args[0]])
+    if name == "IF_RIGHT":
+        return Prim("IF_LEFT", [args[1], args[0]])
+    if name == "FAIL":
+        return fail()
+    if name == "ASSERT":
+        return Seq([Prim("IF", [Seq([]), fail()])])
+    if name == "ASSERT_NONE":
+        return Seq([Prim("IF_NONE", [Seq([]), fail()])])
+    if name == "ASSERT_SOME":
+        return Seq([Prim("IF_NONE", [fail(), Seq([])])])
+    if name == "ASSERT_LEFT":
+        return Seq([Prim("IF_LEFT", [Seq([]), fail()])])
+    if name == "ASSERT_RIGHT":
+        return Seq([Prim("IF_LEFT", [fail(), Seq([])])])
+
+    for comparison in COMPARISONS:
+        if name == "CMP" + comparison:
+            return Seq([Prim("COMPARE"), Prim(comparison)])
+        if name == "IF" + comparison:
+            return Seq([Prim(comparison), Prim("IF", args)])
+        if name == "IFCMP" + comparison:
+            return Seq([Prim("COMPARE"), Prim(comparison), Prim("IF", args)])
+        if name == "ASSERT_" + comparison:
+            return Seq([Prim(comparison), Prim("IF", [Seq([]), fail()])])
+        if name == "ASSERT_CMP" + comparison:
+            return Seq([Prim("COMPARE"), Prim(comparison), Prim("IF", [Seq([]), fail()])])
+
+    return None
+
+# Expand every macro in a node into primitive instructions.
+def expand(node):
+    if isinstance(node, Seq):
+        return Seq([expand(item) for item in node.items])
+    if isinstance(node, Prim):
+        prim = Prim(node.name, [expand(arg) for arg in node.args], node.annots)
+        expansion = expandMacro(prim)
+        if expansion is not None:
+            return expansion
+        if prim.name not in PRIMITIVE_CODES:
+            raise MichelsonError("Unknown primitive {}".format(prim.name))
+        return prim
+    return node
+
+################################################################
+# Binary Encoding
+################################################################
+
+# Primitives in the order of their binary encoding.
+PRIMITIVES = [
+    "parameter", "storage", "code", "False", "Elt", "Left", "None", "Pair", "Right", "Some", "True", "Unit",
+    "PACK", "UNPACK", "BLAKE2B", "SHA256", "SHA512", "ABS", "ADD", "AMOUNT", "AND", "BALANCE", "CAR", "CDR",
+    "CHECK_SIGNATURE", "COMPARE", "CONCAT", "CONS", "CREATE_ACCOUNT", "CREATE_CONTRACT", "IMPLICIT_ACCOUNT",
+    "DIP", "DROP", "DUP", "EDIV", "EMPTY_MAP", "EMPTY_SET", "EQ", "EXEC", "FAILWITH", "GE", "GET", "GT",
+    "HASH_KEY", "IF", "IF_CONS", "IF_LEFT", "IF_NONE", "INT", "LAMBDA", "LE", "LEFT", "LOOP", "LSL", "LSR",
+    "LT", "MAP", "MEM", "MUL", "NEG", "NEQ", "NIL", "NONE", "NOT", "NOW", "OR", "PAIR", "PUSH", "RIGHT",
+    "SIZE", "SOME", "SOURCE", "SENDER", "SELF", "STEPS_TO_QUOTA", "SUB", "SWAP", "TRANSFER_TOKENS",
+    "SET_DELEGATE", "UNIT", "UPDATE", "XOR", "ITER", "LOOP_LEFT", "ADDRESS", "CONTRACT", "ISNAT", "CAST",
+    "RENAME", "bool", "contract", "int", "key", "key_hash", "lambda", "list", "map", "big_map", "nat",
+    "option", "or", "pair", "set", "signature", "string", "bytes", "mutez", "timestamp", "unit", "operation",
+    "address", "SLICE", "DIG", "DUG", "EMPTY_BIG_MAP", "APPLY", "chain_id", "CHAIN_ID", "LEVEL",
+    "SELF_ADDRESS", "never", "NEVER", "UNPAIR", "VOTING_POWER", "TOTAL_VOTING_POWER", "KECCAK", "SHA3",
+    "PAIRING_CHECK", "bls12_381_g1", "bls12_381_g2", "bls12_381_fr", "sapling_state",
+    "sapling_transaction_deprecated", "SAPLING_EMPTY_STATE", "SAPLING_VERIFY_UPDATE", "ticket",
+    "TICKET_DEPRECATED", "READ_TICKET", "SPLIT_TICKET", "JOIN_TICKETS", "GET_AND_UPDATE", "chest",
+    "chest_key", "OPEN_CHEST", "VIEW", "view", "constant", "SUB_MUTEZ", "tx_rollup_l2_address",
+    "MIN_BLOCK_TIME", "sapling_transaction", "EMIT", "Lambda_rec", "LAMBDA_REC", "TICKET", "BYTES", "NAT",
+]
+PRIMITIVE_CODES = { name: code for code, name in enumerate(PRIMITIVES) }
+
+def encodeLength(payload):
+    return struct.pack(">I", len(payload)) + payload
+
+def encodeZarith(value):
+    magnitude = abs(value)
+    first = (magnitude & 0x3f) | (0x40 if value < 0 else 0)
+    magnitude >>= 6
+    out = bytearray([first | (0x80 if magnitude else 0)])
+    while magnitude:
+        byte = magnitude & 0x7f
+        magnitude >>= 7
+        out.append(byte | (0x80 if magnitude else 0))
+    return bytes(out)
+
+# Encode an expanded node in Micheline binary format.
+def encode(node):
+    if isinstance(node, Int):
+        return b"\x00" + encodeZarith(node.value)
+    if isinstance(node, String):
+        return b"\x01" + encodeLength(node.value.encode("utf-8"))
+    if isinstance(node, Bytes):
+        return b"\x0a" + encodeLength(node.value)
+    if isinstance(node, Seq):
+        return b"\x02" + encodeLength(b"".join(encode(item) for item in node.items))
+
+    if node.name not in PRIMITIVE_CODES:
+        raise MichelsonError("Cannot encode macro or unknown primitive {}".format(node.name))
+    code = PRIMITIVE_CODES[node.name]
+    annots = " ".join(node.annots).encode("utf-8")
+    args = b"".join(encode(arg) for arg in node.args)
+
+    if len(node.args) <= 2:
+        tag = 0x03 + 2 * len(node.args) + (1 if annots else 0)
+        return bytes([tag, code]) + args + (encodeLength(annots) if annots else b"")
+    return bytes([0x09, code]) + encodeLength(args) + encodeLength(annots)
+
+# Serialize an expanded node the way `PACK` does.
+def pack(node):
+    return b"\x05" + encode(node)
+
+################################################################
+# Inspection
+################################################################
+
+# Count the instructions in an expanded node, including those in lambdas.
+def countInstructions(node):
+    if isinstance(node, Seq):
+        return sum(countInstructions(item) for item in node.items)
+    if isinstance(node, Prim):
+        isInstruction = 1 if node.name.isupper() else 0
+        return isInstruction + sum(countInstructions(arg) for arg in node.args)
+    return 0
+
+# Find a section, such as `code`, in a parsed script. Returns its argument.
+def getSection(script, name):
+    for item in script.items:
+        if isinstance(item, Prim) and item.name == name:
+            return item.args[0]
+    raise MichelsonError("Script has no {} section".format(name))
@@ -0,0 +1,74 @@
+################################################################
+# Integer implementations of the Minter's math.
+#
+# Mirrors the helpers at the top of `minter.py` operation for
+# operation, including where the contract fails: `sp.as_nat` of a
+# negative value and division by zero raise `ContractError`.
+# Arguments are unpacked rather than nested pairs.
+################################################################
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contract_constants import Constants
+
+PRECISION = Constants.PRECISION
+
+################################################################
+# Failures
+#
+# Failures raised with an error code from `common/errors.py` carry
+# that code. Failures the contracts do not label carry one of the
+# strings below.
+################################################################
+
+AS_NAT_FAILURE = "AS_NAT"
+DIVISION_BY_ZERO = "DIVISION_BY_ZERO"
+MUTEZ_UNDERFLOW = "MUTEZ_UNDERFLOW"
+
+class ContractError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+def verify(condition, code):
+    if not condition:
+        raise ContractError(code)
+
+def asNat(value):
+    verify(value >= 0, AS_NAT_FAILURE)
+    return value
+
+def floorDiv(numerator, denominator):
+    verify(denominator != 0, DIVISION_BY_ZERO)
+    return numerator // denominator
+
+################################################################
+# Math
+################################################################
+
+# Calculate newly accrued stability fees for an oven last updated at `ovenInterestIndex`.
+def calculateNewAccruedInterest(ovenInterestIndex, borrowedTokens, stabilityFeeTokens, minterInterestIndex):
+    ratio = floorDiv(minterInterestIndex * PRECISION, asNat(ovenInterestIndex))
+    totalPrinciple = borrowedTokens + stabilityFeeTokens
+    newTotalTokens = (ratio * totalPrinciple) // PRECISION
+    return asNat(newTotalTokens - totalPrinciple)
+
+# Compound interest via a linear approximation.
+def compoundWithLinearApproximation(initialValue, stabilityFee, numPeriods):
+    return (initialValue * (PRECISION + (numPeriods * stabilityFee))) // PRECISION
+
+# Compute the collateralization percentage, in the form of 200_000_000_000_000_000_000 (= 200%).
+def computeCollateralizationPercentage(ovenBalance, xtzPrice, borrowedTokens):
+    collateralValue = ovenBalance * xtzPrice // PRECISION
+    ratio = floorDiv(collateralValue * PRECISION, borrowedTokens)
+    return ratio * 100
+
+# The Minter's interest index compounded from `lastInterestIndexUpdateTime` to `now`.
+# Returns (newInterestIndex, newLastInterestIndexUpdateTime).
+def compoundInterestIndex(interestIndex, stabilityFee, lastInterestIndexUpdateTime, now):
+    numPeriods = asNat(now - lastInterestIndexUpdateTime) // Constants.SECONDS_PER_COMPOUND
+    newInterestIndex = compoundWithLinearApproximation(interestIndex, stabilityFee, numPeriods)
+    return newInterestIndex, lastInterestIndexUpdateTime + numPeriods * Constants.SECONDS_PER_COMPOUND
@@ -0,0 +1,318 @@
+################################################################
+# Columnar oven snapshots.
+#
+# A snapshot holds the state of every oven in one memory-mapped
+# file, laid out as columns that `batch_health.py` evaluates
+# without parsing or copying:
+#   - ovenBalance, borrowedTokens, stabilityFeeTokens and
+#     interestIndex as limb arrays of shape (limbs, capacity), with
+#     32 bit limbs in uint64 like `batch_health.py`. ovenBalance is
+#     in mutez * MUTEZ_TO_KOLIBRI_CONVERSION, as the Minter sees it.
+#     stabilityFeeTokens and interestIndex hold magnitudes, with
+#     negative values flagged in a bool column.
+#   - isLiquidated as bool.
+#   - oven and owner as uint32 ids into a dictionary of fixed width
+#     addresses.
+#
+# Updates rewrite only the rows of changed ovens and append new
+# ones. The file only grows, by copying into a new file and renaming
+# it, when the capacity or the limb width is exhausted. A header
+# records the level and block hash of the state, and a dirty flag is
+# set for the duration of updates so readers never see half-written
+# rows.
+#
+# Usage:
+#   python3 tools/oven_snapshot.py --database ovens.db --snapshot ovens.snapshot
+################################################################
+
+import argparse
+import collections
+import os
+import struct
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import batch_health
+from contract_constants import Constants
+from indexer import Indexer
+
+MUTEZ_TO_KOLIBRI_CONVERSION = Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+
+MAGIC = b"KOLOVENS"
+VERSION = 1
+# magic, version, dirty, limbs, capacity, count, addressCount, level, blockHash.
+HEADER_FORMAT = "<8sIIIQQQq64s"
+HEADER_SIZE = 256
+ADDRESS_WIDTH = 36
+
+DEFAULT_CAPACITY = 1024
+DEFAULT_LIMBS = 4
+
+LIMB_COLUMNS = ["ovenBalance", "borrowedTokens", "stabilityFeeTokens", "interestIndex"]
+SIGNED_COLUMNS = ["stabilityFeeTokens", "interestIndex"]
+
+# Oven balances are in mutez.
+SnapshotOven = collections.namedtuple("SnapshotOven", ["address", "owner", "ovenBalance", "borrowedTokens", "stabilityFeeTokens", "interestIndex", "isLiquidated"])
+
+class SnapshotError(Exception):
+    pass
+
+# (name, shape, dtype) of each section, in file order. The dictionary holds at most an oven and an owner per row.
+def sections(capacity, limbs):
+    return (
+        [(name, (limbs, capacity), np.uint64) for name in LIMB_COLUMNS] +
+        [(name + "Negative", (capacity,), np.bool_) for name in SIGNED_COLUMNS] +
+        [
+            ("isLiquidated", (capacity,), np.bool_),
+            ("oven", (capacity,), np.uint32),
+            ("owner", (capacity,), np.uint32),
+            ("addresses", (2 * capacity,), "S{}".format(ADDRESS_WIDTH)),
+        ]
+    )
+
+# {name: (offset, shape, dtype)} and the file size for a capacity and limb width. Sections are 8 byte aligned.
+def layout(capacity, limbs):
+    offsets = {}
+    offset = HEADER_SIZE
+    for name, shape, dtype in sections(capacity, limbs):
+        offsets[name] = (offset, shape, dtype)
+        offset += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8
+    return offsets, offset
+
+class OvenSnapshot:
+    def __init__(self, path, writable = False):
+        self.path = path
+        self.writable = writable
+        self.addressIds = None
+        self.map()
+        if self.dirty:
+            raise SnapshotError("{} was left mid-update, rebuild it".format(path))
+
+    # Create an empty snapshot, replacing any file at `path`.
+    @staticmethod
+    def create(path, capacity = DEFAULT_CAPACITY, limbs = DEFAULT_LIMBS):
+        _, size = layout(capacity, limbs)
+        with open(path, "wb") as f:
+            f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, 0, limbs, capacity, 0, 0, -1, b""))
+            f.truncate(size)
+        return OvenSnapshot(path, writable = True)
+
+    def map(self):
+        self.memory = np.memmap(self.path, dtype = np.uint8, mode = "r+" if self.writable else "r")
+        magic, version, self.dirty, self.limbs, self.capacity, self.count, self.addressCount, self.level, blockHash = struct.unpack_from(HEADER_FORMAT, self.memory)
+        if magic != MAGIC or version != VERSION:
+            raise SnapshotError("{} is not a version {} oven snapshot".format(self.path, VERSION))
+        self.blockHash = blockHash.rstrip(b"\x00").decode()
+
+        offsets, size = layout(self.capacity, self.limbs)
+        if len(self.memory) != size:
+            raise SnapshotError("{} is truncated".format(self.path))
+        self.columns = {
+            name: np.ndarray(shape, dtype = dtype, buffer = self.memory, offset = offset)
+            for name, (offset, shape, dtype) in offsets.items()
+        }
+
+    def writeHeader(self):
+        struct.pack_into(
+            HEADER_FORMAT, self.memory, 0,
+            MAGIC, VERSION, self.dirty, self.limbs, self.capacity, self.count, self.addressCount, self.level, self.blockHash.encode()
+        )
+        self.memory.flush()
+
+    def close(self):
+        self.columns = None
+        self.memory = None
+
+    def __len__(self):
+        return self.count
+
+    ################################################################
+    # Columns
+    ################################################################
+
+    # Views of the first `count` rows, without copying. Limb columns have shape (limbs, count).
+    def column(self, name):
+        values = self.columns[name]
+        return values[..., :self.count]
+
+    # A signed column as a (magnitude limbs, negative) pair, which `batch_health` accepts.
+    def signedColumn(self, name):
+        return (self.column(name), self.column(name + "Negative"))
+
+    def addresses(self, name = "oven"):
+        dictionary = self.columns["addresses"]
+        return [address.decode() for address in dictionary[self.column(name)]]
+
+    # Evaluate every oven with `batch_health.evaluateHealth`.
+    def evaluateHealth(self, minterInterestIndex, xtzPrice):
+        return batch_health.evaluateHealth(
+            self.column("ovenBalance"),
+            self.column("borrowedTokens"),
+            self.signedColumn("stabilityFeeTokens"),
+            self.signedColumn("interestIndex"),
+            minterInterestIndex,
+            xtzPrice
+        )
+
+    def oven(self, address):
+        row = self.rowOf(address)
+        if row is None:
+            return None
+
+        def value(name):
+            magnitude = batch_health.fromLimbs(self.columns[name][:, row:row + 1])[0]
+            return -magnitude if name in SIGNED_COLUMNS and self.columns[name + "Negative"][row] else magnitude
+
+        return SnapshotOven(
+            address = address,
+            owner = self.columns["addresses"][self.columns["owner"][row]].decode() or None,
+            ovenBalance = value("ovenBalance") // MUTEZ_TO_KOLIBRI_CONVERSION,
+            borrowedTokens = value("borrowedTokens"),
+            stabilityFeeTokens = value("stabilityFeeTokens"),
+            interestIndex = value("interestIndex"),
+            isLiquidated = bool(self.columns["isLiquidated"][row]),
+        )
+
+    ################################################################
+    # Updates
+    ################################################################
+
+    def loadDictionary(self):
+        if self.addressIds is None:
+            names = [address.decode() for address in self.columns["addresses"][:self.addressCount].tolist()]
+            self.addressIds = dict(zip(names, range(len(names))))
+            self.rows = { names[ovenId]: row for row, ovenId in enumerate(self.column("oven").tolist()) }
+
+    def rowOf(self, address):
+        self.loadDictionary()
+        return self.rows.get(address)
+
+    def addressId(self, address):
+        if address not in self.addressIds:
+            encoded = address.encode()
+            if len(encoded) > ADDRESS_WIDTH:
+                raise SnapshotError("Address {} is longer than {} bytes".format(address, ADDRESS_WIDTH))
+            self.columns["addresses"][self.addressCount] = encoded
+            self.addressIds[address] = self.addressCount
+            self.addressCount += 1
+        return self.addressIds[address]
+
+    # Copy into a new file with room for `capacity` rows of `limbs` limbs, and replace this one with it.
+    def resize(self, capacity, limbs):
+        temporary = self.path + ".resize"
+        resized = OvenSnapshot.create(temporary, capacity, limbs)
+        for name in LIMB_COLUMNS:
+            resized.columns[name][:self.limbs, :self.count] = self.column(name)
+        for name in [name + "Negative" for name in SIGNED_COLUMNS] + ["isLiquidated", "oven", "owner"]:
+            resized.columns[name][:self.count] = self.column(name)
+        resized.columns["addresses"][:self.addressCount] = self.columns["addresses"][:self.addressCount]
+        resized.count, resized.addressCount, resized.level, resized.blockHash = self.count, self.addressCount, self.level, self.blockHash
+        resized.writeHeader()
+        resized.close()
+
+        self.close()
+        os.replace(temporary, self.path)
+        self.map()
+
+    # Write the state of changed ovens at a block. Ovens are (address, owner, ovenBalance, borrowedTokens,
+    # stabilityFeeTokens, interestIndex, isLiquidated), balances in mutez, ex. `SnapshotOven` or `indexer.Oven` rows.
+    def update(self, ovens, level, blockHash = ""):
+        if not self.writable:
+            raise SnapshotError("{} is open read-only".format(self.path))
+        # The last state of each oven.
+        latest = {}
+        for oven in ovens:
+            ovenBalance = oven.ovenBalance if hasattr(oven, "ovenBalance") else oven.balance
+            latest[oven.address] = SnapshotOven(oven.address, oven.owner or "", ovenBalance, oven.borrowedTokens, oven.stabilityFeeTokens, oven.interestIndex, oven.isLiquidated)
+        ovens = list(latest.values())
+
+        self.loadDictionary()
+        newOvens = sum(1 for oven in ovens if oven.address not in self.rows)
+        newAddresses = len(set(address for oven in ovens for address in (oven.address, oven.owner) if address not in self.addressIds))
+        values = {
+            "ovenBalance": [oven.ovenBalance * MUTEZ_TO_KOLIBRI_CONVERSION for oven in ovens],
+            "borrowedTokens": [oven.borrowedTokens for oven in ovens],
+            "stabilityFeeTokens": [abs(oven.stabilityFeeTokens) for oven in ovens],
+            "interestIndex": [abs(oven.interestIndex) for oven in ovens],
+        }
+        limbs = { name: batch_health.toLimbs(column) for name, column in values.items() }
+
+        limbCount = max([self.limbs] + [column.shape[0] for column in limbs.values()])
+        capacity = self.capacity
+        while self.count + newOvens > capacity or self.addressCount + newAddresses > 2 * capacity:
+            capacity *= 2
+        if capacity != self.capacity or limbCount != self.limbs:
+            self.resize(capacity, limbCount)
+
+        self.dirty = 1
+        self.writeHeader()
+
+        rows = []
+        for oven in ovens:
+            if oven.address not in self.rows:
+                self.rows[oven.address] = self.count
+                self.columns["oven"][self.count] = self.addressId(oven.address)
+                self.count += 1
+            row = self.rows[oven.address]
+            self.columns["owner"][row] = self.addressId(oven.owner)
+            rows.append(row)
+
+        rows = np.array(rows, dtype = np.int64)
+        for name, column in limbs.items():
+            self.columns[name][:column.shape[0], rows] = column
+            self.columns[name][column.shape[0]:, rows] = 0
+        self.columns["stabilityFeeTokensNegative"][rows] = [oven.stabilityFeeTokens < 0 for oven in ovens]
+        self.columns["interestIndexNegative"][rows] = [oven.interestIndex < 0 for oven in ovens]
+        self.columns["isLiquidated"][rows] = [oven.isLiquidated for oven in ovens]
+        self.memory.flush()
+
+        self.level = level
+        self.blockHash = blockHash
+        self.dirty = 0
+        self.writeHeader()
+        return len(ovens)
+
+# Bring a snapshot up to date with an indexer database, writing only ovens changed since the snapshot's level.
+# The snapshot is rebuilt if it is missing, was left mid-update, or the block it was taken at has since been
+# reorganized away. Returns the number of ovens written.
+def updateFromIndexer(path, database):
+    checkpoint = database.checkpoint()
+    if checkpoint is None:
+        raise SnapshotError("The index is empty")
+
+    try:
+        snapshot = OvenSnapshot(path, writable = True)
+        if snapshot.level > checkpoint.level or database.blockHash(snapshot.level) not in (None, snapshot.blockHash):
+            snapshot.close()
+            snapshot = OvenSnapshot.create(path)
+    except (FileNotFoundError, SnapshotError):
+        snapshot = OvenSnapshot.create(path)
+
+    written = snapshot.update(database.ovens(sinceLevel = snapshot.level), checkpoint.level, checkpoint.hash)
+    snapshot.close()
+    return written
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Write a columnar oven snapshot from an indexer database.")
+    parser.add_argument("--database", required = True, help = "SQLite database written by tools/indexer.py")
+    parser.add_argument("--snapshot", required = True, help = "Snapshot file to create or update")
+    args = parser.parse_args(argv)
+
+    # Contract addresses are only needed to index, not to read.
+    database = Indexer(args.database, None)
+    try:
+        written = updateFromIndexer(args.snapshot, database)
+        snapshot = OvenSnapshot(args.snapshot)
+        print("Wrote {} ovens, {} in the snapshot at level {}".format(written, len(snapshot), snapshot.level))
+        return 0
+    except SnapshotError as e:
+        print("Error: {}".format(e))
+        return 1
+    finally:
+        database.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
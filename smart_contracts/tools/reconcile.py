@@ -0,0 +1,282 @@
+################################################################
+# kUSD supply reconciliation.
+#
+# Checks the invariants the Minter implies between oven state and
+# the kUSD ledger:
+#   - ledger: balances sum to the total supply.
+#   - oven debt: the total supply is the sum of oven
+#     `borrowedTokens`. `borrow` mints what it adds to
+#     borrowedTokens, while `repay` and `liquidate` burn what they
+#     take off it plus the stability and liquidation fees they mint
+#     to the funds, so fees cancel out and the difference never
+#     changes.
+#   - chain supply: the indexed total supply is the token's.
+# Any difference is drift. Ovens and accounts which break an
+# invariant on their own are reported as offenders, including ovens
+# whose stability fees exceed the debt ceiling headroom: `repay`
+# mints fees before it burns, so it fails for them with
+# DEBT_CEILING. Fees are compounded to the Minter's interest index
+# when it is given, like `repay` does. Otherwise only the stored
+# `stabilityFeeTokens` are compared, which is a lower bound that
+# misses ovens whose fees have accrued since they were last touched.
+#
+# Ovens are read from an oven snapshot in chunks of rows, or from
+# the indexer, and balances from the indexer, one row at a time, so
+# memory does not grow with the number of ovens or accounts. Only
+# the largest offenders are kept.
+#
+# Usage:
+#   python3 tools/reconcile.py --database ovens.db [--snapshot ovens.snapshot] [--source http://localhost:8732 --token KT1... | --debt-ceiling N] [--interest-index N]
+################################################################
+
+import argparse
+import collections
+import heapq
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import batch_health
+import michelson
+import minter_math
+from indexer import Indexer, IndexerError, NodeSource, decodeTokenStorage
+from michelson import MichelsonError
+from minter_math import AS_NAT_FAILURE, ContractError
+from oven_snapshot import OvenSnapshot, SnapshotError
+
+DEFAULT_CHUNK_ROWS = 1 << 16
+DEFAULT_MAX_OFFENDERS = 20
+
+NEGATIVE_BALANCE = "negative balance"
+NEGATIVE_STABILITY_FEES = "negative stabilityFeeTokens"
+LIQUIDATED_WITH_DEBT = "liquidated with debt"
+DEBT_WITHOUT_INTEREST_INDEX = "debt without an interest index"
+FEES_OVER_HEADROOM = "stability fees above the debt ceiling headroom"
+
+# `actual - expected` is the drift.
+Check = collections.namedtuple("Check", ["name", "expected", "actual"])
+Headroom = collections.namedtuple("Headroom", ["debtCeiling", "totalSupply", "headroom"])
+Offender = collections.namedtuple("Offender", ["address", "reason", "value"])
+Report = collections.namedtuple("Report", ["level", "checks", "headroom", "offenders", "offenderCount"])
+
+class ReconcileError(Exception):
+    pass
+
+# The `limit` offenders with the largest values, of however many are added.
+class Offenders:
+    def __init__(self, limit = DEFAULT_MAX_OFFENDERS):
+        self.limit = limit
+        self.count = 0
+        self.heap = []
+
+    def add(self, address, reason, value):
+        entry = (abs(value), self.count, Offender(address, reason, value))
+        self.count += 1
+        if len(self.heap) < self.limit:
+            heapq.heappush(self.heap, entry)
+        elif entry[0] > self.heap[0][0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def largest(self):
+        return [offender for _, _, offender in sorted(self.heap, key = lambda entry: (-entry[0], entry[1]))]
+
+################################################################
+# Ovens
+################################################################
+
+# Stability fees `repay` would charge an oven at a Minter interest index, or its stored fees without one or where the
+# Minter's math fails.
+def owedStabilityFees(borrowedTokens, stabilityFeeTokens, interestIndex, minterInterestIndex = None):
+    if minterInterestIndex is None:
+        return stabilityFeeTokens
+    try:
+        accrued = minter_math.calculateNewAccruedInterest(interestIndex, borrowedTokens, minter_math.asNat(stabilityFeeTokens), minterInterestIndex)
+    except ContractError:
+        return stabilityFeeTokens
+    return stabilityFeeTokens + accrued
+
+# The invariants an oven breaks on its own, as (reason, value).
+def ovenProblems(borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated, headroom = None, minterInterestIndex = None):
+    if stabilityFeeTokens < 0:
+        yield NEGATIVE_STABILITY_FEES, stabilityFeeTokens
+    if isLiquidated and (borrowedTokens or stabilityFeeTokens):
+        yield LIQUIDATED_WITH_DEBT, borrowedTokens + stabilityFeeTokens
+    if borrowedTokens and interestIndex <= 0:
+        yield DEBT_WITHOUT_INTEREST_INDEX, borrowedTokens
+    if headroom is not None:
+        owedFees = owedStabilityFees(borrowedTokens, stabilityFeeTokens, interestIndex, minterInterestIndex)
+        if owedFees > max(headroom, 0):
+            yield FEES_OVER_HEADROOM, owedFees
+
+# Sum of borrowedTokens of indexer ovens, adding ovens which break an invariant to `offenders`.
+def ovenTotal(ovens, offenders, headroom = None, minterInterestIndex = None):
+    borrowedTokens = 0
+    for oven in ovens:
+        borrowedTokens += oven.borrowedTokens
+        for reason, value in ovenProblems(oven.borrowedTokens, oven.stabilityFeeTokens, oven.interestIndex, oven.isLiquidated, headroom, minterInterestIndex):
+            offenders.add(oven.address, reason, value)
+    return borrowedTokens
+
+# Exact sum of a limb array over ovens. Limbs are below 2^32, so each limb sums within 64 bits for fewer than 2^32
+# ovens.
+def limbSum(limbs):
+    return sum(int(total) << (batch_health.LIMB_BITS * index) for index, total in enumerate(limbs.sum(axis = 1, dtype = np.uint64)))
+
+def limbValue(limbs, row, negative = False):
+    magnitude = batch_health.fromLimbs(limbs[:, row:row + 1])[0]
+    return -magnitude if negative else magnitude
+
+# Like `ovenTotal` for a snapshot, `chunkRows` rows at a time on views of the file. Rows which may break an invariant
+# are found with vectorized masks, and only those are read as ints.
+def snapshotOvenTotal(snapshot, offenders, headroom = None, chunkRows = DEFAULT_CHUNK_ROWS, minterInterestIndex = None):
+    dictionary = snapshot.columns["addresses"]
+    borrowedTokens = 0
+    for start in range(0, len(snapshot), chunkRows):
+        rows = slice(start, start + chunkRows)
+        borrowed = snapshot.column("borrowedTokens")[:, rows]
+        fees = snapshot.column("stabilityFeeTokens")[:, rows]
+        negativeFees = snapshot.column("stabilityFeeTokensNegative")[rows]
+        interestIndex = snapshot.column("interestIndex")[:, rows]
+        negativeIndex = snapshot.column("interestIndexNegative")[rows]
+        isLiquidated = snapshot.column("isLiquidated")[rows]
+        borrowedTokens += limbSum(borrowed)
+
+        suspect = negativeFees | (isLiquidated & ~(batch_health.isZero(borrowed) & batch_health.isZero(fees)))
+        suspect |= ~batch_health.isZero(borrowed) & (batch_health.isZero(interestIndex) | negativeIndex)
+        if headroom is not None:
+            limit = batch_health.scalar(max(headroom, 0))
+            suspect |= batch_health.lessThan(limit, fees)
+            if minterInterestIndex is not None:
+                failures = batch_health.Failures(negativeFees.shape)
+                failures.record(negativeFees, AS_NAT_FAILURE)
+                naturalFees, _ = batch_health.naturals((fees, negativeFees))
+                owedFees = batch_health.accrueStabilityFees(borrowed, naturalFees, (interestIndex, negativeIndex), minterInterestIndex, failures)
+                suspect |= batch_health.lessThan(limit, owedFees)
+
+        for row in np.flatnonzero(suspect):
+            address = dictionary[snapshot.columns["oven"][start + row]].decode()
+            problems = ovenProblems(
+                limbValue(borrowed, row),
+                limbValue(fees, row, negativeFees[row]),
+                limbValue(interestIndex, row, negativeIndex[row]),
+                isLiquidated[row],
+                headroom,
+                minterInterestIndex
+            )
+            for reason, problemValue in problems:
+                offenders.add(address, reason, problemValue)
+    return borrowedTokens
+
+################################################################
+# Ledger
+################################################################
+
+# Sum of kUSD balances, adding negative balances, which the token never allows, to `offenders`.
+def ledgerTotal(balances, offenders):
+    total = 0
+    for address, balance in balances:
+        total += balance
+        if balance < 0:
+            offenders.add(address, NEGATIVE_BALANCE, balance)
+    return total
+
+################################################################
+# Reconciliation
+################################################################
+
+# Reconcile the indexer's ovens, or those of a snapshot at the same level, against its kUSD ledger.
+#
+# Params:
+#   - database: An `Indexer`.
+#   - snapshot: An `OvenSnapshot` to read ovens from instead of the indexer.
+#   - tokenStorage: (totalSupply, debtCeiling) of the token at the indexer's level, if known.
+#   - debtCeiling: The token's debt ceiling, if `tokenStorage` is not known.
+#   - minterInterestIndex: The Minter's interest index compounded to now, to compare the fees `repay` would charge
+#     with the headroom. Without it, stored fees are compared, which is a lower bound.
+def reconcile(database, snapshot = None, tokenStorage = None, debtCeiling = None, maxOffenders = DEFAULT_MAX_OFFENDERS, minterInterestIndex = None):
+    checkpoint = database.checkpoint()
+    if checkpoint is None:
+        raise ReconcileError("The index is empty")
+    if snapshot is not None and (snapshot.level, snapshot.blockHash) != (checkpoint.level, checkpoint.hash):
+        raise ReconcileError("The snapshot is at level {} but the index is at level {}".format(snapshot.level, checkpoint.level))
+
+    totalSupply = database.totalSupply()
+    headroom = None
+    if tokenStorage is not None:
+        chainSupply, debtCeiling = tokenStorage
+        headroom = Headroom(debtCeiling, chainSupply, debtCeiling - chainSupply)
+    elif debtCeiling is not None:
+        headroom = Headroom(debtCeiling, totalSupply, debtCeiling - totalSupply)
+
+    offenders = Offenders(maxOffenders)
+    limit = None if headroom is None else headroom.headroom
+    if snapshot is None:
+        borrowedTokens = ovenTotal(database.ovens(), offenders, limit, minterInterestIndex)
+    else:
+        borrowedTokens = snapshotOvenTotal(snapshot, offenders, limit, minterInterestIndex = minterInterestIndex)
+
+    checks = [
+        Check("ledger", totalSupply, ledgerTotal(database.balances(), offenders)),
+        Check("oven debt", totalSupply, borrowedTokens),
+    ]
+    if tokenStorage is not None:
+        checks.append(Check("chain supply", tokenStorage[0], totalSupply))
+    return Report(checkpoint.level, checks, headroom, offenders.largest(), offenders.count)
+
+def formatReport(report):
+    lines = ["Reconciled at level {}".format(report.level)]
+    for check in report.checks:
+        drift = check.actual - check.expected
+        lines.append("{:<13} {:>32} {:>32}  {}".format(check.name, check.expected, check.actual, "ok" if drift == 0 else "drift {}".format(drift)))
+    if report.headroom is not None:
+        lines.append("debt ceiling  {} with {} supplied leaves {}".format(*report.headroom))
+    if report.offenderCount:
+        lines.append("{} offenders, largest first:".format(report.offenderCount))
+        lines += ["  {}  {}  {}".format(*offender) for offender in report.offenders]
+    return "\n".join(lines)
+
+# Whether the report has any drift or offender.
+def isClean(report):
+    return report.offenderCount == 0 and all(check.actual == check.expected for check in report.checks)
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Reconcile oven debt against the kUSD ledger and total supply.")
+    parser.add_argument("--database", required = True, help = "SQLite database written by tools/indexer.py")
+    parser.add_argument("--snapshot", help = "Read ovens from a snapshot written by tools/oven_snapshot.py")
+    parser.add_argument("--source", help = "Node RPC URL to read the token's total supply and debt ceiling from")
+    parser.add_argument("--token", help = "Address of the kUSD token contract, needed with --source")
+    parser.add_argument("--debt-ceiling", type = int, help = "The token's debt ceiling, without --source")
+    parser.add_argument("--interest-index", type = int, help = "The Minter's interest index compounded to now, to check fees with accrued interest against the headroom")
+    parser.add_argument("--max-offenders", type = int, default = DEFAULT_MAX_OFFENDERS, help = "Number of offenders to list")
+    args = parser.parse_args(argv)
+    if (args.source is None) != (args.token is None):
+        parser.error("--source and --token go together")
+
+    # Contract addresses are only needed to index, not to read.
+    database = Indexer(args.database, None)
+    snapshot = None
+    try:
+        snapshot = None if args.snapshot is None else OvenSnapshot(args.snapshot)
+        tokenStorage = None
+        if args.source is not None:
+            checkpoint = database.checkpoint()
+            if checkpoint is None:
+                raise ReconcileError("The index is empty")
+            tokenStorage = decodeTokenStorage(michelson.fromJson(NodeSource(args.source).storage(args.token, checkpoint.level)))
+
+        report = reconcile(database, snapshot, tokenStorage, args.debt_ceiling, args.max_offenders, args.interest_index)
+        print(formatReport(report))
+        return 0 if isClean(report) else 2
+    except (ReconcileError, IndexerError, MichelsonError, SnapshotError) as e:
+        print("Error: {}".format(e))
+        return 1
+    finally:
+        if snapshot is not None:
+            snapshot.close()
+        database.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
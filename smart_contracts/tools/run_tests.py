@@ -0,0 +1,210 @@
+################################################################
+# Parallel runner for SmartPy test scenarios.
+#
+# Discovers every `@sp.add_test` scenario in the given files and
+# runs each one in its own SmartPy CLI process, spread across a
+# worker pool. Each scenario runs from a copy of its file, next to
+# the original so that `file:` imports resolve the same way, in
+# which every other scenario's decorator is commented out. Reports
+# the wall time of each scenario and the slowest ones.
+#
+# Usage:
+#   python3 tools/run_tests.py --cli ~/smartpy-cli/SmartPy.sh [--jobs N] [--filter TEXT] [--changed GIT_REF] FILE.py...
+################################################################
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import build
+
+DECORATOR_REGEX = re.compile(r'^(\s*)@sp\.add_test\(\s*name\s*=\s*"([^"]*)"')
+ANY_DECORATOR_REGEX = re.compile(r'^\s*#?\s*@sp\.add_test\(')
+ALIAS_REGEX = re.compile(r'^\s*(\w+)\s*=\s*sp\.import_script_from_url\(\s*"file:([^"]+)"\s*\)', re.MULTILINE)
+MAIN_GUARD = 'if __name__ == "__main__":'
+
+SHARD_PREFIX = ".test-shard-"
+DEFAULT_OUT_DIR = ".test-shards"
+DEFAULT_SLOWEST = 10
+
+################################################################
+# Discovery
+################################################################
+
+class Scenario:
+    def __init__(self, path, index, name, line, body):
+        self.path = path
+        self.index = index
+        self.name = name
+        # Zero based line of the decorator.
+        self.line = line
+        self.body = body
+
+    @property
+    def id(self):
+        return "{}::{}".format(self.path, self.name)
+
+# Find every active scenario in a SmartPy file, in order.
+def discoverScenarios(path, root):
+    with open(os.path.join(root, path)) as f:
+        lines = f.read().splitlines()
+
+    decorators = [number for number, line in enumerate(lines) if ANY_DECORATOR_REGEX.match(line)]
+    scenarios = []
+    for position, number in enumerate(decorators):
+        match = DECORATOR_REGEX.match(lines[number])
+        if match is None:
+            continue
+        end = decorators[position + 1] if position + 1 < len(decorators) else len(lines)
+        scenarios.append(Scenario(path, len(scenarios), match.group(2), number, "\n".join(lines[number:end])))
+    return scenarios
+
+# Write a copy of a file in which only `scenario` is registered as a test. Returns the path of the copy.
+def writeShard(scenario, allScenarios, root):
+    with open(os.path.join(root, scenario.path)) as f:
+        lines = f.read().splitlines()
+
+    for other in allScenarios:
+        if other is not scenario:
+            indent = DECORATOR_REGEX.match(lines[other.line]).group(1)
+            lines[other.line] = indent + "# " + lines[other.line][len(indent):]
+
+    stem = os.path.splitext(os.path.basename(scenario.path))[0]
+    shardPath = os.path.join(os.path.dirname(scenario.path), "{}{}-{}.py".format(SHARD_PREFIX, stem, scenario.index))
+    with open(os.path.join(root, shardPath), "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return shardPath
+
+################################################################
+# Selection
+################################################################
+
+# Files changed relative to a git ref, relative to the source root.
+def changedFiles(ref, root):
+    output = subprocess.run(
+        ["git", "diff", "--name-only", "--relative", ref],
+        cwd = root, stdout = subprocess.PIPE, check = True, text = True
+    ).stdout
+    return { os.path.normpath(path) for path in output.splitlines() }
+
+def dependsOnChange(path, changed, root):
+    return any(dependency in changed for dependency in build.transitiveImports(path, root))
+
+# Select the scenarios in a file affected by changed files.
+#
+# Every scenario is affected if the file itself, or anything its contract imports, changed. Otherwise, a scenario is
+# affected if it refers to an imported module which depends on a changed file.
+def affectedScenarios(path, scenarios, changed, root):
+    with open(os.path.join(root, path)) as f:
+        text = f.read()
+
+    guard = text.find(MAIN_GUARD)
+    contractImports = [os.path.normpath(imported) for alias, imported in ALIAS_REGEX.findall(text[:guard])] if guard != -1 else []
+    if os.path.normpath(path) in changed or any(dependsOnChange(imported, changed, root) for imported in contractImports):
+        return scenarios
+
+    changedAliases = {
+        alias for alias, imported in ALIAS_REGEX.findall(text)
+        if dependsOnChange(os.path.normpath(imported), changed, root)
+    }
+    return [
+        scenario for scenario in scenarios
+        if any(re.search(r'\b{}\.'.format(alias), scenario.body) for alias in changedAliases)
+    ]
+
+################################################################
+# Running
+################################################################
+
+# Run a single scenario from its shard, then remove the shard. Returns (scenario, passed, seconds, log).
+def runScenario(scenario, shardPath, cli, root, outDir):
+    shardOutDir = os.path.join(outDir, os.path.splitext(os.path.basename(shardPath))[0])
+    start = time.monotonic()
+    try:
+        result = subprocess.run(
+            [cli, "test", shardPath, shardOutDir],
+            cwd = root, stdout = subprocess.PIPE, stderr = subprocess.STDOUT, text = True
+        )
+    finally:
+        os.remove(os.path.join(root, shardPath))
+    return scenario, result.returncode == 0, time.monotonic() - start, result.stdout
+
+def runScenarios(scenariosByFile, cli, root, jobs = None, outDir = DEFAULT_OUT_DIR):
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers = jobs or os.cpu_count()) as executor:
+            futures = []
+            for path, (allScenarios, selected) in scenariosByFile.items():
+                for scenario in selected:
+                    shardPath = writeShard(scenario, allScenarios, root)
+                    futures.append(executor.submit(runScenario, scenario, shardPath, cli, root, outDir))
+            for future in futures:
+                scenario, passed, seconds, log = future.result()
+                print("{} {} ({:.1f}s)".format("PASS" if passed else "FAIL", scenario.id, seconds))
+                results.append((scenario, passed, seconds, log))
+    finally:
+        shutil.rmtree(os.path.join(root, outDir), ignore_errors = True)
+    return results
+
+def formatSummary(results, slowest):
+    failed = [result for result in results if not result[1]]
+    lines = ["", "{} scenarios, {} failed".format(len(results), len(failed))]
+
+    lines.append("")
+    lines.append("Slowest scenarios:")
+    for scenario, passed, seconds, log in sorted(results, key = lambda result: -result[2])[:slowest]:
+        lines.append("  {:>7.1f}s  {}".format(seconds, scenario.id))
+
+    for scenario, passed, seconds, log in failed:
+        lines.append("")
+        lines.append("---- {} ----".format(scenario.id))
+        lines.append(log)
+    return "\n".join(lines)
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Run SmartPy test scenarios in parallel.")
+    parser.add_argument("files", nargs = "+", help = "SmartPy files containing scenarios")
+    parser.add_argument("--cli", required = True, help = "Path to SmartPy.sh")
+    parser.add_argument("--jobs", type = int, default = None, help = "Number of parallel scenarios. Defaults to the CPU count")
+    parser.add_argument("--filter", default = None, help = "Only run scenarios whose name contains this text")
+    parser.add_argument("--changed", metavar = "GIT_REF", default = None, help = "Only run scenarios affected by changes since GIT_REF")
+    parser.add_argument("--slowest", type = int, default = DEFAULT_SLOWEST, help = "Number of slowest scenarios to report")
+    parser.add_argument("--json", metavar = "FILE", default = None, help = "Write per-scenario results to FILE")
+    parser.add_argument("--root", default = ".", help = "Directory containing the SmartPy sources")
+    args = parser.parse_args(argv)
+
+    changed = changedFiles(args.changed, args.root) if args.changed is not None else None
+
+    scenariosByFile = {}
+    for path in args.files:
+        allScenarios = discoverScenarios(path, args.root)
+        selected = allScenarios
+        if args.filter is not None:
+            selected = [scenario for scenario in selected if args.filter in scenario.name]
+        if changed is not None:
+            selected = affectedScenarios(path, selected, changed, args.root)
+        scenariosByFile[path] = (allScenarios, selected)
+
+    results = runScenarios(scenariosByFile, args.cli, args.root, jobs = args.jobs)
+    print(formatSummary(results, args.slowest))
+
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump([
+                { "file": scenario.path, "name": scenario.name, "passed": passed, "seconds": round(seconds, 3) }
+                for scenario, passed, seconds, log in results
+            ], f, indent = 2)
+            f.write("\n")
+
+    return 0 if all(result[1] for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
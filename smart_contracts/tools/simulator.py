@@ -0,0 +1,1588 @@
+################################################################
+# Pure Python simulator of the Kolibri contracts.
+#
+# Executable models of `MinterContract`, `OvenProxyContract`,
+# `OvenContract`, `OvenRegistryContract`, `FA12`, `OracleContract`,
+# `PushOracleContract`, `StabilityFundContract` and the fake
+# Harbinger used in tests. Storage fields, entry points, views,
+# checks, error codes and integer math follow the SmartPy sources.
+# Internal operations run depth first, and a failure rolls back
+# every change made since the top level call.
+#
+# An action script can be run through the simulator, or rendered to
+# a SmartPy scenario which replays the same actions against
+# `test-helpers/universe.py` and verifies, after every action, that
+# SmartPy's storage matches the simulator's. The cross-check is
+# experimental: its scenarios have not yet been run against the
+# SmartPy CLI itself.
+#
+# Usage:
+#   python3 tools/simulator.py SCRIPT.json [--render FILE.py] [--cross-check --cli ~/smartpy-cli/SmartPy.sh]
+#
+# SCRIPT.json is `{ "universe": { ...Universe params }, "actions": [ ...actions ] }`, see `ACTIONS`.
+################################################################
+
+import argparse
+import collections
+import json
+import os
+import subprocess
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import minter_math
+from contract_constants import Constants, Errors, SOURCE_ROOT
+from minter_math import ContractError, asNat, verify
+
+PRECISION = Constants.PRECISION
+MUTEZ_TO_KOLIBRI_CONVERSION = Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+
+# Failures which the contracts do not label with an error code.
+MAP_GET_FAILURE = "MAP_GET"
+BAD_CONTRACT = "BAD_CONTRACT"
+BALANCE_TOO_LOW = "BALANCE_TOO_LOW"
+WRONG_CONDITION = "WRONG_CONDITION"
+
+# Accounts which are not contracts in a universe. Names match `test-helpers/addresses.py`.
+GOVERNOR_ADDRESS = "governor"
+FUND_ADMINISTRATOR_ADDRESS = "fundAdministrator"
+PAUSE_GUARDIAN_ADDRESS = "pauseGuardian"
+
+################################################################
+# Chain
+################################################################
+
+MISSING = object()
+
+# A map whose writes can be rolled back, like a big map in a failed operation.
+class BigMap:
+    def __init__(self, items = None):
+        self.items = dict(items or {})
+        self.journal = None
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __getitem__(self, key):
+        verify(key in self.items, MAP_GET_FAILURE)
+        return self.items[key]
+
+    def __setitem__(self, key, value):
+        if self.journal is not None:
+            self.journal.append((key, self.items.get(key, MISSING)))
+        self.items[key] = value
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, default = None):
+        return self.items.get(key, default)
+
+    def keys(self):
+        return self.items.keys()
+
+    def startJournal(self):
+        if self.journal is None:
+            self.journal = []
+
+    def rollback(self):
+        while self.journal:
+            key, value = self.journal.pop()
+            if value is MISSING:
+                del self.items[key]
+            else:
+                self.items[key] = value
+        self.journal = None
+
+    def commit(self):
+        self.journal = None
+
+# An operation emitted by an entry point.
+Transfer = collections.namedtuple("Transfer", ["destination", "entryPoint", "param", "amount"])
+
+# Send mutez to an address, like `sp.send`.
+def send(address, amount):
+    return Transfer(address, "default", None, amount)
+
+# Mark a method as an entry point.
+def entryPoint(method):
+    method.isEntryPoint = True
+    return method
+
+# Mark a method as an on-chain view.
+def view(method):
+    method.isView = True
+    return method
+
+class Context:
+    def __init__(self, chain, address, sender, source, amount):
+        self.chain = chain
+        self.address = address
+        self.sender = sender
+        self.source = source
+        self.amount = amount
+
+    @property
+    def balance(self):
+        return self.chain.balances.get(self.address, 0)
+
+    @property
+    def now(self):
+        return self.chain.now
+
+    # The address of one of this contract's entry points, like `sp.self_entry_point`.
+    def selfEntryPoint(self, name):
+        return "{}%{}".format(self.address, name)
+
+    # Call an on-chain view of another contract, like `sp.view`. None if the contract has no such view.
+    def view(self, address, name, param = None):
+        return self.chain.view(self.address, address, name, param)
+
+class Contract:
+    # Storage fields and their types, see `renderValue`.
+    FIELDS = {}
+
+    def __init__(self, **storage):
+        self.data = types.SimpleNamespace(**storage)
+
+    def snapshot(self):
+        for value in vars(self.data).values():
+            if isinstance(value, BigMap):
+                value.startJournal()
+        return dict(vars(self.data))
+
+    def restore(self, snapshot):
+        for value in snapshot.values():
+            if isinstance(value, BigMap):
+                value.rollback()
+        vars(self.data).clear()
+        vars(self.data).update(snapshot)
+
+    def commit(self):
+        for value in vars(self.data).values():
+            if isinstance(value, BigMap):
+                value.commit()
+
+class Chain:
+    def __init__(self, now = 0):
+        self.now = now
+        self.contracts = {}
+        self.balances = {}
+        self.delegates = {}
+        self.operationCount = 0
+        self.touched = None
+        self.balanceJournal = None
+
+    def originate(self, address, contract, balance = 0):
+        self.contracts[address] = contract
+        self.balances[address] = balance
+        return contract
+
+    def balance(self, address):
+        return self.balances.get(address, 0)
+
+    # Make a top level call from an account. Like a SmartPy scenario, the amount does not need to be funded.
+    def call(self, sender, destination, entryPoint = "default", param = None, amount = 0, now = None):
+        if now is not None:
+            self.now = now
+
+        self.touched = {}
+        self.balanceJournal = {}
+        try:
+            self.credit(destination, amount)
+            self.execute(sender, sender, Transfer(destination, entryPoint, param, amount))
+        except ContractError:
+            for address, snapshot in self.touched.items():
+                self.contracts[address].restore(snapshot)
+            self.balances.update(self.balanceJournal)
+            raise
+        else:
+            for address in self.touched:
+                self.contracts[address].commit()
+        finally:
+            self.touched = None
+            self.balanceJournal = None
+
+    def credit(self, address, amount):
+        if address not in self.balanceJournal:
+            self.balanceJournal[address] = self.balances.get(address, 0)
+        self.balances[address] = self.balances.get(address, 0) + amount
+
+    # Run a view against the current storage of a contract. Failures fail the calling operation.
+    def view(self, sender, address, name, param = None):
+        method = getattr(self.contracts.get(address), name, None)
+        if not getattr(method, "isView", False):
+            return None
+        return method(Context(self, address, sender, sender, 0), param)
+
+    def execute(self, source, sender, transfer):
+        self.operationCount += 1
+        address, _, entryPointName = transfer.destination.partition("%")
+        entryPointName = entryPointName or transfer.entryPoint
+
+        contract = self.contracts.get(address)
+        if contract is None:
+            # Accounts and contracts which are not modelled accept mutez and nothing else.
+            verify(entryPointName == "default", BAD_CONTRACT)
+            return
+
+        method = getattr(contract, entryPointName, None)
+        verify(getattr(method, "isEntryPoint", False), BAD_CONTRACT)
+
+        if address not in self.touched:
+            self.touched[address] = contract.snapshot()
+
+        context = Context(self, address, sender, source, transfer.amount)
+        for operation in method(context, transfer.param) or []:
+            if operation.amount > 0:
+                verify(self.balances.get(address, 0) >= operation.amount, BALANCE_TOO_LOW)
+                self.credit(address, -operation.amount)
+                self.credit(operation.destination.partition("%")[0], operation.amount)
+            self.execute(source, address, operation)
+
+################################################################
+# Contracts
+#
+# Parameters which are nested pairs in SmartPy are flat tuples here.
+# Oven parameters passed between Oven, OvenProxy and Minter are
+# (oven, owner, balance, borrowedTokens, isLiquidated,
+# stabilityFeeTokens, interestIndex[, extra]), prefixed with the
+# oracle price once it is known.
+################################################################
+
+# Oven Proxy state machine, see `oven-proxy.py`.
+IDLE = 0
+BORROW_WAITING_FOR_ORACLE = 1
+WITHDRAW_WAITING_FOR_ORACLE = 2
+LIQUIDATE_WAITING_FOR_ORACLE = 3
+PARTIAL_LIQUIDATE_WAITING_FOR_ORACLE = 4
+
+# Oracle state machine, see `oracle.py`.
+WAITING_FOR_HARBINGER = 1
+
+class Oven(Contract):
+    FIELDS = {
+        "owner": "address",
+        "borrowedTokens": "nat",
+        "stabilityFeeTokens": "int",
+        "interestIndex": "int",
+        "isLiquidated": "bool",
+        "ovenProxyContractAddress": "address",
+    }
+
+    def __init__(self, owner, ovenProxyContractAddress, borrowedTokens = 0, stabilityFeeTokens = 0, interestIndex = PRECISION, isLiquidated = False):
+        Contract.__init__(
+            self,
+            owner = owner,
+            borrowedTokens = borrowedTokens,
+            stabilityFeeTokens = stabilityFeeTokens,
+            interestIndex = interestIndex,
+            isLiquidated = isLiquidated,
+            ovenProxyContractAddress = ovenProxyContractAddress
+        )
+
+    def ovenParams(self, context):
+        normalizedBalance = context.balance * MUTEZ_TO_KOLIBRI_CONVERSION
+        return (
+            context.address, self.data.owner, normalizedBalance, self.data.borrowedTokens,
+            self.data.isLiquidated, self.data.stabilityFeeTokens, self.data.interestIndex
+        )
+
+    def callProxy(self, context, entryPointName, extra):
+        return [Transfer(self.data.ovenProxyContractAddress, entryPointName, self.ovenParams(context) + extra, context.balance)]
+
+    @entryPoint
+    def borrow(self, context, tokensToBorrow):
+        verify(context.sender == self.data.owner, Errors.NOT_OWNER)
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+        return self.callProxy(context, "borrow", (tokensToBorrow,))
+
+    @entryPoint
+    def repay(self, context, tokensToRepay):
+        verify(context.sender == self.data.owner, Errors.NOT_OWNER)
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+        return self.callProxy(context, "repay", (tokensToRepay,))
+
+    @entryPoint
+    def withdraw(self, context, mutezToWithdraw):
+        verify(context.sender == self.data.owner, Errors.NOT_OWNER)
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+        return self.callProxy(context, "withdraw", (mutezToWithdraw,))
+
+    # Deposit.
+    @entryPoint
+    def default(self, context, unit):
+        return self.callProxy(context, "deposit", ())
+
+    @entryPoint
+    def liquidate(self, context, unit):
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+        return self.callProxy(context, "liquidate", (context.sender,))
+
+    @entryPoint
+    def partialLiquidate(self, context, unit):
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+        return self.callProxy(context, "partialLiquidate", (context.sender,))
+
+    @entryPoint
+    def setDelegate(self, context, newDelegate):
+        verify(context.sender == self.data.owner, Errors.NOT_OWNER)
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+        context.chain.delegates[context.address] = newDelegate
+
+    # Params: (oven, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated)
+    @entryPoint
+    def updateState(self, context, param):
+        verify(context.sender == self.data.ovenProxyContractAddress, Errors.NOT_OVEN_PROXY)
+        verify(param[0] == context.address, Errors.BAD_DESTINATION)
+
+        _, self.data.borrowedTokens, self.data.stabilityFeeTokens, self.data.interestIndex, self.data.isLiquidated = param
+
+    # Params: (owner, newDelegate)
+    @entryPoint
+    def setDelegateFromProxy(self, context, param):
+        verify(context.sender == self.data.ovenProxyContractAddress, Errors.NOT_OVEN_PROXY)
+        verify(param[0] == self.data.owner, Errors.NOT_OWNER)
+        context.chain.delegates[context.address] = param[1]
+
+class OvenProxy(Contract):
+    FIELDS = {
+        "minterContractAddress": "address",
+        "governorContractAddress": "address",
+        "ovenRegistryContractAddress": "address",
+        "pauseGuardianContractAddress": "address",
+        "oracleContractAddress": "address",
+        "paused": "bool",
+        "state": "nat",
+        "borrowParams": "option<params>",
+        "withdrawParams": "option<params>",
+        "liquidateParams": "option<params>",
+    }
+
+    def __init__(self, minterContractAddress, ovenRegistryContractAddress, oracleContractAddress, governorContractAddress = GOVERNOR_ADDRESS, pauseGuardianContractAddress = PAUSE_GUARDIAN_ADDRESS, paused = False):
+        Contract.__init__(
+            self,
+            minterContractAddress = minterContractAddress,
+            governorContractAddress = governorContractAddress,
+            ovenRegistryContractAddress = ovenRegistryContractAddress,
+            pauseGuardianContractAddress = pauseGuardianContractAddress,
+            oracleContractAddress = oracleContractAddress,
+            paused = paused,
+            state = IDLE,
+            borrowParams = None,
+            withdrawParams = None,
+            liquidateParams = None
+        )
+
+    @entryPoint
+    def default(self, context, unit):
+        raise ContractError(Errors.CANNOT_RECEIVE_FUNDS)
+
+    # Params: (ovens, newDelegate)
+    @entryPoint
+    def setDelegates(self, context, param):
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+        verify(self.data.paused == False, Errors.PAUSED)
+        ovens, newDelegate = param
+        return [Transfer(oven, "setDelegateFromProxy", (context.sender, newDelegate), 0) for oven in ovens]
+
+    def verifyIsOven(self, ovenAddress):
+        return Transfer(self.data.ovenRegistryContractAddress, "isOven", ovenAddress, 0)
+
+    def callOracleWithCallback(self, context, entryPointName):
+        return Transfer(self.data.oracleContractAddress, "getXtzUsdRate", context.selfEntryPoint(entryPointName), 0)
+
+    # Forward the params of an oven call to the Minter with the price from the oracle's `getLatestXtzUsdRate` view. If
+    # the oracle has no such view, store them and request the price with a callback instead.
+    def forwardWithOraclePrice(self, context, param, state, register, entryPointName, callbackEntryPoint):
+        verify(self.data.paused == False, Errors.PAUSED)
+        verify(self.data.state == IDLE, Errors.BAD_STATE)
+
+        price = context.view(self.data.oracleContractAddress, "getLatestXtzUsdRate")
+        if price is not None:
+            return Transfer(self.data.minterContractAddress, entryPointName, (price,) + param, context.balance)
+
+        self.data.state = state
+        setattr(self.data, register, param)
+        return self.callOracleWithCallback(context, callbackEntryPoint)
+
+    # Forward the stored params of an oven call with the oracle price to the Minter.
+    def resumeWithPrice(self, context, oracleResult, state, register, entryPointName):
+        verify(context.sender == self.data.oracleContractAddress, Errors.NOT_ORACLE)
+        verify(self.data.state == state, Errors.BAD_STATE)
+
+        param = (oracleResult,) + getattr(self.data, register)
+        self.data.state = IDLE
+        setattr(self.data, register, None)
+        return [Transfer(self.data.minterContractAddress, entryPointName, param, context.balance)]
+
+    @entryPoint
+    def borrow(self, context, param):
+        operation = self.forwardWithOraclePrice(context, param, BORROW_WAITING_FOR_ORACLE, "borrowParams", "borrow", "borrow_callback")
+        return [self.verifyIsOven(context.sender), operation]
+
+    @entryPoint
+    def borrow_callback(self, context, oracleResult):
+        return self.resumeWithPrice(context, oracleResult, BORROW_WAITING_FOR_ORACLE, "borrowParams", "borrow")
+
+    @entryPoint
+    def repay(self, context, param):
+        verify(self.data.paused == False, Errors.PAUSED)
+        verify(self.data.state == IDLE, Errors.BAD_STATE)
+        return [self.verifyIsOven(context.sender), Transfer(self.data.minterContractAddress, "repay", param, context.amount)]
+
+    @entryPoint
+    def liquidate(self, context, param):
+        operation = self.forwardWithOraclePrice(context, param, LIQUIDATE_WAITING_FOR_ORACLE, "liquidateParams", "liquidate", "liquidate_callback")
+        return [self.verifyIsOven(context.sender), operation]
+
+    @entryPoint
+    def liquidate_callback(self, context, oracleResult):
+        return self.resumeWithPrice(context, oracleResult, LIQUIDATE_WAITING_FOR_ORACLE, "liquidateParams", "liquidate")
+
+    @entryPoint
+    def partialLiquidate(self, context, param):
+        operation = self.forwardWithOraclePrice(context, param, PARTIAL_LIQUIDATE_WAITING_FOR_ORACLE, "liquidateParams", "partialLiquidate", "partialLiquidate_callback")
+        return [self.verifyIsOven(context.sender), operation]
+
+    @entryPoint
+    def partialLiquidate_callback(self, context, oracleResult):
+        return self.resumeWithPrice(context, oracleResult, PARTIAL_LIQUIDATE_WAITING_FOR_ORACLE, "liquidateParams", "partialLiquidate")
+
+    @entryPoint
+    def withdraw(self, context, param):
+        # Unlike other oven calls, the state is checked before the pause.
+        verify(self.data.state == IDLE, Errors.BAD_STATE)
+        operation = self.forwardWithOraclePrice(context, param, WITHDRAW_WAITING_FOR_ORACLE, "withdrawParams", "withdraw", "withdraw_callback")
+        return [self.verifyIsOven(context.sender), operation]
+
+    @entryPoint
+    def withdraw_callback(self, context, oracleResult):
+        return self.resumeWithPrice(context, oracleResult, WITHDRAW_WAITING_FOR_ORACLE, "withdrawParams", "withdraw")
+
+    @entryPoint
+    def deposit(self, context, param):
+        verify(self.data.paused == False, Errors.PAUSED)
+        verify(self.data.state == IDLE, Errors.BAD_STATE)
+        return [self.verifyIsOven(context.sender), Transfer(self.data.minterContractAddress, "deposit", param, context.amount)]
+
+    @entryPoint
+    def updateState(self, context, param):
+        verify(context.sender == self.data.minterContractAddress, Errors.NOT_MINTER)
+        return [Transfer(param[0], "updateState", param, context.amount)]
+
+    @entryPoint
+    def pause(self, context, unit):
+        verify(context.sender == self.data.pauseGuardianContractAddress, Errors.NOT_PAUSE_GUARDIAN)
+        self.data.paused = True
+
+    @entryPoint
+    def unpause(self, context, unit):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.paused = False
+
+    @entryPoint
+    def setGovernorContract(self, context, newGovernorContractAddress):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.governorContractAddress = newGovernorContractAddress
+
+    @entryPoint
+    def setMinterContract(self, context, newMinterContractAddress):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.minterContractAddress = newMinterContractAddress
+
+    @entryPoint
+    def setOvenRegistryContract(self, context, newOvenRegistryContractAddress):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.ovenRegistryContractAddress = newOvenRegistryContractAddress
+
+    @entryPoint
+    def setOracleContract(self, context, newOracleContractAddress):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.oracleContractAddress = newOracleContractAddress
+
+    @entryPoint
+    def setPauseGuardianContract(self, context, newPauseGuardianContract):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.pauseGuardianContractAddress = newPauseGuardianContract
+
+class OvenRegistry(Contract):
+    FIELDS = {
+        "governorContractAddress": "address",
+        "ovenFactoryContractAddress": "address",
+        "ovenMap": "bigmap<address,address>",
+    }
+
+    def __init__(self, ovenFactoryContractAddress, governorContractAddress = GOVERNOR_ADDRESS):
+        Contract.__init__(
+            self,
+            governorContractAddress = governorContractAddress,
+            ovenFactoryContractAddress = ovenFactoryContractAddress,
+            ovenMap = BigMap()
+        )
+
+    @entryPoint
+    def isOven(self, context, maybeOvenAddress):
+        verify(maybeOvenAddress in self.data.ovenMap, Errors.NOT_OVEN)
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+
+    @entryPoint
+    def default(self, context, unit):
+        raise ContractError(Errors.CANNOT_RECEIVE_FUNDS)
+
+    # Params: (oven, owner)
+    @entryPoint
+    def addOven(self, context, param):
+        verify(context.sender == self.data.ovenFactoryContractAddress, Errors.NOT_OVEN_FACTORY)
+        ovenAddress, owner = param
+        self.data.ovenMap[ovenAddress] = owner
+
+    @entryPoint
+    def setGovernorContract(self, context, newGovernorContractAddress):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.governorContractAddress = newGovernorContractAddress
+
+    @entryPoint
+    def setOvenFactoryContract(self, context, newOvenFactoryContract):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.ovenFactoryContractAddress = newOvenFactoryContract
+
+# A token ledger entry. `approvals` is never mutated in place, so entries can be rolled back.
+Balance = collections.namedtuple("Balance", ["balance", "approvals"])
+
+class Token(Contract):
+    FIELDS = {
+        "balances": "ledger",
+        "totalSupply": "nat",
+        "paused": "bool",
+        "administrator": "address",
+        "governorContractAddress": "address",
+        "debtCeiling": "nat",
+    }
+
+    def __init__(self, admin = GOVERNOR_ADDRESS, governorContractAddress = GOVERNOR_ADDRESS, debtCeiling = 1000 * PRECISION):
+        Contract.__init__(
+            self,
+            balances = BigMap(),
+            totalSupply = 0,
+            paused = False,
+            administrator = admin,
+            governorContractAddress = governorContractAddress,
+            debtCeiling = debtCeiling
+        )
+
+    def isAdministrator(self, sender):
+        return sender == self.data.administrator
+
+    def addAddressIfNecessary(self, address):
+        if address not in self.data.balances:
+            self.data.balances[address] = Balance(0, {})
+
+    def setBalance(self, address, balance):
+        self.data.balances[address] = self.data.balances[address]._replace(balance = balance)
+
+    def setApproval(self, owner, spender, value):
+        entry = self.data.balances[owner]
+        self.data.balances[owner] = entry._replace(approvals = dict(entry.approvals, **{ spender: value }))
+
+    def approval(self, owner, spender):
+        approvals = self.data.balances[owner].approvals
+        verify(spender in approvals, MAP_GET_FAILURE)
+        return approvals[spender]
+
+    # Params: (from, to, value)
+    @entryPoint
+    def transfer(self, context, param):
+        from_, to_, value = param
+        verify(
+            self.isAdministrator(context.sender) or (
+                not self.data.paused and (from_ == context.sender or self.approval(from_, context.sender) >= value)
+            ),
+            Errors.TOKEN_NO_TRANSFER_PERMISSION
+        )
+        self.addAddressIfNecessary(to_)
+        verify(self.data.balances[from_].balance >= value, Errors.TOKEN_INSUFFICIENT_BALANCE)
+
+        self.setBalance(from_, asNat(self.data.balances[from_].balance - value))
+        self.setBalance(to_, self.data.balances[to_].balance + value)
+        if from_ != context.sender and not self.isAdministrator(context.sender):
+            self.setApproval(from_, context.sender, asNat(self.approval(from_, context.sender) - value))
+
+    # Params: (spender, value)
+    @entryPoint
+    def approve(self, context, param):
+        spender, value = param
+        verify(not self.data.paused, WRONG_CONDITION)
+        alreadyApproved = self.data.balances[context.sender].approvals.get(spender, 0)
+        verify(alreadyApproved == 0 or value == 0, Errors.TOKEN_UNSAFE_ALLOWANCE_CHANGE)
+        self.setApproval(context.sender, spender, value)
+
+    # Params: (address, value)
+    @entryPoint
+    def mint(self, context, param):
+        address, value = param
+        verify(self.isAdministrator(context.sender), Errors.TOKEN_NOT_ADMINISTRATOR)
+        self.addAddressIfNecessary(address)
+
+        self.setBalance(address, self.data.balances[address].balance + value)
+        self.data.totalSupply += value
+        verify(self.data.totalSupply <= self.data.debtCeiling, Errors.DEBT_CEILING)
+
+    # Params: (address, value)
+    @entryPoint
+    def burn(self, context, param):
+        address, value = param
+        verify(self.isAdministrator(context.sender), Errors.TOKEN_NOT_ADMINISTRATOR)
+        verify(self.data.balances[address].balance >= value, Errors.TOKEN_INSUFFICIENT_BALANCE)
+
+        self.setBalance(address, asNat(self.data.balances[address].balance - value))
+        self.data.totalSupply = asNat(self.data.totalSupply - value)
+
+    @entryPoint
+    def setAdministrator(self, context, newAdministrator):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.administrator = newAdministrator
+
+    @entryPoint
+    def setPause(self, context, paused):
+        verify(self.isAdministrator(context.sender), Errors.TOKEN_NOT_ADMINISTRATOR)
+        self.data.paused = paused
+
+    @entryPoint
+    def setGovernorContract(self, context, newGovernorContractAddress):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.governorContractAddress = newGovernorContractAddress
+
+    @entryPoint
+    def setDebtCeiling(self, context, newDebtCeiling):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.debtCeiling = newDebtCeiling
+
+    def getBalance(self, address):
+        return self.data.balances[address].balance
+
+class Oracle(Contract):
+    FIELDS = {
+        "harbingerContractAddress": "address",
+        "state": "nat",
+        "clientCallback": "option<params>",
+        "maxDataDelaySec": "nat",
+        "governorContractAddress": "address",
+        "cumulativePrice": "nat",
+        "lastPrice": "nat",
+        "lastObservationTime": "timestamp",
+        "observations": "map<nat,pair<timestamp,nat>>",
+        "observationIndex": "nat",
+        "observationBufferSize": "nat",
+    }
+
+    def __init__(self, harbingerContractAddress, maxDataDelaySec = 60 * 30, governorContractAddress = GOVERNOR_ADDRESS, observationBufferSize = 10):
+        if observationBufferSize <= 0:
+            raise ValueError("observationBufferSize must be positive, got {}".format(observationBufferSize))
+
+        Contract.__init__(
+            self,
+            harbingerContractAddress = harbingerContractAddress,
+            state = IDLE,
+            clientCallback = None,
+            maxDataDelaySec = maxDataDelaySec,
+            governorContractAddress = governorContractAddress,
+            cumulativePrice = 0,
+            lastPrice = 0,
+            lastObservationTime = 0,
+            observations = {},
+            observationIndex = 0,
+            observationBufferSize = observationBufferSize
+        )
+
+    @entryPoint
+    def default(self, context, unit):
+        raise ContractError(Errors.CANNOT_RECEIVE_FUNDS)
+
+    @entryPoint
+    def getXtzUsdRate(self, context, callback):
+        verify(self.data.state == IDLE, Errors.BAD_STATE)
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+
+        self.data.state = WAITING_FOR_HARBINGER
+        self.data.clientCallback = callback
+
+        harbingerParam = (Constants.ASSET_CODE, context.selfEntryPoint("getXtzUsdRate_callback"))
+        return [Transfer(self.data.harbingerContractAddress, "get", harbingerParam, 0)]
+
+    # Params: (asset, updateTime, price)
+    @entryPoint
+    def getXtzUsdRate_callback(self, context, result):
+        verify(self.data.state == WAITING_FOR_HARBINGER, Errors.BAD_STATE)
+
+        assetCode, updateTime, price = result
+        verify(context.sender == self.data.harbingerContractAddress, Errors.NOT_ORACLE)
+        verify(assetCode == Constants.ASSET_CODE, Errors.WRONG_ASSET)
+
+        dataAge = asNat(context.now - updateTime)
+        verify(dataAge < self.data.maxDataDelaySec, Errors.STALE_DATA)
+
+        clientCallback = self.data.clientCallback
+        clientCallbackParam = price * MUTEZ_TO_KOLIBRI_CONVERSION
+
+        # Accumulate the previous price over the time it was current and record a new observation.
+        if updateTime > self.data.lastObservationTime:
+            self.data.cumulativePrice += self.data.lastPrice * asNat(updateTime - self.data.lastObservationTime)
+            self.data.lastPrice = clientCallbackParam
+            self.data.lastObservationTime = updateTime
+
+            # Copy rather than mutate, so the snapshot taken before this call can be restored.
+            self.data.observations = dict(self.data.observations)
+            self.data.observations[self.data.observationIndex] = (updateTime, self.data.cumulativePrice)
+            self.data.observationIndex = (self.data.observationIndex + 1) % self.data.observationBufferSize
+
+        self.data.state = IDLE
+        self.data.clientCallback = None
+        return [Transfer(clientCallback, "default", clientCallbackParam, 0)]
+
+    @entryPoint
+    def setGovernorContract(self, context, newGovernorContractAddress):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.governorContractAddress = newGovernorContractAddress
+
+    @entryPoint
+    def setMaxDataDelaySec(self, context, newMaxDataDelaySec):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.maxDataDelaySec = newMaxDataDelaySec
+
+class FakeHarbinger(Contract):
+    FIELDS = {
+        "harbingerValue": "nat",
+        "harbingerUpdateTime": "timestamp",
+        "harbingerAsset": "string",
+    }
+
+    def __init__(self, harbingerValue = 0, harbingerUpdateTime = 0, harbingerAsset = Constants.ASSET_CODE):
+        Contract.__init__(
+            self,
+            harbingerValue = harbingerValue,
+            harbingerUpdateTime = harbingerUpdateTime,
+            harbingerAsset = harbingerAsset
+        )
+
+    @entryPoint
+    def setNewPrice(self, context, newValue):
+        self.data.harbingerValue = newValue
+
+    # Params: (asset, callback)
+    @entryPoint
+    def get(self, context, requestPair):
+        result = (self.data.harbingerAsset, self.data.harbingerUpdateTime, self.data.harbingerValue)
+        return [Transfer(requestPair[1], "default", result, 0)]
+
+    # Returns (updateTime, price).
+    @view
+    def getPrice(self, context, assetCode):
+        verify(assetCode == self.data.harbingerAsset, WRONG_CONDITION)
+        return (self.data.harbingerUpdateTime, self.data.harbingerValue)
+
+class PushOracle(Contract):
+    FIELDS = {
+        "price": "nat",
+        "lastUpdateTime": "timestamp",
+        "updaterContractAddress": "address",
+        "harbingerContractAddress": "address",
+        "maxDataDelaySec": "nat",
+        "governorContractAddress": "address",
+    }
+
+    def __init__(self, updaterContractAddress, harbingerContractAddress, price = 0, lastUpdateTime = 0, maxDataDelaySec = 60 * 30, governorContractAddress = GOVERNOR_ADDRESS):
+        Contract.__init__(
+            self,
+            price = price,
+            lastUpdateTime = lastUpdateTime,
+            updaterContractAddress = updaterContractAddress,
+            harbingerContractAddress = harbingerContractAddress,
+            maxDataDelaySec = maxDataDelaySec,
+            governorContractAddress = governorContractAddress
+        )
+
+    def readPrice(self, context):
+        dataAge = asNat(context.now - self.data.lastUpdateTime)
+        verify(dataAge < self.data.maxDataDelaySec, Errors.STALE_DATA)
+        return self.data.price
+
+    @entryPoint
+    def default(self, context, unit):
+        raise ContractError(Errors.CANNOT_RECEIVE_FUNDS)
+
+    @entryPoint
+    def getXtzUsdRate(self, context, callback):
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+        return [Transfer(callback, "default", self.readPrice(context), 0)]
+
+    @entryPoint
+    def setPrice(self, context, newPrice):
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+        verify(context.sender == self.data.updaterContractAddress, Errors.NOT_UPDATER)
+        self.data.price = newPrice
+        self.data.lastUpdateTime = context.now
+
+    @entryPoint
+    def update(self, context, unit):
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+        harbingerResult = context.view(self.data.harbingerContractAddress, "getPrice", Constants.ASSET_CODE)
+        verify(harbingerResult is not None, WRONG_CONDITION)
+        updateTime, harbingerPrice = harbingerResult
+
+        dataAge = asNat(context.now - updateTime)
+        verify(dataAge < self.data.maxDataDelaySec, Errors.STALE_DATA)
+        verify(updateTime > self.data.lastUpdateTime, Errors.STALE_DATA)
+
+        self.data.price = harbingerPrice * MUTEZ_TO_KOLIBRI_CONVERSION
+        self.data.lastUpdateTime = updateTime
+
+    @view
+    def getLatestXtzUsdRate(self, context, unit):
+        return self.readPrice(context)
+
+class StabilityFund(Contract):
+    FIELDS = {
+        "governorContractAddress": "address",
+        "administratorContractAddress": "address",
+        "tokenContractAddress": "address",
+        "ovenRegistryContractAddress": "address",
+    }
+
+    def __init__(self, tokenContractAddress, ovenRegistryContractAddress, governorContractAddress = GOVERNOR_ADDRESS, administratorContractAddress = FUND_ADMINISTRATOR_ADDRESS):
+        Contract.__init__(
+            self,
+            governorContractAddress = governorContractAddress,
+            administratorContractAddress = administratorContractAddress,
+            tokenContractAddress = tokenContractAddress,
+            ovenRegistryContractAddress = ovenRegistryContractAddress
+        )
+
+    @entryPoint
+    def default(self, context, unit):
+        pass
+
+    @entryPoint
+    def setDelegate(self, context, newDelegate):
+        verify(context.sender == self.data.administratorContractAddress, Errors.NOT_ADMIN)
+        context.chain.delegates[context.address] = newDelegate
+
+    @entryPoint
+    def liquidate(self, context, ovenAddress):
+        verify(context.sender == self.data.administratorContractAddress, Errors.NOT_ADMIN)
+        return [
+            Transfer(self.data.ovenRegistryContractAddress, "isOven", ovenAddress, 0),
+            Transfer(ovenAddress, "liquidate", None, 0),
+        ]
+
+    @entryPoint
+    def setGovernorContract(self, context, newGovernorContractAddress):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.governorContractAddress = newGovernorContractAddress
+
+    @entryPoint
+    def setAdministratorContract(self, context, newAdministratorContractAddress):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.administratorContractAddress = newAdministratorContractAddress
+
+    @entryPoint
+    def setOvenRegistryContract(self, context, newOvenRegistryContractAddress):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.data.ovenRegistryContractAddress = newOvenRegistryContractAddress
+
+class Minter(Contract):
+    FIELDS = {
+        "governorContractAddress": "address",
+        "tokenContractAddress": "address",
+        "ovenProxyContractAddress": "address",
+        "collateralizationPercentage": "nat",
+        "developerFundContractAddress": "address",
+        "stabilityFundContractAddress": "address",
+        "liquidationFeePercent": "nat",
+        "stabilityDevFundSplit": "nat",
+        "ovenMax": "option<mutez>",
+        "interestIndex": "nat",
+        "stabilityFee": "nat",
+        "lastInterestIndexUpdateTime": "timestamp",
+    }
+
+    def __init__(
+        self,
+        tokenContractAddress,
+        ovenProxyContractAddress,
+        stabilityFundContractAddress,
+        developerFundContractAddress,
+        governorContractAddress = GOVERNOR_ADDRESS,
+        collateralizationPercentage = 200 * PRECISION, # 200%
+        stabilityFee = 0,
+        lastInterestIndexUpdateTime = 1601871456,
+        interestIndex = PRECISION,
+        stabilityDevFundSplit = PRECISION // 10, # 10%
+        liquidationFeePercent = 8 * PRECISION // 100, # 8%
+        ovenMax = 100 * 1000000
+    ):
+        Contract.__init__(
+            self,
+            governorContractAddress = governorContractAddress,
+            tokenContractAddress = tokenContractAddress,
+            ovenProxyContractAddress = ovenProxyContractAddress,
+            collateralizationPercentage = collateralizationPercentage,
+            developerFundContractAddress = developerFundContractAddress,
+            stabilityFundContractAddress = stabilityFundContractAddress,
+            liquidationFeePercent = liquidationFeePercent,
+            stabilityDevFundSplit = stabilityDevFundSplit,
+            ovenMax = ovenMax,
+            interestIndex = interestIndex,
+            stabilityFee = stabilityFee,
+            lastInterestIndexUpdateTime = lastInterestIndexUpdateTime
+        )
+
+    # Compound the interest index to now. Returns the new index; storage is updated by `commitInterestIndex`.
+    def compoundInterestIndex(self, now):
+        return minter_math.compoundInterestIndex(self.data.interestIndex, self.data.stabilityFee, self.data.lastInterestIndexUpdateTime, now)
+
+    def commitInterestIndex(self, compounded):
+        self.data.interestIndex, self.data.lastInterestIndexUpdateTime = compounded
+
+    # Stability fee tokens of an oven including newly accrued fees.
+    def accrueStabilityFees(self, interestIndex, borrowedTokens, stabilityFeeTokens, newMinterInterestIndex):
+        accrued = minter_math.calculateNewAccruedInterest(interestIndex, borrowedTokens, stabilityFeeTokens, newMinterInterestIndex)
+        return stabilityFeeTokens + accrued
+
+    def verifyIsOvenProxy(self, context):
+        verify(context.sender == self.data.ovenProxyContractAddress, Errors.NOT_OVEN_PROXY)
+
+    def mintTokens(self, tokensToMint, address):
+        return Transfer(self.data.tokenContractAddress, "mint", (address, tokensToMint), 0)
+
+    def burnTokens(self, tokensToBurn, address):
+        return Transfer(self.data.tokenContractAddress, "burn", (address, tokensToBurn), 0)
+
+    def mintTokensToStabilityAndDevFund(self, tokensToMint):
+        tokensForDevFund = (tokensToMint * self.data.stabilityDevFundSplit) // PRECISION
+        tokensForStabilityFund = asNat(tokensToMint - tokensForDevFund)
+        return [
+            self.mintTokens(tokensForDevFund, self.data.developerFundContractAddress),
+            self.mintTokens(tokensForStabilityFund, self.data.stabilityFundContractAddress),
+        ]
+
+    def updateOvenState(self, ovenAddress, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated, sendAmount):
+        param = (ovenAddress, borrowedTokens, stabilityFeeTokens, interestIndex, isLiquidated)
+        return Transfer(self.data.ovenProxyContractAddress, "updateState", param, sendAmount)
+
+    # Split a repayment between stability fees and borrowed tokens.
+    # Returns (stabilityFeeTokensRepaid, remainingStabilityFeeTokens, remainingBorrowedTokens).
+    def applyRepayment(self, tokensToRepay, borrowedTokens, newStabilityFeeTokens):
+        if tokensToRepay < newStabilityFeeTokens:
+            return tokensToRepay, asNat(newStabilityFeeTokens - tokensToRepay), borrowedTokens
+        return newStabilityFeeTokens, 0, asNat(borrowedTokens - asNat(tokensToRepay - newStabilityFeeTokens))
+
+    @entryPoint
+    def getInterestIndex(self, context, callback):
+        verify(context.amount == 0, Errors.AMOUNT_NOT_ALLOWED)
+        compounded = self.compoundInterestIndex(context.now)
+        self.commitInterestIndex(compounded)
+        return [Transfer(callback, "default", compounded[0], 0)]
+
+    @entryPoint
+    def borrow(self, context, param):
+        self.verifyIsOvenProxy(context)
+        oraclePrice, ovenAddress, ownerAddress, ovenBalance, borrowedTokens, isLiquidated, stabilityFeeTokensInt, interestIndex, tokensToBorrow = param
+        stabilityFeeTokens = asNat(stabilityFeeTokensInt)
+
+        compounded = self.compoundInterestIndex(context.now)
+        newMinterInterestIndex = compounded[0]
+
+        verify(isLiquidated == False, Errors.LIQUIDATED)
+
+        newStabilityFeeTokens = self.accrueStabilityFees(interestIndex, borrowedTokens, stabilityFeeTokens, newMinterInterestIndex)
+        newTotalBorrowedTokens = borrowedTokens + tokensToBorrow
+
+        totalOutstandingTokens = newTotalBorrowedTokens + newStabilityFeeTokens
+        if totalOutstandingTokens > 0:
+            newCollateralizationPercentage = minter_math.computeCollateralizationPercentage(ovenBalance, oraclePrice, totalOutstandingTokens)
+            verify(newCollateralizationPercentage >= self.data.collateralizationPercentage, Errors.OVEN_UNDER_COLLATERALIZED)
+
+        self.commitInterestIndex(compounded)
+        return [
+            self.mintTokens(tokensToBorrow, ownerAddress),
+            self.updateOvenState(ovenAddress, newTotalBorrowedTokens, newStabilityFeeTokens, newMinterInterestIndex, isLiquidated, context.balance),
+        ]
+
+    @entryPoint
+    def repay(self, context, param):
+        self.verifyIsOvenProxy(context)
+        ovenAddress, ownerAddress, ovenBalance, borrowedTokens, isLiquidated, stabilityFeeTokensInt, interestIndex, tokensToRepay = param
+        stabilityFeeTokens = asNat(stabilityFeeTokensInt)
+
+        compounded = self.compoundInterestIndex(context.now)
+        newMinterInterestIndex = compounded[0]
+
+        verify(isLiquidated == False, Errors.LIQUIDATED)
+
+        newStabilityFeeTokens = self.accrueStabilityFees(interestIndex, borrowedTokens, stabilityFeeTokens, newMinterInterestIndex)
+        stabilityFeeTokensRepaid, remainingStabilityFeeTokens, remainingBorrowedTokens = self.applyRepayment(tokensToRepay, borrowedTokens, newStabilityFeeTokens)
+
+        self.commitInterestIndex(compounded)
+        return self.mintTokensToStabilityAndDevFund(stabilityFeeTokensRepaid) + [
+            self.burnTokens(tokensToRepay, ownerAddress),
+            self.updateOvenState(ovenAddress, remainingBorrowedTokens, remainingStabilityFeeTokens, newMinterInterestIndex, isLiquidated, context.balance),
+        ]
+
+    @entryPoint
+    def deposit(self, context, param):
+        self.verifyIsOvenProxy(context)
+        if self.data.ovenMax is not None:
+            verify(context.balance <= self.data.ovenMax, Errors.OVEN_MAXIMUM_EXCEEDED)
+
+        ovenAddress, ownerAddress, ovenBalance, borrowedTokens, isLiquidated, stabilityFeeTokensInt, interestIndex = param
+        stabilityFeeTokens = asNat(stabilityFeeTokensInt)
+
+        compounded = self.compoundInterestIndex(context.now)
+        newMinterInterestIndex = compounded[0]
+
+        verify(isLiquidated == False, Errors.LIQUIDATED)
+
+        newStabilityFeeTokens = self.accrueStabilityFees(interestIndex, borrowedTokens, stabilityFeeTokens, newMinterInterestIndex)
+
+        self.commitInterestIndex(compounded)
+        return [self.updateOvenState(ovenAddress, borrowedTokens, newStabilityFeeTokens, newMinterInterestIndex, isLiquidated, context.balance)]
+
+    @entryPoint
+    def withdraw(self, context, param):
+        self.verifyIsOvenProxy(context)
+        oraclePrice, ovenAddress, ownerAddress, ovenBalance, borrowedTokens, isLiquidated, stabilityFeeTokensInt, interestIndex, mutezToWithdraw = param
+        stabilityFeeTokens = asNat(stabilityFeeTokensInt)
+
+        compounded = self.compoundInterestIndex(context.now)
+        newMinterInterestIndex = compounded[0]
+
+        newStabilityFeeTokens = self.accrueStabilityFees(interestIndex, borrowedTokens, stabilityFeeTokens, newMinterInterestIndex)
+
+        totalOutstandingTokens = borrowedTokens + newStabilityFeeTokens
+        if totalOutstandingTokens > 0:
+            newOvenBalance = asNat(ovenBalance - mutezToWithdraw * MUTEZ_TO_KOLIBRI_CONVERSION)
+            newCollateralizationPercentage = minter_math.computeCollateralizationPercentage(newOvenBalance, oraclePrice, totalOutstandingTokens)
+            verify(newCollateralizationPercentage >= self.data.collateralizationPercentage, Errors.OVEN_UNDER_COLLATERALIZED)
+
+        remainingMutez = ovenBalance // MUTEZ_TO_KOLIBRI_CONVERSION - mutezToWithdraw
+        verify(remainingMutez >= 0, minter_math.MUTEZ_UNDERFLOW)
+
+        self.commitInterestIndex(compounded)
+        return [
+            send(ownerAddress, mutezToWithdraw),
+            self.updateOvenState(ovenAddress, borrowedTokens, newStabilityFeeTokens, newMinterInterestIndex, isLiquidated, remainingMutez),
+        ]
+
+    @entryPoint
+    def liquidate(self, context, param):
+        self.verifyIsOvenProxy(context)
+        oraclePrice, ovenAddress, ownerAddress, ovenBalance, borrowedTokens, isLiquidated, stabilityFeeTokensInt, interestIndex, liquidatorAddress = param
+        stabilityFeeTokens = asNat(stabilityFeeTokensInt)
+
+        compounded = self.compoundInterestIndex(context.now)
+        newMinterInterestIndex = compounded[0]
+
+        verify(isLiquidated == False, Errors.LIQUIDATED)
+
+        newStabilityFeeTokens = self.accrueStabilityFees(interestIndex, borrowedTokens, stabilityFeeTokens, newMinterInterestIndex)
+
+        totalOutstandingTokens = borrowedTokens + newStabilityFeeTokens
+        collateralizationPercentage = minter_math.computeCollateralizationPercentage(ovenBalance, oraclePrice, totalOutstandingTokens)
+        verify(collateralizationPercentage < self.data.collateralizationPercentage, Errors.NOT_UNDER_COLLATERALIZED)
+
+        liquidationFee = (totalOutstandingTokens * self.data.liquidationFeePercent) // PRECISION
+
+        self.commitInterestIndex(compounded)
+        return (
+            [self.burnTokens(totalOutstandingTokens + liquidationFee, liquidatorAddress)] +
+            self.mintTokensToStabilityAndDevFund(newStabilityFeeTokens + liquidationFee) +
+            [
+                send(liquidatorAddress, ovenBalance // MUTEZ_TO_KOLIBRI_CONVERSION),
+                self.updateOvenState(ovenAddress, 0, 0, newMinterInterestIndex, True, 0),
+            ]
+        )
+
+    @entryPoint
+    def partialLiquidate(self, context, param):
+        self.verifyIsOvenProxy(context)
+        oraclePrice, ovenAddress, ownerAddress, ovenBalance, borrowedTokens, isLiquidated, stabilityFeeTokensInt, interestIndex, liquidatorAddress = param
+        stabilityFeeTokens = asNat(stabilityFeeTokensInt)
+
+        compounded = self.compoundInterestIndex(context.now)
+        newMinterInterestIndex = compounded[0]
+
+        verify(isLiquidated == False, Errors.LIQUIDATED)
+
+        newStabilityFeeTokens = self.accrueStabilityFees(interestIndex, borrowedTokens, stabilityFeeTokens, newMinterInterestIndex)
+
+        totalOutstandingTokens = borrowedTokens + newStabilityFeeTokens
+        collateralizationPercentage = minter_math.computeCollateralizationPercentage(ovenBalance, oraclePrice, totalOutstandingTokens)
+        verify(collateralizationPercentage < self.data.collateralizationPercentage, Errors.NOT_UNDER_COLLATERALIZED)
+
+        # Repay enough to close the shortfall against the required collateral value, see `minter.py`.
+        collateralValue = ovenBalance * oraclePrice // PRECISION
+        requiredRatio = (self.data.collateralizationPercentage + 99) // 100
+        requiredCollateralValue = (requiredRatio * totalOutstandingTokens + asNat(PRECISION - 1)) // PRECISION
+        shortfall = asNat(requiredCollateralValue - collateralValue)
+
+        verify(requiredRatio > PRECISION + self.data.liquidationFeePercent, Errors.PARTIAL_LIQUIDATION_DISABLED)
+        shortfallReductionPerToken = asNat(requiredRatio - (PRECISION + self.data.liquidationFeePercent))
+        tokensToRepay = minter_math.floorDiv(shortfall * PRECISION + asNat(shortfallReductionPerToken - 1), shortfallReductionPerToken)
+        tokensToRepay = min(tokensToRepay, totalOutstandingTokens)
+
+        ovenBalanceMutez = ovenBalance // MUTEZ_TO_KOLIBRI_CONVERSION
+        seizedValue = (tokensToRepay * (PRECISION + self.data.liquidationFeePercent)) // PRECISION
+        seizedBalance = minter_math.floorDiv(seizedValue * PRECISION, oraclePrice)
+        seizedMutez = min(seizedBalance // MUTEZ_TO_KOLIBRI_CONVERSION, ovenBalanceMutez)
+
+        stabilityFeeTokensRepaid, remainingStabilityFeeTokens, remainingBorrowedTokens = self.applyRepayment(tokensToRepay, borrowedTokens, newStabilityFeeTokens)
+
+        self.commitInterestIndex(compounded)
+        return (
+            [self.burnTokens(tokensToRepay, liquidatorAddress)] +
+            self.mintTokensToStabilityAndDevFund(stabilityFeeTokensRepaid) +
+            [
+                send(liquidatorAddress, seizedMutez),
+                self.updateOvenState(ovenAddress, remainingBorrowedTokens, remainingStabilityFeeTokens, newMinterInterestIndex, isLiquidated, ovenBalanceMutez - seizedMutez),
+            ]
+        )
+
+    # Params: (stabilityFee, liquidationFeePercent, collateralizationPercentage, ovenMax)
+    @entryPoint
+    def updateParams(self, context, newParams):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        self.commitInterestIndex(self.compoundInterestIndex(context.now))
+        self.data.stabilityFee, self.data.liquidationFeePercent, self.data.collateralizationPercentage, self.data.ovenMax = newParams
+
+    # Params: (governor, token, ovenProxy, stabilityFund, developerFund)
+    @entryPoint
+    def updateContracts(self, context, newParams):
+        verify(context.sender == self.data.governorContractAddress, Errors.NOT_GOVERNOR)
+        (
+            self.data.governorContractAddress,
+            self.data.tokenContractAddress,
+            self.data.ovenProxyContractAddress,
+            self.data.stabilityFundContractAddress,
+            self.data.developerFundContractAddress
+        ) = newParams
+
+################################################################
+# Universe
+################################################################
+
+# A wired universe of contracts, like `test-helpers/universe.py`. Contracts live at the address of their attribute
+# name, ex. `universe.minter` is at "minter". The developer fund and the oven factory are plain accounts.
+class Universe:
+    CONTRACT_NAMES = ["fakeHarbinger", "oracle", "token", "ovenRegistry", "stabilityFund", "ovenProxy", "minter"]
+    ACCOUNT_NAMES = ["developerFund", "ovenFactory"]
+
+    def __init__(
+        self,
+        harbingerValue = 2 * 1000000, # $2
+        harbingerUpdateTime = 0,
+        fundAdministratorAddress = FUND_ADMINISTRATOR_ADDRESS,
+        now = 0,
+        **minterParams
+    ):
+        self.chain = Chain(now)
+        self.fundAdministratorAddress = fundAdministratorAddress
+        self.developerFund = "developerFund"
+        self.ovenFactory = "ovenFactory"
+
+        originate = self.chain.originate
+        self.fakeHarbinger = originate("fakeHarbinger", FakeHarbinger(harbingerValue = harbingerValue, harbingerUpdateTime = harbingerUpdateTime))
+        self.oracle = originate("oracle", Oracle(harbingerContractAddress = "fakeHarbinger"))
+        self.token = originate("token", Token())
+        self.ovenRegistry = originate("ovenRegistry", OvenRegistry(ovenFactoryContractAddress = GOVERNOR_ADDRESS))
+        self.stabilityFund = originate("stabilityFund", StabilityFund(
+            tokenContractAddress = "token",
+            ovenRegistryContractAddress = "ovenRegistry",
+            administratorContractAddress = fundAdministratorAddress
+        ))
+        self.ovenProxy = originate("ovenProxy", OvenProxy(
+            minterContractAddress = GOVERNOR_ADDRESS,
+            ovenRegistryContractAddress = "ovenRegistry",
+            oracleContractAddress = "oracle"
+        ))
+        self.minter = originate("minter", Minter(
+            tokenContractAddress = "token",
+            ovenProxyContractAddress = "ovenProxy",
+            stabilityFundContractAddress = "stabilityFund",
+            developerFundContractAddress = self.developerFund,
+            **minterParams
+        ))
+
+        # Close the cycles.
+        self.chain.call(GOVERNOR_ADDRESS, "ovenProxy", "setMinterContract", "minter")
+        self.chain.call(GOVERNOR_ADDRESS, "token", "setAdministrator", "minter")
+        self.chain.call(GOVERNOR_ADDRESS, "ovenRegistry", "setOvenFactoryContract", self.ovenFactory)
+
+        self.ovens = {}
+
+    # Originate an oven at `address` owned by `owner` and register it, as the OvenFactory would.
+    def makeOven(self, address, owner, **ovenParams):
+        oven = self.chain.originate(address, Oven(owner = owner, ovenProxyContractAddress = "ovenProxy", **ovenParams))
+        self.chain.call(self.ovenFactory, "ovenRegistry", "addOven", (address, owner))
+        self.ovens[address] = oven
+        return oven
+
+    def call(self, sender, destination, entryPoint = "default", param = None, amount = 0, now = None):
+        self.chain.call(sender, destination, entryPoint, param, amount, now)
+
+################################################################
+# Action Scripts
+#
+# An action is a dict with an "action" name, its fields, and an
+# optional absolute "now" in seconds. Accounts are named by strings;
+# any name which is not an oven is an account.
+################################################################
+
+def ovenOwner(universe, action):
+    return action.get("sender", universe.ovens[action["oven"]].data.owner)
+
+# name -> (fields, run(universe, action), render(action, addresses) -> (contract expression, call, sender expression))
+ACTIONS = {
+    "makeOven": (
+        ["oven", "owner"],
+        lambda universe, action: universe.makeOven(action["oven"], action["owner"], **ovenParams(action)),
+        None
+    ),
+    "deposit": (
+        ["oven", "mutez"],
+        lambda universe, action: universe.call(ovenOwner(universe, action), action["oven"], "default", None, action["mutez"]),
+        lambda action, names: ("{}.default(sp.unit)".format(action["oven"]), "amount = sp.mutez({})".format(action["mutez"]))
+    ),
+    "borrow": (
+        ["oven", "tokens"],
+        lambda universe, action: universe.call(ovenOwner(universe, action), action["oven"], "borrow", action["tokens"]),
+        lambda action, names: ("{}.borrow(sp.nat({}))".format(action["oven"], action["tokens"]), None)
+    ),
+    "repay": (
+        ["oven", "tokens"],
+        lambda universe, action: universe.call(ovenOwner(universe, action), action["oven"], "repay", action["tokens"]),
+        lambda action, names: ("{}.repay(sp.nat({}))".format(action["oven"], action["tokens"]), None)
+    ),
+    "withdraw": (
+        ["oven", "mutez"],
+        lambda universe, action: universe.call(ovenOwner(universe, action), action["oven"], "withdraw", action["mutez"]),
+        lambda action, names: ("{}.withdraw(sp.mutez({}))".format(action["oven"], action["mutez"]), None)
+    ),
+    "liquidate": (
+        ["oven", "liquidator"],
+        lambda universe, action: universe.call(action["liquidator"], action["oven"], "liquidate"),
+        lambda action, names: ("{}.liquidate(sp.unit)".format(action["oven"]), None)
+    ),
+    "partialLiquidate": (
+        ["oven", "liquidator"],
+        lambda universe, action: universe.call(action["liquidator"], action["oven"], "partialLiquidate"),
+        lambda action, names: ("{}.partialLiquidate(sp.unit)".format(action["oven"]), None)
+    ),
+    "fundLiquidate": (
+        ["oven"],
+        lambda universe, action: universe.call(universe.fundAdministratorAddress, "stabilityFund", "liquidate", action["oven"]),
+        lambda action, names: ("universe.stabilityFund.liquidate({})".format(names[action["oven"]]), None)
+    ),
+    "setPrice": (
+        ["price"],
+        lambda universe, action: universe.call(GOVERNOR_ADDRESS, "fakeHarbinger", "setNewPrice", action["price"]),
+        lambda action, names: ("universe.fakeHarbinger.setNewPrice(sp.nat({}))".format(action["price"]), None)
+    ),
+    "mint": (
+        ["to", "tokens"],
+        lambda universe, action: universe.call("minter", "token", "mint", (action["to"], action["tokens"])),
+        lambda action, names: ("universe.token.mint(sp.record(address = {}, value = sp.nat({})))".format(names[action["to"]], action["tokens"]), None)
+    ),
+    "transfer": (
+        ["from", "to", "tokens"],
+        lambda universe, action: universe.call(action["from"], "token", "transfer", (action["from"], action["to"], action["tokens"])),
+        lambda action, names: ("universe.token.transfer(sp.record(from_ = {}, to_ = {}, value = sp.nat({})))".format(names[action["from"]], names[action["to"]], action["tokens"]), None)
+    ),
+    "updateParams": (
+        ["stabilityFee", "liquidationFeePercent", "collateralizationPercentage", "ovenMax"],
+        lambda universe, action: universe.call(GOVERNOR_ADDRESS, "minter", "updateParams", (
+            action["stabilityFee"], action["liquidationFeePercent"], action["collateralizationPercentage"], action["ovenMax"]
+        )),
+        lambda action, names: ("universe.minter.updateParams((sp.nat({}), (sp.nat({}), (sp.nat({}), {}))))".format(
+            action["stabilityFee"], action["liquidationFeePercent"], action["collateralizationPercentage"],
+            renderValue(action["ovenMax"], "option<mutez>", names)
+        ), None)
+    ),
+    "setMaxDataDelaySec": (
+        ["seconds"],
+        lambda universe, action: universe.call(GOVERNOR_ADDRESS, "oracle", "setMaxDataDelaySec", action["seconds"]),
+        lambda action, names: ("universe.oracle.setMaxDataDelaySec(sp.nat({}))".format(action["seconds"]), None)
+    ),
+    "setDebtCeiling": (
+        ["tokens"],
+        lambda universe, action: universe.call(GOVERNOR_ADDRESS, "token", "setDebtCeiling", action["tokens"]),
+        lambda action, names: ("universe.token.setDebtCeiling(sp.nat({}))".format(action["tokens"]), None)
+    ),
+    "pause": (
+        [],
+        lambda universe, action: universe.call(PAUSE_GUARDIAN_ADDRESS, "ovenProxy", "pause"),
+        lambda action, names: ("universe.ovenProxy.pause()", None)
+    ),
+    "unpause": (
+        [],
+        lambda universe, action: universe.call(GOVERNOR_ADDRESS, "ovenProxy", "unpause"),
+        lambda action, names: ("universe.ovenProxy.unpause()", None)
+    ),
+}
+
+OVEN_PARAMS = {"borrowedTokens": "nat", "stabilityFeeTokens": "int", "interestIndex": "int"}
+
+def ovenParams(action):
+    return { name: action[name] for name in OVEN_PARAMS if name in action }
+
+# The account each action is sent from, as an address in the simulator.
+def actionSender(universe, action):
+    name = action["action"]
+    if name in ["deposit", "borrow", "repay", "withdraw"]:
+        return ovenOwner(universe, action)
+    if name in ["liquidate", "partialLiquidate"]:
+        return action["liquidator"]
+    if name == "mint":
+        return "minter"
+    if name == "transfer":
+        return action["from"]
+    if name == "fundLiquidate":
+        return universe.fundAdministratorAddress
+    if name == "pause":
+        return PAUSE_GUARDIAN_ADDRESS
+    return GOVERNOR_ADDRESS
+
+def validateAction(action):
+    name = action.get("action")
+    if name not in ACTIONS:
+        raise ValueError("Unknown action {!r}".format(name))
+    missing = [field for field in ACTIONS[name][0] if field not in action]
+    if missing:
+        raise ValueError("Action {!r} is missing {}".format(name, ", ".join(missing)))
+
+# Run a single action. Returns None if it succeeded, or the error code it failed with.
+def runAction(universe, action):
+    validateAction(action)
+    if "now" in action:
+        universe.chain.now = action["now"]
+    try:
+        ACTIONS[action["action"]][1](universe, action)
+    except ContractError as e:
+        return e.code
+    return None
+
+# Run an action script. Returns (universe, results) where results holds the outcome of each action.
+def runScript(actions, universeParams = None):
+    universe = Universe(**(universeParams or {}))
+    results = [runAction(universe, action) for action in actions]
+    return universe, results
+
+################################################################
+# Cross-check
+################################################################
+
+UNIVERSE_PARAM_TYPES = dict(
+    { "harbingerValue": "nat", "harbingerUpdateTime": "timestamp" },
+    **{ name: valueType for name, valueType in Minter.FIELDS.items() if valueType != "address" }
+)
+
+# SmartPy expressions for the accounts which are not contracts in a universe.
+ACCOUNT_EXPRESSIONS = {
+    GOVERNOR_ADDRESS: "Addresses.GOVERNOR_ADDRESS",
+    FUND_ADMINISTRATOR_ADDRESS: "Addresses.FUND_ADMINISTRATOR_ADDRESS",
+    PAUSE_GUARDIAN_ADDRESS: "Addresses.PAUSE_GUARDIAN_ADDRESS",
+}
+
+# Split the arguments of a type like `pair<timestamp,nat>`.
+def typeArguments(valueType):
+    inner = valueType[valueType.index("<") + 1:-1]
+    depth = 0
+    for position, character in enumerate(inner):
+        depth += {"<": 1, ">": -1}.get(character, 0)
+        if character == "," and depth == 0:
+            return [inner[:position], inner[position + 1:]]
+    return [inner]
+
+# Render a simulator value as a SmartPy expression. `names` maps addresses to SmartPy expressions.
+def renderValue(value, valueType, names):
+    if valueType.startswith("option<"):
+        return "sp.none" if value is None else "sp.some({})".format(renderValue(value, typeArguments(valueType)[0], names))
+    if valueType.startswith("pair<"):
+        left, right = typeArguments(valueType)
+        return "({}, {})".format(renderValue(value[0], left, names), renderValue(value[1], right, names))
+    if valueType == "address":
+        return names[value]
+    if valueType == "bool":
+        return "True" if value else "False"
+    if valueType == "string":
+        return json.dumps(value)
+    if valueType in ["nat", "int", "timestamp", "mutez"]:
+        return "sp.{}({})".format(valueType, value)
+    raise ValueError("Cannot render {}".format(valueType))
+
+# Lines verifying that a contract's storage in a SmartPy scenario equals the simulator's.
+def renderStorageChecks(expression, contract, names):
+    lines = []
+    for field, valueType in contract.FIELDS.items():
+        value = getattr(contract.data, field)
+        target = "{}.data.{}".format(expression, field)
+
+        if valueType == "option<params>":
+            lines.append("scenario.verify({}.{}())".format(target, "is_none" if value is None else "is_some"))
+        elif valueType == "ledger":
+            for address in sorted(names):
+                if address not in value:
+                    lines.append("scenario.verify(~{}.contains({}))".format(target, names[address]))
+                    continue
+                entry = value.get(address)
+                lines.append("scenario.verify({}[{}].balance == sp.nat({}))".format(target, names[address], entry.balance))
+                lines.append("scenario.verify(sp.len({}[{}].approvals) == {})".format(target, names[address], len(entry.approvals)))
+                for spender, approval in sorted(entry.approvals.items()):
+                    lines.append("scenario.verify({}[{}].approvals[{}] == sp.nat({}))".format(target, names[address], names[spender], approval))
+        elif valueType.startswith("bigmap<") or valueType.startswith("map<"):
+            keyType, entryType = typeArguments(valueType)
+            if valueType.startswith("map<"):
+                lines.append("scenario.verify(sp.len({}) == {})".format(target, len(value)))
+            keys = value.keys() if valueType.startswith("map<") else sorted(names)
+            for key in sorted(keys):
+                if valueType.startswith("bigmap<") and key not in value:
+                    lines.append("scenario.verify(~{}.contains({}))".format(target, names[key]))
+                else:
+                    lines.append("scenario.verify({}[{}] == {})".format(
+                        target, renderValue(key, keyType, names), renderValue(value.get(key), entryType, names)
+                    ))
+        else:
+            lines.append("scenario.verify({} == {})".format(target, renderValue(value, valueType, names)))
+    return lines
+
+# Render an action script as a SmartPy scenario which replays it and verifies storage after every action.
+def renderScenario(actions, universeParams = None, name = "Simulator Cross-check"):
+    universeParams = universeParams or {}
+    for action in actions:
+        validateAction(action)
+
+    # Run the script alongside rendering, so each check reflects the simulator's state after the action.
+    universe = Universe(**universeParams)
+
+    accounts = []
+    for action in actions:
+        for field in ["owner", "liquidator", "to", "from", "sender"]:
+            if field in action and action[field] not in accounts:
+                accounts.append(action[field])
+
+    names = dict(ACCOUNT_EXPRESSIONS)
+    for contractName in Universe.CONTRACT_NAMES + Universe.ACCOUNT_NAMES:
+        names[contractName] = "universe.{}.address".format(contractName)
+    for account in accounts:
+        names[account] = "{}.address".format(account)
+    for action in actions:
+        if action["action"] == "makeOven":
+            names[action["oven"]] = "{}.address".format(action["oven"])
+
+    params = "".join(
+        ",\n    {} = {}".format(param, renderValue(value, UNIVERSE_PARAM_TYPES[param], names))
+        for param, value in sorted(universeParams.items())
+    )
+    lines = [
+        "import smartpy as sp",
+        "",
+        'Addresses = sp.import_script_from_url("file:test-helpers/addresses.py")',
+        'Dummy = sp.import_script_from_url("file:test-helpers/dummy-contract.py")',
+        'Universe = sp.import_script_from_url("file:test-helpers/universe.py")',
+        "",
+        "@sp.add_test(name = {})".format(json.dumps(name)),
+        "def test():",
+        "  scenario = sp.test_scenario()",
+        "  universe = Universe.Universe(\n    scenario{}\n  )".format(params),
+    ]
+    for account in accounts:
+        lines.append("  {} = Dummy.DummyContract()".format(account))
+        lines.append("  scenario += {}".format(account))
+
+    for index, action in enumerate(actions):
+        error = runAction(universe, action)
+        lines.append("")
+        lines.append("  # {}: {}".format(index, json.dumps(action)))
+
+        if action["action"] == "makeOven":
+            params = "".join(
+                ", {} = {}".format(param, renderValue(action[param], OVEN_PARAMS[param], names))
+                for param in OVEN_PARAMS if param in action
+            )
+            lines.append("  {} = universe.makeOven({}{})".format(action["oven"], names[action["owner"]], params))
+        else:
+            call, amount = ACTIONS[action["action"]][2](action, names)
+            runArguments = ["sender = {}".format(names[actionSender(universe, action)])]
+            if amount is not None:
+                runArguments.append(amount)
+            runArguments.append("now = sp.timestamp({})".format(universe.chain.now))
+            if error is not None:
+                runArguments.append("valid = False")
+            lines.append("  scenario += {}.run({})".format(call, ", ".join(runArguments)))
+
+        checks = []
+        for contractName in Universe.CONTRACT_NAMES:
+            checks += renderStorageChecks("universe.{}".format(contractName), getattr(universe, contractName), names)
+        for ovenAddress, oven in universe.ovens.items():
+            checks += renderStorageChecks(ovenAddress, oven, names)
+        for address in list(universe.ovens) + accounts + Universe.CONTRACT_NAMES:
+            expression = names[address].rsplit(".address", 1)[0]
+            checks.append("scenario.verify({}.balance == sp.mutez({}))".format(expression, universe.chain.balance(address)))
+        lines += ["  " + check for check in checks]
+
+    return "\n".join(lines) + "\n"
+
+# Replay an action script through SmartPy and verify its storage matches the simulator's. Returns True if it does.
+def crossCheck(actions, cli, universeParams = None, root = SOURCE_ROOT):
+    path = ".crosscheck-{}.py".format(os.getpid())
+    with open(os.path.join(root, path), "w") as f:
+        f.write(renderScenario(actions, universeParams))
+    try:
+        result = subprocess.run(
+            [cli, "test", path, os.path.join(".crosscheck-out", str(os.getpid()))],
+            cwd = root, stdout = subprocess.PIPE, stderr = subprocess.STDOUT, text = True
+        )
+    finally:
+        os.remove(os.path.join(root, path))
+    if result.returncode != 0:
+        print(result.stdout)
+    return result.returncode == 0
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Run an action script through the contract simulator.")
+    parser.add_argument("script", help = "JSON file with `universe` params and `actions`")
+    parser.add_argument("--render", metavar = "FILE", default = None, help = "Write the SmartPy cross-check scenario to FILE")
+    parser.add_argument("--cross-check", action = "store_true", help = "Experimental: replay the script through SmartPy and compare storage")
+    parser.add_argument("--cli", default = None, help = "Path to SmartPy.sh, required by --cross-check")
+    args = parser.parse_args(argv)
+
+    with open(args.script) as f:
+        script = json.load(f)
+    actions = script["actions"]
+    universeParams = script.get("universe", {})
+
+    start = time.monotonic()
+    universe, results = runScript(actions, universeParams)
+    seconds = time.monotonic() - start
+    for action, error in zip(actions, results):
+        print("{:<8} {}".format("ok" if error is None else "FAILED {}".format(error), json.dumps(action)))
+    print("{} actions, {} internal operations in {:.3f}s".format(len(actions), universe.chain.operationCount, seconds))
+
+    if args.render is not None:
+        with open(args.render, "w") as f:
+            f.write(renderScenario(actions, universeParams))
+
+    if args.cross_check:
+        if args.cli is None:
+            parser.error("--cross-check requires --cli")
+        if not crossCheck(actions, args.cli, universeParams):
+            print("Cross-check FAILED")
+            return 1
+        print("Cross-check passed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+################################################################
+# Monte Carlo solvency simulation.
+#
+# Runs the oven book of a snapshot through many simulated XTZ-USD
+# price paths under candidate Minter parameters, to see what
+# `updateParams` would do to bad debt and the Stability Fund:
+#   - The Minter's interest index compounds every step with
+#     `stabilityFee`, like `compoundInterestIndex`.
+#   - An oven is liquidated with `liquidate`, by the Stability Fund,
+#     at the first step its collateralization is below
+#     `collateralizationPercentage`. The fund burns the oven's debt
+#     plus the liquidation fee, is minted its share of the fees, and
+#     sells the seized XTZ at that step's price.
+#   - Bad debt is the debt of liquidated ovens not covered by their
+#     collateral.
+#
+# An oven is liquidatable when price / interest index falls below a
+# key fixed by its state, like `liquidation_index.py`, so ovens are
+# sorted by that key once and the step each one is liquidated at is
+# found for all ovens of a path with a binary search over the
+# running minimum of the path. Values are floats: the outcomes are
+# distributions, and the exact math is in `batch_health.py`.
+#
+# Paths are simulated in chunks on a process pool. Every parameter
+# set runs on the same paths, and a chunk's paths depend only on the
+# seed, so results do not depend on the number of workers.
+#
+# Usage:
+#   python3 tools/solvency.py --snapshot ovens.snapshot --xtz-price 2.5 [--paths 10000] [--days 30] [--volatility 80] [--collateralization 200 150 ...] [--liquidation-fee 8 ...] [--stability-fee 0 ...] [--jobs N]
+################################################################
+
+import argparse
+import collections
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import batch_health
+import minter_math
+from contract_constants import Constants
+from oven_snapshot import OvenSnapshot
+
+PRECISION = Constants.PRECISION
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+DEFAULT_CHUNK_PATHS = 256
+
+# Minter parameters in contract units, ie. collateralizationPercentage = 200 * PRECISION is 200%.
+Params = collections.namedtuple("Params", ["collateralizationPercentage", "liquidationFeePercent", "stabilityFee", "stabilityDevFundSplit"])
+
+# Geometric Brownian motion of the XTZ-USD price, from `xtzPrice` in USD, with annualized `drift` and `volatility`.
+PathModel = collections.namedtuple("PathModel", ["xtzPrice", "drift", "volatility", "stepSec", "steps"])
+
+# Ovens which can be liquidated, sorted by `key`. Balances are in XTZ and tokens in kUSD.
+Book = collections.namedtuple("Book", ["key", "ovenBalance", "borrowedTokens", "principal", "interestIndex"])
+
+# Results of each path.
+Outcome = collections.namedtuple("Outcome", ["badDebt", "fundDrawdown", "liquidations"])
+
+################################################################
+# Inputs
+################################################################
+
+# The ovens of a snapshot which `liquidate` could ever accept: not liquidated, with debt, and with storage the
+# Minter's math accepts.
+def loadBook(snapshot):
+    interestIndex = snapshot.column("interestIndex")
+    usable = ~(
+        snapshot.column("isLiquidated") |
+        snapshot.column("stabilityFeeTokensNegative") |
+        snapshot.column("interestIndexNegative") |
+        batch_health.isZero(interestIndex)
+    )
+
+    def floats(name):
+        return batch_health.toFloat(snapshot.column(name))[usable] / PRECISION
+
+    ovenBalance = floats("ovenBalance")
+    borrowedTokens = floats("borrowedTokens")
+    principal = borrowedTokens + floats("stabilityFeeTokens")
+    interestIndex = batch_health.toFloat(interestIndex)[usable]
+
+    # Empty ovens with debt get an infinite key and are liquidated at any price.
+    owing = principal > 0
+    with np.errstate(divide = "ignore"):
+        key = principal[owing] / (interestIndex[owing] * ovenBalance[owing])
+    order = np.argsort(key, kind = "stable")
+    return Book(key[order], ovenBalance[owing][order], borrowedTokens[owing][order], principal[owing][order], interestIndex[owing][order])
+
+# The index ovens were most recently updated at, which is the Minter's index up to the time since that update.
+def latestInterestIndex(snapshot):
+    if len(snapshot) == 0:
+        return PRECISION
+    return max(batch_health.fromLimbs(snapshot.column("interestIndex")))
+
+# The Minter's interest index at each step, compounded like `compoundInterestIndex` in `minter.py`.
+def interestIndexes(minterInterestIndex, stabilityFee, stepSec, steps):
+    indexes = [minterInterestIndex]
+    lastUpdateTime = 0
+    for step in range(1, steps):
+        minterInterestIndex, lastUpdateTime = minter_math.compoundInterestIndex(minterInterestIndex, stabilityFee, lastUpdateTime, step * stepSec)
+        indexes.append(minterInterestIndex)
+    return np.array(indexes, dtype = float)
+
+# `count` paths of `model.steps` prices, starting at `model.xtzPrice`.
+def pricePaths(model, count, rng):
+    dt = model.stepSec / SECONDS_PER_YEAR
+    returns = rng.normal((model.drift - model.volatility ** 2 / 2) * dt, model.volatility * np.sqrt(dt), (count, model.steps - 1))
+    logPrices = np.concatenate([np.zeros((count, 1)), np.cumsum(returns, axis = 1)], axis = 1)
+    return model.xtzPrice * np.exp(logPrices)
+
+################################################################
+# Simulation
+################################################################
+
+# Simulate the book along each row of `paths`, prices in USD one step of `stepSec` apart.
+def simulate(book, minterInterestIndex, params, paths, stepSec):
+    steps = paths.shape[1]
+    indexes = interestIndexes(minterInterestIndex, params.stabilityFee, stepSec, steps)
+    requiredRatio = params.collateralizationPercentage / (100 * PRECISION)
+    liquidationFee = params.liquidationFeePercent / PRECISION
+    fundShare = 1 - params.stabilityDevFundSplit / PRECISION
+
+    # Oven i is liquidatable at step t when paths[t] / indexes[t] < requiredRatio * key[i], so once the running
+    # minimum of that ratio is.
+    lowest = np.minimum.accumulate(paths / indexes, axis = 1) / requiredRatio
+
+    outcome = Outcome(np.zeros(len(paths)), np.zeros(len(paths)), np.zeros(len(paths), dtype = np.int64))
+    for row in range(len(paths)):
+        first = np.searchsorted(book.key, lowest[row, -1], side = "right")
+        if first == len(book.key):
+            continue
+        step = np.searchsorted(-lowest[row], -book.key[first:], side = "right")
+
+        totalOutstandingTokens = book.principal[first:] * indexes[step] / book.interestIndex[first:]
+        fee = totalOutstandingTokens * liquidationFee
+        collateralValue = book.ovenBalance[first:] * paths[row, step]
+        minted = (totalOutstandingTokens - book.borrowedTokens[first:] + fee) * fundShare
+
+        # The fund's value after each step, from which its largest fall is measured.
+        spent = np.bincount(step, weights = totalOutstandingTokens + fee - minted - collateralValue, minlength = steps)
+        value = np.concatenate([[0], -np.cumsum(spent)])
+
+        outcome.badDebt[row] = np.maximum(totalOutstandingTokens - collateralValue, 0).sum()
+        outcome.fundDrawdown[row] = (np.maximum.accumulate(value) - value).max()
+        outcome.liquidations[row] = len(step)
+    return outcome
+
+# Book of a worker process, sent once by `startWorker` rather than with every chunk.
+workerBook = None
+
+def startWorker(book):
+    global workerBook
+    workerBook = book
+
+# Simulate chunk `chunk` of the paths of `seed` under every parameter set.
+def simulateChunk(minterInterestIndex, paramSets, model, seed, chunk, pathCount, book = None):
+    paths = pricePaths(model, pathCount, np.random.default_rng([seed, chunk]))
+    return [simulate(workerBook if book is None else book, minterInterestIndex, params, paths, model.stepSec) for params in paramSets]
+
+# Simulate `pathCount` paths under each parameter set with `jobs` worker processes. Returns an `Outcome` per
+# parameter set.
+def sweep(book, minterInterestIndex, paramSets, model, pathCount, seed = 0, jobs = 1, chunkPaths = DEFAULT_CHUNK_PATHS):
+    chunks = [(chunk, min(chunkPaths, pathCount - start)) for chunk, start in enumerate(range(0, pathCount, chunkPaths))]
+    results = []
+    if jobs == 1:
+        results = [simulateChunk(minterInterestIndex, paramSets, model, seed, chunk, count, book) for chunk, count in chunks]
+    else:
+        pending = collections.deque()
+        with ProcessPoolExecutor(max_workers = jobs, initializer = startWorker, initargs = (book,)) as executor:
+            for chunk, count in chunks:
+                pending.append(executor.submit(simulateChunk, minterInterestIndex, paramSets, model, seed, chunk, count))
+                if len(pending) >= 2 * jobs:
+                    results.append(pending.popleft().result())
+            while pending:
+                results.append(pending.popleft().result())
+
+    return [
+        Outcome(*(np.concatenate([chunk[index][field] for chunk in results]) for field in range(len(Outcome._fields))))
+        for index in range(len(paramSets))
+    ]
+
+################################################################
+# Reports
+################################################################
+
+PERCENTILES = [50, 95, 99]
+
+# Mean, percentiles and maximum of each result, and the probability of any bad debt.
+def summarize(outcome):
+    summary = { "badDebtProbability": float(np.mean(outcome.badDebt > 0)) }
+    for name, values in outcome._asdict().items():
+        summary[name] = dict(
+            [("mean", float(np.mean(values)))] +
+            [("p{}".format(percentile), float(np.percentile(values, percentile))) for percentile in PERCENTILES] +
+            [("max", float(np.max(values)))]
+        )
+    return summary
+
+def formatReport(paramSets, outcomes):
+    lines = ["collateral  liq fee  stab fee  P(bad debt)  bad debt mean/p95/p99  fund drawdown mean/p95/p99  liquidations mean"]
+    for params, outcome in zip(paramSets, outcomes):
+        summary = summarize(outcome)
+        lines.append("{:>9.1f}%  {:>6.2f}%  {:>7.2f}%  {:>11.4f}  {:>21}  {:>26}  {:>17.1f}".format(
+            params.collateralizationPercentage / PRECISION,
+            100 * params.liquidationFeePercent / PRECISION,
+            100 * params.stabilityFee * SECONDS_PER_YEAR / Constants.SECONDS_PER_COMPOUND / PRECISION,
+            summary["badDebtProbability"],
+            "/".join("{:.0f}".format(summary["badDebt"][name]) for name in ["mean", "p95", "p99"]),
+            "/".join("{:.0f}".format(summary["fundDrawdown"][name]) for name in ["mean", "p95", "p99"]),
+            summary["liquidations"]["mean"],
+        ))
+    return "\n".join(lines)
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Simulate bad debt and Stability Fund drawdown of an oven book over random price paths.")
+    parser.add_argument("--snapshot", required = True, help = "Oven snapshot written by tools/oven_snapshot.py")
+    parser.add_argument("--xtz-price", type = float, required = True, help = "Starting XTZ-USD price")
+    parser.add_argument("--interest-index", type = int, help = "The Minter's interest index, by default the latest index of an oven")
+    parser.add_argument("--paths", type = int, default = 10000, help = "Number of price paths")
+    parser.add_argument("--days", type = float, default = 30, help = "Length of each path")
+    parser.add_argument("--step-minutes", type = int, default = 60, help = "Time between price updates")
+    parser.add_argument("--volatility", type = float, default = 80, help = "Annualized volatility, in percent")
+    parser.add_argument("--drift", type = float, default = 0, help = "Annualized drift, in percent")
+    parser.add_argument("--collateralization", type = Fraction, nargs = "+", default = [Fraction(200)], help = "collateralizationPercentage values, in percent")
+    parser.add_argument("--liquidation-fee", type = Fraction, nargs = "+", default = [Fraction(8)], help = "liquidationFeePercent values, in percent")
+    parser.add_argument("--stability-fee", type = Fraction, nargs = "+", default = [Fraction(0)], help = "stabilityFee values, as annual percentages")
+    parser.add_argument("--dev-fund-split", type = Fraction, default = Fraction(10), help = "stabilityDevFundSplit, in percent")
+    parser.add_argument("--seed", type = int, default = 0, help = "Seed of the price paths")
+    parser.add_argument("--jobs", type = int, default = os.cpu_count(), help = "Worker processes")
+    args = parser.parse_args(argv)
+
+    periodsPerYear = SECONDS_PER_YEAR // Constants.SECONDS_PER_COMPOUND
+    paramSets = [
+        Params(int(collateralization * PRECISION), int(liquidationFee * PRECISION / 100), int(stabilityFee * PRECISION / 100 / periodsPerYear), int(args.dev_fund_split * PRECISION / 100))
+        for collateralization in args.collateralization
+        for liquidationFee in args.liquidation_fee
+        for stabilityFee in args.stability_fee
+    ]
+    stepSec = 60 * args.step_minutes
+    model = PathModel(args.xtz_price, args.drift / 100, args.volatility / 100, stepSec, int(args.days * 24 * 60 * 60 // stepSec) + 1)
+
+    snapshot = OvenSnapshot(args.snapshot)
+    book = loadBook(snapshot)
+    minterInterestIndex = args.interest_index or latestInterestIndex(snapshot)
+    snapshot.close()
+
+    print("Simulating {} ovens with debt over {} paths of {} steps".format(len(book.key), args.paths, model.steps))
+    outcomes = sweep(book, minterInterestIndex, paramSets, model, args.paths, args.seed, args.jobs)
+    print(formatReport(paramSets, outcomes))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
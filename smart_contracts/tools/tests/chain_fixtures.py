@@ -0,0 +1,166 @@
+import json
+import os
+
+import indexer
+
+# Builders for blocks in the JSON format of the node RPC, with the operations the Kolibri contracts emit.
+
+FACTORY = "KT1OvenFactory"
+REGISTRY = "KT1OvenRegistry"
+TOKEN = "KT1Token"
+PROXY = "KT1OvenProxy"
+MINTER = "KT1Minter"
+CONTRACTS = indexer.Contracts(FACTORY, REGISTRY, TOKEN, PROXY, MINTER)
+
+UNIT = { "prim": "Unit" }
+
+def pair(*args):
+    return { "prim": "Pair", "args": list(args) }
+
+def string(value):
+    return { "string": value }
+
+def number(value):
+    return { "int": str(value) }
+
+def boolean(value):
+    return { "prim": "True" if value else "False" }
+
+def transaction(source, destination, amount = 0, entrypoint = None, value = None):
+    content = { "kind": "transaction", "source": source, "destination": destination, "amount": str(amount) }
+    if entrypoint is not None:
+        content["parameters"] = { "entrypoint": entrypoint, "value": UNIT if value is None else value }
+    return content
+
+def origination(source, address, storage, balance = 0):
+    return { "kind": "origination", "source": source, "balance": str(balance), "script": { "storage": storage }, "originated_contracts": [address] }
+
+# An operation with a top level call and the internal operations it emits. Failed operations backtrack everything.
+def operation(content, internals = (), status = "applied"):
+    internalResults = []
+    for internal in internals:
+        internal = dict(internal)
+        originated = internal.pop("originated_contracts", [])
+        internal["result"] = { "status": status if status == "applied" else "backtracked", "originated_contracts": originated }
+        internalResults.append(internal)
+
+    metadata = { "operation_result": { "status": status }, "internal_operation_results": internalResults }
+    return { "hash": "op", "contents": [dict(content, metadata = metadata)] }
+
+# A block hashed "<branch><level>", building on the block of the same branch one level down unless `predecessor` is given.
+def block(level, operations, branch = "main", predecessor = None):
+    return {
+        "hash": "{}{}".format(branch, level),
+        "header": { "level": level, "predecessor": predecessor or "{}{}".format(branch, level - 1) },
+        "operations": [[], [], [], list(operations)],
+    }
+
+def ovenStorage(owner, borrowedTokens = 0, stabilityFeeTokens = 0, interestIndex = 10 ** 18, isLiquidated = False):
+    return pair(pair(number(borrowedTokens), pair(number(interestIndex), boolean(isLiquidated))), pair(string(PROXY), pair(string(owner), number(stabilityFeeTokens))))
+
+def ovenState(oven, borrowedTokens, stabilityFeeTokens, interestIndex = 10 ** 18, isLiquidated = False):
+    return pair(string(oven), pair(number(borrowedTokens), pair(number(stabilityFeeTokens), pair(number(interestIndex), boolean(isLiquidated)))))
+
+# OvenFactory.makeOven: the factory fetches the interest index, originates the oven and registers it.
+def makeOven(owner, oven, interestIndex = 10 ** 18):
+    return operation(transaction(owner, FACTORY, 0, "makeOven"), [
+        transaction(FACTORY, MINTER, 0, "getInterestIndex"),
+        transaction(MINTER, FACTORY, 0, "makeOven_minterCallback", number(interestIndex)),
+        origination(FACTORY, oven, ovenStorage(owner, interestIndex = interestIndex)),
+        transaction(FACTORY, REGISTRY, 0, "addOven", pair(string(oven), string(owner))),
+    ])
+
+# A call to an oven. The oven forwards its balance through the Oven Proxy to the Minter, which writes back `state`
+# with `returned` mutez, pays the rest to `payee`, and makes `tokenCalls`.
+def ovenCall(sender, oven, entrypoint, parameter, amount, balance, state, returned = None, payee = None, tokenCalls = (), status = "applied"):
+    forwarded = balance + amount
+    returned = forwarded if returned is None else returned
+    internals = [
+        transaction(oven, PROXY, forwarded, entrypoint),
+        transaction(PROXY, MINTER, forwarded, entrypoint),
+        transaction(MINTER, PROXY, returned, "updateState", state),
+        transaction(PROXY, oven, returned, "updateState", state),
+    ]
+    if forwarded > returned:
+        internals.append(transaction(MINTER, payee, forwarded - returned))
+    internals += [transaction(MINTER, TOKEN, 0, entrypoint, value) for entrypoint, value in tokenCalls]
+    return operation(transaction(sender, oven, amount, entrypoint, parameter), internals, status)
+
+def mint(address, tokens):
+    return ("mint", pair(string(address), number(tokens)))
+
+def burn(address, tokens):
+    return ("burn", pair(string(address), number(tokens)))
+
+def tokenTransfer(source, destination, tokens, sourceValue = None):
+    value = pair(sourceValue or string(source), pair(string(destination), number(tokens)))
+    return operation(transaction(source, TOKEN, 0, "transfer", value))
+
+# Alice opens an oven, deposits 10 XTZ, borrows 5 kUSD and sends 1 kUSD to Bob. A failed borrow in between changes nothing.
+def aliceBlocks():
+    oven = "KT1AliceOven"
+    return [
+        block(1, [makeOven("tz1alice", oven)]),
+        block(2, [ovenCall("tz1alice", oven, "default", UNIT, 10 * 10 ** 6, 0, ovenState(oven, 0, 0))]),
+        block(3, [
+            ovenCall("tz1alice", oven, "borrow", number(100 * 10 ** 18), 0, 10 * 10 ** 6, ovenState(oven, 100 * 10 ** 18, 0), status = "failed"),
+            ovenCall("tz1alice", oven, "borrow", number(5 * 10 ** 18), 0, 10 * 10 ** 6, ovenState(oven, 5 * 10 ** 18, 0), tokenCalls = [mint("tz1alice", 5 * 10 ** 18)]),
+        ]),
+        block(4, [tokenTransfer("tz1alice", "tz1bob", 10 ** 18)]),
+        block(5, [
+            ovenCall("tz1alice", oven, "withdraw", number(4 * 10 ** 6), 0, 10 * 10 ** 6, ovenState(oven, 5 * 10 ** 18, 10 ** 16, 101 * 10 ** 16), returned = 6 * 10 ** 6, payee = "tz1alice"),
+            ovenCall("tz1alice", oven, "repay", number(10 ** 18), 0, 6 * 10 ** 6, ovenState(oven, 4 * 10 ** 18, 0, 101 * 10 ** 16), tokenCalls = [
+                burn("tz1alice", 10 ** 18 + 10 ** 16), mint("KT1StabilityFund", 10 ** 16),
+            ]),
+        ]),
+    ]
+
+# A branch replacing Alice's blocks after level 3: she repays instead, and Carol opens an oven.
+def forkBlocks():
+    oven = "KT1AliceOven"
+    return [
+        block(4, [
+            ovenCall("tz1alice", oven, "repay", number(2 * 10 ** 18), 0, 10 * 10 ** 6, ovenState(oven, 3 * 10 ** 18, 0), tokenCalls = [burn("tz1alice", 2 * 10 ** 18)]),
+        ], branch = "fork", predecessor = "main3"),
+        block(5, [makeOven("tz1carol", "KT1CarolOven")], branch = "fork"),
+        block(6, [tokenTransfer("tz1alice", "tz1carol", 10 ** 18)], branch = "fork"),
+    ]
+
+# A random history of ovens being opened, deposited to and withdrawn from, kUSD transfers, and unrelated operations.
+def randomHistory(rng, levelCount):
+    balances = {}
+    blocks = []
+    for level in range(1, levelCount + 1):
+        operations = []
+        for _ in range(rng.randrange(5)):
+            choice = rng.random()
+            if choice < 0.15 or not balances:
+                oven = "KT1Oven{}".format(len(balances))
+                balances[oven] = 0
+                operations.append(makeOven("tz1owner{}".format(len(balances) - 1), oven, rng.randrange(10 ** 18, 2 * 10 ** 18)))
+                continue
+
+            oven = rng.choice(sorted(balances))
+            owner = "tz1owner" + oven[len("KT1Oven"):]
+            state = ovenState(oven, rng.randrange(10 ** 20), rng.randrange(10 ** 16), rng.randrange(10 ** 18, 2 * 10 ** 18), rng.random() < 0.05)
+            if choice < 0.5:
+                amount = rng.randrange(1, 10 ** 8)
+                tokens = rng.randrange(10 ** 19)
+                operations.append(ovenCall(owner, oven, "default", UNIT, amount, balances[oven], state, tokenCalls = [mint(owner, tokens)]))
+                balances[oven] += amount
+            elif choice < 0.65:
+                returned = rng.randrange(balances[oven] + 1)
+                operations.append(ovenCall(owner, oven, "withdraw", number(balances[oven] - returned), 0, balances[oven], state, returned = returned, payee = owner))
+                balances[oven] = returned
+            elif choice < 0.8:
+                operations.append(tokenTransfer(owner, "tz1owner{}".format(rng.randrange(len(balances))), rng.randrange(10 ** 18)))
+            else:
+                operations.append(operation(transaction("tz1stranger", oven if rng.random() < 0.5 else "KT1Other", 0, "default")))
+        blocks.append(block(level, operations))
+    return blocks
+
+def writeBlocks(directory, blocks):
+    os.makedirs(directory, exist_ok = True)
+    for item in blocks:
+        with open(os.path.join(directory, "{}.json".format(item["header"]["level"])), "w") as f:
+            json.dump(item, f)
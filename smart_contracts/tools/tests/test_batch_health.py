@@ -0,0 +1,135 @@
+import random
+
+import numpy as np
+
+import batch_health
+import minter_math
+from contract_constants import Constants
+from minter_math import ContractError
+
+PRECISION = Constants.PRECISION
+
+# The Minter's math for a single oven, as the reference for batch results.
+def evaluateOven(ovenBalance, borrowedTokens, stabilityFeeTokens, interestIndex, minterInterestIndex, xtzPrice):
+    try:
+        stabilityFeeTokens = minter_math.asNat(stabilityFeeTokens)
+        newStabilityFeeTokens = stabilityFeeTokens + minter_math.calculateNewAccruedInterest(interestIndex, borrowedTokens, stabilityFeeTokens, minterInterestIndex)
+        totalOutstandingTokens = borrowedTokens + newStabilityFeeTokens
+        collateralizationPercentage = minter_math.computeCollateralizationPercentage(ovenBalance, xtzPrice, totalOutstandingTokens)
+        return (newStabilityFeeTokens, totalOutstandingTokens, collateralizationPercentage)
+    except ContractError as e:
+        return e.code
+
+def batchResults(health):
+    columns = zip(
+        batch_health.fromLimbs(health.stabilityFeeTokens),
+        batch_health.fromLimbs(health.totalOutstandingTokens),
+        batch_health.fromLimbs(health.collateralizationPercentage)
+    )
+    return [values if code is None else code for values, code in zip(columns, health.failures.codes)]
+
+def randomValue(rng):
+    return rng.choice([
+        0,
+        1,
+        rng.randrange(PRECISION),
+        rng.randrange(2 ** 64),
+        rng.randrange(10 ** 30),
+        rng.randrange(2 ** 160),
+    ])
+
+################################################################
+# Limb Arithmetic
+################################################################
+
+def test_limbs_round_trip():
+    values = [0, 1, 2 ** 32 - 1, 2 ** 32, 2 ** 200 + 12345, PRECISION]
+    assert batch_health.fromLimbs(batch_health.toLimbs(values)) == values
+
+def test_arithmetic_matches_python_ints():
+    rng = random.Random(7)
+    a = [randomValue(rng) for _ in range(500)]
+    b = [randomValue(rng) for _ in range(500)]
+    limbsA = batch_health.toLimbs(a)
+    limbsB = batch_health.toLimbs(b)
+
+    assert batch_health.fromLimbs(batch_health.add(limbsA, limbsB)) == [x + y for x, y in zip(a, b)]
+    assert batch_health.fromLimbs(batch_health.multiply(limbsA, limbsB)) == [x * y for x, y in zip(a, b)]
+    assert list(batch_health.lessThan(limbsA, limbsB)) == [x < y for x, y in zip(a, b)]
+
+    difference, negative = batch_health.subtract(limbsA, limbsB)
+    assert list(negative) == [x < y for x, y in zip(a, b)]
+    assert [d for d, n in zip(batch_health.fromLimbs(difference), negative) if not n] == [x - y for x, y in zip(a, b) if x >= y]
+
+    quotient, divisionByZero = batch_health.floorDivide(limbsA, limbsB)
+    assert list(divisionByZero) == [y == 0 for y in b]
+    assert [q for q, zero in zip(batch_health.fromLimbs(quotient), divisionByZero) if not zero] == [x // y for x, y in zip(a, b) if y != 0]
+
+def test_floor_divide_scalar():
+    rng = random.Random(11)
+    values = [randomValue(rng) for _ in range(500)]
+    limbs = batch_health.toLimbs(values)
+
+    for divisor in [1, 100, PRECISION, 2 ** 64 + 1, 3 ** 40]:
+        assert batch_health.fromLimbs(batch_health.floorDivideScalar(limbs, divisor)) == [value // divisor for value in values]
+
+################################################################
+# Minter Math
+################################################################
+
+def test_health_is_bit_exact_with_minter_math():
+    rng = random.Random(42)
+    count = 2000
+    ovenBalances = [randomValue(rng) for _ in range(count)]
+    borrowedTokens = [randomValue(rng) for _ in range(count)]
+    stabilityFeeTokens = [rng.choice([randomValue(rng), -rng.randrange(1, PRECISION)]) for _ in range(count)]
+    interestIndexes = [rng.choice([PRECISION, rng.randrange(PRECISION, 2 * PRECISION), randomValue(rng), -PRECISION]) for _ in range(count)]
+    minterInterestIndex = rng.randrange(PRECISION, 2 * PRECISION)
+    xtzPrice = 2 * PRECISION
+
+    health = batch_health.evaluateHealth(ovenBalances, borrowedTokens, stabilityFeeTokens, interestIndexes, minterInterestIndex, xtzPrice)
+
+    expected = [
+        evaluateOven(*values, minterInterestIndex, xtzPrice)
+        for values in zip(ovenBalances, borrowedTokens, stabilityFeeTokens, interestIndexes)
+    ]
+    assert batchResults(health) == expected
+
+    # Every failure mode is exercised.
+    codes = set(code for code in expected if not isinstance(code, tuple))
+    assert codes == set([minter_math.AS_NAT_FAILURE, minter_math.DIVISION_BY_ZERO])
+
+def test_health_accepts_limb_columns():
+    columns = [[10 * 10 ** 6 * 10 ** 12], [10 * PRECISION], [0], [PRECISION]]
+    health = batch_health.evaluateHealth(*[batch_health.toLimbs(column) for column in columns], 11 * PRECISION // 10, 2 * PRECISION)
+
+    # $20 of collateral against $11 of debt.
+    assert batchResults(health) == [(PRECISION, 11 * PRECISION, 181818181818181818100)]
+
+def test_liquidatable():
+    ovenBalances = [10 * 10 ** 6 * 10 ** 12] * 4 + [0]
+    borrowedTokens = [9 * PRECISION, 10 * PRECISION, 11 * PRECISION, 10 * PRECISION, 0]
+    health = batch_health.evaluateHealth(ovenBalances, borrowedTokens, [0] * 5, [PRECISION] * 5, PRECISION, 2 * PRECISION)
+    isLiquidated = [False, False, False, True, False]
+
+    expected = [False, False, True, False, False]
+    assert list(batch_health.liquidatable(health, 200 * PRECISION, isLiquidated)) == expected
+    assert list(batch_health.liquidatableAtPrice(ovenBalances, health.totalOutstandingTokens, 2 * PRECISION, 200 * PRECISION, isLiquidated)) == expected
+
+def test_liquidatable_at_price_matches_collateralization_percentage():
+    rng = random.Random(3)
+    count = 2000
+    ovenBalances = [rng.randrange(10 ** 30) for _ in range(count)]
+    totalOutstandingTokens = [rng.choice([0, rng.randrange(10 ** 28)]) for _ in range(count)]
+    xtzPrice = rng.randrange(PRECISION, 5 * PRECISION)
+
+    expected = []
+    for ovenBalance, totalOutstanding in zip(ovenBalances, totalOutstandingTokens):
+        try:
+            expected.append(minter_math.computeCollateralizationPercentage(ovenBalance, xtzPrice, totalOutstanding) < 200 * PRECISION + 50)
+        except ContractError:
+            expected.append(False)
+
+    result = batch_health.liquidatableAtPrice(ovenBalances, totalOutstandingTokens, xtzPrice, 200 * PRECISION + 50)
+    assert list(result) == expected
+    assert np.any(result) and not np.all(result)
@@ -0,0 +1,162 @@
+import os
+import stat
+import sys
+
+import pytest
+
+import build
+
+# A stand-in for SmartPy.sh which records its invocations in the directory it is run from and writes the artifact of
+# each compilation target.
+FAKE_CLI = """#!{python}
+import os, re, sys
+with open("calls.log", "a") as log:
+    log.write(sys.argv[1] + " " + os.path.basename(sys.argv[2]) + "\\n")
+source = open(sys.argv[2]).read()
+if source.startswith("# fail"):
+    sys.exit(1)
+if sys.argv[1] == "compile":
+    for name, invocation in re.findall(r'sp\\.add_compilation_target\\("([^"]+)", (.*)\\)', source):
+        os.makedirs(os.path.join(sys.argv[3], name), exist_ok = True)
+        with open(os.path.join(sys.argv[3], name, "step_000_cont_0_contract.tz"), "w") as f:
+            f.write("compiled " + invocation)
+"""
+
+def writeFile(root, path, content):
+    os.makedirs(os.path.dirname(os.path.join(root, path)), exist_ok = True)
+    with open(os.path.join(root, path), "w") as f:
+        f.write(content)
+
+def makeTree(root):
+    writeFile(root, "common/errors.py", "ERROR = 1\n")
+    writeFile(root, "common/constants.py", "import smartpy as sp\nErrors = sp.import_script_from_url(\"file:./common/errors.py\")\n")
+    writeFile(root, "oven.py", "Constants = sp.import_script_from_url(\"file:common/constants.py\")\n")
+    writeFile(root, "token.py", "Errors = sp.import_script_from_url( \"file:common/errors.py\" )\n")
+    writeFile(root, "end-to-end-tests.py", "Oven = sp.import_script_from_url(\"file:oven.py\")\n")
+
+    cli = os.path.join(root, "smartpy-cli", "SmartPy.sh")
+    writeFile(root, "smartpy-cli/SmartPy.sh", FAKE_CLI.format(python = sys.executable))
+    os.chmod(cli, os.stat(cli).st_mode | stat.S_IEXEC)
+    return cli
+
+def runBuild(root, cli, specs, **kwargs):
+    targets = [build.parseTarget(spec, root, build.cliFingerprint(cli)) for spec in specs]
+    return build.build(targets, cli, root, jobs = 2, **kwargs)
+
+def calls(root):
+    path = os.path.join(root, "calls.log")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        lines = f.read().splitlines()
+    os.remove(path)
+    return sorted(lines)
+
+SPECS = ["oven=OvenContract()", "token=FA12()", "end-to-end-tests="]
+
+################################################################
+# Fingerprints
+################################################################
+
+def test_resolves_transitive_imports(tmp_path):
+    makeTree(str(tmp_path))
+    assert build.transitiveImports("end-to-end-tests.py", str(tmp_path)) == [
+        "common/constants.py", "common/errors.py", "end-to-end-tests.py", "oven.py"
+    ]
+
+def test_fingerprint_changes_with_dependencies_and_invocation(tmp_path):
+    root = str(tmp_path)
+    makeTree(root)
+    original = build.fingerprint("oven.py", "OvenContract()", root)
+
+    assert build.fingerprint("oven.py", "OvenContract(owner = 1)", root) != original
+
+    writeFile(root, "common/errors.py", "ERROR = 2\n")
+    assert build.fingerprint("oven.py", "OvenContract()", root) != original
+
+def test_cli_fingerprint_covers_the_installation(tmp_path):
+    root = str(tmp_path)
+    cli = makeTree(root)
+    original = build.cliFingerprint(cli)
+    assert build.cliFingerprint(cli) == original
+
+    # Any file of the installation, not only the script, identifies the version.
+    writeFile(root, "smartpy-cli/smartpy.py", "VERSION = 2\n")
+    added = build.cliFingerprint(cli)
+    assert added != original
+
+    # Rewriting a file is detected from its modification time, without reading it.
+    installed = os.path.join(root, "smartpy-cli", "smartpy.py")
+    os.utime(installed, ns = (0, os.stat(installed).st_mtime_ns + 1000000000))
+    assert build.cliFingerprint(cli) != added
+
+    with pytest.raises(ValueError):
+        build.cliFingerprint(os.path.join(root, "missing", "SmartPy.sh"))
+
+################################################################
+# Build
+################################################################
+
+def test_compiles_a_copy_registering_the_invocation(tmp_path):
+    root = str(tmp_path)
+    makeTree(root)
+    target = build.parseTarget("oven=OvenContract(owner = 1)", root)
+    assert build.compilationScript(target, root) == (
+        "Constants = sp.import_script_from_url(\"file:common/constants.py\")\n"
+        "\nsp.add_compilation_target(\"oven\", OvenContract(owner = 1))\n"
+    )
+
+def test_builds_all_targets_then_skips_unchanged_ones(tmp_path):
+    root = str(tmp_path)
+    cli = makeTree(root)
+
+    assert runBuild(root, cli, SPECS)
+    assert calls(root) == [
+        "compile oven.py", "compile token.py", "test end-to-end-tests.py", "test oven.py", "test token.py"
+    ]
+    with open(os.path.join(root, "oven.tz")) as f:
+        assert f.read() == "compiled OvenContract()"
+
+    # A no-op rebuild runs nothing.
+    assert runBuild(root, cli, SPECS)
+    assert calls(root) == []
+
+    # Changing a shared import rebuilds only the targets which depend on it.
+    writeFile(root, "common/constants.py", "CHANGED = True\n")
+    assert runBuild(root, cli, SPECS)
+    assert calls(root) == ["compile oven.py", "test end-to-end-tests.py", "test oven.py"]
+
+def test_rebuilds_missing_artifacts_and_when_forced(tmp_path):
+    root = str(tmp_path)
+    cli = makeTree(root)
+    assert runBuild(root, cli, SPECS)
+    calls(root)
+
+    os.remove(os.path.join(root, "token.tz"))
+    assert runBuild(root, cli, SPECS)
+    assert calls(root) == ["compile token.py", "test token.py"]
+
+    assert runBuild(root, cli, SPECS, force = True)
+    assert len(calls(root)) == 5
+
+def test_rebuilds_everything_with_another_cli(tmp_path):
+    root = str(tmp_path)
+    cli = makeTree(root)
+    assert runBuild(root, cli, SPECS)
+    calls(root)
+
+    writeFile(root, "smartpy-cli/VERSION", "0.17.0\n")
+    assert runBuild(root, cli, SPECS)
+    assert len(calls(root)) == 5
+
+def test_failed_targets_are_not_cached(tmp_path):
+    root = str(tmp_path)
+    cli = makeTree(root)
+    writeFile(root, "token.py", "# fail\n")
+
+    assert not runBuild(root, cli, SPECS)
+    calls(root)
+
+    # Only the failed target is retried.
+    assert not runBuild(root, cli, SPECS)
+    assert calls(root) == ["test token.py"]
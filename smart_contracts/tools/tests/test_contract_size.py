@@ -0,0 +1,77 @@
+import json
+
+import contract_size
+
+# A contract in the shape emitted by SmartPy: a LAMBDA shared by every entry point, then a dispatch on the parameter.
+CONTRACT = """
+parameter (or (or (nat %add) (nat %sub)) (unit %reset));
+storage   nat;
+code
+  {
+    LAMBDA nat nat { PUSH nat 1; ADD };
+    SWAP;
+    UNPAIR;
+    IF_LEFT
+      {
+        IF_LEFT
+          {
+            ADD;    # add
+          }
+          {
+            SWAP;
+            SUB;
+            ISNAT;
+            IF_SOME {} { PUSH int 1; FAILWITH };
+          };
+      }
+      {
+        DROP 2;
+        PUSH nat 0;
+      };
+    SWAP;
+    DROP;
+    NIL operation;
+    PAIR;
+  };
+"""
+
+def test_measures_each_entry_point():
+    report = contract_size.measureContract(CONTRACT)
+    entryPoints = report["entryPoints"]
+
+    assert set(entryPoints) == { "add", "sub", "reset", contract_size.COMMON_ENTRY_POINT }
+    assert entryPoints["add"]["instructions"] == 1
+    # SWAP, SUB, ISNAT, IF_NONE, PUSH, FAILWITH
+    assert entryPoints["sub"]["instructions"] == 6
+    assert entryPoints["reset"]["instructions"] == 2
+
+    # Entry points and common code add up to the whole contract.
+    assert sum(size["instructions"] for size in entryPoints.values()) == report["instructions"]
+
+def test_contract_with_a_single_entry_point():
+    report = contract_size.measureContract("parameter unit; storage unit; code { CDR; NIL operation; PAIR };")
+    assert report["entryPoints"]["default"] == { "instructions": 3, "bytes": report["entryPoints"]["default"]["bytes"] }
+    assert report["entryPoints"][contract_size.COMMON_ENTRY_POINT]["instructions"] == 0
+
+def test_flags_growth_beyond_budget():
+    report = { "minter": { "bytes": 1011, "instructions": 100, "entryPoints": {} } }
+
+    assert contract_size.checkBudget(report, { "tolerancePercent": 1, "contracts": { "minter": { "bytes": 1001, "instructions": 100 } } }) == []
+    violations = contract_size.checkBudget(report, { "tolerancePercent": 1, "contracts": { "minter": { "bytes": 1000, "instructions": 100 } } })
+    assert len(violations) == 1 and "bytes" in violations[0]
+
+def test_flags_contracts_without_a_budget():
+    report = { "oven": { "bytes": 10, "instructions": 10, "entryPoints": {} } }
+    assert contract_size.checkBudget(report, { "contracts": {} }) == ["oven: no budget, add one with --update-budget"]
+
+def test_main_fails_over_budget_and_update_resets_it(tmp_path):
+    contract = tmp_path / "calc.tz"
+    contract.write_text(CONTRACT)
+    budget = tmp_path / "budget.json"
+    budget.write_text(json.dumps({ "tolerancePercent": 0, "contracts": { "calc": { "bytes": 1, "instructions": 1 } } }))
+
+    assert contract_size.main(["--budget", str(budget), str(contract)]) == 1
+
+    assert contract_size.main(["--budget", str(budget), "--update-budget", str(contract)]) == 0
+    assert contract_size.main(["--budget", str(budget), str(contract)]) == 0
+    assert json.loads(budget.read_text())["tolerancePercent"] == 0
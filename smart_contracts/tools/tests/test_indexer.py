@@ -0,0 +1,262 @@
+import os
+import random
+
+import pytest
+
+import chain_fixtures
+import indexer
+import michelson
+from chain_fixtures import CONTRACTS
+from indexer import Indexer, IndexerError
+from michelson import Bytes, String
+
+def ovenRow(database):
+    return database.oven("KT1AliceOven")
+
+def assertAliceIndexed(database):
+    assert ovenRow(database) == indexer.Oven(
+        address = "KT1AliceOven",
+        owner = "tz1alice",
+        originationLevel = 1,
+        balance = 6 * 10 ** 6,
+        borrowedTokens = 4 * 10 ** 18,
+        stabilityFeeTokens = 0,
+        interestIndex = 101 * 10 ** 16,
+        isLiquidated = False,
+        updateLevel = 5,
+    )
+    assert database.balance("tz1alice") == 299 * 10 ** 16
+    assert database.balance("tz1bob") == 10 ** 18
+    assert database.balance("KT1StabilityFund") == 10 ** 16
+    assert database.totalSupply() == 4 * 10 ** 18
+    assert database.checkpoint() == indexer.Checkpoint(5, "main5")
+
+################################################################
+# Decoding
+################################################################
+
+def test_decodes_optimized_addresses():
+    assert indexer.decodeAddress(Bytes(bytes.fromhex("000002298c03ed7d454a101eb7022bc95f7e5f41ac78"))) == "tz1KqTpEZ7Yob7QbPE4Hy4Wo8fHG8LhKxZSx"
+    assert indexer.decodeAddress(String("KT1Token%transfer")) == "KT1Token"
+    with pytest.raises(IndexerError):
+        indexer.decodeAddress(Bytes(b"\x00"))
+
+def test_unpairs_nested_and_flattened_combs():
+    values = [String(name) for name in "abc"]
+    nested = { "prim": "Pair", "args": [{ "string": "a" }, { "prim": "Pair", "args": [{ "string": "b" }, { "string": "c" }] }] }
+    flattened = { "prim": "Pair", "args": [{ "string": "a" }, { "string": "b" }, { "string": "c" }] }
+    sequence = [{ "string": "a" }, { "string": "b" }, { "string": "c" }]
+
+    for value in [nested, flattened, sequence]:
+        assert indexer.unpair(michelson.fromJson(value), 3) == values
+
+################################################################
+# Indexing
+################################################################
+
+def test_indexes_ovens_balances_and_supply(tmp_path):
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.aliceBlocks())
+    database = Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1)
+
+    assert database.sync(indexer.FixtureSource(str(tmp_path / "blocks"))) == 5
+    assertAliceIndexed(database)
+    assert [oven.address for oven in database.ovens()] == ["KT1AliceOven"]
+
+def test_restarts_resume_from_the_checkpoint(tmp_path):
+    blocks = chain_fixtures.aliceBlocks()
+    chain_fixtures.writeBlocks(tmp_path / "blocks", blocks)
+    source = indexer.FixtureSource(str(tmp_path / "blocks"))
+    path = str(tmp_path / "index.db")
+
+    database = Indexer(path, CONTRACTS, startLevel = 1)
+    assert database.sync(source, toLevel = 3) == 3
+    database.close()
+
+    database = Indexer(path, CONTRACTS, startLevel = 1)
+    assert database.nextLevel() == 4
+    assert database.sync(source) == 2
+    assertAliceIndexed(database)
+
+    # Re-applying a level is a no-op, and levels cannot be skipped.
+    assert not database.applyBlock(blocks[2])
+    assertAliceIndexed(database)
+    with pytest.raises(IndexerError):
+        database.applyBlock(chain_fixtures.block(7, []))
+
+def test_bad_blocks_are_not_partially_applied(tmp_path):
+    blocks = chain_fixtures.aliceBlocks()
+    database = Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1)
+    for item in blocks[:4]:
+        database.applyBlock(item)
+
+    # A transfer with a malformed recipient after a valid one.
+    bad = chain_fixtures.block(5, [
+        chain_fixtures.tokenTransfer("tz1alice", "tz1carol", 10 ** 18),
+        chain_fixtures.tokenTransfer("tz1bob", "tz1carol", 10 ** 18, sourceValue = { "int": "1" }),
+    ])
+    with pytest.raises(IndexerError):
+        database.applyBlock(bad)
+
+    assert database.balance("tz1carol") == 0
+    assert database.checkpoint().level == 4
+    database.applyBlock(blocks[4])
+    assertAliceIndexed(database)
+
+def test_ovens_not_from_the_factory_are_ignored(tmp_path):
+    database = Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1)
+    impostor = chain_fixtures.operation(
+        chain_fixtures.transaction("KT1Proxy", "KT1Impostor", 0, "updateState", chain_fixtures.ovenState("KT1Impostor", 10 ** 18, 0))
+    )
+    database.applyBlock(chain_fixtures.block(1, [impostor]))
+    assert database.oven("KT1Impostor") is None
+
+################################################################
+# Reorgs
+################################################################
+
+def tables(database, names = ("ovens", "balances", "totals")):
+    rows = lambda table: database.connection.execute("SELECT * FROM {} ORDER BY 1, 2".format(table)).fetchall()
+    return [rows(name) for name in names] + [database.checkpoint()]
+
+def forkedIndex(tmp_path):
+    blocks = chain_fixtures.aliceBlocks()[:3] + chain_fixtures.forkBlocks()
+    database = Indexer(str(tmp_path / "forked.db"), CONTRACTS, startLevel = 1)
+    for item in blocks:
+        database.applyBlock(item)
+    return database
+
+def test_reorgs_roll_back_to_the_fork_point(tmp_path):
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.aliceBlocks())
+    source = indexer.FixtureSource(str(tmp_path / "blocks"))
+    database = Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1)
+    database.sync(source)
+    assertAliceIndexed(database)
+
+    # The node switches to a longer branch forking after level 3.
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.forkBlocks())
+    assert database.sync(source) == 3
+    assert tables(database) == tables(forkedIndex(tmp_path))
+    assert database.checkpoint() == indexer.Checkpoint(6, "fork6")
+
+def test_reorgs_of_the_last_block(tmp_path):
+    blocks = chain_fixtures.aliceBlocks()
+    chain_fixtures.writeBlocks(tmp_path / "blocks", blocks)
+    source = indexer.FixtureSource(str(tmp_path / "blocks"))
+    database = Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1)
+    database.sync(source, toLevel = 4)
+
+    # Block 4 is replaced by another at the same level, before any block builds on it.
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.forkBlocks()[:1])
+    os.remove(str(tmp_path / "blocks" / "5.json"))
+    assert database.sync(source) == 1
+    assert database.checkpoint() == indexer.Checkpoint(4, "fork4")
+    assert database.balance("tz1bob") == 0
+    assert database.balance("tz1alice") == 3 * 10 ** 18
+
+def test_journal_is_bounded(tmp_path):
+    database = Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1, maxReorgDepth = 2)
+    for item in chain_fixtures.aliceBlocks():
+        database.applyBlock(item)
+
+    assert database.connection.execute("SELECT level FROM blocks").fetchall() == [(3,), (4,), (5,)]
+    assert database.connection.execute("SELECT MIN(level) FROM journal").fetchone() == (4,)
+
+    # Forking after level 3 is still possible, but not after level 2.
+    database.rollback(3)
+    assert database.balance("tz1bob") == 0
+    with pytest.raises(IndexerError):
+        database.rollback(2)
+
+def test_forks_deeper_than_the_journal_fail(tmp_path):
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.aliceBlocks())
+    source = indexer.FixtureSource(str(tmp_path / "blocks"))
+    database = Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1, maxReorgDepth = 1)
+    database.sync(source)
+
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.forkBlocks())
+    with pytest.raises(IndexerError):
+        database.sync(source)
+    assertAliceIndexed(database)
+
+################################################################
+# Backfill
+################################################################
+
+ALL_TABLES = ("ovens", "balances", "totals", "blocks", "journal")
+
+def test_backfill_matches_sequential_indexing(tmp_path):
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.randomHistory(random.Random(3), 60))
+    source = indexer.FixtureSource(str(tmp_path / "blocks"))
+    sequential = Indexer(str(tmp_path / "sequential.db"), CONTRACTS, startLevel = 1, maxReorgDepth = 10)
+    sequential.sync(source)
+    assert len(list(sequential.ovens())) > 10
+
+    parallel = Indexer(str(tmp_path / "parallel.db"), CONTRACTS, startLevel = 1, maxReorgDepth = 10)
+    assert parallel.backfill(source, 60, jobs = 3, chunkLevels = 7) == 60
+    assert tables(parallel, ALL_TABLES) == tables(sequential, ALL_TABLES)
+
+    # Backfilling resumes from the checkpoint, and syncing continues from the backfill.
+    resumed = Indexer(str(tmp_path / "resumed.db"), CONTRACTS, startLevel = 1, maxReorgDepth = 10)
+    resumed.sync(source, toLevel = 20)
+    assert resumed.backfill(source, 50, jobs = 2, chunkLevels = 4) == 30
+    assert resumed.sync(source) == 10
+    assert tables(resumed, ALL_TABLES) == tables(sequential, ALL_TABLES)
+
+def test_backfill_keeps_only_operations_of_the_contracts(tmp_path):
+    oven = "KT1AliceOven"
+    blocks = [chain_fixtures.block(1, [
+        chain_fixtures.operation(chain_fixtures.transaction("tz1stranger", "KT1Other", 5)),
+        chain_fixtures.ovenCall("tz1alice", oven, "default", chain_fixtures.UNIT, 10, 0, chain_fixtures.ovenState(oven, 0, 0)),
+        chain_fixtures.tokenTransfer("tz1alice", "tz1bob", 1),
+    ])]
+    chain_fixtures.writeBlocks(tmp_path / "blocks", blocks)
+
+    fetched = indexer.fetchRange(indexer.FixtureSource(str(tmp_path / "blocks")), CONTRACTS, 1, 1)
+    assert [operation["contents"][0]["destination"] for operation in fetched[0]["operations"][0]] == [oven, chain_fixtures.TOKEN]
+
+def test_backfill_needs_the_oven_proxy(tmp_path):
+    database = Indexer(str(tmp_path / "index.db"), indexer.Contracts(*CONTRACTS[:3]), startLevel = 1)
+    with pytest.raises(IndexerError):
+        database.backfill(indexer.FixtureSource(str(tmp_path)), 10, jobs = 2)
+
+################################################################
+# Sources
+################################################################
+
+def test_recorded_blocks_replay(tmp_path):
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.aliceBlocks())
+    recording = indexer.RecordingSource(indexer.FixtureSource(str(tmp_path / "blocks")), str(tmp_path / "recorded"))
+    Indexer(str(tmp_path / "first.db"), CONTRACTS, startLevel = 1).sync(recording)
+
+    replay = indexer.openSource(str(tmp_path / "recorded"))
+    assert replay.levels() == [1, 2, 3, 4, 5]
+    database = Indexer(str(tmp_path / "second.db"), CONTRACTS, startLevel = 1)
+    database.sync(replay)
+    assertAliceIndexed(database)
+
+    with pytest.raises(IndexerError):
+        replay.block(6)
+
+def test_main(tmp_path, capsys):
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.aliceBlocks())
+    args = [
+        "--database", str(tmp_path / "index.db"), "--source", str(tmp_path / "blocks"), "--start-level", "1",
+        "--oven-factory", chain_fixtures.FACTORY, "--oven-registry", chain_fixtures.REGISTRY, "--token", chain_fixtures.TOKEN,
+    ]
+    assert indexer.main(args) == 0
+    assert "Applied 5 blocks to level 5" in capsys.readouterr().out
+
+    assertAliceIndexed(Indexer(str(tmp_path / "index.db"), CONTRACTS))
+
+def test_main_with_jobs(tmp_path, capsys):
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.aliceBlocks())
+    args = [
+        "--database", str(tmp_path / "index.db"), "--source", str(tmp_path / "blocks"), "--start-level", "1", "--reorg-depth", "2",
+        "--oven-factory", chain_fixtures.FACTORY, "--oven-registry", chain_fixtures.REGISTRY, "--token", chain_fixtures.TOKEN,
+        "--jobs", "2", "--oven-proxy", chain_fixtures.PROXY, "--minter", chain_fixtures.MINTER,
+    ]
+    assert indexer.main(args) == 0
+    assertAliceIndexed(Indexer(str(tmp_path / "index.db"), CONTRACTS))
+
+    with pytest.raises(SystemExit):
+        indexer.main(args[:-4])
@@ -0,0 +1,120 @@
+import asyncio
+
+import keeper
+import liquidation_index
+import simulator
+from contract_constants import Constants, Errors
+from keeper import Keeper, LocalRpc
+
+PRECISION = Constants.PRECISION
+
+def liquidatableOvens(rpc):
+    universe = rpc.universe
+    xtzPrice = universe.fakeHarbinger.data.harbingerValue * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+    return set(
+        address for address in universe.ovens
+        if liquidation_index.isLiquidatable(rpc.ovenState(address), xtzPrice, universe.minter.data.interestIndex, universe.minter.data.collateralizationPercentage)
+    )
+
+# A universe with Alice at 222%, Bob at 189% and Charlie at 122% once the price falls from $2 to $1.
+def makeRpc(**rpcParams):
+    rpc = LocalRpc(simulator.Universe(lastInterestIndexUpdateTime = 0), **rpcParams)
+    rpc.runAction({ "action": "mint", "to": "stabilityFund", "tokens": 100 * PRECISION })
+    for oven, mutez in [("alice", 20), ("bob", 17), ("charlie", 11)]:
+        rpc.runAction({ "action": "makeOven", "oven": oven, "owner": oven })
+        rpc.runAction({ "action": "deposit", "oven": oven, "mutez": mutez * 1000000 })
+        rpc.runAction({ "action": "borrow", "oven": oven, "tokens": 9 * PRECISION })
+    rpc.runAction({ "action": "setPrice", "price": 1000000, "now": 1 })
+    return rpc
+
+async def tickAndDrain(keeperInstance):
+    targets = await keeperInstance.tick()
+    await keeperInstance.drain()
+    return targets
+
+################################################################
+# Liquidation
+################################################################
+
+def test_liquidates_via_stability_fund_most_undercollateralized_first():
+    rpc = makeRpc()
+    keeperInstance = Keeper(rpc, concurrency = 1)
+
+    assert asyncio.run(tickAndDrain(keeperInstance)) == ["charlie", "bob"]
+    assert rpc.submitted == ["charlie", "bob"]
+    assert keeperInstance.results == { "liquidated": 2 }
+    assert rpc.universe.ovens["charlie"].data.isLiquidated
+    assert rpc.universe.ovens["bob"].data.isLiquidated
+    assert not rpc.universe.ovens["alice"].data.isLiquidated
+    assert liquidatableOvens(rpc) == set()
+
+    # The fund paid for the liquidations and holds the collateral.
+    assert rpc.universe.chain.balance("stabilityFund") == 28 * 1000000
+
+def test_liquidates_directly():
+    rpc = makeRpc(keeperAddress = "liquidator")
+    rpc.runAction({ "action": "mint", "to": "liquidator", "tokens": 100 * PRECISION })
+    keeperInstance = Keeper(rpc, viaStabilityFund = False)
+
+    assert sorted(asyncio.run(tickAndDrain(keeperInstance))) == ["bob", "charlie"]
+    assert rpc.universe.chain.balance("liquidator") == 28 * 1000000
+    assert rpc.universe.chain.balance("stabilityFund") == 0
+
+def test_concurrency_is_bounded():
+    rpc = keeper.makeLoadTest(200, latencySec = 0.001)
+    expected = liquidatableOvens(rpc)
+    keeperInstance = Keeper(rpc, concurrency = 4)
+
+    targets = asyncio.run(tickAndDrain(keeperInstance))
+    assert set(targets) == expected
+    assert rpc.maxInFlight == 4
+    assert keeperInstance.results == { "liquidated": len(expected) }
+    assert liquidatableOvens(rpc) == set()
+
+################################################################
+# Failures
+################################################################
+
+def test_stale_price_is_skipped():
+    rpc = makeRpc()
+    rpc.universe.chain.now = rpc.universe.oracle.data.maxDataDelaySec + 1
+    keeperInstance = Keeper(rpc)
+
+    assert asyncio.run(tickAndDrain(keeperInstance)) == []
+    assert rpc.submitted == []
+
+def test_lost_races_are_counted():
+    rpc = makeRpc()
+    rpc.runAction({ "action": "mint", "to": "liquidator", "tokens": 100 * PRECISION })
+    keeperInstance = Keeper(rpc)
+
+    async def race():
+        await keeperInstance.sync()
+        # Another liquidator gets to Charlie between the keeper's sync and its submission.
+        rpc.universe.call("liquidator", "charlie", "liquidate")
+        keeperInstance.cursor = len(rpc.changes)
+        return await tickAndDrain(keeperInstance)
+
+    assert sorted(asyncio.run(race())) == ["bob", "charlie"]
+    assert keeperInstance.results == { "liquidated": 1, Errors.LIQUIDATED: 1 }
+
+def test_run_until_stopped():
+    rpc = makeRpc()
+    keeperInstance = Keeper(rpc, pollIntervalSec = 0.001)
+
+    async def runBriefly():
+        stop = asyncio.Event()
+        task = asyncio.ensure_future(keeperInstance.run(stop))
+        await asyncio.sleep(0.05)
+        # Alice falls to 178% when the price falls again.
+        rpc.runAction({ "action": "setPrice", "price": 800000, "now": 2 })
+        await asyncio.sleep(0.05)
+        stop.set()
+        await task
+
+    asyncio.run(runBriefly())
+    assert rpc.submitted.count("alice") == 1
+    assert keeperInstance.results == { "liquidated": 3 }
+
+def test_main_load_test():
+    assert keeper.main(["--ovens", "100"]) == 0
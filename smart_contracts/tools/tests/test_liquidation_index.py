@@ -0,0 +1,119 @@
+import random
+
+import liquidation_index
+from contract_constants import Constants
+from liquidation_index import LiquidationIndex, OvenState
+
+PRECISION = Constants.PRECISION
+COLLATERALIZATION_PERCENTAGE = 200 * PRECISION
+
+def randomOven(rng):
+    return OvenState(
+        ovenBalance = rng.choice([0, 1, rng.randrange(10 ** 6), rng.randrange(10 ** 12)]),
+        borrowedTokens = rng.choice([0, 1, rng.randrange(10 ** 6), rng.randrange(10 ** 18), rng.randrange(10 ** 26)]),
+        stabilityFeeTokens = rng.choice([0, 0, rng.randrange(10 ** 18), -1]),
+        interestIndex = rng.choice([PRECISION, rng.randrange(PRECISION, 11 * PRECISION // 10)]),
+        isLiquidated = rng.random() < 0.05
+    )
+
+def makeIndex(ovens):
+    index = LiquidationIndex()
+    for address, oven in ovens.items():
+        index.update(address, *oven)
+    return index
+
+def bruteForce(ovens, xtzPrice, minterInterestIndex, collateralizationPercentage = COLLATERALIZATION_PERCENTAGE):
+    return set(
+        address for address, oven in ovens.items()
+        if liquidation_index.isLiquidatable(oven, xtzPrice, minterInterestIndex, collateralizationPercentage)
+    )
+
+################################################################
+# Liquidation prices
+################################################################
+
+def test_liquidation_price_is_the_boundary_of_liquidate():
+    rng = random.Random(5)
+    for _ in range(2000):
+        oven = randomOven(rng)._replace(isLiquidated = False)
+        minterInterestIndex = oven.interestIndex + rng.randrange(PRECISION // 10)
+        price = liquidation_index.liquidationPrice(oven, minterInterestIndex, COLLATERALIZATION_PERCENTAGE)
+
+        if price is None:
+            assert liquidation_index.isLiquidatable(oven, 10 ** 30, minterInterestIndex, COLLATERALIZATION_PERCENTAGE)
+        elif price == 0:
+            assert not liquidation_index.isLiquidatable(oven, 0, minterInterestIndex, COLLATERALIZATION_PERCENTAGE)
+        else:
+            assert liquidation_index.isLiquidatable(oven, price - 1, minterInterestIndex, COLLATERALIZATION_PERCENTAGE)
+            assert not liquidation_index.isLiquidatable(oven, price, minterInterestIndex, COLLATERALIZATION_PERCENTAGE)
+
+def test_end_to_end_liquidation_price():
+    # 10 XTZ against 10 kUSD at 200% is liquidatable below $2.
+    oven = OvenState(10 * 10 ** 6, 10 * PRECISION, 0, PRECISION, False)
+    assert liquidation_index.liquidationPrice(oven, PRECISION, COLLATERALIZATION_PERCENTAGE) == 2 * PRECISION
+
+################################################################
+# Index
+################################################################
+
+def test_range_query_matches_brute_force():
+    rng = random.Random(9)
+    ovens = { "oven{}".format(i): randomOven(rng) for i in range(3000) }
+    index = makeIndex(ovens)
+    minterInterestIndex = 11 * PRECISION // 10
+
+    # Prices at exact liquidation prices, either side of them, and at random.
+    prices = [rng.randrange(4 * PRECISION) for _ in range(20)]
+    for oven in rng.sample(list(ovens.values()), 20):
+        price = liquidation_index.liquidationPrice(oven, minterInterestIndex, COLLATERALIZATION_PERCENTAGE)
+        if price:
+            prices += [price - 1, price, price + 1]
+
+    for xtzPrice in prices:
+        assert set(index.liquidatable(xtzPrice, minterInterestIndex, COLLATERALIZATION_PERCENTAGE)) == bruteForce(ovens, xtzPrice, minterInterestIndex)
+
+def test_interest_and_parameters_change_without_reindexing():
+    rng = random.Random(13)
+    ovens = { "oven{}".format(i): randomOven(rng) for i in range(2000) }
+    index = makeIndex(ovens)
+
+    for minterInterestIndex in [11 * PRECISION // 10, 12 * PRECISION // 10, 2 * PRECISION]:
+        for collateralizationPercentage in [150 * PRECISION, 200 * PRECISION + 1]:
+            for xtzPrice in [PRECISION, 2 * PRECISION, 3 * PRECISION]:
+                result = index.liquidatable(xtzPrice, minterInterestIndex, collateralizationPercentage)
+                assert set(result) == bruteForce(ovens, xtzPrice, minterInterestIndex, collateralizationPercentage)
+
+def test_results_are_most_undercollateralized_first():
+    index = LiquidationIndex()
+    index.update("healthy", 20 * 10 ** 6, 10 * PRECISION, 0, PRECISION)
+    index.update("under", 9 * 10 ** 6, 10 * PRECISION, 0, PRECISION)
+    index.update("deeplyUnder", 5 * 10 ** 6, 10 * PRECISION, 0, PRECISION)
+    index.update("empty", 0, 10 * PRECISION, 0, PRECISION)
+
+    assert index.liquidatable(2 * PRECISION, PRECISION, COLLATERALIZATION_PERCENTAGE) == ["empty", "deeplyUnder", "under"]
+
+def test_update_and_remove():
+    index = LiquidationIndex()
+    index.update("alice", 9 * 10 ** 6, 10 * PRECISION, 0, PRECISION)
+    index.update("bob", 9 * 10 ** 6, 10 * PRECISION, 0, PRECISION)
+    assert sorted(index.liquidatable(2 * PRECISION, PRECISION, COLLATERALIZATION_PERCENTAGE)) == ["alice", "bob"]
+
+    # Alice deposits, and Bob is liquidated.
+    index.update("alice", 30 * 10 ** 6, 10 * PRECISION, 0, PRECISION)
+    index.update("bob", 0, 0, 0, PRECISION, True)
+    assert index.liquidatable(2 * PRECISION, PRECISION, COLLATERALIZATION_PERCENTAGE) == []
+    assert len(index) == 2
+
+    index.remove("alice")
+    index.remove("alice")
+    assert "alice" not in index
+    assert index.keys == []
+
+def test_load_matches_updates():
+    rng = random.Random(17)
+    ovens = { "oven{}".format(i): randomOven(rng) for i in range(500) }
+    index = LiquidationIndex()
+    index.load(ovens.items())
+
+    assert index.keys == makeIndex(ovens).keys
+    assert set(index.liquidatable(2 * PRECISION, 11 * PRECISION // 10, COLLATERALIZATION_PERCENTAGE)) == bruteForce(ovens, 2 * PRECISION, 11 * PRECISION // 10)
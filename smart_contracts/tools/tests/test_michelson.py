@@ -0,0 +1,101 @@
+import pytest
+
+import michelson
+from michelson import Bytes, Int, Prim, Seq, String
+
+################################################################
+# Parsing
+################################################################
+
+def test_parses_primitive_with_annotations_and_arguments():
+    assert michelson.parseExpression("(pair %borrow nat (option :t mutez))") == Prim(
+        "pair", [Prim("nat"), Prim("option", [Prim("mutez")], [":t"])], ["%borrow"]
+    )
+
+def test_parses_literals():
+    assert michelson.parseExpression("-12") == Int(-12)
+    assert michelson.parseExpression('"a\\"b\\n"') == String('a"b\n')
+    assert michelson.parseExpression("0x0a0B") == Bytes(b"\x0a\x0b")
+
+def test_parses_sequences_and_skips_comments():
+    text = """
+    {
+        PUSH nat 1; # one
+        /* block
+           comment */
+        DROP;
+        {}
+    }
+    """
+    assert michelson.parseExpression(text) == Seq([Prim("PUSH", [Prim("nat"), Int(1)]), Prim("DROP"), Seq([])])
+
+def test_parses_script_sections():
+    script = michelson.parseScript("parameter unit;\nstorage nat;\ncode { CDR; NIL operation; PAIR };")
+    assert michelson.getSection(script, "storage") == Prim("nat")
+    assert michelson.getSection(script, "code") == Seq([Prim("CDR"), Prim("NIL", [Prim("operation")]), Prim("PAIR")])
+
+def test_converts_rpc_json():
+    value = [{ "prim": "Pair", "args": [{ "int": "-3" }, { "string": "KT1" }], "annots": ["%p"] }, { "bytes": "0a0b" }]
+    assert michelson.fromJson(value) == Seq([Prim("Pair", [Int(-3), String("KT1")], ["%p"]), Bytes(b"\x0a\x0b")])
+
+    with pytest.raises(michelson.MichelsonError):
+        michelson.fromJson({ "unknown": 1 })
+
+def test_rejects_malformed_input():
+    with pytest.raises(michelson.MichelsonError):
+        michelson.parseExpression("{ DROP DROP")
+    with pytest.raises(michelson.MichelsonError):
+        michelson.parseExpression("{ DROP } }")
+
+################################################################
+# Macro Expansion
+################################################################
+
+def test_expands_cadr_macros():
+    assert michelson.expand(Prim("CDDAR")) == Seq([Prim("CDR"), Prim("CDR"), Prim("CAR")])
+
+def test_expands_if_some_by_swapping_branches():
+    some, none = Seq([Prim("DROP")]), Seq([Prim("UNIT")])
+    assert michelson.expand(Prim("IF_SOME", [some, none])) == Prim("IF_NONE", [none, some])
+
+def test_expands_comparison_macros():
+    assert michelson.expand(Prim("IFCMPEQ", [Seq([]), Seq([])])) == Seq([
+        Prim("COMPARE"), Prim("EQ"), Prim("IF", [Seq([]), Seq([])])
+    ])
+
+def test_rejects_unknown_primitives():
+    with pytest.raises(michelson.MichelsonError):
+        michelson.expand(Prim("NOT_AN_INSTRUCTION"))
+
+################################################################
+# Binary Encoding
+################################################################
+
+@pytest.mark.parametrize("text, packed", [
+    ("Unit", "05030b"),
+    ("1", "050001"),
+    ("-64", "0500c001"),
+    ("1000000", "050080897a"),
+    ('"a"', "05010000000161"),
+    ("0x0a", "050a000000010a"),
+    ("Pair 1 2", "0507070001 0002"),
+    ("{}", "050200000000"),
+    ("Some 0", "0505090000"),
+    ("(pair %foo nat nat)", "05 0865 0362 0362 00000004 25666f6f"),
+])
+def test_packs_like_the_protocol(text, packed):
+    node = michelson.expand(michelson.parseExpression(text))
+    assert michelson.pack(node).hex() == packed.replace(" ", "")
+
+def test_encodes_primitives_with_more_than_two_arguments():
+    node = Prim("pair", [Prim("nat"), Prim("nat"), Prim("nat")])
+    assert michelson.encode(node).hex() == "0965" + "00000006" + "036203620362" + "00000000"
+
+################################################################
+# Inspection
+################################################################
+
+def test_counts_instructions_including_lambdas():
+    node = michelson.expand(michelson.parseExpression("{ LAMBDA nat nat { PUSH nat 1; ADD }; CADR; DROP }"))
+    # LAMBDA, PUSH, ADD, CAR, CDR, DROP
+    assert michelson.countInstructions(node) == 6
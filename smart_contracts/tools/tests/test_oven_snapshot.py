@@ -0,0 +1,178 @@
+import random
+
+import numpy as np
+import pytest
+
+import batch_health
+import chain_fixtures
+import indexer
+import oven_snapshot
+from chain_fixtures import CONTRACTS
+from contract_constants import Constants
+from oven_snapshot import OvenSnapshot, SnapshotError, SnapshotOven
+
+PRECISION = Constants.PRECISION
+
+def randomOvens(rng, count, prefix = "KT1Oven"):
+    return [
+        SnapshotOven(
+            address = "{}{}".format(prefix, i),
+            owner = "tz1owner{}".format(i % 7),
+            ovenBalance = rng.choice([0, rng.randrange(10 ** 6), rng.randrange(10 ** 12)]),
+            borrowedTokens = rng.choice([0, rng.randrange(10 ** 20), rng.randrange(10 ** 26)]),
+            stabilityFeeTokens = rng.choice([0, rng.randrange(10 ** 18), -rng.randrange(1, 10 ** 6)]),
+            interestIndex = rng.choice([PRECISION, rng.randrange(PRECISION, 2 * PRECISION), -PRECISION]),
+            isLiquidated = rng.random() < 0.1,
+        )
+        for i in range(count)
+    ]
+
+def expectedHealth(ovens, minterInterestIndex, xtzPrice):
+    return batch_health.evaluateHealth(
+        [oven.ovenBalance * Constants.MUTEZ_TO_KOLIBRI_CONVERSION for oven in ovens],
+        [oven.borrowedTokens for oven in ovens],
+        [oven.stabilityFeeTokens for oven in ovens],
+        [oven.interestIndex for oven in ovens],
+        minterInterestIndex,
+        xtzPrice
+    )
+
+def assertSameHealth(health, expected):
+    assert batch_health.fromLimbs(health.collateralizationPercentage) == batch_health.fromLimbs(expected.collateralizationPercentage)
+    assert batch_health.fromLimbs(health.totalOutstandingTokens) == batch_health.fromLimbs(expected.totalOutstandingTokens)
+    assert list(health.failures.codes) == list(expected.failures.codes)
+
+################################################################
+# Snapshots
+################################################################
+
+def test_round_trip_and_zero_copy_health(tmp_path):
+    path = str(tmp_path / "ovens.snapshot")
+    ovens = randomOvens(random.Random(1), 500)
+    OvenSnapshot.create(path).update(ovens, 10, "block10")
+
+    snapshot = OvenSnapshot(path)
+    assert (len(snapshot), snapshot.level, snapshot.blockHash) == (500, 10, "block10")
+    assert snapshot.addresses() == [oven.address for oven in ovens]
+    assert snapshot.addresses("owner") == [oven.owner for oven in ovens]
+    assert [snapshot.oven(oven.address) for oven in ovens] == ovens
+    assert snapshot.oven("KT1Missing") is None
+
+    # Columns are views of the mapped file, and evaluating them leaves the read-only file untouched.
+    assert np.shares_memory(snapshot.column("borrowedTokens"), snapshot.memory)
+    health = snapshot.evaluateHealth(11 * PRECISION // 10, 2 * PRECISION)
+    assertSameHealth(health, expectedHealth(ovens, 11 * PRECISION // 10, 2 * PRECISION))
+    assert list(batch_health.liquidatable(health, 200 * PRECISION, snapshot.column("isLiquidated"))) == list(
+        batch_health.liquidatable(health, 200 * PRECISION, [oven.isLiquidated for oven in ovens])
+    )
+
+def test_updates_rewrite_changed_ovens_and_grow(tmp_path):
+    path = str(tmp_path / "ovens.snapshot")
+    rng = random.Random(2)
+    ovens = randomOvens(rng, 10)
+    snapshot = OvenSnapshot.create(path, capacity = 4, limbs = 1)
+    snapshot.update(ovens, 1)
+    assert (snapshot.capacity, snapshot.limbs) == (16, 3)
+
+    # Change three ovens, twice for one of them, and add many more.
+    changed = [ovens[2]._replace(borrowedTokens = 1), ovens[5]._replace(isLiquidated = True), ovens[2]._replace(borrowedTokens = 2 ** 200)]
+    added = randomOvens(rng, 30, prefix = "KT1New")
+    assert snapshot.update(changed + added, 2) == 32
+    snapshot.close()
+
+    expected = list(ovens)
+    expected[2] = changed[2]
+    expected[5] = changed[1]
+    expected += added
+
+    snapshot = OvenSnapshot(path)
+    assert (len(snapshot), snapshot.capacity, snapshot.limbs, snapshot.level) == (40, 64, 7, 2)
+    assert [snapshot.oven(oven.address) for oven in expected] == expected
+    assertSameHealth(snapshot.evaluateHealth(PRECISION, PRECISION), expectedHealth(expected, PRECISION, PRECISION))
+
+def test_rejects_bad_files(tmp_path):
+    path = str(tmp_path / "ovens.snapshot")
+    with open(path, "wb") as f:
+        f.write(b"x" * 300)
+    with pytest.raises(SnapshotError):
+        OvenSnapshot(path)
+
+    snapshot = OvenSnapshot.create(path)
+    with pytest.raises(SnapshotError):
+        OvenSnapshot(path).update([], 1)
+
+    # An update which never finished.
+    snapshot.dirty = 1
+    snapshot.writeHeader()
+    with pytest.raises(SnapshotError):
+        OvenSnapshot(path)
+
+    with pytest.raises(SnapshotError):
+        snapshot.update([SnapshotOven("KT1" + "x" * 40, None, 0, 0, 0, 0, False)], 1)
+
+################################################################
+# Indexer
+################################################################
+
+def test_updates_from_the_indexer(tmp_path):
+    blocks = chain_fixtures.aliceBlocks() + [chain_fixtures.block(6, [chain_fixtures.makeOven("tz1bob", "KT1BobOven")])]
+    chain_fixtures.writeBlocks(tmp_path / "blocks", blocks)
+    source = indexer.FixtureSource(str(tmp_path / "blocks"))
+    database = indexer.Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1)
+    path = str(tmp_path / "ovens.snapshot")
+
+    database.sync(source, toLevel = 4)
+    assert oven_snapshot.updateFromIndexer(path, database) == 1
+    # Only ovens changed since the snapshot are written.
+    assert oven_snapshot.updateFromIndexer(path, database) == 0
+    database.sync(source)
+    assert oven_snapshot.updateFromIndexer(path, database) == 2
+
+    snapshot = OvenSnapshot(path)
+    assert snapshot.blockHash == "main6"
+    assert snapshot.oven("KT1AliceOven") == SnapshotOven("KT1AliceOven", "tz1alice", 6 * 10 ** 6, 4 * 10 ** 18, 0, 101 * 10 ** 16, False)
+    assert snapshot.oven("KT1BobOven") == SnapshotOven("KT1BobOven", "tz1bob", 0, 0, 0, PRECISION, False)
+
+def test_updates_owners_registered_later(tmp_path):
+    registration = chain_fixtures.operation(
+        chain_fixtures.transaction(chain_fixtures.FACTORY, chain_fixtures.REGISTRY, 0, "addOven", chain_fixtures.pair(chain_fixtures.string("KT1AliceOven"), chain_fixtures.string("tz1carol")))
+    )
+    blocks = chain_fixtures.aliceBlocks() + [chain_fixtures.block(6, [registration])]
+    chain_fixtures.writeBlocks(tmp_path / "blocks", blocks)
+    source = indexer.FixtureSource(str(tmp_path / "blocks"))
+    database = indexer.Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1)
+    path = str(tmp_path / "ovens.snapshot")
+
+    database.sync(source, toLevel = 5)
+    oven_snapshot.updateFromIndexer(path, database)
+    database.sync(source)
+    assert oven_snapshot.updateFromIndexer(path, database) == 1
+    assert OvenSnapshot(path).oven("KT1AliceOven").owner == "tz1carol"
+
+def test_rebuilds_after_reorgs(tmp_path):
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.aliceBlocks())
+    source = indexer.FixtureSource(str(tmp_path / "blocks"))
+    database = indexer.Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1)
+    path = str(tmp_path / "ovens.snapshot")
+    database.sync(source)
+    oven_snapshot.updateFromIndexer(path, database)
+
+    # Alice's level 4 and 5 blocks are replaced, and her oven's row reverts to an older level.
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.forkBlocks())
+    database.sync(source)
+    assert oven_snapshot.updateFromIndexer(path, database) == 2
+
+    snapshot = OvenSnapshot(path)
+    assert snapshot.oven("KT1AliceOven").borrowedTokens == 3 * 10 ** 18
+    assert snapshot.oven("KT1CarolOven").owner == "tz1carol"
+
+def test_main(tmp_path, capsys):
+    chain_fixtures.writeBlocks(tmp_path / "blocks", chain_fixtures.aliceBlocks())
+    database = indexer.Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1)
+    database.sync(indexer.FixtureSource(str(tmp_path / "blocks")))
+    database.close()
+
+    args = ["--database", str(tmp_path / "index.db"), "--snapshot", str(tmp_path / "ovens.snapshot")]
+    assert oven_snapshot.main(args) == 0
+    assert "Wrote 1 ovens, 1 in the snapshot at level 5" in capsys.readouterr().out
+    assert oven_snapshot.main(["--database", str(tmp_path / "empty.db"), "--snapshot", str(tmp_path / "other.snapshot")]) == 1
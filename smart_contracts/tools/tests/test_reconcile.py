@@ -0,0 +1,159 @@
+import random
+
+import pytest
+
+import chain_fixtures
+import indexer
+import michelson
+import oven_snapshot
+import reconcile
+from contract_constants import Constants
+from chain_fixtures import CONTRACTS, boolean, number, pair, string
+from reconcile import Check, Headroom, Offender, Offenders
+
+PRECISION = Constants.PRECISION
+
+def indexBlocks(tmp_path, blocks):
+    chain_fixtures.writeBlocks(tmp_path / "blocks", blocks)
+    database = indexer.Indexer(str(tmp_path / "index.db"), CONTRACTS, startLevel = 1)
+    database.sync(indexer.FixtureSource(str(tmp_path / "blocks")))
+    return database
+
+def snapshotOf(tmp_path, database):
+    oven_snapshot.updateFromIndexer(str(tmp_path / "ovens.snapshot"), database)
+    return oven_snapshot.OvenSnapshot(str(tmp_path / "ovens.snapshot"))
+
+# Token storage laid out like `token.tz`, with big maps as ids.
+def tokenStorage(totalSupply, debtCeiling):
+    return pair(
+        pair(pair(string("tz1administrator"), number(1)), pair(number(debtCeiling), string("tz1governor"))),
+        pair(pair(number(2), boolean(False)), pair(number(3), number(totalSupply))),
+    )
+
+################################################################
+# Reconciliation
+################################################################
+
+def test_clean_history(tmp_path):
+    database = indexBlocks(tmp_path, chain_fixtures.aliceBlocks())
+    for snapshot in [None, snapshotOf(tmp_path, database)]:
+        report = reconcile.reconcile(database, snapshot, tokenStorage = (4 * PRECISION, 1000 * PRECISION))
+        assert report.level == 5
+        assert report.checks == [
+            Check("ledger", 4 * PRECISION, 4 * PRECISION),
+            Check("oven debt", 4 * PRECISION, 4 * PRECISION),
+            Check("chain supply", 4 * PRECISION, 4 * PRECISION),
+        ]
+        assert report.headroom == Headroom(1000 * PRECISION, 4 * PRECISION, 996 * PRECISION)
+        assert reconcile.isClean(report)
+
+def test_reports_drift_and_offenders(tmp_path):
+    oven = "KT1AliceOven"
+    blocks = chain_fixtures.aliceBlocks() + [
+        # A deposit which also mints to Mallory, and a liquidation which leaves the oven's debt in place.
+        chain_fixtures.block(6, [
+            chain_fixtures.ovenCall("tz1alice", oven, "default", chain_fixtures.UNIT, 10 ** 6, 6 * 10 ** 6, chain_fixtures.ovenState(oven, 4 * PRECISION, 0, 101 * 10 ** 16), tokenCalls = [
+                chain_fixtures.mint("tz1mallory", 7),
+            ]),
+        ]),
+        chain_fixtures.block(7, [
+            chain_fixtures.ovenCall("tz1keeper", oven, "liquidate", chain_fixtures.UNIT, 0, 7 * 10 ** 6, chain_fixtures.ovenState(oven, 4 * PRECISION, 5, 101 * 10 ** 16, True), returned = 0, payee = "tz1keeper"),
+        ]),
+        chain_fixtures.block(8, [chain_fixtures.tokenTransfer("tz1bob", "tz1carol", 2 * PRECISION)]),
+    ]
+    database = indexBlocks(tmp_path, blocks)
+
+    for snapshot in [None, snapshotOf(tmp_path, database)]:
+        report = reconcile.reconcile(database, snapshot, tokenStorage = (4 * PRECISION, 4 * PRECISION + 10))
+        assert report.checks == [
+            Check("ledger", 4 * PRECISION + 7, 4 * PRECISION + 7),
+            Check("oven debt", 4 * PRECISION + 7, 4 * PRECISION),
+            Check("chain supply", 4 * PRECISION, 4 * PRECISION + 7),
+        ]
+        assert report.offenders == [
+            Offender(oven, reconcile.LIQUIDATED_WITH_DEBT, 4 * PRECISION + 5),
+            Offender("tz1bob", reconcile.NEGATIVE_BALANCE, -PRECISION),
+        ]
+        assert not reconcile.isClean(report)
+
+    # Fees above the headroom make `repay` fail.
+    report = reconcile.reconcile(database, debtCeiling = 4 * PRECISION + 10)
+    assert report.headroom == Headroom(4 * PRECISION + 10, 4 * PRECISION + 7, 3)
+    assert Offender(oven, reconcile.FEES_OVER_HEADROOM, 5) in report.offenders
+
+def test_fees_compound_to_the_minter_index(tmp_path):
+    database = indexBlocks(tmp_path, chain_fixtures.aliceBlocks())
+    oven = "KT1AliceOven"
+    # Alice's oven owes no stored fees on 4 kUSD, and accrues 1% more at the Minter's index.
+    minterInterestIndex = 101 * 101 * 10 ** 14
+    for snapshot in [None, snapshotOf(tmp_path, database)]:
+        report = reconcile.reconcile(database, snapshot, tokenStorage = (4 * PRECISION, 4 * PRECISION + 10 ** 16))
+        assert reconcile.isClean(report)
+
+        report = reconcile.reconcile(database, snapshot, tokenStorage = (4 * PRECISION, 4 * PRECISION + 10 ** 16), minterInterestIndex = minterInterestIndex)
+        assert report.offenders == [Offender(oven, reconcile.FEES_OVER_HEADROOM, 4 * 10 ** 16)]
+
+    # Ovens whose interest math fails are compared on their stored fees.
+    assert reconcile.owedStabilityFees(PRECISION, 5, 0, minterInterestIndex) == 5
+    assert reconcile.owedStabilityFees(PRECISION, 5, 2 * PRECISION, PRECISION) == 5
+
+def test_snapshots_reconcile_like_the_indexer(tmp_path):
+    database = indexBlocks(tmp_path, chain_fixtures.randomHistory(random.Random(7), 300))
+    snapshot = snapshotOf(tmp_path, database)
+    latestIndex = max(oven.interestIndex for oven in database.ovens())
+
+    for debtCeiling, minterInterestIndex in [(None, None), (database.totalSupply() + 10 ** 15, None), (database.totalSupply() + 10 ** 17, latestIndex * 11 // 10)]:
+        expected = reconcile.reconcile(database, debtCeiling = debtCeiling, maxOffenders = 1000, minterInterestIndex = minterInterestIndex)
+        offenders = Offenders(1000)
+        limit = None if debtCeiling is None else expected.headroom.headroom
+        borrowedTokens = reconcile.snapshotOvenTotal(snapshot, offenders, limit, chunkRows = 7, minterInterestIndex = minterInterestIndex)
+
+        assert borrowedTokens == expected.checks[1].actual
+        ovenOffenders = [offender for offender in expected.offenders if offender.reason != reconcile.NEGATIVE_BALANCE]
+        assert sorted(offenders.largest()) == sorted(ovenOffenders)
+        if debtCeiling is not None:
+            assert any(offender.reason == reconcile.FEES_OVER_HEADROOM for offender in ovenOffenders)
+
+def test_snapshots_must_match_the_index(tmp_path):
+    blocks = chain_fixtures.aliceBlocks()
+    database = indexBlocks(tmp_path, blocks[:4])
+    snapshot = snapshotOf(tmp_path, database)
+    chain_fixtures.writeBlocks(tmp_path / "blocks", blocks)
+    database.sync(indexer.FixtureSource(str(tmp_path / "blocks")))
+
+    with pytest.raises(reconcile.ReconcileError, match = "snapshot is at level 4"):
+        reconcile.reconcile(database, snapshot)
+
+def test_offenders_keep_the_largest():
+    offenders = Offenders(3)
+    for index, value in enumerate([5, -9, 1, 7, -2, 9, 3]):
+        offenders.add("tz1account{}".format(index), reconcile.NEGATIVE_BALANCE, value)
+    assert offenders.count == 7
+    assert [offender.value for offender in offenders.largest()] == [-9, 9, 7]
+
+def test_decode_token_storage():
+    assert indexer.decodeTokenStorage(michelson.fromJson(tokenStorage(12, 34))) == (12, 34)
+
+################################################################
+# Command Line
+################################################################
+
+def test_main(tmp_path, capsys):
+    database = indexBlocks(tmp_path, chain_fixtures.aliceBlocks())
+    snapshotOf(tmp_path, database).close()
+    database.close()
+
+    args = ["--database", str(tmp_path / "index.db"), "--snapshot", str(tmp_path / "ovens.snapshot"), "--debt-ceiling", str(5 * PRECISION)]
+    assert reconcile.main(args) == 0
+    output = capsys.readouterr().out
+    assert "Reconciled at level 5" in output
+    assert "debt ceiling  {} with {} supplied leaves {}".format(5 * PRECISION, 4 * PRECISION, PRECISION) in output
+    assert reconcile.main(["--database", str(tmp_path / "empty.db")]) == 1
+
+    # A transfer from an account which never held kUSD.
+    database = indexBlocks(tmp_path / "drift", [chain_fixtures.block(1, [chain_fixtures.tokenTransfer("tz1alice", "tz1bob", 3)])])
+    database.close()
+    assert reconcile.main(["--database", str(tmp_path / "drift" / "index.db")]) == 2
+    output = capsys.readouterr().out
+    assert "1 offenders" in output
+    assert "tz1alice  negative balance  -3" in output
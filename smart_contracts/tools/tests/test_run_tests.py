@@ -0,0 +1,131 @@
+import os
+import re
+import stat
+import sys
+
+import run_tests
+
+# A stand-in for SmartPy.sh which records the scenarios registered in the file it is given, and fails if a scenario's
+# name contains "broken".
+FAKE_CLI = """#!{python}
+import os, re, sys
+text = open(sys.argv[2]).read()
+names = re.findall(r'^\\s*@sp\\.add_test\\(name\\s*=\\s*"([^"]*)"', text, re.MULTILINE)
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "calls.log"), "a") as log:
+    log.write("|".join(names) + "\\n")
+sys.exit(1 if any("broken" in name for name in names) else 0)
+"""
+
+MINTER = '''import smartpy as sp
+
+Errors = sp.import_script_from_url("file:common/errors.py")
+
+class MinterContract(sp.Contract):
+    pass
+
+if __name__ == "__main__":
+    Token = sp.import_script_from_url("file:token.py")
+    MockOvenProxy = sp.import_script_from_url("file:test-helpers/mock-oven-proxy.py")
+
+    @sp.add_test(name = "borrow - succeeds")
+    def test():
+        token = Token.FA12()
+
+    # @sp.add_test(name = "borrow - disabled")
+    def test():
+        pass
+
+    @sp.add_test(name="repay - broken")
+    def test():
+        ovenProxy = MockOvenProxy.MockOvenProxyContract()
+'''
+
+def writeFile(root, path, content):
+    os.makedirs(os.path.dirname(os.path.join(root, path)), exist_ok = True)
+    with open(os.path.join(root, path), "w") as f:
+        f.write(content)
+
+def makeTree(root):
+    writeFile(root, "common/errors.py", "ERROR = 1\n")
+    writeFile(root, "common/constants.py", "PRECISION = 1\n")
+    writeFile(root, "token.py", "Constants = sp.import_script_from_url(\"file:common/constants.py\")\n")
+    writeFile(root, "test-helpers/mock-oven-proxy.py", "\n")
+    writeFile(root, "minter.py", MINTER)
+
+    cli = os.path.join(root, "SmartPy.sh")
+    writeFile(root, "SmartPy.sh", FAKE_CLI.format(python = sys.executable))
+    os.chmod(cli, os.stat(cli).st_mode | stat.S_IEXEC)
+    return cli
+
+def names(scenarios):
+    return [scenario.name for scenario in scenarios]
+
+################################################################
+# Discovery
+################################################################
+
+def test_discovers_active_scenarios(tmp_path):
+    makeTree(str(tmp_path))
+    scenarios = run_tests.discoverScenarios("minter.py", str(tmp_path))
+
+    assert names(scenarios) == ["borrow - succeeds", "repay - broken"]
+    assert "Token.FA12()" in scenarios[0].body
+    assert "MockOvenProxy" not in scenarios[0].body
+
+def test_shard_registers_only_its_scenario(tmp_path):
+    root = str(tmp_path)
+    makeTree(root)
+    scenarios = run_tests.discoverScenarios("minter.py", root)
+
+    shardPath = run_tests.writeShard(scenarios[1], scenarios, root)
+    assert os.path.dirname(shardPath) == ""
+    assert names(run_tests.discoverScenarios(shardPath, root)) == ["repay - broken"]
+
+    # Line numbers are preserved, so errors point to the same lines as the original file.
+    with open(os.path.join(root, shardPath)) as f:
+        assert len(f.read().splitlines()) == len(MINTER.splitlines())
+
+################################################################
+# Selection
+################################################################
+
+def test_change_to_contract_dependency_selects_every_scenario(tmp_path):
+    root = str(tmp_path)
+    makeTree(root)
+    scenarios = run_tests.discoverScenarios("minter.py", root)
+
+    assert run_tests.affectedScenarios("minter.py", scenarios, {"common/errors.py"}, root) == scenarios
+    assert run_tests.affectedScenarios("minter.py", scenarios, {"minter.py"}, root) == scenarios
+
+def test_change_to_test_dependency_selects_scenarios_using_it(tmp_path):
+    root = str(tmp_path)
+    makeTree(root)
+    scenarios = run_tests.discoverScenarios("minter.py", root)
+
+    assert names(run_tests.affectedScenarios("minter.py", scenarios, {"common/constants.py"}, root)) == ["borrow - succeeds"]
+    assert names(run_tests.affectedScenarios("minter.py", scenarios, {"test-helpers/mock-oven-proxy.py"}, root)) == ["repay - broken"]
+    assert run_tests.affectedScenarios("minter.py", scenarios, {"oven.py"}, root) == []
+
+################################################################
+# Running
+################################################################
+
+def test_runs_each_scenario_in_its_own_process_and_reports_failures(tmp_path):
+    root = str(tmp_path)
+    cli = makeTree(root)
+    scenarios = run_tests.discoverScenarios("minter.py", root)
+
+    results = run_tests.runScenarios({ "minter.py": (scenarios, scenarios) }, cli, root, jobs = 2)
+
+    assert [(scenario.name, passed) for scenario, passed, seconds, log in results] == [
+        ("borrow - succeeds", True), ("repay - broken", False)
+    ]
+    with open(os.path.join(root, "calls.log")) as f:
+        assert sorted(f.read().splitlines()) == ["borrow - succeeds", "repay - broken"]
+
+    # Shards are cleaned up.
+    assert not any(name.startswith(run_tests.SHARD_PREFIX) for name in os.listdir(root))
+
+    summary = run_tests.formatSummary(results, slowest = 1)
+    assert "2 scenarios, 1 failed" in summary
+    assert len(re.findall(r"^\s+\d+\.\ds  ", summary, re.MULTILINE)) == 1
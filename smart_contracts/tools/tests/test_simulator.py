@@ -0,0 +1,318 @@
+import json
+import os
+import stat
+import sys
+
+import pytest
+
+import simulator
+from contract_constants import Constants, Errors
+from minter_math import ContractError
+
+PRECISION = Constants.PRECISION
+TEZ = 1000000
+
+# A stand-in for SmartPy.sh which records the scenario it is given, and fails if it asks for `FAIL`.
+FAKE_CLI = """#!{python}
+import os, sys
+text = open(sys.argv[2]).read()
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenario.log"), "w") as log:
+    log.write(text)
+sys.exit(1 if "FAIL" in text else 0)
+"""
+
+def makeUniverse(**params):
+    return simulator.Universe(**dict({ "lastInterestIndexUpdateTime": 0 }, **params))
+
+################################################################
+# End to end flows
+################################################################
+
+def test_deposit_and_withdraw():
+    universe = makeUniverse()
+    universe.makeOven("aliceOven", "alice")
+
+    universe.call("alice", "aliceOven", "default", amount = 10 * TEZ, now = 1)
+    assert universe.chain.balance("aliceOven") == 10 * TEZ
+
+    universe.call("alice", "aliceOven", "withdraw", 10 * TEZ, now = 2)
+    assert universe.chain.balance("aliceOven") == 0
+    assert universe.chain.balance("alice") == 10 * TEZ
+    assert universe.chain.balance("minter") == 0
+    assert universe.chain.balance("ovenProxy") == 0
+
+def test_liquidation_matches_end_to_end_test():
+    universe = makeUniverse(stabilityDevFundSplit = PRECISION // 10, liquidationFeePercent = PRECISION // 10)
+    oven = universe.makeOven("aliceOven", "alice")
+
+    universe.call("alice", "aliceOven", "default", amount = 10 * TEZ, now = 1)
+    universe.call("alice", "aliceOven", "borrow", 10 * PRECISION, now = 2)
+    assert universe.token.getBalance("alice") == 10 * PRECISION
+
+    universe.call("governor", "fakeHarbinger", "setNewPrice", 100000)
+    universe.call("minter", "token", "mint", ("bob", 100 * PRECISION))
+    universe.call("bob", "aliceOven", "liquidate", now = 3)
+
+    borrowAmount = 10 * PRECISION
+    assert universe.token.getBalance("bob") == 100 * PRECISION - borrowAmount - borrowAmount // 10
+    assert universe.token.getBalance("developerFund") == borrowAmount // 10 // 10
+    assert universe.token.getBalance("stabilityFund") == borrowAmount // 10 // 10 * 9
+    assert universe.chain.balance("bob") == 10 * TEZ
+    assert oven.data.isLiquidated == True
+    assert oven.data.borrowedTokens == 0
+
+def test_stability_fund_liquidation():
+    universe = makeUniverse(stabilityDevFundSplit = PRECISION // 10, liquidationFeePercent = PRECISION // 10)
+    oven = universe.makeOven("aliceOven", "alice")
+    universe.call("alice", "aliceOven", "default", amount = 10 * TEZ, now = 1)
+    universe.call("alice", "aliceOven", "borrow", 10 * PRECISION, now = 2)
+    universe.call("governor", "fakeHarbinger", "setNewPrice", 100000)
+    universe.call("minter", "token", "mint", ("stabilityFund", 100 * PRECISION))
+
+    with pytest.raises(ContractError) as error:
+        universe.call("alice", "stabilityFund", "liquidate", "aliceOven", now = 3)
+    assert error.value.code == Errors.NOT_ADMIN
+
+    universe.call("fundAdministrator", "stabilityFund", "liquidate", "aliceOven", now = 3)
+    assert oven.data.isLiquidated == True
+    assert universe.chain.balance("stabilityFund") == 10 * TEZ
+    assert universe.token.getBalance("stabilityFund") == 100 * PRECISION - 11 * PRECISION + 9 * PRECISION // 10
+
+def test_fees_accrue_in_sync_with_minter_interest_index():
+    universe = makeUniverse(
+        stabilityFee = PRECISION // 10,
+        lastInterestIndexUpdateTime = Constants.SECONDS_PER_COMPOUND,
+        interestIndex = 1100000000000000000
+    )
+    oven = universe.makeOven("aliceOven", "alice", borrowedTokens = 10 * PRECISION, interestIndex = 1100000000000000000)
+
+    universe.call("alice", "aliceOven", "default", amount = TEZ, now = Constants.SECONDS_PER_COMPOUND * 2)
+    assert universe.minter.data.interestIndex == 1210000000000000000
+    assert universe.minter.data.lastInterestIndexUpdateTime == Constants.SECONDS_PER_COMPOUND * 2
+    assert oven.data.interestIndex == 1210000000000000000
+    assert oven.data.stabilityFeeTokens == 1000000000000000000
+
+    universe.call("alice", "aliceOven", "default", amount = TEZ, now = Constants.SECONDS_PER_COMPOUND * 3)
+    assert universe.minter.data.interestIndex == 1331000000000000000
+    assert oven.data.interestIndex == 1331000000000000000
+    assert oven.data.stabilityFeeTokens == 2100000000000000000
+
+def test_oracle_records_observations():
+    universe = makeUniverse(harbingerUpdateTime = 10)
+    universe.makeOven("aliceOven", "alice")
+    universe.call("alice", "aliceOven", "default", amount = 10 * TEZ, now = 11)
+    universe.call("alice", "aliceOven", "borrow", PRECISION, now = 12)
+
+    assert universe.oracle.data.lastPrice == 2 * TEZ * Constants.MUTEZ_TO_KOLIBRI_CONVERSION
+    assert universe.oracle.data.observations == { 0: (10, 0) }
+    assert universe.oracle.data.observationIndex == 1
+    assert universe.oracle.data.state == simulator.IDLE
+
+    # Observations are written modulo the buffer size, so an empty buffer is rejected up front.
+    with pytest.raises(ValueError):
+        simulator.Oracle(harbingerContractAddress = "fakeHarbinger", observationBufferSize = 0)
+
+################################################################
+# Failures
+################################################################
+
+def test_failures_carry_contract_error_codes():
+    universe = makeUniverse()
+    universe.makeOven("aliceOven", "alice")
+    universe.call("alice", "aliceOven", "default", amount = 10 * TEZ, now = 1)
+
+    with pytest.raises(ContractError) as error:
+        universe.call("mallory", "aliceOven", "borrow", PRECISION, now = 2)
+    assert error.value.code == Errors.NOT_OWNER
+
+    with pytest.raises(ContractError) as error:
+        universe.call("governor", "minter", "borrow", (0, "aliceOven", "alice", 0, 0, False, 0, PRECISION, 0))
+    assert error.value.code == Errors.NOT_OVEN_PROXY
+
+def test_failed_operation_rolls_back_every_contract():
+    universe = makeUniverse(stabilityFee = PRECISION // 10)
+    oven = universe.makeOven("aliceOven", "alice")
+    universe.call("alice", "aliceOven", "default", amount = 10 * TEZ, now = 1)
+    minterBefore = dict(vars(universe.minter.data))
+    oracleBefore = dict(vars(universe.oracle.data))
+
+    # $20 of collateral cannot back $11 at 200%. The proxy and oracle change state before the Minter fails.
+    with pytest.raises(ContractError) as error:
+        universe.call("alice", "aliceOven", "borrow", 11 * PRECISION, now = 120)
+    assert error.value.code == Errors.OVEN_UNDER_COLLATERALIZED
+
+    assert universe.ovenProxy.data.state == simulator.IDLE
+    assert universe.ovenProxy.data.borrowParams is None
+    assert vars(universe.minter.data) == minterBefore
+    assert vars(universe.oracle.data) == oracleBefore
+    assert oven.data.borrowedTokens == 0
+    assert universe.chain.balance("aliceOven") == 10 * TEZ
+    assert universe.chain.balance("ovenProxy") == 0
+    assert "alice" not in universe.token.data.balances
+
+def test_big_map_writes_roll_back():
+    universe = makeUniverse()
+    universe.call("minter", "token", "mint", ("alice", 5))
+
+    with pytest.raises(ContractError) as error:
+        universe.call("alice", "token", "transfer", ("alice", "bob", 6))
+    assert error.value.code == Errors.TOKEN_INSUFFICIENT_BALANCE
+    assert "bob" not in universe.token.data.balances
+    assert universe.token.getBalance("alice") == 5
+
+def test_debt_ceiling_and_pause():
+    universe = makeUniverse()
+    universe.makeOven("aliceOven", "alice")
+    universe.call("alice", "aliceOven", "default", amount = 10 * TEZ, now = 1)
+
+    universe.call("governor", "token", "setDebtCeiling", PRECISION)
+    with pytest.raises(ContractError) as error:
+        universe.call("alice", "aliceOven", "borrow", 2 * PRECISION, now = 2)
+    assert error.value.code == Errors.DEBT_CEILING
+
+    universe.call("pauseGuardian", "ovenProxy", "pause")
+    with pytest.raises(ContractError) as error:
+        universe.call("alice", "aliceOven", "borrow", PRECISION, now = 3)
+    assert error.value.code == Errors.PAUSED
+    with pytest.raises(ContractError) as error:
+        universe.call("alice", "ovenProxy", "setDelegates", (["aliceOven"], "tz1baker"), now = 3)
+    assert error.value.code == Errors.PAUSED
+
+def test_stale_oracle_data_fails():
+    universe = makeUniverse()
+    universe.makeOven("aliceOven", "alice")
+    universe.call("alice", "aliceOven", "default", amount = 10 * TEZ, now = 1)
+
+    with pytest.raises(ContractError) as error:
+        universe.call("alice", "aliceOven", "borrow", PRECISION, now = 60 * 30)
+    assert error.value.code == Errors.STALE_DATA
+
+def test_oven_proxy_reads_push_oracle_view():
+    universe = makeUniverse()
+    universe.makeOven("aliceOven", "alice")
+    universe.call("alice", "aliceOven", "default", amount = 10 * TEZ, now = 1)
+
+    universe.chain.originate("pushOracle", simulator.PushOracle(updaterContractAddress = "updater", harbingerContractAddress = "fakeHarbinger"))
+    universe.call("updater", "pushOracle", "setPrice", 2 * PRECISION, now = 2)
+    universe.call("governor", "ovenProxy", "setOracleContract", "pushOracle")
+
+    # The borrow reaches the Minter without a callback from the oracle.
+    operationCount = universe.chain.operationCount
+    universe.call("alice", "aliceOven", "borrow", PRECISION, now = 3)
+    assert universe.ovens["aliceOven"].data.borrowedTokens == PRECISION
+    assert universe.ovenProxy.data.state == simulator.IDLE
+    assert universe.chain.operationCount - operationCount == 7
+
+    # A stale pushed price fails the call. Relaying Harbinger's price makes it fresh again.
+    with pytest.raises(ContractError) as error:
+        universe.call("alice", "aliceOven", "withdraw", TEZ, now = 2 + 60 * 30)
+    assert error.value.code == Errors.STALE_DATA
+    universe.fakeHarbinger.data.harbingerUpdateTime = 2 + 60 * 30
+    universe.call("keeper", "pushOracle", "update", now = 2 + 60 * 30)
+    universe.call("alice", "aliceOven", "withdraw", TEZ, now = 2 + 60 * 30)
+    assert universe.chain.balance("alice") == TEZ
+
+def test_unregistered_oven_is_rejected():
+    universe = makeUniverse()
+    universe.chain.originate("fakeOven", simulator.Oven(owner = "mallory", ovenProxyContractAddress = "ovenProxy"))
+
+    with pytest.raises(ContractError) as error:
+        universe.call("mallory", "fakeOven", "default", amount = TEZ, now = 1)
+    assert error.value.code == Errors.NOT_OVEN
+
+def test_partial_liquidation_needs_collateralization_above_liquidation_fee():
+    # At 105% with an 8% liquidation fee, repaying a token seizes more collateral than it frees.
+    universe = makeUniverse(collateralizationPercentage = 105 * PRECISION, liquidationFeePercent = 8 * PRECISION // 100)
+    universe.makeOven("aliceOven", "alice")
+    universe.call("alice", "aliceOven", "default", amount = 10 * TEZ, now = 1)
+    universe.call("alice", "aliceOven", "borrow", 15 * PRECISION, now = 2)
+    universe.call("governor", "fakeHarbinger", "setNewPrice", 1000000)
+    universe.call("minter", "token", "mint", ("bob", 20 * PRECISION))
+
+    with pytest.raises(ContractError) as error:
+        universe.call("bob", "aliceOven", "partialLiquidate", now = 3)
+    assert error.value.code == Errors.PARTIAL_LIQUIDATION_DISABLED
+
+    universe.call("bob", "aliceOven", "liquidate", now = 3)
+    assert universe.ovens["aliceOven"].data.isLiquidated == True
+
+################################################################
+# Action scripts
+################################################################
+
+SCRIPT = [
+    { "action": "makeOven", "oven": "aliceOven", "owner": "alice" },
+    { "action": "deposit", "oven": "aliceOven", "mutez": 10 * TEZ, "now": 1 },
+    { "action": "borrow", "oven": "aliceOven", "tokens": 5 * PRECISION, "now": 2 },
+    { "action": "borrow", "oven": "aliceOven", "tokens": 10 * PRECISION, "now": 3 },
+    { "action": "setPrice", "price": 900000 },
+    { "action": "mint", "to": "bob", "tokens": 10 * PRECISION },
+    { "action": "partialLiquidate", "oven": "aliceOven", "liquidator": "bob", "now": 4 },
+]
+
+def test_run_script_reports_each_action():
+    universe, results = simulator.runScript(SCRIPT, { "lastInterestIndexUpdateTime": 0 })
+
+    assert results == [None, None, None, Errors.OVEN_UNDER_COLLATERALIZED, None, None, None]
+    assert universe.chain.balance("bob") > 0
+    assert universe.token.getBalance("bob") < 10 * PRECISION
+    assert universe.ovens["aliceOven"].data.isLiquidated == False
+
+def test_unknown_or_incomplete_actions_are_rejected():
+    with pytest.raises(ValueError):
+        simulator.runScript([{ "action": "teleport" }])
+    with pytest.raises(ValueError):
+        simulator.runScript([{ "action": "borrow", "oven": "aliceOven" }])
+
+def test_render_scenario():
+    text = simulator.renderScenario(SCRIPT, { "lastInterestIndexUpdateTime": 0 })
+
+    assert 'Universe = sp.import_script_from_url("file:test-helpers/universe.py")' in text
+    assert "lastInterestIndexUpdateTime = sp.timestamp(0)" in text
+    assert "  aliceOven = universe.makeOven(alice.address)" in text
+    assert "  bob = Dummy.DummyContract()" in text
+    assert "  scenario += aliceOven.default(sp.unit).run(sender = alice.address, amount = sp.mutez(10000000), now = sp.timestamp(1))" in text
+    assert "aliceOven.borrow(sp.nat(10000000000000000000)).run(sender = alice.address, now = sp.timestamp(3), valid = False)" in text
+    assert "universe.token.mint(sp.record(address = bob.address, value = sp.nat(10000000000000000000))).run(sender = universe.minter.address" in text
+    assert "scenario.verify(universe.token.data.balances[alice.address].balance == sp.nat(5000000000000000000))" in text
+    assert "scenario.verify(~universe.token.data.balances.contains(bob.address))" in text
+    assert "scenario.verify(universe.ovenRegistry.data.ovenMap[aliceOven.address] == alice.address)" in text
+    assert "scenario.verify(universe.ovenProxy.data.borrowParams.is_none())" in text
+    assert "scenario.verify(sp.len(universe.oracle.data.observations) == 0)" in text
+    assert "scenario.verify(aliceOven.balance == sp.mutez(10000000))" in text
+    compile(text, "scenario.py", "exec")
+
+def test_cross_check_runs_rendered_scenario(tmp_path):
+    cli = str(tmp_path / "SmartPy.sh")
+    with open(cli, "w") as f:
+        f.write(FAKE_CLI.format(python = sys.executable))
+    os.chmod(cli, os.stat(cli).st_mode | stat.S_IEXEC)
+
+    assert simulator.crossCheck(SCRIPT[:3], cli, root = str(tmp_path))
+    with open(str(tmp_path / "scenario.log")) as f:
+        assert "aliceOven.borrow(sp.nat(5000000000000000000))" in f.read()
+    assert [name for name in os.listdir(str(tmp_path)) if name.startswith(".crosscheck-") and name.endswith(".py")] == []
+
+    assert not simulator.crossCheck(SCRIPT[:1] + [{ "action": "mint", "to": "FAIL", "tokens": 1 }], cli, root = str(tmp_path))
+
+def test_main(tmp_path, capsys):
+    script = tmp_path / "script.json"
+    script.write_text(json.dumps({ "universe": { "lastInterestIndexUpdateTime": 0 }, "actions": SCRIPT }))
+    rendered = tmp_path / "scenario.py"
+
+    assert simulator.main([str(script), "--render", str(rendered)]) == 0
+    output = capsys.readouterr().out
+    assert "FAILED {}".format(Errors.OVEN_UNDER_COLLATERALIZED) in output
+    assert "7 actions" in output
+    assert rendered.read_text().startswith("import smartpy as sp")
+
+def test_cross_check_script_exercises_every_outcome(tmp_path):
+    # CI replays this script through the SmartPy CLI with --cross-check.
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "cross-check.json")) as f:
+        script = json.load(f)
+    universe, results = simulator.runScript(script["actions"], script["universe"])
+
+    assert Errors.OVEN_UNDER_COLLATERALIZED in results
+    assert Errors.PAUSED in results
+    assert results[-1] is None
+    compile(simulator.renderScenario(script["actions"], script["universe"]), "cross-check.py", "exec")
@@ -0,0 +1,145 @@
+import random
+
+import numpy as np
+import pytest
+
+import solvency
+from contract_constants import Constants
+from oven_snapshot import OvenSnapshot, SnapshotOven
+from solvency import Params, PathModel
+
+PRECISION = Constants.PRECISION
+
+DEFAULT_PARAMS = Params(200 * PRECISION, 8 * PRECISION // 100, 0, PRECISION // 10)
+
+def writeSnapshot(path, ovens):
+    snapshot = OvenSnapshot.create(str(path))
+    snapshot.update(ovens, 1)
+    snapshot.close()
+    return OvenSnapshot(str(path))
+
+def aliceOven(ovenBalance = 10 * 10 ** 6, borrowedTokens = 5 * PRECISION, **kwargs):
+    return SnapshotOven("KT1AliceOven", "tz1alice", ovenBalance, borrowedTokens, kwargs.get("stabilityFeeTokens", 0), kwargs.get("interestIndex", PRECISION), kwargs.get("isLiquidated", False))
+
+def randomOvens(rng, count):
+    return [
+        SnapshotOven(
+            address = "KT1Oven{}".format(i),
+            owner = "tz1owner",
+            ovenBalance = rng.choice([0, rng.randrange(1, 10 ** 9), rng.randrange(10 ** 9, 10 ** 11)]),
+            borrowedTokens = rng.choice([0, rng.randrange(10 ** 21), rng.randrange(10 ** 23)]),
+            stabilityFeeTokens = rng.choice([0, rng.randrange(10 ** 18), -1]),
+            interestIndex = rng.choice([PRECISION, rng.randrange(PRECISION, 11 * PRECISION // 10)]),
+            isLiquidated = rng.random() < 0.05,
+        )
+        for i in range(count)
+    ]
+
+# Step by step reference: check every open oven at every step.
+def referenceOutcome(ovens, minterInterestIndex, params, paths, stepSec):
+    indexes = solvency.interestIndexes(minterInterestIndex, params.stabilityFee, stepSec, paths.shape[1])
+    badDebt, fundDrawdown, liquidations = [], [], []
+    for path in paths:
+        open = [oven for oven in ovens if not oven.isLiquidated and oven.stabilityFeeTokens >= 0 and oven.interestIndex > 0 and oven.borrowedTokens + oven.stabilityFeeTokens > 0]
+        value, peak, drawdown, bad, count = 0, 0, 0, 0, 0
+        for price, index in zip(path, indexes):
+            remaining = []
+            for oven in open:
+                total = (oven.borrowedTokens + oven.stabilityFeeTokens) / PRECISION * index / oven.interestIndex
+                collateralValue = oven.ovenBalance / 10 ** 6 * price
+                if collateralValue >= params.collateralizationPercentage / (100 * PRECISION) * total:
+                    remaining.append(oven)
+                    continue
+                fee = total * params.liquidationFeePercent / PRECISION
+                minted = (total - oven.borrowedTokens / PRECISION + fee) * (1 - params.stabilityDevFundSplit / PRECISION)
+                value -= total + fee - minted - collateralValue
+                bad += max(total - collateralValue, 0)
+                count += 1
+            open = remaining
+            peak = max(peak, value)
+            drawdown = max(drawdown, peak - value)
+        badDebt.append(bad)
+        fundDrawdown.append(drawdown)
+        liquidations.append(count)
+    return solvency.Outcome(badDebt, fundDrawdown, liquidations)
+
+def assertSameOutcome(outcome, expected):
+    assert np.allclose(outcome.badDebt, expected.badDebt, rtol = 1e-9, atol = 1e-9)
+    assert np.allclose(outcome.fundDrawdown, expected.fundDrawdown, rtol = 1e-9, atol = 1e-9)
+    assert list(outcome.liquidations) == list(expected.liquidations)
+
+################################################################
+# Simulation
+################################################################
+
+def test_liquidation_outcomes(tmp_path):
+    book = solvency.loadBook(writeSnapshot(tmp_path / "ovens.snapshot", [aliceOven()]))
+    # 10 XTZ backing 5 kUSD at 200% is liquidated below $1.
+    paths = np.array([
+        [1.5, 1.2, 1.1, 1.0],
+        [1.5, 1.2, 0.9, 0.4],
+        [1.5, 0.4, 0.9, 2.0],
+    ])
+    outcome = solvency.simulate(book, PRECISION, DEFAULT_PARAMS, paths, 3600)
+
+    # The fund burns 5.4 kUSD, is minted 90% of the 0.4 kUSD fee and sells 10 XTZ.
+    assert list(outcome.liquidations) == [0, 1, 1]
+    assert outcome.badDebt == pytest.approx([0, 0, 1])
+    assert outcome.fundDrawdown == pytest.approx([0, 0, 1.04])
+
+def test_interest_moves_liquidation_prices():
+    # 5% a step for two steps.
+    indexes = solvency.interestIndexes(PRECISION, PRECISION // 20 // 60, 3600, 3)
+    assert list(indexes) == pytest.approx([PRECISION, 1.05 * PRECISION, 1.1025 * PRECISION])
+
+def test_matches_step_by_step_reference(tmp_path):
+    rng = random.Random(3)
+    ovens = randomOvens(rng, 200)
+    book = solvency.loadBook(writeSnapshot(tmp_path / "ovens.snapshot", ovens))
+    model = PathModel(xtzPrice = 3.0, drift = 0, volatility = 2.0, stepSec = 3600, steps = 48)
+    paths = solvency.pricePaths(model, 20, np.random.default_rng(4))
+
+    for params in [DEFAULT_PARAMS, Params(150 * PRECISION, 0, 10 ** 10, 0), Params(300 * PRECISION, 15 * PRECISION // 100, 0, PRECISION)]:
+        outcome = solvency.simulate(book, 11 * PRECISION // 10, params, paths, model.stepSec)
+        assertSameOutcome(outcome, referenceOutcome(ovens, 11 * PRECISION // 10, params, paths, model.stepSec))
+
+def test_excludes_ovens_which_cannot_be_liquidated(tmp_path):
+    ovens = [
+        aliceOven(),
+        aliceOven(isLiquidated = True)._replace(address = "KT1Liquidated"),
+        aliceOven(stabilityFeeTokens = -1)._replace(address = "KT1NegativeFees"),
+        aliceOven(borrowedTokens = 0)._replace(address = "KT1NoDebt"),
+        aliceOven(ovenBalance = 0)._replace(address = "KT1Empty"),
+    ]
+    book = solvency.loadBook(writeSnapshot(tmp_path / "ovens.snapshot", ovens))
+    assert list(book.key) == [pytest.approx(0.5 / PRECISION), np.inf]
+
+################################################################
+# Sweeps
+################################################################
+
+def test_sweep_is_independent_of_workers(tmp_path):
+    snapshot = writeSnapshot(tmp_path / "ovens.snapshot", randomOvens(random.Random(5), 100))
+    book = solvency.loadBook(snapshot)
+    model = PathModel(xtzPrice = 3.0, drift = 0, volatility = 1.5, stepSec = 3600, steps = 24 * 7)
+    paramSets = [DEFAULT_PARAMS, DEFAULT_PARAMS._replace(collateralizationPercentage = 150 * PRECISION)]
+
+    sequential = solvency.sweep(book, PRECISION, paramSets, model, 50, seed = 1, chunkPaths = 16)
+    parallel = solvency.sweep(book, PRECISION, paramSets, model, 50, seed = 1, jobs = 2, chunkPaths = 16)
+    for left, right in zip(sequential, parallel):
+        assert len(left.badDebt) == 50
+        assertSameOutcome(left, right)
+
+    # Every parameter set sees the same paths, so a lower collateralization requirement never liquidates more.
+    assert (sequential[1].liquidations <= sequential[0].liquidations).all()
+    assert solvency.summarize(sequential[0])["liquidations"]["max"] > 0
+
+def test_main(tmp_path, capsys):
+    writeSnapshot(tmp_path / "ovens.snapshot", randomOvens(random.Random(6), 50)).close()
+    args = ["--snapshot", str(tmp_path / "ovens.snapshot"), "--xtz-price", "3", "--paths", "20", "--days", "2", "--collateralization", "200", "150", "--stability-fee", "5", "--jobs", "1"]
+    assert solvency.main(args) == 0
+
+    output = capsys.readouterr().out
+    assert "over 20 paths of 49 steps" in output
+    assert "    200.0%    8.00%     5.00%" in output
+    assert "    150.0%    8.00%     5.00%" in output